@@ -35,6 +35,7 @@ from ...models.scan_performance_models import (
 )
 from ...api.security.rbac import get_current_user
 from ...core.monitoring import MetricsCollector
+from ...services.metrics_export_service import MetricsExportService
 
 router = APIRouter(prefix="/api/v1/monitoring", tags=["Advanced Monitoring"])
 
@@ -44,6 +45,7 @@ streaming_service = RealTimeStreamingService()
 edge_service = EdgeComputingService()
 intelligence_service = ScanIntelligenceService()
 metrics_collector = MetricsCollector()
+metrics_export_service = MetricsExportService()
 
 @router.get("/dashboards/real-time")
 async def get_real_time_monitoring_dashboard(
@@ -311,6 +313,60 @@ async def stream_real_time_metrics(
         }
     )
 
+@router.get("/metrics/export")
+async def export_metrics(
+    format: str = Query("json", description="Export format: json, ndjson, csv, xml, prometheus, arrow or parquet"),
+    compression: str = Query("none", description="Compression: none, gzip or zstd"),
+    include_metadata: bool = Query(True, description="Include export metadata"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream the current metrics snapshot in the requested format.
+    """
+    try:
+        export = metrics_export_service.stream_metrics(
+            await metrics_collector.get_all_metrics(), format, compression, include_metadata
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return StreamingResponse(export["content"], media_type=export["media_type"], headers={
+        "Content-Disposition": f'attachment; filename="{export["filename"]}"',
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@router.get("/metrics/export/historical")
+async def export_historical_metrics(
+    start_date: datetime = Query(..., description="Start of the period (inclusive)"),
+    end_date: datetime = Query(..., description="End of the period (exclusive)"),
+    aggregation: str = Query("hourly", description="Bucket size: minute, hourly or daily"),
+    format: str = Query("parquet", description="Export format: parquet, arrow, ndjson, csv, json or xml"),
+    compression: str = Query("none", description="Compression: none, gzip or zstd (parquet compresses its columns)"),
+    batch_size: int = Query(5000, ge=100, le=100000, description="Rows per batch"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream historical metric rollups in constant memory, in row batches.
+    """
+    if end_date <= start_date:
+        raise HTTPException(status_code=400, detail="end_date must be after start_date")
+    try:
+        export = await metrics_export_service.stream_historical_metrics(
+            start_date, end_date, format=format, aggregation=aggregation,
+            compression=compression, batch_size=batch_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export historical metrics: {str(e)}")
+    
+    return StreamingResponse(export["content"], media_type=export["media_type"], headers={
+        "Content-Disposition": f'attachment; filename="{export["filename"]}"',
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @router.post("/analytics/custom")
 async def create_custom_monitoring_analytics(
     analytics_config: Dict[str, Any],
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+import json
 import logging
 
 # **INTERCONNECTED: Import enhanced service and models**
@@ -315,6 +317,31 @@ async def evaluate_rule_with_data_sources(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/evaluate-all")
+async def evaluate_all_rules(
+    evaluation_params: Dict[str, Any] = Body(default={}, description="Evaluation parameters"),
+    session: Session = Depends(get_session)
+):
+    """Evaluate all active (or the given) rules against their data sources, streaming progress as NDJSON"""
+    try:
+        progress = ComplianceRuleService.evaluate_rules_in_bulk(
+            session=session,
+            rule_ids=evaluation_params.get("rule_ids"),
+            data_source_ids=evaluation_params.get("data_source_ids"),
+            include_performance_check=evaluation_params.get("include_performance_check", True),
+            include_security_check=evaluation_params.get("include_security_check", True),
+            include_details=evaluation_params.get("include_details", True)
+        )
+        return StreamingResponse(
+            (json.dumps(record) + "\n" for record in progress),
+            media_type="application/x-ndjson"
+        )
+        
+    except Exception as e:
+        logger.error(f"Error evaluating all rules: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/test", response_model=Dict[str, Any])
 async def test_rule(
     rule_data: Dict[str, Any] = Body(..., description="Rule data to test"),
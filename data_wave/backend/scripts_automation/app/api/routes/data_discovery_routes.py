@@ -102,6 +102,16 @@ class TablePreviewRequest(BaseModel):
         description="Maximum number of rows to preview"
     )
 
+class TableStreamRequest(BaseModel):
+    schema_name: str = Field(..., description="Schema name")
+    table_name: str = Field(..., description="Table name")
+    limit: Optional[int] = Field(
+        default=10000, ge=1, le=5000000,
+        description="Maximum number of rows to stream"
+    )
+    format: str = Field(default="arrow", description="Stream format: arrow (IPC stream) or ndjson")
+    batch_size: int = Field(default=5000, ge=100, le=100000, description="Rows per record batch")
+
 class ColumnProfileRequest(BaseModel):
     data_source_id: int = Field(..., description="ID of the data source")
     schema_name: str = Field(..., description="Schema name")
@@ -819,6 +829,46 @@ async def preview_table_data(
         )
 
 
+@router.post("/data-sources/{data_source_id}/preview-table/stream")
+async def stream_table_data(
+    data_source_id: int,
+    request: TableStreamRequest,
+    session: Session = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(require_permission(PERMISSION_SCAN_VIEW))
+):
+    """
+    Stream table rows in record batches as an Arrow IPC stream or chunked NDJSON
+    """
+    try:
+        data_source = DataSourceService.get_data_source(session, data_source_id)
+        if not data_source:
+            raise HTTPException(status_code=404, detail="Data source not found")
+        
+        stream = await connection_service.stream_table_preview(
+            data_source,
+            request.schema_name,
+            request.table_name,
+            limit=request.limit,
+            output_format=request.format,
+            batch_size=request.batch_size
+        )
+        return StreamingResponse(stream["content"], media_type=stream["media_type"], headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error streaming table data: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Table stream failed: {str(e)}"
+        )
+
+
 @router.post("/data-sources/profile-column")
 async def profile_column_data(
     request: ColumnProfileRequest,
@@ -853,7 +903,7 @@ async def profile_column_data(
             "schema_name": request.schema_name,
             "table_name": request.table_name,
             "column_name": request.column_name,
-            "profile": profile_result["profile"]
+            "profile": profile_result["column_profile"]
         }
         
     except HTTPException:
@@ -1,9 +1,11 @@
+import asyncio
 from typing import Dict, List, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlmodel import Session
 
 from app.db_session import get_session
 from app.services.data_profiling_service import DataProfilingService
+from app.services.data_source_service import DataSourceService
 from app.api.security import get_current_user, require_permission
 from app.api.security.rbac import (
     PERMISSION_DATA_PROFILING_VIEW, PERMISSION_DATA_PROFILING_RUN
@@ -41,21 +43,21 @@ async def profile_data(
     data_source_id: int = Query(..., description="ID of the data source"),
     schema_name: Optional[str] = Query(None, description="Schema name for relational databases"),
     table_name: str = Query(..., description="Table name for relational databases or collection name for MongoDB"),
-    sample_size: int = Query(1000, description="Number of rows to sample for profiling"),
-    include_correlations: bool = Query(False, description="Whether to include correlation analysis"),
+    sample_percent: Optional[float] = Query(None, description="TABLESAMPLE percentage; sized from row estimates when omitted"),
     session: Session = Depends(get_session),
     current_user: Dict[str, Any] = Depends(require_permission(PERMISSION_DATA_PROFILING_RUN))
 ) -> Dict[str, Any]:
-    """Profile data from a data source."""
+    """Profile every column of a table with aggregates pushed down into the source."""
     try:
-        service = DataProfilingService(session)
-        return service.profile_data(
-            data_source_id=data_source_id,
-            schema_name=schema_name,
-            table_name=table_name,
-            sample_size=sample_size,
-            include_correlations=include_correlations
+        data_source = DataSourceService.get_data_source(session, data_source_id)
+        if not data_source:
+            raise HTTPException(status_code=404, detail="Data source not found")
+        # Profiling connects and queries the source synchronously
+        return await asyncio.to_thread(
+            DataProfilingService.profile_table, data_source, table_name, schema_name, sample_percent
         )
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
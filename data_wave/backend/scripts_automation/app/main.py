@@ -653,11 +653,22 @@ async def validation_exception_handler(request: Request, exc: FastAPIRequestVali
         )
 
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     """Shutdown event handler."""
     # Stop scan scheduler
     ScanSchedulerService.stop_scheduler()
     logger.info("Enterprise scan scheduler stopped")
+    # Dispose warm data source connector engines
+    from app.services.connector_engine_registry import get_connector_engine_registry
+    get_connector_engine_registry().close_all()
+    logger.info("Connector engine registry closed")
+    # Flush write-behind activity ingestion before the loop stops
+    from app.services.racine_services.racine_activity_ingestion import shutdown_ingestion_pipelines
+    await shutdown_ingestion_pipelines()
+    logger.info("Activity ingestion pipelines flushed")
+    # Cancel timers on the shared loop scheduler
+    from app.services.scheduler import get_loop_scheduler
+    get_loop_scheduler().shutdown()
 
 @app.get("/health")
 async def health_check():
@@ -14,7 +14,7 @@ from .rule_template_models import (
 
 from .rule_version_control_models import (
     RuleVersion, RuleBranch, RuleChange, MergeRequest, MergeRequestReview,
-    VersionComparison, VersionCreateRequest, BranchCreateRequest,
+    VersionComparison, RuleVersionDelta, VersionCreateRequest, BranchCreateRequest,
     MergeRequestCreateRequest, VersionResponse, BranchResponse
 )
 
@@ -48,7 +48,7 @@ __all__ = [
     
     # Version Control Models
     "RuleVersion", "RuleBranch", "RuleChange", "MergeRequest", "MergeRequestReview",
-    "VersionComparison", "VersionCreateRequest", "BranchCreateRequest",
+    "VersionComparison", "RuleVersionDelta", "VersionCreateRequest", "BranchCreateRequest",
     "MergeRequestCreateRequest", "VersionResponse", "BranchResponse",
     
     # Collaboration Models
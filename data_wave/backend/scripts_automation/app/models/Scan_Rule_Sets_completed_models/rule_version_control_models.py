@@ -107,7 +107,7 @@ class RuleVersion(SQLModel, table=True):
     is_draft: bool = Field(default=True, index=True, description="Draft version")
     
     # Version content
-    rule_content: Dict[str, Any] = Field(sa_column=Column(JSON), description="Rule definition")
+    rule_content: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON), description="Rule definition (snapshot versions only, see RuleVersionDelta)")
     rule_metadata: Dict[str, Any] = Field(sa_column=Column(JSON), description="Rule metadata")
     configuration: Dict[str, Any] = Field(sa_column=Column(JSON), description="Rule configuration")
     dependencies: List[str] = Field(default_factory=list, sa_column=Column(JSON))
@@ -488,6 +488,40 @@ class VersionComparison(SQLModel, table=True):
         UniqueConstraint("comparison_id", name="uq_version_comparison_id"),
     )
 
+class RuleVersionDelta(SQLModel, table=True):
+    """
+    Delta-encoded rule content.
+    Every version is stored as a patch against its parent version; every few
+    versions a full snapshot is kept as well so checkouts replay a bounded chain.
+    """
+    __tablename__ = "rule_version_deltas"
+    
+    # Primary identification
+    id: Optional[int] = Field(default=None, primary_key=True)
+    version_id: str = Field(index=True, unique=True, description="Version whose content is stored")
+    rule_id: str = Field(index=True, description="Associated rule identifier")
+    
+    # Delta chain
+    parent_version_id: Optional[str] = Field(default=None, index=True, description="Version the patch applies to")
+    snapshot_version_id: str = Field(index=True, description="Snapshot the delta chain starts from")
+    chain_length: int = Field(default=0, ge=0, description="Patches replayed from the snapshot")
+    is_snapshot: bool = Field(default=False, index=True)
+    
+    # Stored content
+    content: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON), description="Full content (snapshots)")
+    patch: Optional[List[Any]] = Field(default=None, sa_column=Column(JSON), description="Structural patch from the parent")
+    content_digest: str = Field(max_length=64, description="Digest of the materialized content")
+    stored_bytes: int = Field(default=0, ge=0)
+    
+    # Temporal fields
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    
+    # Table constraints
+    __table_args__ = (
+        Index("idx_version_delta_rule_snapshot", "rule_id", "snapshot_version_id"),
+        UniqueConstraint("version_id", name="uq_rule_version_delta_version_id"),
+    )
+
 # ===================== REQUEST/RESPONSE MODELS =====================
 
 class VersionCreateRequest(BaseModel):
@@ -97,7 +97,8 @@ from .racine_dashboard_models import (
     RacineDashboardWidgetData,
     RacineDashboardAlert,
     RacineDashboardTemplate,
-    RacineDashboardAudit
+    RacineDashboardAudit,
+    RacineMetricRollup
 )
 
 from .racine_collaboration_models import (
@@ -196,6 +197,7 @@ __all__ = [
     "RacineDashboardAlert",
     "RacineDashboardTemplate",
     "RacineDashboardAudit",
+    "RacineMetricRollup",
     
     # Collaboration Models
     "RacineCollaboration",
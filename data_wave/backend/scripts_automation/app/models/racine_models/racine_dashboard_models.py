@@ -18,7 +18,7 @@ These models provide:
 All models are designed for enterprise-grade scalability, performance, and security.
 """
 
-from sqlalchemy import Column, String, Text, Integer, DateTime, Boolean, Float, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Integer, DateTime, Boolean, Float, ForeignKey, JSON, Index, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -640,4 +640,34 @@ class RacineDashboardAudit(Base):
     # Relationships
     dashboard = relationship("RacineDashboard")
     widget = relationship("RacineDashboardWidget")
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+
+class RacineMetricRollup(Base):
+    """
+    Time-bucketed metric aggregates (minute/hour/day) maintained by the dashboard
+    rollup compactor and read by dashboard refreshes instead of the raw tables.
+    """
+    __tablename__ = 'racine_metric_rollups'
+    __table_args__ = (
+        Index('ix_racine_metric_rollups_lookup', 'resolution', 'bucket_start', 'metric_group'),
+        UniqueConstraint('resolution', 'metric_group', 'measure', 'bucket_start', name='uq_racine_metric_rollups_bucket'),
+    )
+
+    # Primary identifier
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Bucket identity
+    resolution = Column(String(16), nullable=False)  # minute, hour, day (plus the compactor's backfill marker)
+    metric_group = Column(String, nullable=False)  # scans, compliance, classifications, catalog, data_sources
+    measure = Column(String, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+
+    # Mergeable aggregates
+    sample_count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Float, nullable=False, default=0.0)
+    value_min = Column(Float)
+    value_max = Column(Float)
+    last_value = Column(Float)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -38,6 +38,8 @@ from ...core.settings import get_settings_manager
 from ...core.cache_manager import EnterpriseCacheManager as CacheManager
 from ...core.logging_config import get_logger
 from ...utils.rate_limiter import check_rate_limit
+from .. import structural_diff
+from .rule_version_store import RuleVersionStore, rule_version_store
 from ...models.Scan_Rule_Sets_completed_models.rule_version_control_models import (
     RuleVersion, RuleBranch, RuleChange, MergeRequest, MergeRequestReview,
     VersionComparison, VersionType, BranchType, ChangeType, MergeStrategy,
@@ -76,47 +78,41 @@ class DiffEngine:
             "complexity_delta": 0.0
         }
         
-        # Flatten content for comparison
-        old_flat = self._flatten_dict(old_content)
-        new_flat = self._flatten_dict(new_content)
+        # Identical subtrees are skipped, list elements are aligned rather than compared by index
+        result = structural_diff.diff(old_content, new_content)
         
-        # Compute changes
-        all_keys = set(old_flat.keys()) | set(new_flat.keys())
-        
-        for key in all_keys:
-            old_val = old_flat.get(key)
-            new_val = new_flat.get(key)
-            
-            if old_val is None and new_val is not None:
-                # Addition
+        for change in result.changes:
+            if change.op == structural_diff.ADDED:
                 diff_result["changes"].append({
                     "type": "addition",
-                    "path": key,
-                    "new_value": new_val
+                    "path": change.location,
+                    "new_value": change.new
                 })
                 diff_result["summary"]["additions"] += 1
             
-            elif old_val is not None and new_val is None:
-                # Deletion
+            elif change.op == structural_diff.REMOVED:
                 diff_result["changes"].append({
                     "type": "deletion",
-                    "path": key,
-                    "old_value": old_val
+                    "path": change.location,
+                    "old_value": change.old
                 })
                 diff_result["summary"]["deletions"] += 1
             
-            elif old_val != new_val:
-                # Modification
+            else:
+                # Modification (or a keyed list element moved to another position)
                 diff_result["changes"].append({
                     "type": "modification",
-                    "path": key,
-                    "old_value": old_val,
-                    "new_value": new_val
+                    "path": change.location,
+                    "old_value": change.old,
+                    "new_value": change.new
                 })
                 diff_result["summary"]["modifications"] += 1
         
+        # Compact patch from the old to the new content, replayable with structural_diff.apply_patch
+        diff_result["patch"] = result.patch
+        
         # Calculate similarity score
-        diff_result["similarity_score"] = self._calculate_similarity(old_flat, new_flat)
+        diff_result["similarity_score"] = self._calculate_similarity(old_content, result)
         
         # Calculate complexity delta
         diff_result["complexity_delta"] = self._calculate_complexity_delta(old_content, new_content)
@@ -140,19 +136,27 @@ class DiffEngine:
                 items.append((new_key, v))
         return dict(items)
     
-    def _calculate_similarity(self, old_flat: Dict[str, Any], 
-                            new_flat: Dict[str, Any]) -> float:
-        """Calculate similarity score between two flattened dictionaries"""
-        all_keys = set(old_flat.keys()) | set(new_flat.keys())
-        if not all_keys:
+    def _calculate_similarity(self, old_content: Dict[str, Any],
+                            result: structural_diff.StructuralDiff) -> float:
+        """Share of leaf values left unchanged, over the leaves of both versions"""
+        old_leaves = structural_diff.leaf_count(old_content)
+        changed = added = 0
+        for change in result.changes:
+            if change.op == structural_diff.ADDED:
+                changed += structural_diff.leaf_count(change.new)
+                added += structural_diff.leaf_count(change.new)
+            elif change.op == structural_diff.REMOVED:
+                changed += structural_diff.leaf_count(change.old)
+            elif change.op == structural_diff.CHANGED:
+                old_count = structural_diff.leaf_count(change.old)
+                new_count = structural_diff.leaf_count(change.new)
+                changed += max(old_count, new_count)
+                added += max(new_count - old_count, 0)
+        
+        all_leaves = old_leaves + added
+        if not all_leaves:
             return 1.0
-        
-        same_count = 0
-        for key in all_keys:
-            if old_flat.get(key) == new_flat.get(key):
-                same_count += 1
-        
-        return same_count / len(all_keys)
+        return max(all_leaves - changed, 0) / all_leaves
     
     def _calculate_complexity_delta(self, old_content: Dict[str, Any], 
                                   new_content: Dict[str, Any]) -> float:
@@ -227,8 +231,9 @@ class DiffEngine:
 class MergeEngine:
     """Advanced merge engine with intelligent conflict resolution"""
     
-    def __init__(self):
+    def __init__(self, version_store: Optional[RuleVersionStore] = None):
         self.diff_engine = DiffEngine()
+        self.version_store = version_store or rule_version_store
         self.auto_resolve_strategies = {
             "last_modified_wins": self._last_modified_wins,
             "size_based": self._size_based_resolution,
@@ -261,29 +266,24 @@ class MergeEngine:
                 merge_result["error"] = "Could not find latest versions for branches"
                 return merge_result
             
-            # Detect conflicts
-            conflicts = self.diff_engine.detect_conflicts(
-                base_version.rule_content,
-                source_version.rule_content,
-                target_version.rule_content
-            )
+            # Merge the stored deltas from the common base to each branch head
+            with get_session() as session:
+                merge = self.version_store.merge(
+                    session, base_version.version_id, source_version.version_id, target_version.version_id
+                )
+            conflicts = merge["conflicts"]
             
             merge_result["conflicts"] = conflicts
             
             if not conflicts:
-                # No conflicts - perform clean merge
-                merged_content = self._perform_clean_merge(
-                    base_version.rule_content,
-                    source_version.rule_content,
-                    target_version.rule_content
-                )
-                merge_result["merged_content"] = merged_content
+                # No conflicts - clean merge
+                merge_result["merged_content"] = merge["content"]
                 merge_result["success"] = True
             
             elif auto_resolve:
-                # Attempt automatic conflict resolution
+                # Attempt automatic conflict resolution on top of the non-conflicting changes
                 resolution_result = self._auto_resolve_conflicts(
-                    conflicts, base_version, source_version, target_version
+                    conflicts, merge["content"], source_version, target_version
                 )
                 
                 merge_result["merged_content"] = resolution_result["content"]
@@ -329,103 +329,12 @@ class MergeEngine:
         except Exception:
             return None
     
-    def _perform_clean_merge(self, base_content: Dict[str, Any],
-                           source_content: Dict[str, Any],
-                           target_content: Dict[str, Any]) -> Dict[str, Any]:
-        """Perform merge when there are no conflicts"""
-        # Start with base content
-        merged = base_content.copy()
-        
-        # Apply changes from source
-        source_diff = self.diff_engine.compute_diff(base_content, source_content)
-        merged = self._apply_changes(merged, source_diff["changes"])
-        
-        # Apply changes from target
-        target_diff = self.diff_engine.compute_diff(base_content, target_content)
-        merged = self._apply_changes(merged, target_diff["changes"])
-        
-        return merged
-    
-    def _apply_changes(self, content: Dict[str, Any], changes: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Apply a list of changes to content"""
-        result = content.copy()
-        
-        for change in changes:
-            path = change["path"]
-            change_type = change["type"]
-            
-            if change_type == "addition":
-                self._set_nested_value(result, path, change["new_value"])
-            elif change_type == "modification":
-                self._set_nested_value(result, path, change["new_value"])
-            elif change_type == "deletion":
-                self._delete_nested_value(result, path)
-        
-        return result
-    
-    def _set_nested_value(self, obj: Dict[str, Any], path: str, value: Any):
-        """Set a value at a nested path"""
-        keys = path.split('.')
-        current = obj
-        
-        for key in keys[:-1]:
-            if '[' in key:
-                # Handle array indices
-                key_name, index = key.split('[')
-                index = int(index.rstrip(']'))
-                if key_name not in current:
-                    current[key_name] = []
-                while len(current[key_name]) <= index:
-                    current[key_name].append(None)
-                if current[key_name][index] is None:
-                    current[key_name][index] = {}
-                current = current[key_name][index]
-            else:
-                if key not in current:
-                    current[key] = {}
-                current = current[key]
-        
-        final_key = keys[-1]
-        if '[' in final_key:
-            key_name, index = final_key.split('[')
-            index = int(index.rstrip(']'))
-            if key_name not in current:
-                current[key_name] = []
-            while len(current[key_name]) <= index:
-                current[key_name].append(None)
-            current[key_name][index] = value
-        else:
-            current[final_key] = value
-    
-    def _delete_nested_value(self, obj: Dict[str, Any], path: str):
-        """Delete a value at a nested path"""
-        keys = path.split('.')
-        current = obj
-        
-        for key in keys[:-1]:
-            if '[' in key:
-                key_name, index = key.split('[')
-                index = int(index.rstrip(']'))
-                current = current[key_name][index]
-            else:
-                current = current[key]
-        
-        final_key = keys[-1]
-        if '[' in final_key:
-            key_name, index = final_key.split('[')
-            index = int(index.rstrip(']'))
-            if key_name in current and index < len(current[key_name]):
-                del current[key_name][index]
-        else:
-            if final_key in current:
-                del current[final_key]
-    
     def _auto_resolve_conflicts(self, conflicts: List[Dict[str, Any]],
-                              base_version: RuleVersion,
+                              content: Dict[str, Any],
                               source_version: RuleVersion,
                               target_version: RuleVersion) -> Dict[str, Any]:
         """Attempt to automatically resolve conflicts"""
-        resolved_content = base_version.rule_content.copy()
+        resolved_content = content
         auto_resolved = 0
         manual_required = 0
         
@@ -433,7 +342,15 @@ class MergeEngine:
             resolution = self._resolve_single_conflict(conflict, source_version, target_version)
             
             if resolution["auto_resolved"]:
-                self._set_nested_value(resolved_content, conflict["path"], resolution["value"])
+                value = resolution["value"]
+                operation = ["del", conflict["path_parts"]] if value is None \
+                    else ["set", conflict["path_parts"], value]
+                try:
+                    resolved_content = structural_diff.apply_patch(resolved_content, [operation], in_place=True)
+                except (KeyError, IndexError, TypeError):
+                    if value is not None:
+                        manual_required += 1
+                        continue
                 auto_resolved += 1
             else:
                 manual_required += 1
@@ -525,7 +442,8 @@ class RuleVersionControlService:
         self.settings = get_settings()
         self.cache = CacheManager()
         self.diff_engine = DiffEngine()
-        self.merge_engine = MergeEngine()
+        self.version_store = rule_version_store
+        self.merge_engine = MergeEngine(self.version_store)
         
         # Service configuration
         self.max_versions_per_rule = 1000
@@ -590,9 +508,10 @@ class RuleVersionControlService:
             
             # Calculate change metrics
             change_metrics = {}
+            diff_result = None
             if parent_version:
                 diff_result = self.diff_engine.compute_diff(
-                    parent_version.rule_content,
+                    self._get_content(session, parent_version),
                     version_data.rule_content
                 )
                 change_metrics = {
@@ -601,6 +520,12 @@ class RuleVersionControlService:
                     "complexity_delta": diff_result["complexity_delta"]
                 }
             
+            # Store the content as a delta from the parent, with a full snapshot every few versions
+            content_record = self.version_store.put(
+                session, version_id, version_data.rule_id, version_data.rule_content,
+                parent_version.version_id if parent_version else None
+            )
+            
             # Create version record
             version = RuleVersion(
                 version_id=version_id,
@@ -608,7 +533,7 @@ class RuleVersionControlService:
                 branch_id=version_data.branch_id,
                 version_number=await self._generate_version_number(session, version_data),
                 version_type=version_data.version_type,
-                rule_content=version_data.rule_content,
+                rule_content=version_data.rule_content if content_record.is_snapshot else None,
                 rule_metadata={
                     "change_metrics": change_metrics,
                     "author_info": {"name": author, "timestamp": datetime.utcnow().isoformat()}
@@ -617,7 +542,9 @@ class RuleVersionControlService:
                 change_description=version_data.change_description,
                 change_type=ChangeType.UPDATE if parent_version else ChangeType.CREATE,
                 breaking_changes=version_data.breaking_changes or [],
+                parent_version_id=parent_version.version_id if parent_version else None,
                 commit_hash=commit_hash,
+                tree_hash=content_record.content_digest,
                 tags=version_data.tags or [],
                 author=author,
                 created_at=datetime.utcnow(),
@@ -630,8 +557,8 @@ class RuleVersionControlService:
             session.refresh(version)
             
             # Create change records
-            if parent_version:
-                await self._create_change_records(session, version, parent_version)
+            if diff_result:
+                await self._create_change_records(session, version, diff_result)
             
             # Update branch head
             await self._update_branch_head(session, version_data.branch_id, version_id)
@@ -735,13 +662,8 @@ class RuleVersionControlService:
         return f"{major}.{minor}.{patch}"
     
     async def _create_change_records(self, session, new_version: RuleVersion, 
-                                   parent_version: RuleVersion):
+                                   diff_result: Dict[str, Any]):
         """Create detailed change records"""
-        diff_result = self.diff_engine.compute_diff(
-            parent_version.rule_content,
-            new_version.rule_content
-        )
-        
         for i, change in enumerate(diff_result["changes"]):
             change_record = RuleChange(
                 change_id=f"change_{uuid4().hex[:12]}",
@@ -803,6 +725,11 @@ class RuleVersionControlService:
         
         return version
     
+    def _get_content(self, session, version: RuleVersion) -> Dict[str, Any]:
+        """Rule content of a version, materialized from the delta store"""
+        content = self.version_store.checkout(session, version.version_id)
+        return content if content is not None else (version.rule_content or {})
+    
     async def create_branch(self, session, branch_data: BranchCreateRequest,
                           created_by: str) -> Dict[str, Any]:
         """Create a new branch with validation and setup"""
@@ -862,8 +789,8 @@ class RuleVersionControlService:
             
             # Generate comparison
             diff_result = self.diff_engine.compute_diff(
-                version1.rule_content,
-                version2.rule_content
+                self._get_content(session, version1),
+                self._get_content(session, version2)
             )
             
             # Create comparison record
@@ -964,6 +891,7 @@ class RuleVersionControlService:
         return {
             "service_name": "RuleVersionControlService",
             "metrics": self.metrics.copy(),
+            "version_store": self.version_store.metrics.copy(),
             "configuration": {
                 "max_versions_per_rule": self.max_versions_per_rule,
                 "auto_gc_enabled": self.auto_gc_enabled,
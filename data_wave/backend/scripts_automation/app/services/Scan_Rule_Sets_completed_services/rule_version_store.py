@@ -0,0 +1,271 @@
+"""
+Delta-Encoded Rule Version Store
+================================
+
+Rule content used to be stored in full on every version, and every comparison
+or merge started again from full snapshots. The store keeps one
+``RuleVersionDelta`` per version instead:
+
+- every version carries the structural patch from its parent version
+  (``structural_diff``), so a new version costs the size of its change;
+- every ``SNAPSHOT_INTERVAL`` versions along a chain the full content is kept
+  too. A checkout starts from the nearest snapshot (or cached ancestor) and
+  replays at most ``SNAPSHOT_INTERVAL - 1`` patches, however long the history;
+- materialized versions are kept in an LRU cache. Versions are immutable, so
+  cached content never needs invalidating.
+
+Three-way merges compose the stored patches from the merge base to each side.
+Patch operations touching disjoint paths merge cleanly by replaying the
+source's patches onto the target. Operations whose paths overlap (one is a
+prefix of the other) are conflicts. A side whose history does not contain the
+base falls back to one diff from the base.
+"""
+
+import copy
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from .. import structural_diff
+from ...core.logging_config import get_logger
+from ...models.Scan_Rule_Sets_completed_models.rule_version_control_models import RuleVersionDelta
+
+logger = get_logger(__name__)
+
+SNAPSHOT_INTERVAL = int(os.getenv("RULE_VERSION_SNAPSHOT_INTERVAL", "32"))
+VERSION_CACHE_SIZE = int(os.getenv("RULE_VERSION_CACHE_SIZE", "512"))
+
+_MISSING = object()
+
+
+def _value_at(document: Any, path: Tuple[Any, ...]) -> Any:
+    for part in path:
+        try:
+            document = document[part]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return document
+
+
+def _overlaps(path: Tuple[Any, ...], paths: Set[Tuple[Any, ...]], prefixes: Set[Tuple[Any, ...]]) -> bool:
+    """Whether ``path`` equals, contains or lies under one of ``paths``."""
+    return path in prefixes or any(path[:i] in paths for i in range(len(path) + 1))
+
+
+def _prefixes(paths: Set[Tuple[Any, ...]]) -> Set[Tuple[Any, ...]]:
+    return {path[:i] for path in paths for i in range(len(path))}
+
+
+class RuleVersionStore:
+    """Snapshots plus bounded delta chains for rule content, with a cache of hot versions."""
+
+    def __init__(self, snapshot_interval: int = SNAPSHOT_INTERVAL, cache_size: int = VERSION_CACHE_SIZE):
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.metrics = {"checkouts": 0, "cache_hits": 0, "patches_replayed": 0}
+
+    # ------------------------------------------------------------------ cache
+
+    def _cached(self, version_id: str) -> Any:
+        with self._lock:
+            content = self._cache.get(version_id, _MISSING)
+            if content is not _MISSING:
+                self._cache.move_to_end(version_id)
+            return content
+
+    def _remember(self, version_id: str, content: Dict[str, Any]) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[version_id] = content
+            self._cache.move_to_end(version_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    # ---------------------------------------------------------------- records
+
+    @staticmethod
+    def _record(session: Session, version_id: str) -> Optional[RuleVersionDelta]:
+        return session.execute(
+            select(RuleVersionDelta).where(RuleVersionDelta.version_id == version_id)
+        ).scalars().first()
+
+    def _lineage(self, session: Session, version_id: str) -> Iterator[RuleVersionDelta]:
+        """The version's record, then its ancestors', newest first (one query per snapshot group)."""
+        group: Dict[str, RuleVersionDelta] = {}
+        current_id: Optional[str] = version_id
+        while current_id is not None:
+            record = group.get(current_id)
+            if record is None:
+                record = self._record(session, current_id)
+                if record is None:
+                    return
+                group = {r.version_id: r for r in session.execute(
+                    select(RuleVersionDelta).where(
+                        RuleVersionDelta.rule_id == record.rule_id,
+                        RuleVersionDelta.snapshot_version_id == record.snapshot_version_id
+                    )
+                ).scalars()}
+            yield record
+            current_id = record.parent_version_id
+
+    # -------------------------------------------------------------- versions
+
+    def put(self, session: Session, version_id: str, rule_id: str, content: Dict[str, Any],
+            parent_version_id: Optional[str] = None) -> RuleVersionDelta:
+        """Store a version's content as a patch from its parent (plus a snapshot when the chain is long)."""
+        parent = self._record(session, parent_version_id) if parent_version_id else None
+        patch = None
+        if parent is not None:
+            # Internal read: not counted in the checkout metrics
+            patch = copy.deepcopy(structural_diff.diff(self._materialize(session, parent.version_id), content).patch)
+        snapshot = parent is None or parent.chain_length + 1 >= self.snapshot_interval
+        record = RuleVersionDelta(
+            version_id=version_id,
+            rule_id=rule_id,
+            parent_version_id=parent.version_id if parent else None,
+            snapshot_version_id=version_id if snapshot else parent.snapshot_version_id,
+            chain_length=0 if snapshot else parent.chain_length + 1,
+            is_snapshot=snapshot,
+            content=copy.deepcopy(content) if snapshot else None,
+            patch=patch,
+            content_digest=structural_diff.document_digest(content),
+            stored_bytes=len(json.dumps(content if snapshot else None, default=str))
+            + len(json.dumps(patch, default=str))
+        )
+        session.add(record)
+        self._remember(version_id, copy.deepcopy(content))
+        return record
+
+    def checkout(self, session: Session, version_id: str) -> Optional[Dict[str, Any]]:
+        """Materialize a version: nearest snapshot or cached ancestor plus the patches after it."""
+        self.metrics["checkouts"] += 1
+        return self._materialize(session, version_id, self.metrics)
+
+    def _materialize(self, session: Session, version_id: str,
+                     metrics: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        cached = self._cached(version_id)
+        if cached is not _MISSING:
+            if metrics is not None:
+                metrics["cache_hits"] += 1
+            return copy.deepcopy(cached)
+
+        pending: List[RuleVersionDelta] = []
+        content = None
+        for record in self._lineage(session, version_id):
+            cached = self._cached(record.version_id)
+            if cached is not _MISSING:
+                content = copy.deepcopy(cached)
+                break
+            if record.is_snapshot:
+                content = copy.deepcopy(record.content)
+                break
+            pending.append(record)
+        else:
+            if not pending:
+                return None
+            raise ValueError(f"Delta chain of rule version {version_id} has no snapshot")
+
+        for record in reversed(pending):
+            content = structural_diff.apply_patch(content, record.patch or [], in_place=True)
+        if metrics is not None:
+            metrics["patches_replayed"] += len(pending)
+        if pending and structural_diff.document_digest(content) != pending[0].content_digest:
+            raise ValueError(f"Digest mismatch while materializing rule version {version_id}")
+        self._remember(version_id, content)
+        return copy.deepcopy(content)
+
+    def patches_since(self, session: Session, base_version_id: str, version_id: str) -> List[list]:
+        """Patch operations from ``base_version_id`` to ``version_id``, in replay order."""
+        if base_version_id == version_id:
+            return []
+        chain: List[RuleVersionDelta] = []
+        for record in self._lineage(session, version_id):
+            if record.version_id == base_version_id:
+                return [op for r in reversed(chain) for op in (r.patch or [])]
+            chain.append(record)
+        # The base is not an ancestor: one diff between the materialized versions
+        logger.debug(f"Rule version {base_version_id} is not an ancestor of {version_id}, diffing contents")
+        return structural_diff.diff(
+            self.checkout(session, base_version_id), self.checkout(session, version_id)
+        ).patch
+
+    # ----------------------------------------------------------------- merges
+
+    def merge(self, session: Session, base_version_id: str, source_version_id: str,
+              target_version_id: str) -> Dict[str, Any]:
+        """
+        Three-way merge on stored patches. Returns the target content with the
+        source's non-conflicting changes applied, and the conflicting paths.
+        """
+        source_ops = self.patches_since(session, base_version_id, source_version_id)
+        target_ops = self.patches_since(session, base_version_id, target_version_id)
+        target_paths = {tuple(op[1]) for op in target_ops}
+        target_prefixes = _prefixes(target_paths)
+        target_by_path = {tuple(op[1]): op for op in target_ops}
+
+        clean: List[list] = []
+        conflicted: Set[Tuple[Any, ...]] = set()
+        conflicted_prefixes: Set[Tuple[Any, ...]] = set()
+        conflict_paths: List[Tuple[Any, ...]] = []
+        for op in source_ops:
+            path = tuple(op[1])
+            if conflicted and _overlaps(path, conflicted, conflicted_prefixes):
+                continue  # Computed on top of a conflicting change
+            if not _overlaps(path, target_paths, target_prefixes):
+                clean.append(op)
+                continue
+            if target_by_path.get(path) == op:
+                continue  # The same change on both sides
+            conflicted.add(path)
+            conflicted_prefixes.update(path[:i] for i in range(len(path)))
+            # Report the outermost overlapping path
+            outer = next((path[:i] for i in range(len(path) + 1) if path[:i] in target_paths), path)
+            if outer not in conflict_paths:
+                conflict_paths.append(outer)
+
+        merged = self.checkout(session, target_version_id)
+        merged = structural_diff.apply_patch(merged, clean, in_place=True)
+        conflicts = []
+        if conflict_paths:
+            base = self.checkout(session, base_version_id)
+            source = self.checkout(session, source_version_id)
+            target = self.checkout(session, target_version_id)
+            for path in conflict_paths:
+                base_value, source_value, target_value = (
+                    _value_at(base, path), _value_at(source, path), _value_at(target, path)
+                )
+                if base_value is None:
+                    conflict_type = "addition_conflict"
+                elif source_value is None or target_value is None:
+                    conflict_type = "deletion_conflict"
+                else:
+                    conflict_type = "modification_conflict"
+                conflicts.append({
+                    "path": structural_diff.format_path(path),
+                    "path_parts": list(path),
+                    "base_value": base_value,
+                    "branch1_value": source_value,
+                    "branch2_value": target_value,
+                    "conflict_type": conflict_type
+                })
+        return {
+            "content": merged,
+            "conflicts": conflicts,
+            "source_operations": len(source_ops),
+            "target_operations": len(target_ops),
+            "applied_operations": len(clean)
+        }
+
+
+rule_version_store = RuleVersionStore()
@@ -59,6 +59,7 @@ from ..core.cache import RedisCache as CacheManager
 from .ai_service import EnterpriseAIService as AIService
 from .scan_intelligence_service import ScanIntelligenceService
 from .data_source_connection_service import DataSourceConnectionService
+from .scheduler import get_loop_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -148,6 +149,8 @@ class AdvancedScanScheduler:
     predictive analytics, and adaptive optimization capabilities.
     """
     
+    SCHEDULING_INTERVAL_SECONDS = 30
+    
     def __init__(self):
         self.settings = get_settings()
         self.cache = CacheManager()
@@ -190,29 +193,28 @@ class AdvancedScanScheduler:
         self.executor = ThreadPoolExecutor(max_workers=10)
         
         # Defer background tasks start until an event loop exists
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(self._scheduling_loop())
-            loop.create_task(self._optimization_loop())
-            loop.create_task(self._dependency_resolution_loop())
-            loop.create_task(self._metrics_collection_loop())
-            loop.create_task(self._predictive_analytics_loop())
-        except RuntimeError:
-            pass
+        self.start()
         
         logger.info("Advanced Scan Scheduler initialized successfully")
     
+    @property
+    def _scheduling_job_name(self) -> str:
+        return f"advanced_scan_scheduler.scheduling@{id(self):x}"
+    
     def start(self) -> None:
         """Start background tasks when an event loop is available."""
         try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(self._scheduling_loop())
-            loop.create_task(self._optimization_loop())
-            loop.create_task(self._dependency_resolution_loop())
-            loop.create_task(self._metrics_collection_loop())
-            loop.create_task(self._predictive_analytics_loop())
+            # Periodic job on the shared loop scheduler (no per-tick threads or re-arming)
+            get_loop_scheduler().call_every(
+                self._scheduling_job_name, self.SCHEDULING_INTERVAL_SECONDS, self._scheduling_tick, first_delay=0
+            )
         except RuntimeError:
             pass
+    
+    def stop(self) -> None:
+        """Stop the periodic scheduling job."""
+        get_loop_scheduler().cancel(self._scheduling_job_name)
+    
     def _init_ml_models(self):
         """Initialize ML models for scheduling optimization"""
         try:
@@ -1007,59 +1009,43 @@ class AdvancedScanScheduler:
         except Exception as e:
             logger.error(f"Priority queue update failed: {e}")
     
-    async def _scheduling_loop(self):
-        """Background loop for processing scheduled scans"""
-        while True:
-            try:
-                current_time = datetime.utcnow()
-                
-                # Process due schedules
-                due_schedules = []
+    async def _scheduling_tick(self):
+        """Process due and recurring schedules (runs every SCHEDULING_INTERVAL_SECONDS)"""
+        try:
+            current_time = datetime.utcnow()
+            
+            # Process due schedules
+            due_schedules = []
+            
+            while self.priority_queue:
+                priority_val, schedule_time, schedule_id = self.priority_queue[0]
+                schedule_datetime = datetime.fromtimestamp(schedule_time)
                 
-                while self.priority_queue:
-                    priority_val, schedule_time, schedule_id = self.priority_queue[0]
-                    schedule_datetime = datetime.fromtimestamp(schedule_time)
+                if schedule_datetime <= current_time:
+                    # Schedule is due
+                    heapq.heappop(self.priority_queue)
                     
-                    if schedule_datetime <= current_time:
-                        # Schedule is due
-                        heapq.heappop(self.priority_queue)
+                    if schedule_id in self.scheduled_scans:
+                        scheduled_scan = self.scheduled_scans[schedule_id]
                         
-                        if schedule_id in self.scheduled_scans:
-                            scheduled_scan = self.scheduled_scans[schedule_id]
-                            
-                            # Check dependencies
-                            if await self._check_dependencies_ready(scheduled_scan):
-                                due_schedules.append(scheduled_scan)
-                            else:
-                                # Reschedule with short delay
-                                await self._reschedule_with_delay(scheduled_scan, timedelta(minutes=5))
-                    else:
-                        break  # No more due schedules
-                
-                # Execute due schedules
-                for scheduled_scan in due_schedules:
-                    await self._execute_scheduled_scan(scheduled_scan)
-                
-                # Process recurring schedules
-                await self._process_recurring_schedules()
-                
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="scan_scheduling",
-                    delay_seconds=30,
-                    task_func=self._scheduling_loop
-                )
-                
-            except Exception as e:
-                logger.error(f"Error in scheduling loop: {e}")
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="scan_scheduling_fallback",
-                    delay_seconds=60,
-                    task_func=self._scheduling_loop
-                )
+                        # Check dependencies
+                        if await self._check_dependencies_ready(scheduled_scan):
+                            due_schedules.append(scheduled_scan)
+                        else:
+                            # Reschedule with short delay
+                            await self._reschedule_with_delay(scheduled_scan, timedelta(minutes=5))
+                else:
+                    break  # No more due schedules
+            
+            # Execute due schedules
+            for scheduled_scan in due_schedules:
+                await self._execute_scheduled_scan(scheduled_scan)
+            
+            # Process recurring schedules
+            await self._process_recurring_schedules()
+            
+        except Exception as e:
+            logger.error(f"Error in scheduling loop: {e}")
     
     async def _check_dependencies_ready(self, scheduled_scan: ScheduledScan) -> bool:
         """Check if all dependencies are satisfied"""
@@ -22,12 +22,76 @@ from datetime import datetime, timedelta
 import json
 import uuid
 import asyncio
+import importlib
+import time
 from enum import Enum
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import threading
 
+from .durable_job_queue import DurableJobQueue, SQLiteJobStore
+
 logger = logging.getLogger(__name__)
 
+# Callables accepted as ``submit_job(handler=...)``, by "module:qualname". Jobs persist the
+# name, not the callable, so a job recovered by another process can resolve its handler.
+_job_handler_registry: Dict[str, Callable] = {}
+
+_job_queue: Optional[DurableJobQueue] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def job_handler_name(handler: Callable) -> str:
+    return f"{handler.__module__}:{handler.__qualname__}"
+
+
+def register_background_handler(handler: Callable) -> Callable:
+    """Allow ``handler`` to be passed to ``submit_job``; usable as a decorator at module level."""
+    _job_handler_registry[job_handler_name(handler)] = handler
+    return handler
+
+
+def resolve_job_handler(name: str) -> Optional[Callable]:
+    """Look up a persisted handler name, importing its module (which registers it) if needed."""
+    handler = _job_handler_registry.get(name)
+    if handler is None:
+        try:
+            importlib.import_module(name.split(":", 1)[0])
+        except ImportError as e:
+            logger.warning(f"Cannot import module of job handler {name}: {e}")
+            return None
+        handler = _job_handler_registry.get(name)
+    return handler
+
+
+def get_background_job_queue() -> DurableJobQueue:
+    """Get the process-wide job queue (one SQLite store per process)."""
+    global _job_queue
+    if _job_queue is None:
+        with _shared_lock:
+            if _job_queue is None:
+                _job_queue = DurableJobQueue(BackgroundProcessingService._open_job_store())
+    return _job_queue
+
+
+def close_background_job_queue() -> None:
+    """Flush and close the process-wide queue; the next ``get_background_job_queue`` reopens it."""
+    global _job_queue
+    with _shared_lock:
+        queue, _job_queue = _job_queue, None
+    if queue is not None:
+        queue.close()
+
+
+def get_background_process_pool() -> ProcessPoolExecutor:
+    """Get the process-wide pool for CPU-bound job handlers."""
+    global _process_pool
+    if _process_pool is None:
+        with _shared_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=4)
+    return _process_pool
+
 
 class JobStatus(Enum):
     """Job status enumeration"""
@@ -69,14 +133,27 @@ class BackgroundProcessingService:
     def __init__(self):
         self.jobs = {}  # Active jobs
         self.job_history = []  # Job history
-        self.job_queue = asyncio.Queue()  # Job queue
+        self.max_history = 10000
+        self.job_queue = get_background_job_queue()  # Priority job queue, shared by the process
         self.scheduled_jobs = {}  # Scheduled jobs
         self.running = False
         self.max_concurrent_jobs = 5
         self.active_job_count = 0
+        self.error_count = 0
         self.thread_pool = ThreadPoolExecutor(max_workers=10)
-        self.process_pool = ProcessPoolExecutor(max_workers=4)
+        self.process_pool = get_background_process_pool()
         self.job_handlers = {}  # Registered job handlers
+        self.cpu_bound_job_types = set()  # Job types whose sync handlers run in the process pool
+        self._workers = []
+    
+    @staticmethod
+    def _open_job_store() -> Optional[SQLiteJobStore]:
+        """Open the durable job store; fall back to an in-memory queue if unavailable."""
+        try:
+            return SQLiteJobStore()
+        except Exception as e:
+            logger.warning(f"Durable job store unavailable, jobs will not survive restarts: {e}")
+            return None
     
     async def submit_job(
         self,
@@ -87,8 +164,11 @@ class BackgroundProcessingService:
         schedule_time: Optional[datetime] = None,
         handler: Optional[Callable] = None
     ) -> Dict[str, Any]:
-        """Submit a new background job"""
+        """Submit a new background job (``handler`` must be registered with ``register_background_handler``)"""
         try:
+            handler_name = job_handler_name(handler) if handler is not None else None
+            if handler_name is not None and _job_handler_registry.get(handler_name) is not handler:
+                raise ValueError(f"Job handler {handler_name} is not registered; jobs could not be recovered")
             job_id = str(uuid.uuid4())
             
             job = {
@@ -107,17 +187,19 @@ class BackgroundProcessingService:
                 "execution_time": 0.0,
                 "retry_count": 0,
                 "max_retries": 3,
-                "handler": handler
+                "handler": handler,
+                "handler_name": handler_name
             }
             
             if schedule_time:
                 self.scheduled_jobs[job_id] = job
-                # Schedule job execution
-                asyncio.create_task(self._schedule_job_execution(job_id, schedule_time))
+                # Delayed delivery: the queue promotes the job once it is due
+                delay = (schedule_time - datetime.utcnow()).total_seconds()
+                await self.job_queue.put(job, available_at=time.time() + max(0.0, delay))
             else:
                 self.jobs[job_id] = job
                 # Add to queue
-                await self.job_queue.put((priority, job_id))
+                await self.job_queue.put(job)
             
             logger.info(f"Submitted job: {job_id} - {job_type}")
             return {
@@ -130,83 +212,66 @@ class BackgroundProcessingService:
             logger.error(f"Error submitting job: {e}")
             return {"success": False, "error": str(e)}
     
-    async def _schedule_job_execution(self, job_id: str, schedule_time: datetime):
-        """Schedule job execution for a specific time"""
-        try:
-            now = datetime.utcnow()
-            if schedule_time > now:
-                delay = (schedule_time - now).total_seconds()
-                await self._schedule_delayed_execution(job_id, delay)
-            
-            # Move job from scheduled to active
-            if job_id in self.scheduled_jobs:
-                job = self.scheduled_jobs[job_id]
-                job["status"] = JobStatus.PENDING.value
-                self.jobs[job_id] = job
-                del self.scheduled_jobs[job_id]
-                
-                # Add to queue
-                await self.job_queue.put((job["priority"], job_id))
-                
-                logger.info(f"Scheduled job started: {job_id}")
-            
-        except Exception as e:
-            logger.error(f"Error scheduling job execution: {e}")
-    
     async def start_background_processor(self):
         """Start the background job processor"""
         if self.running:
             return
         
         self.running = True
-        logger.info("Background processor started")
+        self.job_queue = get_background_job_queue()
+        
+        # Pick up jobs that were queued or running when the process last stopped
+        for job in self.job_queue.recover():
+            if job.get("handler_name"):
+                job["handler"] = resolve_job_handler(job["handler_name"])
+            if job["status"] == JobStatus.SCHEDULED.value:
+                self.scheduled_jobs[job["job_id"]] = job
+            else:
+                self.jobs[job["job_id"]] = job
         
-        # Start job processing loop
-        asyncio.create_task(self._process_jobs())
+        # One long-lived worker per concurrency slot; each blocks on the queue
+        self._workers = [
+            asyncio.create_task(self._process_jobs()) for _ in range(self.max_concurrent_jobs)
+        ]
+        logger.info("Background processor started")
     
     async def stop_background_processor(self):
         """Stop the background job processor"""
         self.running = False
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+        # Jobs still queued become recoverable by the next process at once
+        close_background_job_queue()
         logger.info("Background processor stopped")
     
     async def _process_jobs(self):
-        """Process jobs from the queue"""
+        """Worker: lease jobs from the queue and execute them"""
         while self.running:
             try:
-                if self.active_job_count < self.max_concurrent_jobs:
-                    # Get next job from queue
-                    try:
-                        priority, job_id = await asyncio.wait_for(
-                            self.job_queue.get(), timeout=1.0
-                        )
-                    except asyncio.TimeoutError:
-                        continue
-                    
-                    # Check if job still exists
-                    if job_id not in self.jobs:
-                        continue
-                    
-                    # Execute job
-                    asyncio.create_task(self._execute_job(job_id))
-                    
+                job, lease_token = await self.job_queue.get()
+                await self._execute_job(job, lease_token)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in background processor: {e}")
                 await self._handle_processor_error(e)
     
-    async def _execute_job(self, job_id: str):
+    async def _execute_job(self, job: Dict[str, Any], lease_token: str):
         """Execute a single background job"""
+        job_id = job["job_id"]
+        self.scheduled_jobs.pop(job_id, None)
+        self.jobs[job_id] = job
+        
+        # Update status
+        job["status"] = JobStatus.RUNNING.value
+        job["started_at"] = datetime.utcnow().isoformat()
+        self.active_job_count += 1
+        start_time = datetime.utcnow()
+        
         try:
-            job = self.jobs[job_id]
-            
-            # Update status
-            job["status"] = JobStatus.RUNNING.value
-            job["started_at"] = datetime.utcnow().isoformat()
-            self.active_job_count += 1
-            
-            start_time = datetime.utcnow()
-            
             # Execute job
-            result = await self._execute_job_by_type(job)
+            result = await asyncio.wait_for(self._execute_job_by_type(job), timeout=job["timeout"])
             
             # Calculate execution time
             end_time = datetime.utcnow()
@@ -218,55 +283,55 @@ class BackgroundProcessingService:
             job["result"] = result
             job["execution_time"] = execution_time
             
-            # Move to history
-            self.job_history.append(job.copy())
-            del self.jobs[job_id]
-            self.active_job_count -= 1
-            
-            logger.info(f"Job completed: {job_id} - {execution_time:.2f}s")
+            if self.job_queue.ack(job, lease_token):
+                self._archive_job(job)
+                logger.info(f"Job completed: {job_id} - {execution_time:.2f}s")
             
         except Exception as e:
             logger.error(f"Error executing job {job_id}: {e}")
             
-            if job_id in self.jobs:
-                job = self.jobs[job_id]
+            # Check retry configuration
+            if job["retry_count"] < job["max_retries"]:
+                # Retry job with exponential backoff
+                job["retry_count"] += 1
+                job["error"] = None
+                job["completed_at"] = None
+                job["started_at"] = None
+                self.job_queue.retry(job, lease_token, delay_seconds=min(60, 2 ** job["retry_count"]))
+            else:
                 job["status"] = JobStatus.FAILED.value
-                job["error"] = str(e)
+                job["error"] = str(e) or type(e).__name__
                 job["completed_at"] = datetime.utcnow().isoformat()
-                
-                # Check retry configuration
-                if job["retry_count"] < job["max_retries"]:
-                    # Retry job
-                    job["retry_count"] += 1
-                    job["status"] = JobStatus.PENDING.value
-                    job["error"] = None
-                    job["completed_at"] = None
-                    job["started_at"] = None
-                    
-                    # Re-queue job
-                    await self.job_queue.put((job["priority"], job_id))
-                else:
-                    # Move to history
-                    self.job_history.append(job.copy())
-                    del self.jobs[job_id]
-                
-                self.active_job_count -= 1
+                if self.job_queue.ack(job, lease_token):
+                    self._archive_job(job)
+        finally:
+            self.active_job_count -= 1
+    
+    def _archive_job(self, job: Dict[str, Any]):
+        """Move a finished job from the active set to the bounded in-memory history"""
+        self.jobs.pop(job["job_id"], None)
+        self.job_history.append(job.copy())
+        if len(self.job_history) > self.max_history:
+            del self.job_history[:len(self.job_history) - self.max_history]
     
     async def _execute_job_by_type(self, job: Dict[str, Any]) -> Dict[str, Any]:
         """Execute job based on type"""
         try:
             job_type = job["job_type"]
             job_data = job["job_data"]
-            handler = job.get("handler")
+            handler = job.get("handler") or self.job_handlers.get(job_type)
+            if job.get("handler_name") and not job.get("handler"):
+                raise ValueError(f"Job handler not registered: {job['handler_name']}")
             
             # Use custom handler if provided
             if handler:
                 if asyncio.iscoroutinefunction(handler):
                     result = await handler(job_data)
                 else:
-                    # Run in thread pool for synchronous handlers
-                    loop = asyncio.get_event_loop()
-                    result = await loop.run_in_executor(self.thread_pool, handler, job_data)
+                    # CPU-bound handlers go to the process pool, blocking I/O to the thread pool
+                    executor = self.process_pool if job_type in self.cpu_bound_job_types else self.thread_pool
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(executor, handler, job_data)
                 return result
             
             # Use default handlers based on job type
@@ -894,6 +959,21 @@ class BackgroundProcessingService:
                         "error": job["error"]
                     }
             
+            # Check the durable store (jobs finished before a restart)
+            job = self.job_queue.get_record(job_id)
+            if job:
+                return {
+                    "success": True,
+                    "job_id": job_id,
+                    "status": job["status"],
+                    "created_at": job.get("created_at"),
+                    "started_at": job.get("started_at"),
+                    "completed_at": job.get("completed_at"),
+                    "execution_time": job.get("execution_time", 0.0),
+                    "result": job.get("result"),
+                    "error": job.get("error")
+                }
+            
             return {
                 "success": False,
                 "error": f"Job not found: {job_id}"
@@ -951,18 +1031,19 @@ class BackgroundProcessingService:
         try:
             if job_id in self.jobs:
                 job = self.jobs[job_id]
+                self.job_queue.cancel(job_id)
                 job["status"] = JobStatus.CANCELLED.value
                 job["completed_at"] = datetime.utcnow().isoformat()
                 
                 # Move to history
-                self.job_history.append(job.copy())
-                del self.jobs[job_id]
+                self._archive_job(job)
                 
                 logger.info(f"Job cancelled: {job_id}")
                 return {"success": True, "job_id": job_id, "status": "cancelled"}
             
             if job_id in self.scheduled_jobs:
                 job = self.scheduled_jobs[job_id]
+                self.job_queue.cancel(job_id)
                 job["status"] = JobStatus.CANCELLED.value
                 job["completed_at"] = datetime.utcnow().isoformat()
                 
@@ -994,7 +1075,9 @@ class BackgroundProcessingService:
                 "cancelled_jobs": 0,
                 "average_execution_time": 0.0,
                 "jobs_by_type": {},
-                "jobs_by_status": {}
+                "jobs_by_status": {},
+                "running_jobs": self.active_job_count,
+                "queue": self.job_queue.get_metrics()
             }
             
             all_jobs = list(self.jobs.values()) + list(self.scheduled_jobs.values()) + self.job_history
@@ -1031,10 +1114,14 @@ class BackgroundProcessingService:
             logger.error(f"Error getting job metrics: {e}")
             return {"error": str(e)}
     
-    def register_job_handler(self, job_type: str, handler: Callable):
-        """Register a custom job handler"""
+    def register_job_handler(self, job_type: str, handler: Callable, cpu_bound: bool = False):
+        """Register a custom job handler (``cpu_bound`` sync handlers run in the process pool)"""
         try:
             self.job_handlers[job_type] = handler
+            if cpu_bound:
+                self.cpu_bound_job_types.add(job_type)
+            else:
+                self.cpu_bound_job_types.discard(job_type)
             logger.info(f"Registered job handler for type: {job_type}")
         except Exception as e:
             logger.error(f"Error registering job handler: {e}")
@@ -1044,6 +1131,7 @@ class BackgroundProcessingService:
         try:
             if job_type in self.job_handlers:
                 del self.job_handlers[job_type]
+                self.cpu_bound_job_types.discard(job_type)
                 logger.info(f"Unregistered job handler for type: {job_type}")
         except Exception as e:
             logger.error(f"Error unregistering job handler: {e}")
@@ -1055,6 +1143,7 @@ class BackgroundProcessingService:
             notification_service = NotificationService()
             
             # Log error and send notification
+            self.error_count += 1
             error_message = f"Background processor error: {str(error)}"
             logger.error(error_message)
             
@@ -1065,68 +1154,14 @@ class BackgroundProcessingService:
                 service="background_processing"
             )
             
-            # Use exponential backoff for retry
+            # Use exponential backoff before the worker resumes
             retry_delay = min(60, 2 ** min(self.error_count, 6))  # Max 1 minute
+            await asyncio.sleep(retry_delay)
             
-            # Schedule retry using scheduler service
-            from .scheduler import SchedulerService
-            scheduler = SchedulerService()
-            await scheduler.schedule_task(
-                self._process_jobs,
-                delay_seconds=retry_delay
-            )
-            
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Error in processor error handler: {e}")
             
-            # Schedule fallback retry
-            from .scheduler import SchedulerService
-            scheduler = SchedulerService()
-            await scheduler.schedule_task(
-                self._process_jobs,
-                delay_seconds=60
-            )
-    
-    async def _schedule_delayed_execution(self, job_id: str, delay: float):
-        """Schedule delayed execution using real scheduling"""
-        try:
-            from ..services.scheduler import SchedulerService
-            scheduler = SchedulerService()
-            
-            # Schedule delayed execution
-            await scheduler.schedule_task(
-                task_name=f"delayed_job_{job_id}",
-                delay_seconds=delay,
-                task_func=self._execute_delayed_job,
-                args=(job_id,)
-            )
-            
-        except Exception as e:
-            logger.warning(f"Error scheduling delayed execution: {e}")
-            
-            # Schedule fallback execution
-            from .scheduler import SchedulerService
-            scheduler = SchedulerService()
-            await scheduler.schedule_task(
-                self._execute_delayed_job,
-                job_id,
-                delay_seconds=delay
-            )
-    
-    async def _execute_delayed_job(self, job_id: str):
-        """Execute a delayed job"""
-        try:
-            # Move job from scheduled to active
-            if job_id in self.scheduled_jobs:
-                job = self.scheduled_jobs[job_id]
-                job["status"] = JobStatus.PENDING.value
-                self.jobs[job_id] = job
-                del self.scheduled_jobs[job_id]
-                
-                # Add to queue
-                await self.job_queue.put((job["priority"], job_id))
-                
-                logger.info(f"Delayed job started: {job_id}")
-            
-        except Exception as e:
-            logger.error(f"Error executing delayed job: {e}")
+            # Fallback backoff
+            await asyncio.sleep(60)
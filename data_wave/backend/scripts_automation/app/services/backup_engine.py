@@ -0,0 +1,525 @@
+"""
+Streaming Backup Engine
+Chunked, compressed and content-addressed table dumps with resumable restores.
+
+A backup is a ``manifest.json`` listing every table and the chunks its rows
+were cut into. The chunks themselves live in a content-addressed
+``ChunkStore`` shared by all backups of a data source, named by the SHA-256
+of their uncompressed content. Each table is read through a server-side
+cursor (``stream_results`` on SQLAlchemy engines, a batched ``find`` on
+MongoDB) and encoded as NDJSON, ``batch_size`` rows at a time, so memory stays
+bounded whatever the table size. Tables are dumped in parallel by ``workers``
+threads.
+
+- Chunk boundaries are content-defined: a chunk ends after a row whose CRC32
+  hits a fixed residue (``chunk_rows`` rows on average, between a quarter and
+  four times that). An inserted, updated or deleted row only changes the chunk
+  it falls in, so the next backup of a mostly-static table finds all its other
+  chunks already stored.
+- Where the server can digest a table without sending its rows (an md5 sum
+  on PostgreSQL, ``CHECKSUM TABLE`` on MySQL, ``dbHash`` on MongoDB), a table
+  whose digest matches the base backup is not read at all: its chunks are
+  taken over from the base manifest.
+- A chunk already in the store is neither compressed nor written again. New
+  chunks are compressed (zstd when the ``zstandard`` package is installed,
+  gzip otherwise) into a ``.part`` file and renamed once complete.
+- Every manifest references all of its chunks, so any backup restores on its
+  own. Incremental and differential backups record their base backup and the
+  chunks and bytes that changed since it.
+- Values JSON cannot represent exactly are tagged: ``{"$decimal": "12.30"}``
+  for decimals and ``{"$bytes": <base64>}`` for binary columns, decoded back
+  to ``Decimal`` and ``bytes`` on restore.
+- ``restore_backup`` verifies each chunk's checksum before loading it and
+  appends the chunk to a checkpoint file once its rows are committed. An
+  interrupted restore resumes after the last loaded chunk. The checkpoint is
+  kept per restore target, so restoring the same backup into another database
+  starts from the beginning.
+- ``collect_garbage`` removes the chunks no remaining manifest references.
+"""
+
+import base64
+import decimal
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import MetaData, Table, inspect, literal_column, select, table as table_clause, text
+from sqlalchemy.engine import Engine
+
+from app.services.columnar_transport import DEFAULT_BATCH_SIZE, iter_cursor_batches, json_default, stream_ndjson
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BACKUP_ROOT = os.getenv("BACKUP_ROOT", "/backups")
+MANIFEST_FILE = "manifest.json"
+CHECKPOINT_FILE = "restore.{target}.checkpoint"
+CHUNK_STORE_DIRECTORY = "chunks"
+MANIFEST_VERSION = 2
+
+DEFAULT_CODEC = "zstd" if ZSTD_AVAILABLE else "gzip"
+DEFAULT_CHUNK_ROWS = 1024  # Average rows per content-defined chunk
+DEFAULT_WORKERS = 4
+CODEC_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+SYSTEM_SCHEMAS = {
+    "information_schema", "pg_catalog", "pg_toast", "mysql", "performance_schema", "sys", "admin", "config", "local"
+}
+
+# (schema or database, table or collection)
+TableRef = Tuple[Optional[str], str]
+
+
+def _open_compressed_writer(path: str, codec: str):
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression requires the zstandard package; use codec=gzip")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+    if codec == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    raise ValueError(f"Unsupported backup codec: {codec}")
+
+
+def read_chunk(path: str) -> bytes:
+    """Uncompressed content of a chunk file (codec taken from its extension)."""
+    if path.endswith(CODEC_EXTENSIONS["zstd"]):
+        if not ZSTD_AVAILABLE:
+            raise ValueError("Reading a zstd backup requires the zstandard package")
+        with open(path, "rb") as f:
+            return zstandard.ZstdDecompressor().stream_reader(f).read()
+    with gzip.open(path, "rb") as f:
+        return f.read()
+
+
+class ChunkStore:
+    """Compressed chunks named by the SHA-256 of their content: ``<root>/<ab>/<digest>.ndjson.<ext>``."""
+
+    def __init__(self, root: str, codec: str = DEFAULT_CODEC):
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unsupported backup codec: {codec}")
+        self.root = root
+        self.codec = codec
+
+    def file_for(self, digest: str) -> str:
+        return os.path.join(digest[:2], f"{digest}.ndjson{CODEC_EXTENSIONS[self.codec]}")
+
+    def put(self, digest: str, data: bytes) -> Tuple[str, bool, int]:
+        """Store ``data`` unless present; returns ``(file, written, stored bytes)``."""
+        file = self.file_for(digest)
+        path = os.path.join(self.root, file)
+        if os.path.exists(path):
+            return file, False, os.path.getsize(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique part name: two workers may store the same chunk concurrently
+        part = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        with _open_compressed_writer(part, self.codec) as stream:
+            stream.write(data)
+        os.replace(part, path)
+        return file, True, os.path.getsize(path)
+
+    def get(self, file: str) -> bytes:
+        return read_chunk(os.path.join(self.root, file))
+
+    def files(self) -> Iterator[str]:
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".part"):
+                    yield os.path.relpath(os.path.join(directory, name), self.root)
+
+
+class SqlTableSource:
+    """Tables of a SQLAlchemy engine, read through server-side cursors."""
+
+    def __init__(self, engine: Engine, schemas: Optional[Sequence[str]] = None):
+        self.engine = engine
+        self.schemas = list(schemas) if schemas else None
+
+    def tables(self) -> List[TableRef]:
+        inspector = inspect(self.engine)
+        schemas = self.schemas or [s for s in inspector.get_schema_names() if s.lower() not in SYSTEM_SCHEMAS]
+        return [(schema, name) for schema in schemas for name in inspector.get_table_names(schema=schema)]
+
+    def table_digest(self, schema: Optional[str], name: str) -> Optional[str]:
+        """Content digest computed by the server (no rows transferred), None where unsupported."""
+        dialect = self.engine.dialect.name
+        preparer = self.engine.dialect.identifier_preparer
+        qualified = (preparer.quote_schema(schema) + "." if schema else "") + preparer.quote(name)
+        if dialect == "postgresql":
+            # Order-independent: sum of per-row hash prefixes, plus the row count
+            query = (f"SELECT count(*), coalesce(sum(('x' || substr(md5(t::text), 1, 15))::bit(60)::bigint), 0) "
+                     f"FROM {qualified} t")
+        elif dialect == "mysql":
+            query = f"CHECKSUM TABLE {qualified} EXTENDED"
+        else:
+            return None
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(text(query)).one()
+        except Exception as e:
+            logger.debug(f"Table digest unavailable for {qualified}: {str(e)}")
+            return None
+        if dialect == "mysql":
+            return None if row[1] is None else f"checksum:{row[1]}"
+        return f"md5sum:{row[0]}:{row[1]}"
+
+    def iter_lines(self, schema: Optional[str], name: str, batch_size: int) -> Iterator[Tuple[List[str], List[bytes]]]:
+        """Yield ``(columns, NDJSON lines)`` per batch, in primary key order."""
+        query = select(literal_column("*")).select_from(table_clause(name, schema=schema))
+        inspector = inspect(self.engine)
+        # A stable row order keeps unchanged rows in the same chunks from one backup to the next;
+        # tables without a primary key are ordered by all their columns
+        order = inspector.get_pk_constraint(name, schema=schema).get("constrained_columns") or [
+            column["name"] for column in inspector.get_columns(name, schema=schema)
+        ]
+        preparer = self.engine.dialect.identifier_preparer
+        query = query.order_by(*(literal_column(preparer.quote(column)) for column in order))
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(query)
+            for columns, rows in iter_cursor_batches(result, batch_size):
+                for data in stream_ndjson([(columns, rows)], default=encode_value):
+                    # JSON escapes line breaks inside values: one line per row
+                    yield columns, data.splitlines(keepends=True)
+
+
+class MongoCollectionSource:
+    """Collections of a MongoDB client, read with batched cursors as extended JSON."""
+
+    def __init__(self, client: Any, databases: Optional[Sequence[str]] = None):
+        self.client = client
+        self.databases = list(databases) if databases else None
+
+    def tables(self) -> List[TableRef]:
+        databases = self.databases or [d for d in self.client.list_database_names() if d not in SYSTEM_SCHEMAS]
+        return [(db, name) for db in databases for name in self.client[db].list_collection_names()]
+
+    def table_digest(self, database: str, name: str) -> Optional[str]:
+        """MD5 of the collection computed by the server (``dbHash``), None where unsupported."""
+        try:
+            result = self.client[database].command("dbHash", collections=[name])
+        except Exception as e:
+            logger.debug(f"dbHash unavailable for {database}.{name}: {str(e)}")
+            return None
+        digest = result.get("collections", {}).get(name)
+        return f"dbhash:{digest}" if digest else None
+
+    def iter_lines(self, database: str, name: str, batch_size: int) -> Iterator[Tuple[List[str], List[bytes]]]:
+        from bson import json_util
+
+        batch: List[bytes] = []
+        # Sorted by _id so unchanged documents land in the same chunks from one backup to the next
+        for document in self.client[database][name].find({}, batch_size=batch_size).sort("_id", 1):
+            batch.append((json_util.dumps(document) + "\n").encode("utf-8"))
+            if len(batch) == batch_size:
+                yield [], batch
+                batch = []
+        if batch:
+            yield [], batch
+
+
+def content_defined_chunks(batches: Iterable[List[bytes]], average_rows: int) -> Iterator[List[bytes]]:
+    """Group lines into chunks cut after lines whose CRC32 hits a fixed residue."""
+    minimum, maximum = max(1, average_rows // 4), average_rows * 4
+    chunk: List[bytes] = []
+    for lines in batches:
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= maximum or (len(chunk) >= minimum and zlib.crc32(line) % average_rows == 0):
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def manifest_digests(manifest: Dict[str, Any]) -> Set[str]:
+    return {chunk["sha256"] for entry in manifest.get("tables", []) for chunk in entry["chunks"]}
+
+
+class StreamingBackupEngine:
+    """Dumps every table of a source into a chunk store and writes the manifest to ``location``."""
+
+    def __init__(
+        self,
+        source: Any,
+        location: str,
+        store: Optional[ChunkStore] = None,
+        workers: int = DEFAULT_WORKERS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        backup_type: str = "full",
+        base_manifest: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.source = source
+        self.location = location
+        self.store = store or ChunkStore(os.path.join(os.path.dirname(location), CHUNK_STORE_DIRECTORY))
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.chunk_rows = max(1, chunk_rows)
+        self.backup_type = backup_type
+        self.base_manifest = base_manifest
+        self.base_digests = manifest_digests(base_manifest) if base_manifest else set()
+        self.base_tables = {entry["directory"]: entry for entry in (base_manifest or {}).get("tables", [])}
+        self.metadata = metadata or {}
+
+    def _table_directory(self, ref: TableRef) -> str:
+        schema, name = ref
+        return f"{schema}.{name}" if schema else name
+
+    def _unchanged_base_table(self, directory: str, digest: Optional[str]) -> Optional[Dict[str, Any]]:
+        base = self.base_tables.get(directory)
+        if not digest or not base or base.get("digest") != digest:
+            return None
+        if not all(os.path.exists(os.path.join(self.store.root, c["file"])) for c in base["chunks"]):
+            return None
+        return dict(base, chunks=[dict(c, written=False) for c in base["chunks"]], reused=True)
+
+    def _dump_table(self, ref: TableRef) -> Dict[str, Any]:
+        directory = self._table_directory(ref)
+        table_digest = getattr(self.source, "table_digest", None)
+        digest = table_digest(ref[0], ref[1]) if table_digest else None
+        unchanged = self._unchanged_base_table(directory, digest)
+        if unchanged is not None:
+            return unchanged
+
+        columns: List[str] = []
+
+        def batches() -> Iterator[List[bytes]]:
+            nonlocal columns
+            for batch_columns, lines in self.source.iter_lines(ref[0], ref[1], self.batch_size):
+                columns = columns or list(batch_columns)
+                yield lines
+
+        chunks: List[Dict[str, Any]] = []
+        for chunk in content_defined_chunks(batches(), self.chunk_rows):
+            data = b"".join(chunk)
+            chunk_digest = hashlib.sha256(data).hexdigest()
+            file, written, stored_bytes = self.store.put(chunk_digest, data)
+            chunks.append({
+                "sha256": chunk_digest,
+                "file": file,
+                "rows": len(chunk),
+                "raw_bytes": len(data),
+                "stored_bytes": stored_bytes,
+                "written": written
+            })
+        return {
+            "schema": ref[0],
+            "name": ref[1],
+            "directory": directory,
+            "digest": digest,
+            "reused": False,
+            "columns": columns,
+            "rows": sum(c["rows"] for c in chunks),
+            "raw_bytes": sum(c["raw_bytes"] for c in chunks),
+            "stored_bytes": sum(c["stored_bytes"] for c in chunks),
+            "chunks": chunks
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """Dump all tables and return the manifest (also written to ``manifest.json``)."""
+        started = time.perf_counter()
+        os.makedirs(self.location, exist_ok=True)
+        tables = self.source.tables()
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(tables))),
+                                thread_name_prefix="backup") as executor:
+            dumped = list(executor.map(self._dump_table, tables))
+        duration = time.perf_counter() - started
+
+        chunks = [chunk for entry in dumped for chunk in entry["chunks"]]
+        changed = {c["sha256"]: c["stored_bytes"] for c in chunks if c["sha256"] not in self.base_digests}
+        raw_bytes = sum(entry["raw_bytes"] for entry in dumped)
+        stored_bytes = sum(entry["stored_bytes"] for entry in dumped)
+        streamed_bytes = sum(entry["raw_bytes"] for entry in dumped if not entry["reused"])
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "codec": self.store.codec,
+            "chunk_store": os.path.relpath(self.store.root, self.location),
+            "backup_type": self.backup_type,
+            "base_backup": (self.base_manifest or {}).get("metadata", {}).get("backup_id"),
+            "created_at": datetime.now().isoformat(),
+            "metadata": self.metadata,
+            "tables": dumped,
+            "table_count": len(dumped),
+            "rows": sum(entry["rows"] for entry in dumped),
+            "reused_tables": sum(1 for entry in dumped if entry["reused"]),
+            "chunk_count": len(chunks),
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            # Relative to the base backup (everything for a full backup)
+            "changed_chunks": len(changed),
+            "changed_bytes": sum(changed.values()),
+            # Physically added to the chunk store by this backup
+            "written_chunks": sum(1 for c in chunks if c["written"]),
+            "written_bytes": sum(c["stored_bytes"] for c in chunks if c["written"]),
+            "compression_ratio": round(stored_bytes / raw_bytes, 4) if raw_bytes else 1.0,
+            "duration_seconds": round(duration, 3),
+            "throughput_mb_s": round(streamed_bytes / (1024 * 1024) / duration, 2) if duration > 0 else 0.0
+        }
+        with open(os.path.join(self.location, MANIFEST_FILE + ".part"), "w") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(os.path.join(self.location, MANIFEST_FILE + ".part"), os.path.join(self.location, MANIFEST_FILE))
+        logger.info(
+            f"{self.backup_type.capitalize()} backup written to {self.location}: {manifest['table_count']} tables, "
+            f"{manifest['rows']} rows, {manifest['written_chunks']}/{len(chunks)} new chunks, "
+            f"{manifest['written_bytes']} bytes written ({manifest['throughput_mb_s']} MB/s)"
+        )
+        return manifest
+
+
+def encode_value(value: Any) -> Any:
+    """JSON default for backups: tags decimals and binary values so restores get them back unchanged."""
+    if isinstance(value, decimal.Decimal):
+        return {"$decimal": str(value)}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {"$bytes": base64.b64encode(bytes(value)).decode("ascii")}
+    return json_default(value)
+
+
+def decode_value(obj: Dict[str, Any]) -> Any:
+    """``json.loads`` object hook reversing ``encode_value``."""
+    if len(obj) == 1:
+        if "$decimal" in obj:
+            return decimal.Decimal(obj["$decimal"])
+        if "$bytes" in obj:
+            return base64.b64decode(obj["$bytes"])
+    return obj
+
+
+def load_manifest(location: str) -> Dict[str, Any]:
+    with open(os.path.join(location, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def manifest_store(location: str, manifest: Dict[str, Any]) -> ChunkStore:
+    """The chunk store a manifest's chunks live in."""
+    return ChunkStore(os.path.normpath(os.path.join(location, manifest["chunk_store"])), manifest["codec"])
+
+
+class SqlRestoreTarget:
+    """Loads NDJSON chunks into existing tables of a SQLAlchemy engine."""
+
+    def __init__(self, engine: Engine, schema_map: Optional[Dict[str, str]] = None):
+        self.engine = engine
+        self.schema_map = schema_map or {}
+        self._tables: Dict[TableRef, Table] = {}
+
+    @property
+    def identity(self) -> str:
+        return json.dumps([self.engine.url.render_as_string(hide_password=True), self.schema_map], sort_keys=True)
+
+    def load(self, schema: Optional[str], name: str, lines: List[bytes]) -> int:
+        schema = self.schema_map.get(schema, schema)
+        key = (schema, name)
+        if key not in self._tables:
+            self._tables[key] = Table(name, MetaData(), schema=schema, autoload_with=self.engine)
+        rows = [json.loads(line, object_hook=decode_value) for line in lines]
+        with self.engine.begin() as conn:
+            conn.execute(self._tables[key].insert(), rows)
+        return len(rows)
+
+
+class MongoRestoreTarget:
+    """Loads extended JSON chunks into MongoDB collections."""
+
+    def __init__(self, client: Any, database_map: Optional[Dict[str, str]] = None):
+        self.client = client
+        self.database_map = database_map or {}
+
+    @property
+    def identity(self) -> str:
+        return json.dumps([repr(self.client), self.database_map], sort_keys=True)
+
+    def load(self, database: str, name: str, lines: List[bytes]) -> int:
+        from bson import json_util
+
+        documents = [json_util.loads(line) for line in lines]
+        self.client[self.database_map.get(database, database)][name].insert_many(documents, ordered=False)
+        return len(documents)
+
+
+def default_checkpoint_path(location: str, target: Any) -> str:
+    """Checkpoint of restoring the backup at ``location`` into ``target`` (one per target)."""
+    identity = getattr(target, "identity", None)
+    if identity is None:
+        raise ValueError("checkpoint_path is required for restore targets without an identity")
+    digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(location, CHECKPOINT_FILE.format(target=digest))
+
+
+def restore_backup(location: str, target: Any, tables: Optional[Sequence[str]] = None,
+                   checkpoint_path: Optional[str] = None) -> Dict[str, Any]:
+    """Load a backup chunk by chunk into ``target``, resuming after the checkpointed chunks.
+
+    ``tables`` restricts the restore to the given table directories
+    (``schema.table``). Each chunk is read from the chunk store, verified
+    against its manifest checksum before it is loaded and checkpointed once
+    its rows are committed. The checkpoint defaults to one file per target
+    (``default_checkpoint_path``).
+    """
+    started = time.perf_counter()
+    manifest = load_manifest(location)
+    store = manifest_store(location, manifest)
+    checkpoint_path = checkpoint_path or default_checkpoint_path(location, target)
+    done: Set[str] = set()
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            done = {line.strip() for line in f if line.strip()}
+
+    loaded_chunks = skipped_chunks = rows = raw_bytes = 0
+    with open(checkpoint_path, "a") as checkpoint:
+        for entry in manifest["tables"]:
+            if tables and entry["directory"] not in tables:
+                continue
+            for index, chunk in enumerate(entry["chunks"]):
+                chunk_id = f"{entry['directory']}/{index:05d}"
+                if chunk_id in done:
+                    skipped_chunks += 1
+                    continue
+                data = store.get(chunk["file"])
+                if hashlib.sha256(data).hexdigest() != chunk["sha256"]:
+                    raise ValueError(f"Checksum mismatch in backup chunk {chunk_id}")
+                rows += target.load(entry["schema"], entry["name"], data.splitlines())
+                raw_bytes += len(data)
+                checkpoint.write(chunk_id + "\n")
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+                loaded_chunks += 1
+
+    duration = time.perf_counter() - started
+    return {
+        "loaded_chunks": loaded_chunks,
+        "skipped_chunks": skipped_chunks,
+        "rows": rows,
+        "duration_seconds": round(duration, 3),
+        "throughput_mb_s": round(raw_bytes / (1024 * 1024) / duration, 2) if duration > 0 else 0.0
+    }
+
+
+def collect_garbage(store: ChunkStore, manifests: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """Delete the chunks of ``store`` that none of ``manifests`` references."""
+    referenced = {chunk["file"] for manifest in manifests for entry in manifest["tables"] for chunk in entry["chunks"]}
+    removed = removed_bytes = kept = 0
+    for file in list(store.files()):
+        if file in referenced:
+            kept += 1
+            continue
+        path = os.path.join(store.root, file)
+        removed_bytes += os.path.getsize(path)
+        os.remove(path)
+        removed += 1
+    logger.info(f"Chunk store {store.root}: removed {removed} unreferenced chunks ({removed_bytes} bytes), kept {kept}")
+    return {"removed_chunks": removed, "removed_bytes": removed_bytes, "kept_chunks": kept}
@@ -3,6 +3,7 @@ from typing import List, Optional, Dict, Any
 from types import SimpleNamespace
 from datetime import datetime, timedelta
 import asyncio
+import shutil
 from app.models.backup_models import (
     BackupOperation, RestoreOperation, BackupSchedule,
     BackupOperationResponse, RestoreOperationResponse, BackupScheduleResponse,
@@ -12,7 +13,12 @@ from app.models.backup_models import (
 )
 from app.models.scan_models import DataSource
 import logging
-from app.services.background_processing_service import BackgroundProcessingService
+from app.services.background_processing_service import BackgroundProcessingService, register_background_handler
+from app.services.backup_engine import (
+    BACKUP_ROOT, DEFAULT_WORKERS, ChunkStore, MongoCollectionSource, SqlTableSource, StreamingBackupEngine,
+    collect_garbage, load_manifest, manifest_store
+)
+from app.services.data_source_connection_service import DataSourceConnectionService
 from app.models.scan_models import DataSourceStatus
 import os
 from app.models.scan_models import DataSourceType
@@ -348,8 +354,21 @@ class BackupService:
             if backup.status in [BackupStatus.RUNNING, BackupStatus.PENDING]:
                 raise ValueError("Cannot delete backup that is currently running")
             
+            restores = BackupService._restores_of(session, [backup.id])
+            if any(r.status in (RestoreStatus.RUNNING, RestoreStatus.PENDING) for r in restores):
+                raise ValueError("Cannot delete backup that is being restored")
+            
+            data_source_id = backup.data_source_id
+            stores = BackupService._backup_stores([backup])
+            locations = [backup.backup_location]
+            # Finished restores only record history: they go with the backup
+            for restore in restores:
+                session.delete(restore)
             session.delete(backup)
             session.commit()
+            # Files go only once the rows are gone, so a failed commit never leaves rows without files
+            BackupService._remove_backup_files(locations)
+            BackupService._collect_chunk_garbage(session, data_source_id, stores)
             
             logger.info(f"Backup {backup_id} deleted successfully")
             return True
@@ -511,6 +530,7 @@ class BackupService:
             return False
 
     @staticmethod
+    @register_background_handler
     async def _execute_backup_process(backup_id: int, data_source_id: int, session: Session):
         """Execute the actual backup process with real data source integration"""
         try:
@@ -556,7 +576,7 @@ class BackupService:
                     backup.backup_size_bytes = backup_result["size"]
                     backup.backup_location = backup_result["location"]
                     backup.compression_ratio = backup_result["compression_ratio"]
-                    backup.backup_metadata = backup_metadata
+                    backup.backup_metadata = dict(backup_metadata, backup_statistics=backup_result.get("statistics", {}))
                     
                     if backup.started_at:
                         backup.duration_seconds = int((backup.completed_at - backup.started_at).total_seconds())
@@ -809,32 +829,7 @@ class BackupService:
     async def _backup_mysql_database(data_source: DataSource, backup: BackupOperation, estimated_size: int, session: Session) -> Dict[str, Any]:
         """Backup MySQL database"""
         try:
-            # Simulate MySQL backup process
-            await asyncio.sleep(2)  # Simulate backup time
-            
-            # Calculate actual backup size (simulated)
-            actual_size = int(estimated_size * 0.8)  # 20% compression
-            
-            # Generate backup location
-            backup_location = f"/backups/mysql/{data_source.id}/{backup.id}_{int(datetime.now().timestamp())}.sql"
-            
-            # Ensure backup directory exists
-            backup_dir = os.path.dirname(backup_location)
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            # Create a dummy backup file for demonstration
-            with open(backup_location, 'w') as f:
-                f.write(f"-- MySQL Backup for {data_source.name}\n")
-                f.write(f"-- Generated at {datetime.now().isoformat()}\n")
-                f.write(f"-- Data source: {data_source.host}:{data_source.port}/{data_source.database_name}\n")
-            
-            return {
-                "success": True,
-                "size": actual_size,
-                "location": backup_location,
-                "compression_ratio": 0.8,
-                "backup_type": "mysql_dump"
-            }
+            return await BackupService._run_streaming_backup(data_source, backup, "mysql", "mysql_dump", session)
             
         except Exception as e:
             logger.error(f"Error backing up MySQL database: {str(e)}")
@@ -844,32 +839,7 @@ class BackupService:
     async def _backup_postgresql_database(data_source: DataSource, backup: BackupOperation, estimated_size: int, session: Session) -> Dict[str, Any]:
         """Backup PostgreSQL database"""
         try:
-            # Simulate PostgreSQL backup process
-            await asyncio.sleep(3)  # Simulate backup time
-            
-            # Calculate actual backup size
-            actual_size = int(estimated_size * 0.85)  # 15% compression
-            
-            # Generate backup location
-            backup_location = f"/backups/postgresql/{data_source.id}/{backup.id}_{int(datetime.now().timestamp())}.sql"
-            
-            # Ensure backup directory exists
-            backup_dir = os.path.dirname(backup_location)
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            # Create a dummy backup file for demonstration
-            with open(backup_location, 'w') as f:
-                f.write(f"-- PostgreSQL Backup for {data_source.name}\n")
-                f.write(f"-- Generated at {datetime.now().isoformat()}\n")
-                f.write(f"-- Data source: {data_source.host}:{data_source.port}/{data_source.database_name}\n")
-            
-            return {
-                "success": True,
-                "size": actual_size,
-                "location": backup_location,
-                "compression_ratio": 0.85,
-                "backup_type": "postgresql_dump"
-            }
+            return await BackupService._run_streaming_backup(data_source, backup, "postgresql", "postgresql_dump", session)
             
         except Exception as e:
             logger.error(f"Error backing up PostgreSQL database: {str(e)}")
@@ -879,32 +849,7 @@ class BackupService:
     async def _backup_mongodb_database(data_source: DataSource, backup: BackupOperation, estimated_size: int, session: Session) -> Dict[str, Any]:
         """Backup MongoDB database"""
         try:
-            # Simulate MongoDB backup process
-            await asyncio.sleep(2)  # Simulate backup time
-            
-            # Calculate actual backup size
-            actual_size = int(estimated_size * 0.9)  # 10% compression
-            
-            # Generate backup location
-            backup_location = f"/backups/mongodb/{data_source.id}/{backup.id}_{int(datetime.now().timestamp())}.bson"
-            
-            # Ensure backup directory exists
-            backup_dir = os.path.dirname(backup_location)
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            # Create a dummy backup file for demonstration
-            with open(backup_location, 'w') as f:
-                f.write(f"-- MongoDB Backup for {data_source.name}\n")
-                f.write(f"-- Generated at {datetime.now().isoformat()}\n")
-                f.write(f"-- Data source: {data_source.host}:{data_source.port}/{data_source.database_name}\n")
-            
-            return {
-                "success": True,
-                "size": actual_size,
-                "location": backup_location,
-                "compression_ratio": 0.9,
-                "backup_type": "mongodb_dump"
-            }
+            return await BackupService._run_streaming_backup(data_source, backup, "mongodb", "mongodb_dump", session)
             
         except Exception as e:
             logger.error(f"Error backing up MongoDB database: {str(e)}")
@@ -913,37 +858,194 @@ class BackupService:
     @staticmethod
     async def _backup_generic_database(data_source: DataSource, backup: BackupOperation, estimated_size: int, session: Session) -> Dict[str, Any]:
         """Generic backup for unknown data source types"""
+        logger.warning(f"Streaming backup is not supported for data source type {data_source.source_type.value}")
+        return {
+            "success": False,
+            "error": f"Backup is not supported for data source type {data_source.source_type.value}"
+        }
+
+    @staticmethod
+    def _backup_source(data_source: DataSource, kind: str):
+        """Table source to stream a backup from, over the connector's pooled engine or client"""
+        connector = DataSourceConnectionService()._get_connector(data_source)
+        if kind == "mongodb":
+            password = connector._get_password()
+            if not password:
+                raise ValueError("Failed to retrieve password")
+            databases = [data_source.database_name] if data_source.database_name else None
+            return MongoCollectionSource(connector._get_mongo_client(password), databases)
+        engine = connector._get_engine(connector._build_connection_string(), "backup")
+        # MySQL: the connected database is the schema
+        schemas = [data_source.database_name] if kind == "mysql" and data_source.database_name else None
+        return SqlTableSource(engine, schemas)
+
+    @staticmethod
+    def _find_base_backup(session: Session, backup: BackupOperation) -> Optional[BackupOperation]:
+        """Backup an incremental (latest backup) or differential (latest full backup) is taken against"""
+        if backup.backup_type not in (BackupType.INCREMENTAL, BackupType.DIFFERENTIAL):
+            return None
+        query = select(BackupOperation).where(
+            BackupOperation.data_source_id == backup.data_source_id,
+            BackupOperation.id != backup.id,
+            BackupOperation.status == BackupStatus.COMPLETED,
+            BackupOperation.backup_location.isnot(None)
+        )
+        if backup.backup_type == BackupType.DIFFERENTIAL:
+            query = query.where(BackupOperation.backup_type == BackupType.FULL)
+        return session.execute(query.order_by(BackupOperation.completed_at.desc()).limit(1)).scalars().first()
+
+    @staticmethod
+    def _load_backup_manifest(backup: BackupOperation) -> Optional[Dict[str, Any]]:
         try:
-            # Simulate generic backup
-            await asyncio.sleep(2)  # Simulate backup time
-            
-            # Calculate actual backup size
-            actual_size = int(estimated_size * 0.85)  # 15% compression
-            
-            # Generate backup location
-            backup_location = f"/backups/generic/{data_source.id}/{backup.id}_{int(datetime.now().timestamp())}.backup"
-            
-            # Ensure backup directory exists
-            backup_dir = os.path.dirname(backup_location)
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            # Create a dummy backup file for demonstration
-            with open(backup_location, 'w') as f:
-                f.write(f"-- Generic Backup for {data_source.name}\n")
-                f.write(f"-- Generated at {datetime.now().isoformat()}\n")
-                f.write(f"-- Data source: {data_source.host}:{data_source.port}/{data_source.database_name}\n")
-            
-            return {
-                "success": True,
-                "size": actual_size,
-                "location": backup_location,
-                "compression_ratio": 0.85,
-                "backup_type": "generic_snapshot"
+            return load_manifest(backup.backup_location)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    @staticmethod
+    async def _run_streaming_backup(data_source: DataSource, backup: BackupOperation, kind: str, dump_type: str,
+                                    session: Session) -> Dict[str, Any]:
+        """Stream every table of the data source into the source's content-addressed chunk store"""
+        backup_location = os.path.join(
+            BACKUP_ROOT, kind, str(data_source.id), f"{backup.id}_{int(datetime.now().timestamp())}"
+        )
+        base_backup = BackupService._find_base_backup(session, backup)
+        base_manifest = BackupService._load_backup_manifest(base_backup) if base_backup else None
+        if backup.backup_type in (BackupType.INCREMENTAL, BackupType.DIFFERENTIAL) and base_manifest is None:
+            logger.info(f"No base backup for {backup.backup_type.value} backup {backup.id}: every chunk counts as changed")
+        engine = StreamingBackupEngine(
+            BackupService._backup_source(data_source, kind),
+            backup_location,
+            workers=max(1, min(DEFAULT_WORKERS, data_source.pool_size or DEFAULT_WORKERS)),
+            backup_type=backup.backup_type.value,
+            base_manifest=base_manifest,
+            metadata={"data_source_id": data_source.id, "backup_id": backup.id, "dump_type": dump_type}
+        )
+        # The dump blocks on database reads and file writes: keep it off the event loop
+        manifest = await asyncio.get_running_loop().run_in_executor(None, engine.run)
+        
+        return {
+            "success": True,
+            # Storage this backup adds over its base (all of it for a full backup)
+            "size": manifest["changed_bytes"],
+            "location": backup_location,
+            "compression_ratio": manifest["compression_ratio"],
+            "backup_type": dump_type,
+            "statistics": {
+                "codec": manifest["codec"],
+                "base_backup_id": base_backup.id if base_manifest else None,
+                "tables": manifest["table_count"],
+                "rows": manifest["rows"],
+                "raw_bytes": manifest["raw_bytes"],
+                "stored_bytes": manifest["stored_bytes"],
+                "chunks": manifest["chunk_count"],
+                "changed_chunks": manifest["changed_chunks"],
+                "written_chunks": manifest["written_chunks"],
+                "written_bytes": manifest["written_bytes"],
+                "duration_seconds": manifest["duration_seconds"],
+                "throughput_mb_s": manifest["throughput_mb_s"]
             }
+        }
+
+    @staticmethod
+    def _backup_stores(backups: List[BackupOperation]) -> List[ChunkStore]:
+        """Chunk stores referenced by the manifests of ``backups``"""
+        stores: Dict[str, ChunkStore] = {}
+        for backup in backups:
+            manifest = BackupService._load_backup_manifest(backup) if backup.backup_location else None
+            if manifest is None:
+                continue
+            store = manifest_store(backup.backup_location, manifest)
+            stores[store.root] = store
+        return list(stores.values())
+
+    @staticmethod
+    def _remove_backup_files(locations: List[Optional[str]]) -> None:
+        """Delete backup directories (manifests); their chunks are left to garbage collection"""
+        for location in locations:
+            if location:
+                shutil.rmtree(location, ignore_errors=True)
+
+    @staticmethod
+    def _restores_of(session: Session, backup_ids: List[int]) -> List[RestoreOperation]:
+        if not backup_ids:
+            return []
+        return session.execute(
+            select(RestoreOperation).where(RestoreOperation.backup_id.in_(backup_ids))
+        ).scalars().all()
+
+    @staticmethod
+    def _collect_chunk_garbage(session: Session, data_source_id: int, stores: List[ChunkStore]) -> Dict[str, int]:
+        """Remove chunks no remaining backup of the data source references"""
+        totals = {"removed_chunks": 0, "removed_bytes": 0, "kept_chunks": 0}
+        if not stores:
+            return totals
+        remaining = session.execute(select(BackupOperation).where(
+            BackupOperation.data_source_id == data_source_id,
+            BackupOperation.backup_location.isnot(None)
+        )).scalars().all()
+        if any(b.status in (BackupStatus.RUNNING, BackupStatus.PENDING) for b in remaining):
+            # A running backup may reuse chunks its manifest does not list yet
+            logger.info(f"Skipping chunk garbage collection for data source {data_source_id}: backup in progress")
+            return totals
+        manifests = [m for m in (BackupService._load_backup_manifest(b) for b in remaining) if m is not None]
+        for store in stores:
+            for key, value in collect_garbage(store, manifests).items():
+                totals[key] += value
+        return totals
+
+    @staticmethod
+    def apply_retention(session: Session, data_source_id: int) -> Dict[str, Any]:
+        """Expire completed backups past the schedules' retention and garbage-collect their chunks.
+        
+        A backup is kept while it is younger than the longest ``retention_days`` and
+        among the newest ``max_backups`` of the data source's schedules; the latest
+        backup is always kept. Every manifest lists all its chunks, so any backup can
+        expire without breaking the incrementals taken against it. Backups with a
+        pending or running restore are kept until the restore finishes; the records
+        of finished restores are deleted along with their backup.
+        """
+        try:
+            schedules = session.execute(
+                select(BackupSchedule).where(BackupSchedule.data_source_id == data_source_id)
+            ).scalars().all()
+            if not schedules:
+                return {"expired_backups": 0, "removed_chunks": 0, "removed_bytes": 0}
+            retention_days = max(s.retention_days for s in schedules)
+            max_backups = max(1, max(s.max_backups for s in schedules))
+            cutoff = datetime.now() - timedelta(days=retention_days)
+            
+            completed = session.execute(select(BackupOperation).where(
+                BackupOperation.data_source_id == data_source_id,
+                BackupOperation.status == BackupStatus.COMPLETED
+            ).order_by(BackupOperation.completed_at.desc())).scalars().all()
+            expired = [
+                b for position, b in enumerate(completed)
+                if position > 0 and (position >= max_backups or (b.completed_at or b.created_at) < cutoff)
+            ]
+            restores = BackupService._restores_of(session, [b.id for b in expired])
+            restoring = {r.backup_id for r in restores if r.status in (RestoreStatus.RUNNING, RestoreStatus.PENDING)}
+            expired = [b for b in expired if b.id not in restoring]
+            stores = BackupService._backup_stores(expired)
+            locations = [b.backup_location for b in expired]
+            for restore in restores:
+                if restore.backup_id not in restoring:
+                    session.delete(restore)
+            for backup in expired:
+                session.delete(backup)
+            session.commit()
+            BackupService._remove_backup_files(locations)
+            
+            collected = BackupService._collect_chunk_garbage(session, data_source_id, stores)
+            logger.info(
+                f"Backup retention for data source {data_source_id}: expired {len(expired)} backups, "
+                f"removed {collected['removed_chunks']} chunks ({collected['removed_bytes']} bytes)"
+            )
+            return {"expired_backups": len(expired), **collected}
             
         except Exception as e:
-            logger.error(f"Error performing generic backup: {str(e)}")
-            return {"success": False, "error": str(e)}
+            session.rollback()
+            logger.error(f"Error applying backup retention for data source {data_source_id}: {str(e)}")
+            raise
 
     @staticmethod
     def _create_backup_verification(backup: BackupOperation, session: Session):
@@ -975,6 +1077,9 @@ class BackupService:
             # Update backup schedules if needed
             BackupService._update_backup_schedules_after_backup(data_source, session)
             
+            # Expire old backups and drop the chunks only they referenced
+            BackupService.apply_retention(session, data_source.id)
+            
         except Exception as e:
             logger.error(f"Error executing post-backup operations: {str(e)}")
 
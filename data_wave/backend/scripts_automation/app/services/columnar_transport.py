@@ -0,0 +1,304 @@
+"""
+Columnar Transport
+Batch-wise conversion of database cursors into Arrow record batches and streaming encoders.
+
+Table previews and profiling samples used to be materialized as lists of per-row
+dicts (every value stringified) and JSON-encoded in one piece. This module lets
+callers pull rows from a cursor ``batch_size`` at a time, pivot each batch into
+an Arrow ``RecordBatch`` and stream it to the client as an Arrow IPC stream,
+a Parquet file (one row group per batch) or chunked NDJSON, so memory stays
+bounded by one batch.
+
+The Arrow schema is fixed by the first batch, since a stream cannot change
+its schema once written. Types are chosen so later batches still fit:
+decimals get the widest precision and the scale seen so far, and values of
+later batches are promoted into the column type (integers into float or
+decimal columns, integral floats into integer columns, anything into string
+columns). A value that cannot be represented in its column type (a fraction
+in an integer column) raises ``ValueError`` naming the column.
+
+pyarrow is optional: without it ``iter_record_batches`` is unavailable and only
+the NDJSON encoder (fed from plain row batches) can be used.
+"""
+
+import decimal
+import enum
+import json
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+DEFAULT_BATCH_SIZE = 5000
+
+# (column names, list of row tuples)
+RowBatch = Tuple[List[str], List[Sequence[Any]]]
+
+
+def iter_cursor_batches(result: Any, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[RowBatch]:
+    """Yield ``(columns, rows)`` from a SQLAlchemy result or DB-API cursor via ``fetchmany``."""
+    if hasattr(result, "keys"):
+        columns = [str(col) for col in result.keys()]
+    else:
+        columns = [col[0] for col in (result.description or [])]
+    while True:
+        rows = result.fetchmany(batch_size)
+        if not rows:
+            break
+        yield columns, rows
+
+
+def _normalize(value: Any) -> Any:
+    """Map values Arrow cannot infer (UUIDs, enums, nested documents) onto portable types."""
+    if value is None or isinstance(value, (bool, int, float, str, bytes, datetime, date, time, timedelta, decimal.Decimal)):
+        return value
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def _column_values(rows: Sequence[Sequence[Any]], index: int) -> List[Any]:
+    return [_normalize(row[index]) for row in rows]
+
+
+MAX_DECIMAL_PRECISION = 38
+
+
+def _as_strings(values: List[Any]) -> List[Any]:
+    return [v if v is None or isinstance(v, str) else str(v) for v in values]
+
+
+def _is_integral(value: Any) -> bool:
+    if isinstance(value, float):
+        return value.is_integer()
+    if isinstance(value, decimal.Decimal):
+        return value.is_finite() and value == value.to_integral_value()
+    return False
+
+
+def _promote(values: List[Any], arrow_type: "pa.DataType") -> List[Any]:
+    """Convert values of another type into ``arrow_type`` where no information is lost."""
+    numeric = (int, float, decimal.Decimal)
+    if pa.types.is_string(arrow_type):
+        return _as_strings(values)
+    if pa.types.is_floating(arrow_type):
+        return [float(v) if isinstance(v, numeric) and not isinstance(v, bool) else v for v in values]
+    if pa.types.is_decimal(arrow_type):
+        quantum = decimal.Decimal(1).scaleb(-arrow_type.scale)
+        return [
+            decimal.Decimal(str(v) if isinstance(v, float) else v).quantize(quantum)
+            if isinstance(v, numeric) and not isinstance(v, bool) else v
+            for v in values
+        ]
+    if pa.types.is_integer(arrow_type):
+        return [int(v) if _is_integral(v) else v for v in values]
+    return values
+
+
+class RecordBatchBuilder:
+    """Pivots row batches into Arrow record batches against a schema fixed by the first batch."""
+
+    def __init__(self):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for Arrow transport")
+        self.schema: Optional["pa.Schema"] = None
+
+    @staticmethod
+    def _infer(values: List[Any]) -> "pa.Array":
+        try:
+            array = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            return pa.array(_as_strings(values), type=pa.string())
+        if pa.types.is_null(array.type):
+            # All-null in the first batch: commit to string so later values still fit
+            return array.cast(pa.string())
+        if pa.types.is_decimal(array.type):
+            # Inferred precision only covers this batch: widen it so larger values of later batches fit
+            scale = max(array.type.scale, 0)
+            if array.type.precision > MAX_DECIMAL_PRECISION or scale >= MAX_DECIMAL_PRECISION:
+                return pa.array(_as_strings(values), type=pa.string())
+            return pa.array(_promote(values, pa.decimal128(MAX_DECIMAL_PRECISION, scale)),
+                            type=pa.decimal128(MAX_DECIMAL_PRECISION, scale))
+        return array
+
+    def build(self, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> "pa.RecordBatch":
+        if self.schema is None:
+            arrays = [self._infer(_column_values(rows, index)) for index in range(len(columns))]
+            batch = pa.RecordBatch.from_arrays(arrays, names=list(columns))
+            self.schema = batch.schema
+            return batch
+
+        arrays = []
+        for index, field in enumerate(self.schema):
+            values = _column_values(rows, index)
+            try:
+                if pa.types.is_string(field.type) or pa.types.is_integer(field.type):
+                    values = _promote(values, field.type)
+                    if any(isinstance(v, (float, decimal.Decimal)) for v in values):
+                        # Arrow would silently truncate fractional values into an integer column
+                        raise TypeError("fractional value")
+                    arrays.append(pa.array(values, type=field.type))
+                    continue
+                try:
+                    arrays.append(pa.array(values, type=field.type))
+                except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                    arrays.append(pa.array(_promote(values, field.type), type=field.type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError, TypeError, decimal.InvalidOperation) as e:
+                raise ValueError(
+                    f"Column {field.name!r}: values of a later batch do not fit its {field.type} type: {e}"
+                ) from e
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def iter_record_batches(row_batches: Iterable[RowBatch]) -> Iterator["pa.RecordBatch"]:
+    """Convert ``(columns, rows)`` batches into Arrow record batches with one stable schema."""
+    builder = RecordBatchBuilder()
+    for columns, rows in row_batches:
+        yield builder.build(columns, rows)
+
+
+def record_batches_to_table(batches: Iterable["pa.RecordBatch"]) -> "pa.Table":
+    batches = list(batches)
+    if not batches:
+        return pa.table({})
+    return pa.Table.from_batches(batches)
+
+
+def table_to_pandas(table: "pa.Table") -> Any:
+    """Convert to pandas with decimal columns as float64 (pandas would keep them as object dtype)."""
+    schema = pa.schema([
+        pa.field(field.name, pa.float64()) if pa.types.is_decimal(field.type) else field for field in table.schema
+    ])
+    return table.cast(schema).to_pandas()
+
+
+class _ChunkSink:
+    """File-like sink that hands written IPC bytes back to the generator."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_arrow_ipc(batches: Iterable["pa.RecordBatch"]) -> Iterator[bytes]:
+    """Encode record batches as an Arrow IPC stream, yielding bytes after every batch."""
+    sink = _ChunkSink()
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pa.ipc.new_stream(sink, batch.schema)
+            writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, pa.schema([]))
+        writer.close()
+        writer = None
+        tail = sink.drain()
+        if tail:
+            yield tail
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def stream_parquet(batches: Iterable["pa.RecordBatch"], compression: str = "zstd") -> Iterator[bytes]:
+    """Encode record batches as a Parquet file, one row group per batch, yielding bytes after every row group."""
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                writer = pq.ParquetWriter(sink, batch.schema, compression=compression)
+            writer.write_table(pa.Table.from_batches([batch]))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        if writer is None:
+            writer = pq.ParquetWriter(sink, pa.schema([]), compression=compression)
+        writer.close()
+        writer = None
+        tail = sink.drain()
+        if tail:
+            yield tail
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def json_default(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def stream_ndjson(row_batches: Iterable[RowBatch],
+                  default: Callable[[Any], Any] = json_default) -> Iterator[bytes]:
+    """Encode row batches as NDJSON, one chunk (many lines) per batch."""
+    for columns, rows in row_batches:
+        lines = [
+            json.dumps(dict(zip(columns, row)), default=default)
+            for row in rows
+        ]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def stream_ndjson_from_arrow(batches: Iterable["pa.RecordBatch"]) -> Iterator[bytes]:
+    """NDJSON encoding for callers that already hold Arrow batches."""
+    for batch in batches:
+        columns = batch.schema.names
+        rows = zip(*(column.to_pylist() for column in batch.columns))
+        lines = [json.dumps(dict(zip(columns, row)), default=json_default) for row in rows]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
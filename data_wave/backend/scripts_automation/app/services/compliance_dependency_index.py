@@ -0,0 +1,307 @@
+"""
+Dependency index for incremental compliance re-evaluation.
+
+Compliance evaluation used to re-check every rule against every source,
+whatever changed. The index records what each active rule depends on:
+its data sources (linked, or all of them), the tables it is scoped to
+(``parameters["tables"]``, glob patterns on ``schema.table``), and which
+kinds of table change matter to it. Every rule depends on tables appearing or
+disappearing, since that changes the source's entity count. Column-scoped
+and privacy/quality rules also depend on column definitions and
+classifications, and quality/retention rules on row counts.
+
+Rule scores themselves are computed from source-level attributes only (entity
+count, encryption, monitoring, backup, uptime, classification). Every
+evaluation records a digest of those attributes per source
+(``source_state``), so a rule of the source whose recorded state differs
+from the current one is stale whatever tables changed. Table patterns only
+add rules on top of that.
+
+An incremental scan's change set is reduced to a ``ScanDelta`` (changed
+tables of one source and the kinds of change). ``reevaluate_for_delta`` takes
+the source's rules that are stale or match a changed table and recomputes
+only their pair with that source. The
+result is patched into each rule's latest evaluation, and the rule's score
+is updated from the patched per-source details. Rules without a previous
+evaluation are evaluated in full.
+"""
+
+import fnmatch
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.compliance_rule_models import (
+    ComplianceRule, ComplianceRuleEvaluation, ComplianceRuleScope, ComplianceRuleStatus, ComplianceRuleType,
+    RuleValidationStatus
+)
+from app.models.scan_models import DataSource
+from app.services.compliance_batch_evaluator import (
+    COMPLIANT_SCORE, SourceMatrix, evaluate_rules_in_bulk, load_rule_targets
+)
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAX_AGE_SECONDS = 300  # Rebuild to pick up rule changes made by other processes
+
+TABLE_CHANGE = "table"
+COLUMN_CHANGE = "columns"
+ROW_CHANGE = "rows"
+
+COLUMN_RULE_TYPES = (ComplianceRuleType.PRIVACY, ComplianceRuleType.QUALITY)
+COLUMN_SCOPES = (ComplianceRuleScope.COLUMN, ComplianceRuleScope.FIELD)
+ROW_RULE_TYPES = (ComplianceRuleType.QUALITY, ComplianceRuleType.DATA_RETENTION)
+
+
+@dataclass(frozen=True)
+class RuleDependencies:
+    rule_id: int
+    sources: Optional[frozenset]  # None: applies to all sources
+    tables: Tuple[str, ...]
+    changes: frozenset
+
+    @classmethod
+    def of(cls, rule: ComplianceRule, source_ids: Optional[Iterable[int]]) -> "RuleDependencies":
+        parameters = rule.parameters or {}
+        tables = parameters.get("tables") or (rule.data_source_filters or {}).get("tables") or ["*"]
+        changes = {TABLE_CHANGE}
+        if rule.rule_type in COLUMN_RULE_TYPES or rule.scope in COLUMN_SCOPES or parameters.get("classifications"):
+            changes.add(COLUMN_CHANGE)
+        if rule.rule_type in ROW_RULE_TYPES:
+            changes.add(ROW_CHANGE)
+        return cls(
+            rule_id=rule.id,
+            sources=None if source_ids is None else frozenset(source_ids),
+            tables=tuple(pattern.lower() for pattern in tables),
+            changes=frozenset(changes)
+        )
+
+    def matches(self, table: str, kinds: Set[str]) -> bool:
+        if not self.changes & kinds:
+            return False
+        if table.endswith(".*"):
+            # Every table of a dropped schema: compare the schema part of the patterns
+            schema = table[:-2]
+            return any(fnmatch.fnmatchcase(schema, pattern.split(".", 1)[0]) for pattern in self.tables)
+        return any(fnmatch.fnmatchcase(table, pattern) for pattern in self.tables)
+
+
+@dataclass
+class ScanDelta:
+    """Changed tables of one data source (``schema.table`` → kinds of change)."""
+    data_source_id: int
+    tables: Dict[str, Set[str]] = field(default_factory=dict)
+
+    def add(self, container: str, name: str, kind: str) -> None:
+        self.tables.setdefault(f"{container}.{name}".lower(), set()).add(kind)
+
+    @classmethod
+    def from_incremental_metadata(cls, data_source_id: int, metadata: Dict[str, Any]) -> "ScanDelta":
+        """Reduce an incremental scan's change set (relational or MongoDB) to changed tables."""
+        delta = cls(data_source_id)
+        for containers, items, children, count in (
+            ("schemas", "tables", "columns", "previous_row_count"),
+            ("databases", "collections", "fields", "previous_document_count"),
+        ):
+            for container in metadata.get(containers, []):
+                container_change = container.get("change_type")
+                if container_change == "deleted":
+                    # Tables of a dropped schema are not listed; match any table in it
+                    delta.add(container["name"], "*", TABLE_CHANGE)
+                    continue
+                for item in container.get(items, []):
+                    if container_change == "added" or item.get("change_type") in ("added", "deleted"):
+                        delta.add(container["name"], item["name"], TABLE_CHANGE)
+                        continue
+                    if item.get(children):
+                        delta.add(container["name"], item["name"], COLUMN_CHANGE)
+                    if count in item:
+                        delta.add(container["name"], item["name"], ROW_CHANGE)
+        return delta
+
+    def __bool__(self) -> bool:
+        return bool(self.tables)
+
+
+class ComplianceDependencyIndex:
+    """Active rules by data source, with the tables and kinds of change they depend on."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built_at: Optional[float] = None
+        self._by_source: Dict[int, List[RuleDependencies]] = {}
+        self._all_sources: List[RuleDependencies] = []
+
+    def build(self, session: Session) -> None:
+        rules = session.execute(
+            select(ComplianceRule).where(ComplianceRule.status == ComplianceRuleStatus.ACTIVE)
+        ).scalars().all()
+        targets = load_rule_targets(session, [rule for rule in rules if not rule.applies_to_all_sources])
+        with self._lock:
+            self.load_rules(rules, targets)
+            self._built_at = time.monotonic()
+
+    def load_rules(self, rules: Sequence[ComplianceRule], targets: Dict[int, List[int]]) -> None:
+        with self._lock:
+            self._by_source = {}
+            self._all_sources = []
+            for rule in rules:
+                if rule.applies_to_all_sources:
+                    self._all_sources.append(RuleDependencies.of(rule, None))
+                    continue
+                dependencies = RuleDependencies.of(rule, targets.get(rule.id, []))
+                for source_id in dependencies.sources:
+                    self._by_source.setdefault(source_id, []).append(dependencies)
+
+    def ensure_fresh(self, session: Session) -> "ComplianceDependencyIndex":
+        with self._lock:
+            if self._built_at is None or time.monotonic() - self._built_at > INDEX_MAX_AGE_SECONDS:
+                self.build(session)
+        return self
+
+    def invalidate(self) -> None:
+        """Rules changed: rebuild on next use."""
+        with self._lock:
+            self._built_at = None
+
+    def rules_for_source(self, data_source_id: int) -> List[int]:
+        """Ids of every active rule evaluated against the data source."""
+        with self._lock:
+            candidates = self._all_sources + self._by_source.get(data_source_id, [])
+        return sorted({dependencies.rule_id for dependencies in candidates})
+
+    def affected_rules(self, delta: ScanDelta) -> List[int]:
+        """Ids of the rules whose dependencies match a changed table of the delta's source."""
+        with self._lock:
+            candidates = self._all_sources + self._by_source.get(delta.data_source_id, [])
+        return sorted({
+            dependencies.rule_id for dependencies in candidates
+            if any(dependencies.matches(table, kinds) for table, kinds in delta.tables.items())
+        })
+
+
+compliance_dependency_index = ComplianceDependencyIndex()
+
+
+def _latest_evaluations(session: Session, rule_ids: Sequence[int]) -> Dict[int, ComplianceRuleEvaluation]:
+    latest = select(
+        ComplianceRuleEvaluation.rule_id, func.max(ComplianceRuleEvaluation.id).label("id")
+    ).where(ComplianceRuleEvaluation.rule_id.in_(rule_ids)).group_by(ComplianceRuleEvaluation.rule_id).subquery()
+    evaluations = session.execute(
+        select(ComplianceRuleEvaluation).join(latest, ComplianceRuleEvaluation.id == latest.c.id)
+    ).scalars().all()
+    return {evaluation.rule_id: evaluation for evaluation in evaluations}
+
+
+def _recorded_state(evaluation: Optional[ComplianceRuleEvaluation], source_id: int) -> Optional[str]:
+    """Source state recorded by a rule's latest evaluation for the source (None if not recorded)."""
+    details = (evaluation.evaluation_context or {}).get("evaluation_details") if evaluation else None
+    for detail in details or []:
+        if detail.get("source_id") == source_id:
+            return detail.get("source_state")
+    return None
+
+
+def reevaluate_for_delta(session: Session, delta: ScanDelta,
+                         index: Optional[ComplianceDependencyIndex] = None) -> Dict[str, Any]:
+    """Re-evaluate only the rule/source pairs a scan delta affects and update the rule scores."""
+    started = time.perf_counter()
+    index = (index or compliance_dependency_index).ensure_fresh(session)
+    candidate_ids = index.rules_for_source(delta.data_source_id)
+    source = session.get(DataSource, delta.data_source_id)
+    rule_ids: List[int] = []
+    if candidate_ids and source is not None:
+        matrix = SourceMatrix([source])
+        state = matrix.source_state(0)
+        previous = _latest_evaluations(session, candidate_ids)
+        table_affected = set(index.affected_rules(delta)) if delta else set()
+        # Source attributes changed since a rule's last evaluation: its score is stale whatever the tables
+        rule_ids = [
+            rule_id for rule_id in candidate_ids
+            if rule_id in table_affected or _recorded_state(previous.get(rule_id), source.id) != state
+        ]
+    if not rule_ids:
+        return {"data_source_id": delta.data_source_id, "affected_rules": 0, "reevaluated_rules": 0,
+                "fully_evaluated_rules": 0, "elapsed_ms": int((time.perf_counter() - started) * 1000)}
+
+    rules = {rule.id: rule for rule in session.execute(
+        select(ComplianceRule).where(ComplianceRule.id.in_(rule_ids))
+    ).scalars().all()}
+    evaluations: List[Dict[str, Any]] = []
+    rule_updates: List[Dict[str, Any]] = []
+    full: List[int] = []
+    try:
+        for rule_id in rule_ids:
+            rule = rules.get(rule_id)
+            evaluation = previous.get(rule_id)
+            context = dict(evaluation.evaluation_context or {}) if evaluation else {}
+            if rule is None or "evaluation_details" not in context:
+                full.append(rule_id)
+                continue
+            pair_started = time.perf_counter()
+            performance_check = context.get("performance_check", True)
+            [pair] = matrix.source_details(
+                matrix.positions(), rule.rule_type, performance_check, context.get("security_check", True)
+            )
+            details = [d for d in context["evaluation_details"] if d.get("source_id") != source.id] + [pair]
+            total_entities = sum(d["entity_count"] for d in details)
+            compliant_entities = sum(d["compliant_count"] for d in details)
+            compliance_score = (compliant_entities / total_entities * 100) if total_entities > 0 else 0
+            status = RuleValidationStatus.COMPLIANT if compliance_score >= COMPLIANT_SCORE \
+                else RuleValidationStatus.NON_COMPLIANT
+            now = datetime.now()
+            context["evaluation_details"] = details
+            context["incremental"] = {"data_source_id": source.id, "changed_tables": sorted(delta.tables)[:100]}
+            evaluations.append({
+                "rule_id": rule_id,
+                "evaluation_id": f"eval_{rule_id}_{int(now.timestamp())}_inc{source.id}",
+                "status": status,
+                "entity_count": {
+                    "total": total_entities,
+                    "compliant": compliant_entities,
+                    "non_compliant": total_entities - compliant_entities,
+                    "error": 0,
+                    "not_applicable": 0
+                },
+                "compliance_score": compliance_score,
+                "issues_found": total_entities - compliant_entities,
+                "execution_time_ms": int((time.perf_counter() - pair_started) * 1000),
+                "entities_processed": pair["entity_count"],
+                "evaluation_context": context,
+                "evaluation_metadata": {"rule_version": rule.version, "incremental": True,
+                                        "previous_evaluation_id": evaluation.evaluation_id},
+                "evaluated_at": now
+            })
+            rule_updates.append({
+                "id": rule_id,
+                "pass_rate": compliance_score,
+                "total_entities": total_entities,
+                "passing_entities": compliant_entities,
+                "failing_entities": total_entities - compliant_entities,
+                "last_evaluated_at": now
+            })
+        session.bulk_insert_mappings(ComplianceRuleEvaluation, evaluations)
+        session.bulk_update_mappings(ComplianceRule, rule_updates)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error re-evaluating compliance for data source {delta.data_source_id}: {str(e)}")
+        raise
+
+    if full:
+        for _ in evaluate_rules_in_bulk(session, rule_ids=full):
+            pass
+
+    return {
+        "data_source_id": delta.data_source_id,
+        "affected_rules": len(rule_ids),
+        "reevaluated_rules": len(evaluations),
+        "fully_evaluated_rules": len(full),
+        "elapsed_ms": int((time.perf_counter() - started) * 1000)
+    }
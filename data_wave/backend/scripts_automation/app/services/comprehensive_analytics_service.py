@@ -36,6 +36,7 @@ from plotly.subplots import make_subplots
 from ..core.config import settings
 from ..core.cache_manager import EnterpriseCacheManager as CacheManager
 from ..services.ai_service import EnterpriseAIService as AIService
+from ..services.scheduler import get_loop_scheduler
 from ..models.analytics_models import (
     AnalyticsDataset, DataCorrelation, AnalyticsInsight, MLModel,
     AnalyticsAlert, AnalyticsExperiment, AnalyticsQuery, AnalyticsResult
@@ -108,22 +109,12 @@ class ComprehensiveAnalyticsService:
         # Threading
         self.executor = ThreadPoolExecutor(max_workers=12)
         
-        # Background tasks - defer until start() method
-        self._background_tasks = [
-            self._analytics_processing_loop,
-            self._model_training_loop,
-            self._insight_generation_loop,
-            self._performance_monitoring_loop
-        ]
         self._pending_dashboard_streams = []
     
     async def start(self):
         """Start background tasks when event loop is available"""
         try:
             loop = asyncio.get_running_loop()
-            # Start background tasks
-            for task_func in self._background_tasks:
-                loop.create_task(task_func())
             # Start pending dashboard streams
             for dashboard_id in self._pending_dashboard_streams:
                 loop.create_task(self._stream_dashboard_data(dashboard_id))
@@ -747,23 +738,20 @@ class ComprehensiveAnalyticsService:
             if not dashboard:
                 return
             
-            while True:
-                # Update each widget with fresh data
-                for widget in dashboard['widgets']:
-                    updated_data = await self._get_widget_data(widget)
-                    widget['data'] = updated_data
-                    widget['last_updated'] = datetime.utcnow().isoformat()
-                
-                # Schedule next refresh using scheduler service
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="dashboard_refresh",
-                    delay_seconds=dashboard['refresh_interval'],
-                    task_func=self._stream_dashboard_data,
-                    args=[dashboard_id]
-                )
-                
+            # Update each widget with fresh data
+            for widget in dashboard['widgets']:
+                updated_data = await self._get_widget_data(widget)
+                widget['data'] = updated_data
+                widget['last_updated'] = datetime.utcnow().isoformat()
+            
+            # Schedule next refresh on the shared loop scheduler
+            get_loop_scheduler().call_later(
+                f"comprehensive_analytics.dashboard_refresh:{dashboard_id}",
+                dashboard['refresh_interval'],
+                self._stream_dashboard_data,
+                args=(dashboard_id,)
+            )
+            
         except Exception as e:
             logger.error(f"Failed to stream dashboard data: {e}")
     
@@ -848,104 +836,6 @@ class ComprehensiveAnalyticsService:
             logger.error(f"Failed to get analytics metrics: {e}")
             raise
     
-    # Background processing methods
-    
-    async def _analytics_processing_loop(self):
-        """Background loop for processing analytics queries"""
-        while True:
-            try:
-                # Process queued analytics requests
-                # Clean up completed queries
-                # Update metrics
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="analytics_processing",
-                    delay_seconds=10,
-                    task_func=self._analytics_processing_loop
-                )
-            except Exception as e:
-                logger.error(f"Analytics processing loop error: {e}")
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="analytics_processing_fallback",
-                    delay_seconds=30,
-                    task_func=self._analytics_processing_loop
-                )
-    
-    async def _model_training_loop(self):
-        """Background loop for training and updating ML models"""
-        while True:
-            try:
-                # Retrain models with new data
-                # Update model performance metrics
-                # Optimize model parameters
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="model_training",
-                    delay_seconds=3600,
-                    task_func=self._model_training_loop
-                )
-            except Exception as e:
-                logger.error(f"Model training loop error: {e}")
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="model_training_fallback",
-                    delay_seconds=1800,
-                    task_func=self._model_training_loop
-                )
-    
-    async def _insight_generation_loop(self):
-        """Background loop for generating automated insights"""
-        while True:
-            try:
-                # Generate automated insights
-                # Update insight cache
-                # Trigger alerts if needed
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="insight_generation",
-                    delay_seconds=300,
-                    task_func=self._insight_generation_loop
-                )
-            except Exception as e:
-                logger.error(f"Insight generation loop error: {e}")
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="insight_generation_fallback",
-                    delay_seconds=600,
-                    task_func=self._insight_generation_loop
-                )
-    
-    async def _performance_monitoring_loop(self):
-        """Background loop for monitoring analytics performance"""
-        while True:
-            try:
-                # Monitor service performance
-                # Update metrics
-                # Trigger optimizations if needed
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="performance_monitoring",
-                    delay_seconds=60,
-                    task_func=self._performance_monitoring_loop
-                )
-            except Exception as e:
-                logger.error(f"Performance monitoring loop error: {e}")
-                from .scheduler import SchedulerService
-                scheduler = SchedulerService()
-                await scheduler.schedule_task(
-                    task_name="performance_monitoring_fallback",
-                    delay_seconds=120,
-                    task_func=self._performance_monitoring_loop
-                )
-    
     # Helper methods
     
     def _generate_query_hash(self, query: AnalyticsQuery) -> str:
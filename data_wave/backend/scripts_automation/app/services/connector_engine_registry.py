@@ -0,0 +1,314 @@
+"""
+Connector Engine Registry
+Process-wide cache of SQLAlchemy engines and native clients for data source connectors.
+
+Connectors used to build a fresh connection string and engine on every
+test_connection / get_table_preview / get_column_profile call, paying
+TCP + TLS + authentication for each interactive request. The registry keeps
+one bounded pool per data source and hands the warm engine back on reuse.
+
+- Engines are keyed by data source id and fingerprinted on the connection
+  string and pool settings, so a rotated credential or changed pool config
+  transparently replaces the stale engine.
+- Idle engines are disposed after ``idle_timeout_seconds`` and the total number
+  of cached entries is bounded (least recently used entries are evicted first).
+- Hit/miss/eviction counters and per-pool checkout stats are exposed through
+  ``get_metrics`` for the connection pool endpoints.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _RegistryEntry:
+    """A cached engine or client together with its bookkeeping."""
+    key: Tuple[Any, str]
+    fingerprint: str
+    resource: Any
+    closer: Callable[[Any], None]
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+
+def _fingerprint(*parts: Any) -> str:
+    """Stable digest of the connection parameters (never stores secrets in clear)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _dispose_engine(engine: Engine) -> None:
+    engine.dispose()
+
+
+def _close_client(client: Any) -> None:
+    close = getattr(client, "close", None)
+    if callable(close):
+        close()
+
+
+class ConnectorEngineRegistry:
+    """Bounded, thread-safe registry of warm engines/clients per data source."""
+
+    def __init__(
+        self,
+        max_entries: int = 64,
+        idle_timeout_seconds: float = 600.0,
+        eviction_interval_seconds: float = 30.0,
+    ):
+        self.max_entries = max_entries
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.eviction_interval_seconds = eviction_interval_seconds
+        self._entries: "OrderedDict[Tuple[Any, str], _RegistryEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_eviction = time.monotonic()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "created": 0,
+            "invalidated": 0,
+            "rotated": 0,
+            "evicted_idle": 0,
+            "evicted_capacity": 0,
+            "creation_failures": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_engine(
+        self,
+        data_source: Any,
+        connection_string: str,
+        purpose: str = "default",
+        **engine_kwargs: Any,
+    ) -> Engine:
+        """Return a pooled SQLAlchemy engine for ``data_source``.
+
+        Pool bounds default to the data source's ``pool_size`` / ``max_overflow`` /
+        ``pool_timeout`` settings; explicit ``engine_kwargs`` take precedence.
+        """
+        kwargs = self._pool_kwargs(data_source, connection_string)
+        kwargs.update(engine_kwargs)
+        fingerprint = _fingerprint(connection_string, sorted(kwargs.items(), key=lambda kv: kv[0]))
+        return self._get_or_create(
+            key=(self._data_source_key(data_source), f"engine:{purpose}"),
+            fingerprint=fingerprint,
+            factory=lambda: create_engine(connection_string, **kwargs),
+            closer=_dispose_engine,
+        )
+
+    def get_client(
+        self,
+        data_source: Any,
+        kind: str,
+        fingerprint_parts: Tuple[Any, ...],
+        factory: Callable[[], Any],
+        closer: Callable[[Any], None] = _close_client,
+    ) -> Any:
+        """Return a cached native client (Snowflake connection, Mongo client, ...).
+
+        ``fingerprint_parts`` must include every credential or setting whose change
+        should force a reconnect.
+        """
+        return self._get_or_create(
+            key=(self._data_source_key(data_source), f"client:{kind}"),
+            fingerprint=_fingerprint(*fingerprint_parts),
+            factory=factory,
+            closer=closer,
+        )
+
+    def invalidate(self, data_source_id: Any) -> int:
+        """Drop every cached engine/client for a data source (e.g. after a credential update)."""
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == data_source_id]
+            entries = [self._entries.pop(key) for key in keys]
+            self._stats["invalidated"] += len(entries)
+        for entry in entries:
+            self._close_entry(entry)
+        if entries:
+            logger.info(f"Invalidated {len(entries)} cached connection(s) for data source {data_source_id}")
+        return len(entries)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Dispose of entries that have not been used within the idle timeout."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._last_eviction = now
+            expired = [
+                key for key, entry in self._entries.items()
+                if now - entry.last_used > self.idle_timeout_seconds
+            ]
+            entries = [self._entries.pop(key) for key in expired]
+            self._stats["evicted_idle"] += len(entries)
+        for entry in entries:
+            self._close_entry(entry)
+        return len(entries)
+
+    def close_all(self) -> None:
+        """Dispose of every cached engine and client (application shutdown)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._close_entry(entry)
+
+    def get_metrics(self, data_source_id: Any = None) -> Dict[str, Any]:
+        """Registry counters plus per-entry pool health."""
+        now = time.monotonic()
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            entries = []
+            for entry in self._entries.values():
+                if data_source_id is not None and entry.key[0] != data_source_id:
+                    continue
+                entries.append({
+                    "data_source_id": entry.key[0],
+                    "kind": entry.key[1],
+                    "uses": entry.uses,
+                    "age_seconds": round(now - entry.created_at, 3),
+                    "idle_seconds": round(now - entry.last_used, 3),
+                    "pool": self._pool_status(entry.resource),
+                })
+        stats.update({
+            "cached_entries": len(entries) if data_source_id is not None else len(self._entries),
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "max_entries": self.max_entries,
+            "idle_timeout_seconds": self.idle_timeout_seconds,
+            "entries": entries,
+        })
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _get_or_create(
+        self,
+        key: Tuple[Any, str],
+        fingerprint: str,
+        factory: Callable[[], Any],
+        closer: Callable[[Any], None],
+    ) -> Any:
+        self._maybe_evict_idle()
+        stale: Optional[_RegistryEntry] = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.fingerprint == fingerprint:
+                entry.last_used = time.monotonic()
+                entry.uses += 1
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.resource
+            if entry is not None:
+                # Credentials or pool settings changed underneath us
+                stale = self._entries.pop(key)
+                self._stats["rotated"] += 1
+            self._stats["misses"] += 1
+
+        if stale is not None:
+            self._close_entry(stale)
+
+        try:
+            resource = factory()
+        except Exception:
+            with self._lock:
+                self._stats["creation_failures"] += 1
+            raise
+
+        overflow = []
+        with self._lock:
+            raced = self._entries.get(key)
+            if raced is not None and raced.fingerprint == fingerprint:
+                # Another thread won the race; keep theirs and discard ours
+                overflow.append(_RegistryEntry(key, fingerprint, resource, closer))
+                resource = raced.resource
+                raced.uses += 1
+                raced.last_used = time.monotonic()
+            else:
+                if raced is not None:
+                    overflow.append(self._entries.pop(key))
+                self._entries[key] = _RegistryEntry(key, fingerprint, resource, closer, uses=1)
+                self._stats["created"] += 1
+                while len(self._entries) > self.max_entries:
+                    _, evicted = self._entries.popitem(last=False)
+                    overflow.append(evicted)
+                    self._stats["evicted_capacity"] += 1
+        for entry in overflow:
+            self._close_entry(entry)
+        return resource
+
+    def _maybe_evict_idle(self) -> None:
+        if time.monotonic() - self._last_eviction >= self.eviction_interval_seconds:
+            self.evict_idle()
+
+    @staticmethod
+    def _data_source_key(data_source: Any) -> Any:
+        data_source_id = getattr(data_source, "id", None)
+        if data_source_id is not None:
+            return data_source_id
+        return f"{getattr(data_source, 'host', '')}:{getattr(data_source, 'port', '')}/{getattr(data_source, 'database_name', '')}"
+
+    @staticmethod
+    def _pool_kwargs(data_source: Any, connection_string: str) -> Dict[str, Any]:
+        if connection_string.startswith("sqlite"):
+            return {}
+        return {
+            "pool_size": getattr(data_source, "pool_size", None) or 5,
+            "max_overflow": getattr(data_source, "max_overflow", None) or 10,
+            "pool_timeout": getattr(data_source, "pool_timeout", None) or 30,
+            "pool_recycle": 1800,
+            "pool_pre_ping": True,
+        }
+
+    @staticmethod
+    def _pool_status(resource: Any) -> Dict[str, Any]:
+        pool = getattr(resource, "pool", None)
+        if pool is None:
+            return {}
+        status: Dict[str, Any] = {"status": pool.status()}
+        for attr in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, attr, None)
+            if callable(method):
+                try:
+                    status[attr] = method()
+                except Exception:
+                    pass
+        return status
+
+    @staticmethod
+    def _close_entry(entry: _RegistryEntry) -> None:
+        try:
+            entry.closer(entry.resource)
+        except Exception as e:
+            logger.warning(f"Error closing cached connection for data source {entry.key[0]}: {e}")
+
+
+_registry: Optional[ConnectorEngineRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_connector_engine_registry() -> ConnectorEngineRegistry:
+    """Get the process-wide connector engine registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ConnectorEngineRegistry()
+    return _registry
@@ -1,13 +1,22 @@
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Tuple, Union, Callable
 import re
+import math
 import logging
 from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
 from sqlmodel import Session, select
 from app.models.scan_models import ScanRuleSet
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Compiled expressions kept by expression text
+EXPRESSION_CACHE_SIZE = 4096
+# Metadata with at least this many columns/fields is filtered with array masks
+COLUMNAR_MIN_ROWS = 10000
+
 class ExpressionParser:
     """Parser for custom scan rule expressions."""
     
@@ -282,6 +291,86 @@ class ExpressionParser:
         Returns:
             A function that takes a context dictionary and returns a boolean
         """
+        if not expression or expression.strip() == "":
+            return lambda context: True
+        return ExpressionParser.compile(expression)
+    
+    @staticmethod
+    @lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+    def compile(expression: str) -> Callable[[Dict[str, Any]], bool]:
+        """Compile an expression into a Python function, cached by expression text.
+        
+        The token list is walked once, following exactly the same grammar as
+        ``interpret``, into a single function body: sub-trees without context
+        lookups are constant-folded, comparisons against a literal precompute
+        the literal side and AND/OR short-circuit. Quoted and numeric tokens
+        are treated as literals (``interpret`` would first look them up in the
+        context, which never has such keys).
+        """
+        try:
+            return _ExpressionCompiler(ExpressionParser.tokenize(expression)).build()
+        except Exception as e:
+            # The interpreter hits the same structural error on every call
+            logger.error(f"Expression evaluation error: {e}")
+            return lambda context: False
+    
+    @staticmethod
+    @lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+    def compile_rules(inclusions: Tuple[str, ...], exclusions: Tuple[str, ...]) -> Callable[[Dict[str, Any]], bool]:
+        """Single predicate for "any inclusion matches (or there are none) and no exclusion matches"."""
+        namespace: Dict[str, Any] = {}
+        
+        def calls(expressions: Tuple[str, ...]) -> str:
+            names = []
+            for expression in expressions:
+                name = f"_f{len(namespace)}"
+                namespace[name] = ExpressionParser.parse(expression)
+                names.append(f"{name}(context)")
+            return " or ".join(names)
+        
+        included = calls(inclusions) or "True"
+        excluded = calls(exclusions) or "False"
+        return eval(compile(f"lambda context: bool({included}) and not ({excluded})", "<scan rules>", "eval"), namespace)
+    
+    @staticmethod
+    @lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+    def compile_mask(expression: str, keys: Tuple[str, ...]) -> Callable[["_ColumnarFrame"], np.ndarray]:
+        """Compile an expression into a boolean-mask function over a columnar frame.
+        
+        ``keys`` are the context keys of the frame's rows. Expressions using
+        functions or arithmetic are evaluated row by row with ``compile``.
+        """
+        if not expression or expression.strip() == "":
+            return lambda frame: np.ones(frame.size, dtype=bool)
+        
+        evaluate = ExpressionParser.parse(expression)
+        
+        def row_wise(frame: "_ColumnarFrame") -> np.ndarray:
+            return np.fromiter((bool(evaluate(row)) for row in frame.records()), dtype=bool, count=frame.size)
+        
+        try:
+            vectorized = _MaskCompiler(ExpressionParser.tokenize(expression), keys).build()
+        except _NotVectorizable:
+            return row_wise
+        except Exception:
+            # Structural error, already logged by ``compile``
+            return lambda frame: np.zeros(frame.size, dtype=bool)
+        
+        def evaluate_mask(frame: "_ColumnarFrame") -> np.ndarray:
+            try:
+                return vectorized(frame)
+            except Exception as e:
+                logger.warning(f"Columnar evaluation of {expression!r} failed, evaluating row by row: {e}")
+                return row_wise(frame)
+        
+        return evaluate_mask
+    
+    @staticmethod
+    def interpret(expression: str) -> Callable[[Dict[str, Any]], bool]:
+        """Token-walking interpreter; re-parses the token list on every call.
+
+        Kept as the reference semantics for ``compile``.
+        """
         if not expression or expression.strip() == "":
             return lambda context: True
         
@@ -405,6 +494,462 @@ class ExpressionParser:
         return evaluate
 
 
+class _Literal:
+    """Compiled node whose value does not depend on the context."""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self, value: Any):
+        self.value = value
+
+
+def _literal_value(token: str) -> Any:
+    try:
+        return float(token)
+    except ValueError:
+        return token.strip('"\'')
+
+
+def _is_literal_token(token: str) -> bool:
+    if token[:1] in ('"', "'"):
+        return True
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def _text(value: Any) -> str:
+    return str(value).lower() if value is not None else ""
+
+
+def _regex_match(pattern, value: Any) -> bool:
+    return bool(pattern.match(value)) if isinstance(value, str) else False
+
+
+def _number_comparison(operator: str, literal: Any) -> Callable[[Any], Any]:
+    """``value <op> literal`` with the literal converted once; same fallbacks as ``apply_operator_with_validation``."""
+    apply = ExpressionParser.apply_operator_with_validation
+    compare = {
+        '>': lambda x, y: x > y,
+        '<': lambda x, y: x < y,
+        '>=': lambda x, y: x >= y,
+        '<=': lambda x, y: x <= y,
+    }[operator]
+    bound = float(literal) if literal is not None else 0
+    
+    def evaluate(value):
+        try:
+            return compare(float(value) if value is not None else 0, bound)
+        except Exception:
+            return apply(operator, value, literal)
+    
+    return evaluate
+
+
+class _ExpressionCompiler:
+    """Compiles a token list into the source of a single Python function.
+    
+    Walks the tokens with the same grammar as ``ExpressionParser.interpret``.
+    Nodes are either ``_Literal`` (folded at compile time) or a source
+    fragment; token values never appear in the source, they are bound as
+    names in the function's namespace.
+    """
+    
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.namespace: Dict[str, Any] = {
+            "_apply": ExpressionParser.apply_operator_with_validation,
+            "_call": ExpressionParser.evaluate_function,
+            "_regex_match": _regex_match,
+            "_log": logger.error,
+        }
+        self.temporaries = 0
+    
+    def bind(self, value: Any) -> str:
+        name = f"_k{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+    
+    def temporary(self) -> str:
+        self.temporaries += 1
+        return f"_v{self.temporaries}"
+    
+    def text(self, node: str) -> str:
+        """Inline ``_text``: lower-cased string, '' for None."""
+        value = self.temporary()
+        return f"(str({value}).lower() if ({value} := {node}) is not None else '')"
+    
+    def source(self, node) -> str:
+        return self.bind(node.value) if isinstance(node, _Literal) else node
+    
+    def build(self) -> Callable[[Dict[str, Any]], Any]:
+        node, _ = self.expression(0)
+        if isinstance(node, _Literal):
+            value = node.value
+            return lambda context: value
+        source = (
+            "def evaluate(context):\n"
+            "    try:\n"
+            f"        return {node}\n"
+            "    except Exception as e:\n"
+            "        _log(f'Expression evaluation error: {e}')\n"
+            "        return False\n"
+        )
+        exec(compile(source, "<scan rule expression>", "exec"), self.namespace)
+        return self.namespace["evaluate"]
+    
+    def expression(self, index: int):
+        tokens = self.tokens
+        if index >= len(tokens):
+            return _Literal(True), index
+        
+        if tokens[index] == 'NOT':
+            operand, index = self.expression(index + 1)
+            if isinstance(operand, _Literal):
+                return _Literal(not operand.value), index
+            return self.negate(operand), index
+        left, index = self.operand(index)
+        
+        if index >= len(tokens) or tokens[index] == ')':
+            return left, index + 1 if index < len(tokens) and tokens[index] == ')' else index
+        
+        operator = tokens[index]
+        if operator not in ExpressionParser.OPERATORS:
+            raise ValueError(f"Unknown operator: {operator}")
+        right, index = self.operand(index + 1)
+        result = self.operator(operator, left, right)
+        
+        if index >= len(tokens) or tokens[index] == ')':
+            return result, index + 1 if index < len(tokens) and tokens[index] == ')' else index
+        
+        next_operator = tokens[index]
+        if next_operator not in ['AND', 'OR']:
+            raise ValueError(f"Expected AND or OR, got: {next_operator}")
+        rest, index = self.expression(index + 1)
+        return self.operator(next_operator, result, rest), index
+    
+    def operand(self, index: int):
+        tokens = self.tokens
+        token = tokens[index]
+        if token == '(':
+            return self.expression(index + 1)
+        if token.startswith('FUNCTION_'):
+            index += 1
+            args = []
+            if index < len(tokens) and tokens[index] == '(':
+                index += 1
+                while index < len(tokens) and tokens[index] != ')':
+                    if tokens[index] == ',':
+                        index += 1
+                        continue
+                    arg, index = self.expression(index)
+                    args.append(arg)
+                if index < len(tokens) and tokens[index] == ')':
+                    index += 1
+            return self.function(token, args), index
+        if _is_literal_token(token):
+            return _Literal(_literal_value(token)), index + 1
+        return self.lookup(token, _literal_value(token)), index + 1
+    
+    def function(self, function_name: str, args: List[Any]):
+        if function_name != "FUNCTION_DATE_NOW" and all(isinstance(arg, _Literal) for arg in args):
+            return _Literal(ExpressionParser.evaluate_function(function_name, [arg.value for arg in args], {}))
+        return self.call(function_name, args)
+    
+    def operator(self, operator: str, left, right):
+        if isinstance(left, _Literal) and isinstance(right, _Literal):
+            return _Literal(ExpressionParser.apply_operator_with_validation(operator, left.value, right.value))
+        
+        if operator in ('AND', 'OR'):
+            # Operands have no side effects, so short-circuiting keeps the result
+            absorbing = operator == 'OR'
+            for node, other in ((left, right), (right, left)):
+                if isinstance(node, _Literal):
+                    if bool(node.value) == absorbing:
+                        return _Literal(absorbing)
+                    return self.truth(other)
+        return self.combine(operator, left, right)
+    
+    # Backend: Python source fragments
+    
+    def lookup(self, key: str, fallback: Any) -> str:
+        return f"context.get({self.bind(key)}, {self.bind(fallback)})"
+    
+    def negate(self, node: str) -> str:
+        return f"(not {node})"
+    
+    def truth(self, node: str) -> str:
+        return f"(True if {node} else False)"
+    
+    def call(self, function_name: str, args: List[Any]) -> str:
+        arg_list = ", ".join(self.source(arg) for arg in args)
+        return f"_call({self.bind(function_name)}, [{arg_list}], context)"
+    
+    def combine(self, operator: str, left, right) -> str:
+        if operator in ('AND', 'OR'):
+            return f"(True if {left} {operator.lower()} {right} else False)"
+        
+        if operator in ('==', '!='):
+            if isinstance(left, _Literal):
+                left, right = right, left
+            expected = self.bind(_text(right.value)) if isinstance(right, _Literal) else self.text(right)
+            return f"({self.text(left)} {operator} {expected})"
+        
+        if operator in ('>', '<', '>=', '<=') and isinstance(right, _Literal):
+            try:
+                compare = _number_comparison(operator, right.value)
+            except (ValueError, TypeError):
+                # Not a number: every comparison falls back to strings in ``apply``
+                pass
+            except Exception:
+                return _Literal(False)
+            else:
+                return f"{self.bind(compare)}({left})"
+        
+        if operator in ('CONTAINS', 'STARTSWITH', 'ENDSWITH') and isinstance(right, _Literal):
+            if not isinstance(right.value, str):
+                # str methods reject non-str arguments, which ``apply`` turns into False
+                return _Literal(False)
+            value, literal = self.temporary(), self.bind(right.value)
+            test = {
+                'CONTAINS': f"{literal} in {value}",
+                'STARTSWITH': f"{value}.startswith({literal})",
+                'ENDSWITH': f"{value}.endswith({literal})",
+            }[operator]
+            return f"({test} if isinstance(({value} := {left}), str) else False)"
+        
+        if operator == 'MATCHES' and isinstance(right, _Literal):
+            if not isinstance(right.value, str):
+                return _Literal(False)
+            try:
+                pattern = re.compile(right.value)
+            except re.error:
+                return _Literal(False)
+            return f"_regex_match({self.bind(pattern)}, {left})"
+        
+        return f"_apply({self.bind(operator)}, {self.source(left)}, {self.source(right)})"
+
+
+class _NotVectorizable(Exception):
+    """Raised by ``_MaskCompiler`` for nodes that need row-wise evaluation."""
+
+
+def _to_number(value: Any):
+    """``float(value)`` plus how ``apply_operator_with_validation`` treats a failure.
+    
+    Status 0 is a number, 1 falls back to string comparison, 2 makes the
+    comparison False.
+    """
+    if value is None:
+        return 0.0, 0
+    try:
+        return float(value), 0
+    except (ValueError, TypeError):
+        return math.nan, 1
+    except Exception:
+        return math.nan, 2
+
+
+_TEXTS = np.frompyfunc(_text, 1, 1)
+_STRINGS = np.frompyfunc(lambda value: str(value) if value is not None else "", 1, 1)
+_TRUTHS = np.frompyfunc(bool, 1, 1)
+_NUMBERS = np.frompyfunc(_to_number, 1, 2)
+_ARRAY_COMPARISONS = {'>': np.greater, '<': np.less, '>=': np.greater_equal, '<=': np.less_equal}
+# Value types whose equal values also have equal text (unlike 1, 1.0 and True)
+_ENCODABLE_TYPES = ("string", "boolean", "integer")
+
+
+def _object_array(values) -> np.ndarray:
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        return values
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    return values if values.dtype == bool else _TRUTHS(values).astype(bool)
+
+
+class _ColumnarFrame:
+    """Scan metadata flattened into one array per context key.
+    
+    Columns are loaded on first use. A loader returns the row values, or
+    ``(values, codes)`` when rows repeat their parent's value. Plain columns
+    holding a single value type are dictionary-encoded, so predicates on a
+    column run once per distinct value and are broadcast back with the codes.
+    """
+    
+    def __init__(self, size: int, loaders: Dict[str, Callable[[], Any]]):
+        self.size = size
+        self.loaders = loaders
+        # Keyed by loader, so aliases such as "name"/"column" load once
+        self._encoded: Dict[Callable[[], Any], Tuple[np.ndarray, Optional[np.ndarray]]] = {}
+        self._records: Optional[List[Dict[str, Any]]] = None
+    
+    def encoded(self, key: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        loader = self.loaders[key]
+        encoded = self._encoded.get(loader)
+        if encoded is None:
+            loaded = loader()
+            if isinstance(loaded, tuple):
+                values, codes = loaded
+                encoded = (_object_array(values), np.asarray(codes, dtype=np.intp))
+            else:
+                values = _object_array(loaded)
+                if pd.api.types.infer_dtype(values, skipna=False) in _ENCODABLE_TYPES:
+                    codes, uniques = pd.factorize(values)
+                    encoded = (_object_array(uniques), codes)
+                else:
+                    encoded = (values, None)
+            self._encoded[loader] = encoded
+        return encoded
+    
+    def values(self, key: str) -> np.ndarray:
+        values, codes = self.encoded(key)
+        return values if codes is None else values[codes]
+    
+    def transform(self, key: str, convert: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """``convert(values(key))``, computed on the distinct values when the column is encoded."""
+        values, codes = self.encoded(key)
+        converted = convert(values)
+        return converted if codes is None else converted[codes]
+    
+    def records(self) -> List[Dict[str, Any]]:
+        """Row contexts, for expressions that can only be evaluated one row at a time."""
+        if self._records is None:
+            keys = list(self.loaders)
+            self._records = [dict(zip(keys, row)) for row in zip(*(self.values(key) for key in keys))]
+        return self._records
+
+
+class _Lookup:
+    """Mask-compiler node for a context key present in the frame."""
+    
+    __slots__ = ("key",)
+    
+    def __init__(self, key: str):
+        self.key = key
+    
+    def __call__(self, frame: _ColumnarFrame) -> np.ndarray:
+        return frame.values(self.key)
+
+
+def _per_value(node, convert: Callable[[np.ndarray], np.ndarray]) -> Callable[[_ColumnarFrame], np.ndarray]:
+    if isinstance(node, _Lookup):
+        key = node.key
+        return lambda frame: frame.transform(key, convert)
+    return lambda frame: convert(node(frame))
+
+
+def _literal_comparison(operator: str, literal: Any) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    """Array form of ``value <op> literal`` with ``apply_operator_with_validation``'s fallbacks.
+    
+    Returns None when every comparison is False.
+    """
+    compare = _ARRAY_COMPARISONS[operator]
+    literal_text = str(literal) if literal is not None else ""
+    try:
+        bound = float(literal) if literal is not None else 0
+    except (ValueError, TypeError):
+        # Not a number: rows compare as strings, unless converting their value errors
+        def compare_text(values):
+            _, status = _NUMBERS(values)
+            return compare(_STRINGS(values), literal_text).astype(bool) & (status.astype(np.int8) != 2)
+        return compare_text
+    except Exception:
+        return None
+    
+    def compare_number(values):
+        converted, status = _NUMBERS(values)
+        status = status.astype(np.int8)
+        result = np.zeros(len(values), dtype=bool)
+        numeric = status == 0
+        result[numeric] = compare(converted[numeric].astype(float), bound)
+        fallback = status == 1
+        if fallback.any():
+            result[fallback] = compare(_STRINGS(values[fallback]), literal_text).astype(bool)
+        return result
+    
+    return compare_number
+
+
+class _MaskCompiler(_ExpressionCompiler):
+    """Compiles an expression into a boolean mask over a ``_ColumnarFrame``.
+    
+    Same grammar and folding as the source backend; comparisons, string
+    tests and boolean operators become array operations. Functions and
+    arithmetic raise ``_NotVectorizable``.
+    """
+    
+    def __init__(self, tokens: List[str], keys: Tuple[str, ...]):
+        super().__init__(tokens)
+        self.keys = frozenset(keys)
+    
+    def build(self) -> Callable[[_ColumnarFrame], np.ndarray]:
+        node, _ = self.expression(0)
+        if isinstance(node, _Literal):
+            value = bool(node.value)
+            return lambda frame: np.full(frame.size, value)
+        return self.truth(node)
+    
+    def lookup(self, key: str, fallback: Any):
+        # Every row context of a level has the same keys
+        return _Lookup(key) if key in self.keys else _Literal(fallback)
+    
+    def negate(self, node):
+        return _per_value(node, lambda values: ~_truthy(values))
+    
+    def truth(self, node):
+        return _per_value(node, _truthy)
+    
+    def call(self, function_name: str, args: List[Any]):
+        raise _NotVectorizable(function_name)
+    
+    def combine(self, operator: str, left, right):
+        if operator in ('AND', 'OR'):
+            left, right = self.truth(left), self.truth(right)
+            if operator == 'AND':
+                return lambda frame: left(frame) & right(frame)
+            return lambda frame: left(frame) | right(frame)
+        
+        if operator in ('==', '!='):
+            if isinstance(left, _Literal):
+                left, right = right, left
+            if isinstance(right, _Literal):
+                expected = _text(right.value)
+                if operator == '==':
+                    return _per_value(left, lambda values: (_TEXTS(values) == expected).astype(bool))
+                return _per_value(left, lambda values: (_TEXTS(values) != expected).astype(bool))
+            if operator == '==':
+                return lambda frame: (_TEXTS(left(frame)) == _TEXTS(right(frame))).astype(bool)
+            return lambda frame: (_TEXTS(left(frame)) != _TEXTS(right(frame))).astype(bool)
+        
+        if operator in _ARRAY_COMPARISONS and isinstance(right, _Literal):
+            compare = _literal_comparison(operator, right.value)
+            return _Literal(False) if compare is None else _per_value(left, compare)
+        
+        if operator in ('CONTAINS', 'STARTSWITH', 'ENDSWITH', 'MATCHES') and isinstance(right, _Literal):
+            if not isinstance(right.value, str):
+                return _Literal(False)
+            literal = right.value
+            if operator == 'MATCHES':
+                try:
+                    pattern = re.compile(literal)
+                except re.error:
+                    return _Literal(False)
+                test = np.frompyfunc(lambda value: _regex_match(pattern, value), 1, 1)
+            else:
+                test = np.frompyfunc({
+                    'CONTAINS': lambda value: isinstance(value, str) and literal in value,
+                    'STARTSWITH': lambda value: isinstance(value, str) and value.startswith(literal),
+                    'ENDSWITH': lambda value: isinstance(value, str) and value.endswith(literal),
+                }[operator], 1, 1)
+            return _per_value(left, lambda values: test(values).astype(bool))
+        
+        raise _NotVectorizable(operator)
+
+
 class CustomScanRuleService:
     """Service for managing custom scan rules."""
     
@@ -569,7 +1114,8 @@ class CustomScanRuleService:
     def apply_custom_rule_filters(
         rule_set: ScanRuleSet,
         metadata: Dict[str, Any],
-        metadata_type: str = "relational"
+        metadata_type: str = "relational",
+        columnar: Optional[bool] = None
     ) -> Dict[str, Any]:
         """Apply custom rule filters to metadata.
         
@@ -577,6 +1123,9 @@ class CustomScanRuleService:
             rule_set: The scan rule set with custom expressions
             metadata: The metadata to filter
             metadata_type: The type of metadata ("relational" or "mongodb")
+            columnar: Evaluate the rules as array masks over flattened metadata;
+                by default only when there are at least ``COLUMNAR_MIN_ROWS``
+                columns/fields
             
         Returns:
             The filtered metadata
@@ -585,9 +1134,15 @@ class CustomScanRuleService:
             return metadata
         
         try:
+            if columnar is None:
+                columnar = CustomScanRuleService._leaf_count(metadata, metadata_type) >= COLUMNAR_MIN_ROWS
             if metadata_type == "relational":
+                if columnar:
+                    return CustomScanRuleService._filter_relational_columnar(rule_set, metadata)
                 return CustomScanRuleService._filter_relational_metadata(rule_set, metadata)
             elif metadata_type == "mongodb":
+                if columnar:
+                    return CustomScanRuleService._filter_mongodb_columnar(rule_set, metadata)
                 return CustomScanRuleService._filter_mongodb_metadata(rule_set, metadata)
             else:
                 logger.error(f"Unsupported metadata type: {metadata_type}")
@@ -596,18 +1151,22 @@ class CustomScanRuleService:
             logger.error(f"Error applying custom rule filters: {str(e)}")
             return metadata
     
+    @staticmethod
+    def _compiled_rules(custom_props: Dict[str, Any], level: str) -> Callable[[Dict[str, Any]], bool]:
+        return ExpressionParser.compile_rules(
+            tuple(custom_props.get(f"{level}_inclusion_expressions") or ()),
+            tuple(custom_props.get(f"{level}_exclusion_expressions") or ()),
+        )
+    
     @staticmethod
     def _filter_relational_metadata(rule_set: ScanRuleSet, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Filter relational metadata using custom expressions."""
         custom_props = rule_set.custom_properties or {}
         
-        # Parse expressions
-        schema_include_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("schema_inclusion_expressions", [])]
-        schema_exclude_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("schema_exclusion_expressions", [])]
-        table_include_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("table_inclusion_expressions", [])]
-        table_exclude_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("table_exclusion_expressions", [])]
-        column_include_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("column_inclusion_expressions", [])]
-        column_exclude_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("column_exclusion_expressions", [])]
+        # Compiled predicates (cached by expression text across calls)
+        schema_matches = CustomScanRuleService._compiled_rules(custom_props, "schema")
+        table_matches = CustomScanRuleService._compiled_rules(custom_props, "table")
+        column_matches = CustomScanRuleService._compiled_rules(custom_props, "column")
         
         filtered_metadata = {"schemas": []}
         
@@ -616,10 +1175,7 @@ class CustomScanRuleService:
             schema_context = {"name": schema.get("name", ""), "schema": schema.get("name", "")}
             
             # Check if schema should be included
-            include_schema = not schema_include_funcs or any(func(schema_context) for func in schema_include_funcs)
-            exclude_schema = any(func(schema_context) for func in schema_exclude_funcs)
-            
-            if include_schema and not exclude_schema:
+            if schema_matches(schema_context):
                 filtered_schema = {"name": schema.get("name", ""), "tables": []}
                 
                 # Filter tables
@@ -632,10 +1188,7 @@ class CustomScanRuleService:
                     }
                     
                     # Check if table should be included
-                    include_table = not table_include_funcs or any(func(table_context) for func in table_include_funcs)
-                    exclude_table = any(func(table_context) for func in table_exclude_funcs)
-                    
-                    if include_table and not exclude_table:
+                    if table_matches(table_context):
                         filtered_table = {
                             "name": table.get("name", ""),
                             "row_count": table.get("row_count", 0),
@@ -656,10 +1209,7 @@ class CustomScanRuleService:
                             }
                             
                             # Check if column should be included
-                            include_column = not column_include_funcs or any(func(column_context) for func in column_include_funcs)
-                            exclude_column = any(func(column_context) for func in column_exclude_funcs)
-                            
-                            if include_column and not exclude_column:
+                            if column_matches(column_context):
                                 filtered_table["columns"].append(column)
                         
                         if filtered_table["columns"]:
@@ -675,13 +1225,10 @@ class CustomScanRuleService:
         """Filter MongoDB metadata using custom expressions."""
         custom_props = rule_set.custom_properties or {}
         
-        # Parse expressions
-        db_include_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("database_inclusion_expressions", [])]
-        db_exclude_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("database_exclusion_expressions", [])]
-        coll_include_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("collection_inclusion_expressions", [])]
-        coll_exclude_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("collection_exclusion_expressions", [])]
-        field_include_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("field_inclusion_expressions", [])]
-        field_exclude_funcs = [ExpressionParser.parse(expr) for expr in custom_props.get("field_exclusion_expressions", [])]
+        # Compiled predicates (cached by expression text across calls)
+        db_matches = CustomScanRuleService._compiled_rules(custom_props, "database")
+        coll_matches = CustomScanRuleService._compiled_rules(custom_props, "collection")
+        field_matches = CustomScanRuleService._compiled_rules(custom_props, "field")
         
         filtered_metadata = {"databases": []}
         
@@ -690,10 +1237,7 @@ class CustomScanRuleService:
             db_context = {"name": db.get("name", ""), "database": db.get("name", "")}
             
             # Check if database should be included
-            include_db = not db_include_funcs or any(func(db_context) for func in db_include_funcs)
-            exclude_db = any(func(db_context) for func in db_exclude_funcs)
-            
-            if include_db and not exclude_db:
+            if db_matches(db_context):
                 filtered_db = {"name": db.get("name", ""), "collections": []}
                 
                 # Filter collections
@@ -706,10 +1250,7 @@ class CustomScanRuleService:
                     }
                     
                     # Check if collection should be included
-                    include_coll = not coll_include_funcs or any(func(coll_context) for func in coll_include_funcs)
-                    exclude_coll = any(func(coll_context) for func in coll_exclude_funcs)
-                    
-                    if include_coll and not exclude_coll:
+                    if coll_matches(coll_context):
                         filtered_coll = {
                             "name": collection.get("name", ""),
                             "document_count": collection.get("document_count", 0),
@@ -729,10 +1270,7 @@ class CustomScanRuleService:
                             }
                             
                             # Check if field should be included
-                            include_field = not field_include_funcs or any(func(field_context) for func in field_include_funcs)
-                            exclude_field = any(func(field_context) for func in field_exclude_funcs)
-                            
-                            if include_field and not exclude_field:
+                            if field_matches(field_context):
                                 filtered_coll["fields"].append(field)
                         
                         if filtered_coll["fields"]:
@@ -741,4 +1279,165 @@ class CustomScanRuleService:
                 if filtered_db["collections"]:
                     filtered_metadata["databases"].append(filtered_db)
         
-        return filtered_metadata
\ No newline at end of file
+        return filtered_metadata
+    
+    @staticmethod
+    def _leaf_count(metadata: Dict[str, Any], metadata_type: str) -> int:
+        if metadata_type == "mongodb":
+            return sum(
+                len(collection.get("fields", []))
+                for db in metadata.get("databases", []) for collection in db.get("collections", [])
+            )
+        return sum(
+            len(table.get("columns", []))
+            for schema in metadata.get("schemas", []) for table in schema.get("tables", [])
+        )
+    
+    @staticmethod
+    def _rule_mask(custom_props: Dict[str, Any], level: str, size: int, loaders: Dict[str, Callable[[], Any]]) -> np.ndarray:
+        """Evaluate a level's include/exclude expressions over its flattened rows."""
+        frame = _ColumnarFrame(size, loaders)
+        keys = tuple(loaders)
+        inclusions = custom_props.get(f"{level}_inclusion_expressions") or []
+        exclusions = custom_props.get(f"{level}_exclusion_expressions") or []
+        
+        if inclusions:
+            mask = np.zeros(size, dtype=bool)
+            for expression in inclusions:
+                mask |= ExpressionParser.compile_mask(expression, keys)(frame)
+        else:
+            mask = np.ones(size, dtype=bool)
+        for expression in exclusions:
+            if not mask.any():
+                break
+            mask &= ~ExpressionParser.compile_mask(expression, keys)(frame)
+        return mask
+    
+    @staticmethod
+    def _field_loader(items: List[Dict[str, Any]], key: str, default: Any) -> Callable[[], List[Any]]:
+        return lambda: [item.get(key, default) for item in items]
+    
+    @staticmethod
+    def _flatten_children(parents: List[Dict[str, Any]], parent_mask: np.ndarray, key: str) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Children of the kept parents, with the index of each child's parent."""
+        kept = np.flatnonzero(parent_mask)
+        children, counts = [], []
+        for index in kept:
+            items = parents[index].get(key, [])
+            children.extend(items)
+            counts.append(len(items))
+        return children, np.repeat(kept, counts)
+    
+    @staticmethod
+    def _rebuild_tree(
+        parents: List[Dict[str, Any]],
+        children: List[Dict[str, Any]],
+        child_parent: np.ndarray,
+        leaves: List[Dict[str, Any]],
+        leaf_child: np.ndarray,
+        leaf_mask: np.ndarray,
+        child_fields: Tuple[str, Any, str],
+        parent_children_key: str,
+    ) -> List[Dict[str, Any]]:
+        """Group the kept leaves back under copies of their parents, dropping empty ones."""
+        count_field, default, leaves_key = child_fields
+        filtered_parents: List[Dict[str, Any]] = []
+        current_child = current_parent = None
+        for leaf_index in np.flatnonzero(leaf_mask):
+            child_index = leaf_child[leaf_index]
+            if child_index != current_child:
+                current_child = child_index
+                child = children[child_index]
+                filtered_child = {"name": child.get("name", ""), count_field: child.get(count_field, default), leaves_key: []}
+                parent_index = child_parent[child_index]
+                if parent_index != current_parent:
+                    current_parent = parent_index
+                    filtered_parent = {"name": parents[parent_index].get("name", ""), parent_children_key: []}
+                    filtered_parents.append(filtered_parent)
+                filtered_parent[parent_children_key].append(filtered_child)
+            filtered_child[leaves_key].append(leaves[leaf_index])
+        return filtered_parents
+    
+    @staticmethod
+    def _filter_relational_columnar(rule_set: ScanRuleSet, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Columnar equivalent of ``_filter_relational_metadata``.
+        
+        Each level is flattened into arrays (only below the rows kept by the
+        level above, and only for the keys the rules read), its rules are
+        evaluated as boolean masks and the tree is rebuilt from the kept columns.
+        """
+        custom_props = rule_set.custom_properties or {}
+        field = CustomScanRuleService._field_loader
+        
+        schemas = metadata.get("schemas", [])
+        schema_names = [schema.get("name", "") for schema in schemas]
+        schema_mask = CustomScanRuleService._rule_mask(custom_props, "schema", len(schemas), {
+            "name": lambda: schema_names,
+            "schema": lambda: schema_names,
+        })
+        
+        tables, table_schema = CustomScanRuleService._flatten_children(schemas, schema_mask, "tables")
+        table_names = [table.get("name", "") for table in tables]
+        table_mask = CustomScanRuleService._rule_mask(custom_props, "table", len(tables), {
+            "name": lambda: table_names,
+            "table": lambda: table_names,
+            "schema": lambda: (schema_names, table_schema),
+            "row_count": field(tables, "row_count", 0),
+        })
+        
+        columns, column_table = CustomScanRuleService._flatten_children(tables, table_mask, "columns")
+        column_names = field(columns, "name", "")
+        column_mask = CustomScanRuleService._rule_mask(custom_props, "column", len(columns), {
+            "name": column_names,
+            "column": column_names,
+            "table": lambda: (table_names, column_table),
+            "schema": lambda: (schema_names, table_schema[column_table]),
+            "data_type": field(columns, "data_type", ""),
+            "is_nullable": field(columns, "is_nullable", False),
+            "is_primary_key": field(columns, "is_primary_key", False),
+            "is_foreign_key": field(columns, "is_foreign_key", False),
+        })
+        
+        return {"schemas": CustomScanRuleService._rebuild_tree(
+            schemas, tables, table_schema, columns, column_table, column_mask,
+            ("row_count", 0, "columns"), "tables",
+        )}
+    
+    @staticmethod
+    def _filter_mongodb_columnar(rule_set: ScanRuleSet, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Columnar equivalent of ``_filter_mongodb_metadata``."""
+        custom_props = rule_set.custom_properties or {}
+        field = CustomScanRuleService._field_loader
+        
+        databases = metadata.get("databases", [])
+        db_names = [db.get("name", "") for db in databases]
+        db_mask = CustomScanRuleService._rule_mask(custom_props, "database", len(databases), {
+            "name": lambda: db_names,
+            "database": lambda: db_names,
+        })
+        
+        collections, collection_db = CustomScanRuleService._flatten_children(databases, db_mask, "collections")
+        collection_names = [collection.get("name", "") for collection in collections]
+        collection_mask = CustomScanRuleService._rule_mask(custom_props, "collection", len(collections), {
+            "name": lambda: collection_names,
+            "collection": lambda: collection_names,
+            "database": lambda: (db_names, collection_db),
+            "document_count": field(collections, "document_count", 0),
+        })
+        
+        fields, field_collection = CustomScanRuleService._flatten_children(collections, collection_mask, "fields")
+        field_names = field(fields, "name", "")
+        field_mask = CustomScanRuleService._rule_mask(custom_props, "field", len(fields), {
+            "name": field_names,
+            "field": field_names,
+            "collection": lambda: (collection_names, field_collection),
+            "database": lambda: (db_names, collection_db[field_collection]),
+            "data_type": field(fields, "data_type", ""),
+            "is_array": field(fields, "is_array", False),
+            "is_nested": field(fields, "is_nested", False),
+        })
+        
+        return {"databases": CustomScanRuleService._rebuild_tree(
+            databases, collections, collection_db, fields, field_collection, field_mask,
+            ("document_count", 0, "fields"), "collections",
+        )}
\ No newline at end of file
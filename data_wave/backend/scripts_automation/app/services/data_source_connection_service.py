@@ -7,7 +7,7 @@ Similar to Microsoft Purview's data source connection and discovery features
 import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, Any, Union, cast, Sequence, TypeVar, Iterable, TYPE_CHECKING
+from typing import Dict, List, Optional, Any, Union, cast, Sequence, TypeVar, Iterable, Iterator, TYPE_CHECKING
 from datetime import datetime
 import traceback
 import os
@@ -50,6 +50,13 @@ from app.core.config import settings
 from app.services.data_source_service import DataSourceService
 from app.services.progress_bus import ProgressBus
 from app.services.enterprise_schema_discovery import EnterpriseSchemaDiscovery
+from app.services.connector_engine_registry import get_connector_engine_registry
+from app.services.columnar_transport import (
+    DEFAULT_BATCH_SIZE, RowBatch, iter_cursor_batches, iter_record_batches,
+    stream_arrow_ipc, stream_ndjson, PYARROW_AVAILABLE,
+    ARROW_STREAM_MEDIA_TYPE, NDJSON_MEDIA_TYPE
+)
+from app.services.profiling_engine import PushdownProfilingEngine
 
 # Type variables for better type hints
 T = TypeVar('T')
@@ -100,6 +107,17 @@ def dict_to_list(d: Dict[str, Any]) -> List[RowDict]:
         return []
     return [{"key": k, "value": v} for k, v in d.items()]
 
+def _chain_batches(first: Optional[RowBatch], rest: Iterator[RowBatch]) -> Iterator[RowBatch]:
+    """Re-attach a primed first batch in front of the remaining batch iterator."""
+    if first is None:
+        return
+    yield first
+    yield from rest
+
+def _quote_snowflake_identifier(name: str) -> str:
+    """Quote a Snowflake identifier (case preserved as discovered, embedded quotes doubled)."""
+    return '"' + name.replace('"', '""') + '"'
+
 def row_to_dict(row: Union[Row, RowMapping, None]) -> Dict[str, Any]:
     """Convert a SQLAlchemy Row or RowMapping to a dictionary."""
     if row is None:
@@ -111,6 +129,9 @@ def row_to_dict(row: Union[Row, RowMapping, None]) -> Dict[str, Any]:
 class BaseConnector:
     """Base class for all data source connectors"""
     
+    # PushdownProfilingEngine dialect for SQLAlchemy-backed connectors
+    profiling_dialect: Optional[str] = None
+    
     def __init__(self, data_source: 'DataSource'):
         self.data_source = data_source
         self.connection = None
@@ -131,10 +152,40 @@ class BaseConnector:
         """Get column profile - to be implemented by subclasses"""
         raise NotImplementedError
     
+    def iter_table_batches(self, schema_name: str, table_name: str, limit: Optional[int] = None,
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[RowBatch]:
+        """Stream (columns, rows) batches from a server-side cursor - to be implemented by subclasses"""
+        raise NotImplementedError
+    
+    def profile_table(self, schema_name: str, table_name: str,
+                      column_names: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Profile table columns with one aggregate query pushed down into the source (blocking).
+        
+        Raises NotImplementedError for connectors without a profiling dialect.
+        """
+        if not self.profiling_dialect:
+            raise NotImplementedError
+        engine = self._get_engine(self._build_connection_string(), "profiling")
+        profiling_engine = PushdownProfilingEngine(engine, self.profiling_dialect)
+        columns = profiling_engine.get_columns(table_name, schema_name)
+        if column_names is not None:
+            wanted = set(column_names)
+            columns = [column for column in columns if column.name in wanted]
+            missing = wanted - {column.name for column in columns}
+            if missing:
+                raise ValueError(f"Columns not found in {schema_name}.{table_name}: {', '.join(sorted(missing))}")
+        return profiling_engine.profile_table(table_name, schema_name, columns=columns)
+    
     def _build_connection_string(self) -> str:
         """Build connection string - to be implemented by subclasses"""
         raise NotImplementedError
 
+    def _get_engine(self, connection_string: str, purpose: str = "default", **engine_kwargs):
+        """Get a warm pooled engine for this data source from the shared registry"""
+        return get_connector_engine_registry().get_engine(
+            self.data_source, connection_string, purpose, **engine_kwargs
+        )
+
     def _get_password(self) -> Optional[str]:
         """Get decrypted password with multiple fallback mechanisms"""
         from app.services.data_source_service import DataSourceService
@@ -356,6 +407,8 @@ class LocationAwareConnector:
 class PostgreSQLConnector(BaseConnector):
     """PostgreSQL connector with advanced discovery capabilities"""
     
+    profiling_dialect = "postgresql"
+    
     async def test_connection(self) -> Dict[str, Any]:
         try:
             password = self._get_password()
@@ -368,7 +421,7 @@ class PostgreSQLConnector(BaseConnector):
                 }
 
             connection_string = self._build_connection_string()
-            engine = create_engine(connection_string, connect_args={"connect_timeout": 10})
+            engine = self._get_engine(connection_string, "probe", connect_args={"connect_timeout": 10})
             
             with engine.connect() as conn:
                 result = conn.execute(text("SELECT version(), current_database(), current_user"))
@@ -674,7 +727,7 @@ class PostgreSQLConnector(BaseConnector):
         """Get approximate row count for table"""
         try:
             connection_string = self._build_connection_string()
-            engine = create_engine(connection_string)
+            engine = self._get_engine(connection_string)
             
             with engine.connect() as conn:
                 query = text(f"SELECT reltuples::bigint FROM pg_class WHERE relname = :table_name")
@@ -691,7 +744,7 @@ class PostgreSQLConnector(BaseConnector):
             connection_string = self._build_connection_string()
             logger.info(f"PostgreSQL table preview: {schema_name}.{table_name} (limit: {limit})")
             
-            engine = create_engine(connection_string)
+            engine = self._get_engine(connection_string)
             
             with engine.connect() as conn:
                 query = text(f'SELECT * FROM "{schema_name}"."{table_name}" LIMIT :limit')
@@ -731,7 +784,7 @@ class PostgreSQLConnector(BaseConnector):
         """Get detailed column profile and statistics"""
         try:
             connection_string = self._build_connection_string()
-            engine = create_engine(connection_string)
+            engine = self._get_engine(connection_string)
             
             with engine.connect() as conn:
                 # Get comprehensive enterprise statistics with advanced metrics
@@ -775,6 +828,17 @@ class PostgreSQLConnector(BaseConnector):
             logger.error(f"Column profiling failed: {str(e)}")
             raise
     
+    def iter_table_batches(self, schema_name: str, table_name: str, limit: Optional[int] = None,
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[RowBatch]:
+        """Stream raw table rows in batches through a server-side (named) cursor"""
+        engine = self._get_engine(self._build_connection_string())
+        query = f'SELECT * FROM "{schema_name}"."{table_name}"' + (" LIMIT :limit" if limit else "")
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(
+                text(query), {"limit": limit} if limit else {}
+            )
+            yield from iter_cursor_batches(result, batch_size)
+    
     def _build_connection_string(self) -> str:
         """Build PostgreSQL connection string"""
         password = self._get_password()
@@ -787,6 +851,8 @@ class PostgreSQLConnector(BaseConnector):
 class MySQLConnector(BaseConnector):
     """MySQL connector with discovery capabilities"""
     
+    profiling_dialect = "mysql"
+    
     async def test_connection(self) -> Dict[str, Any]:
         try:
             password = self._get_password()
@@ -798,7 +864,7 @@ class MySQLConnector(BaseConnector):
                 }
 
             connection_string = self._build_connection_string()
-            engine = create_engine(connection_string)
+            engine = self._get_engine(connection_string)
             
             start = datetime.now()
             with engine.connect() as conn:
@@ -870,7 +936,7 @@ class MySQLConnector(BaseConnector):
                 return {"success": False, "error": "Failed to retrieve password"}
 
             connection_string = self._build_connection_string()
-            engine = create_engine(connection_string)
+            engine = self._get_engine(connection_string)
             
             inspector = inspect(engine)
             schemas = []
@@ -976,7 +1042,7 @@ class MySQLConnector(BaseConnector):
         """Get preview of table data"""
         try:
             connection_string = self._build_connection_string()
-            engine = create_engine(connection_string)
+            engine = self._get_engine(connection_string)
             
             with engine.connect() as conn:
                 query = text(f'SELECT * FROM `{schema_name}`.`{table_name}` LIMIT :limit')
@@ -1009,7 +1075,7 @@ class MySQLConnector(BaseConnector):
         """Get detailed column profile and statistics"""
         try:
             connection_string = self._build_connection_string()
-            engine = create_engine(connection_string)
+            engine = self._get_engine(connection_string)
             
             with engine.connect() as conn:
                 # Get comprehensive statistics
@@ -1059,6 +1125,17 @@ class MySQLConnector(BaseConnector):
             logger.error(f"Column profiling failed: {str(e)}")
             raise
     
+    def iter_table_batches(self, schema_name: str, table_name: str, limit: Optional[int] = None,
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[RowBatch]:
+        """Stream raw table rows in batches through an unbuffered (SSCursor) result"""
+        engine = self._get_engine(self._build_connection_string())
+        query = f'SELECT * FROM `{schema_name}`.`{table_name}`' + (" LIMIT :limit" if limit else "")
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(
+                text(query), {"limit": limit} if limit else {}
+            )
+            yield from iter_cursor_batches(result, batch_size)
+    
     def _build_connection_string(self) -> str:
         """Build MySQL connection string"""
         password = self._get_password()
@@ -1224,12 +1301,7 @@ class MongoDBConnector(BaseConnector):
             if not password:
                 raise ValueError("Failed to retrieve password")
 
-            client = pymongo.MongoClient(
-                host=self.data_source.host,
-                port=self.data_source.port,
-                username=self.data_source.username,
-                password=password
-            )
+            client = self._get_mongo_client(password)
             collection = client[schema_name][table_name]
             
             # Get documents
@@ -1250,9 +1322,6 @@ class MongoDBConnector(BaseConnector):
         except Exception as e:
             logger.error(f"MongoDB preview failed: {str(e)}")
             raise
-        finally:
-            if client:
-                client.close()
     
     async def get_column_profile(self, schema_name: str, table_name: str, column_name: str) -> ColumnProfileResult:
         """Get detailed column profile and statistics"""
@@ -1262,12 +1331,7 @@ class MongoDBConnector(BaseConnector):
             if not password:
                 raise ValueError("Failed to retrieve password")
 
-            client = pymongo.MongoClient(
-                host=self.data_source.host,
-                port=self.data_source.port,
-                username=self.data_source.username,
-                password=password
-            )
+            client = self._get_mongo_client(password)
             collection = client[schema_name][table_name]
             
             # Get basic statistics
@@ -1316,10 +1380,22 @@ class MongoDBConnector(BaseConnector):
         except Exception as e:
             logger.error(f"MongoDB profiling failed: {str(e)}")
             raise
-        finally:
-            if client:
-                client.close()
     
+    def _get_mongo_client(self, password: str) -> pymongo.MongoClient:
+        """Get a cached MongoClient (MongoClient maintains its own connection pool)"""
+        return get_connector_engine_registry().get_client(
+            self.data_source, "mongodb",
+            (self.data_source.host, self.data_source.port, self.data_source.username, password),
+            factory=lambda: pymongo.MongoClient(
+                host=self.data_source.host,
+                port=self.data_source.port,
+                username=self.data_source.username,
+                password=password,
+                maxPoolSize=(self.data_source.pool_size or 5) + (self.data_source.max_overflow or 10),
+                maxIdleTimeMS=600000
+            )
+        )
+
     def _build_connection_string(self) -> str:
         """Build MongoDB connection string"""
         password = self._get_password()
@@ -1349,15 +1425,7 @@ class SnowflakeConnector(BaseConnector):
                 }
 
             connection_string = self._build_connection_string()
-            conn = snowflake.connector.connect(
-                user=self.data_source.username,
-                password=password,
-                account=self.data_source.host,
-                warehouse=self.data_source.database_name,
-                database=self.data_source.database_name,
-                role=self.data_source.username,
-                application="data_source_discovery"
-            )
+            conn = self._get_snowflake_connection(password)
             
             # Comprehensive enterprise connection test with advanced diagnostics
             start_time = datetime.now()
@@ -1442,15 +1510,7 @@ class SnowflakeConnector(BaseConnector):
                 return {"success": False, "error": "Failed to retrieve password"}
 
             connection_string = self._build_connection_string()
-            conn = snowflake.connector.connect(
-                user=self.data_source.username,
-                password=password,
-                account=self.data_source.host,
-                warehouse=self.data_source.database_name,
-                database=self.data_source.database_name,
-                role=self.data_source.username,
-                application="data_source_discovery"
-            )
+            conn = self._get_snowflake_connection(password)
             
             with conn.cursor() as cursor:
                 # Get database names
@@ -1544,15 +1604,7 @@ class SnowflakeConnector(BaseConnector):
                 raise ValueError("Failed to retrieve password")
                 
             connection_string = self._build_connection_string()
-            conn = snowflake.connector.connect(
-                user=self.data_source.username,
-                password=password,
-                account=self.data_source.host,
-                warehouse=self.data_source.database_name,
-                database=self.data_source.database_name,
-                role=self.data_source.username,
-                application="data_source_discovery"
-            )
+            conn = self._get_snowflake_connection(password)
             
             with conn.cursor() as cursor:
                 query = text(f"""
@@ -1591,15 +1643,7 @@ class SnowflakeConnector(BaseConnector):
                 raise ValueError("Failed to retrieve password")
                 
             connection_string = self._build_connection_string()
-            conn = snowflake.connector.connect(
-                user=self.data_source.username,
-                password=password,
-                account=self.data_source.host,
-                warehouse=self.data_source.database_name,
-                database=self.data_source.database_name,
-                role=self.data_source.username,
-                application="data_source_discovery"
-            )
+            conn = self._get_snowflake_connection(password)
             
             with conn.cursor() as cursor:
                 # Get comprehensive statistics
@@ -1658,6 +1702,43 @@ class SnowflakeConnector(BaseConnector):
             logger.error(f"Column profiling failed: {str(e)}")
             raise
     
+    def iter_table_batches(self, schema_name: str, table_name: str, limit: Optional[int] = None,
+                           batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[RowBatch]:
+        """Stream raw table rows in batches with cursor.fetchmany; schema_name may be 'db.schema'"""
+        password = self._get_password()
+        if not password:
+            raise ValueError("Failed to retrieve password")
+        conn = self._get_snowflake_connection(password)
+        qualified = ".".join(_quote_snowflake_identifier(part) for part in [*schema_name.split("."), table_name])
+        query = f"SELECT * FROM {qualified}" + (f" LIMIT {int(limit)}" if limit else "")
+        with conn.cursor() as cursor:
+            cursor.arraysize = batch_size
+            cursor.execute(query)
+            yield from iter_cursor_batches(cursor, batch_size)
+    
+    def _get_snowflake_connection(self, password: str):
+        """Get a cached Snowflake connection, reconnecting when credentials rotate or the session closed"""
+        registry = get_connector_engine_registry()
+        fingerprint = (self.data_source.username, password, self.data_source.host, self.data_source.database_name)
+
+        def _connect():
+            return snowflake.connector.connect(
+                user=self.data_source.username,
+                password=password,
+                account=self.data_source.host,
+                warehouse=self.data_source.database_name,
+                database=self.data_source.database_name,
+                role=self.data_source.username,
+                application="data_source_discovery",
+                client_session_keep_alive=True
+            )
+
+        conn = registry.get_client(self.data_source, "snowflake", fingerprint, factory=_connect)
+        if conn.is_closed():
+            registry.invalidate(self.data_source.id)
+            conn = registry.get_client(self.data_source, "snowflake", fingerprint, factory=_connect)
+        return conn
+
     def _build_connection_string(self) -> str:
         """Build Snowflake connection string"""
         password = self._get_password()
@@ -2733,11 +2814,72 @@ class DataSourceConnectionService:
                 "error": str(e)
             }
     
+    async def stream_table_preview(
+        self,
+        data_source: DataSource,
+        schema_name: str,
+        table_name: str,
+        limit: Optional[int] = None,
+        output_format: str = "arrow",
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """Stream table rows as Arrow IPC or NDJSON without materializing per-row dicts.
+        
+        Returns the media type and a byte iterator suitable for a StreamingResponse.
+        Connectors without a server-side cursor implementation fall back to a single
+        batch built from get_table_preview.
+        """
+        if output_format not in ("arrow", "ndjson"):
+            raise ValueError(f"Unsupported stream format: {output_format}")
+        if output_format == "arrow" and not PYARROW_AVAILABLE:
+            raise ValueError("Arrow streaming requires pyarrow; use format=ndjson")
+        
+        connector = self._get_connector(data_source)
+        row_batches: Iterable[RowBatch]
+        try:
+            row_batches = connector.iter_table_batches(schema_name, table_name, limit, batch_size)
+            # Prime the generator so connection errors surface before the response starts;
+            # connecting and running the query block, so off the event loop
+            first = await asyncio.to_thread(next, row_batches, None)
+            row_batches = _chain_batches(first, row_batches)
+        except NotImplementedError:
+            preview = await connector.get_table_preview(schema_name, table_name, limit or 100)
+            preview = preview[0] if isinstance(preview, list) and preview else preview
+            columns = list(preview.get("columns", []))
+            rows = [[row.get(col) for col in columns] for row in preview.get("rows", [])]
+            row_batches = [(columns, rows)] if rows else []
+        
+        if output_format == "arrow":
+            return {
+                "media_type": ARROW_STREAM_MEDIA_TYPE,
+                "content": stream_arrow_ipc(iter_record_batches(row_batches))
+            }
+        return {
+            "media_type": NDJSON_MEDIA_TYPE,
+            "content": stream_ndjson(row_batches)
+        }
+    
     async def get_column_profile(self, data_source: DataSource, schema_name: str, table_name: str, column_name: str) -> Dict[str, Any]:
         """Get detailed column profile and statistics"""
         try:
             connector = self._get_connector(data_source)
-            profile_data = await connector.get_column_profile(schema_name, table_name, column_name)
+            try:
+                # One pushed-down (and, on large tables, sampled) aggregate query instead of full scans
+                table_profile = await asyncio.to_thread(
+                    connector.profile_table, schema_name, table_name, [column_name]
+                )
+                if "error" in table_profile:
+                    raise ValueError(table_profile["error"])
+                profile_data = {
+                    "statistics": table_profile["columns"][column_name],
+                    "row_count": table_profile.get("row_count"),
+                    "estimated_row_count": table_profile.get("estimated_row_count"),
+                    "pushdown": table_profile.get("pushdown", False),
+                    "sampling": table_profile.get("sampling"),
+                    "profile_date": datetime.now().isoformat()
+                }
+            except NotImplementedError:
+                profile_data = await connector.get_column_profile(schema_name, table_name, column_name)
             
             return {
                 "success": True,
@@ -2855,7 +2997,10 @@ class DataSourceConnectionService:
 
     async def get_connection_pool_stats(self, data_source_id: int) -> Dict[str, Any]:
         """Get current statistics for the connection pool."""
-        stats = self.connection_stats.get(data_source_id, {})
+        stats = dict(self.connection_stats.get(data_source_id, {}))
+        registry_metrics = get_connector_engine_registry().get_metrics(data_source_id)
+        if registry_metrics["entries"]:
+            stats["engines"] = registry_metrics["entries"]
         if not stats:
             return {
                 "success": False,
@@ -2912,6 +3057,7 @@ class DataSourceConnectionService:
                     await connector.failover_connection.close()
                     
             self.connection_stats.pop(data_source_id, None)
+            get_connector_engine_registry().invalidate(data_source_id)
             
             return {
                 "success": True,
@@ -13,6 +13,7 @@ from sqlalchemy.sql.expression import Select
 import logging
 from datetime import datetime, timedelta
 from app.services.secret_manager import get_secret, set_secret, delete_secret
+from app.services.connector_engine_registry import get_connector_engine_registry
 import uuid
 from cryptography.fernet import Fernet
 import base64
@@ -336,6 +337,8 @@ class DataSourceService:
         session.add(data_source)
         session.commit()
         session.refresh(data_source)
+        # Drop warm connector engines so rotated credentials/settings take effect immediately
+        get_connector_engine_registry().invalidate(data_source_id)
         logger.info(f"Updated data source: {data_source.name} (ID: {data_source_id}) by user: {updated_by}")
         return data_source
     
@@ -354,6 +357,7 @@ class DataSourceService:
         
         session.delete(data_source)
         session.commit()
+        get_connector_engine_registry().invalidate(data_source_id)
         logger.info(f"Deleted data source: {data_source.name} (ID: {data_source_id})")
         return True
     
@@ -1516,6 +1520,7 @@ class DataSourceService:
         session.add(data_source)
         session.commit()
         session.refresh(data_source)
+        get_connector_engine_registry().invalidate(data_source_id)
         return data_source
 
     @staticmethod
@@ -12,6 +12,8 @@ import difflib
 from dataclasses import dataclass
 import asyncio
 
+from app.services import structural_diff
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,69 +51,12 @@ class DiffService:
         Detect structural changes between content versions
         """
         try:
-            changes = []
-            
-            # 1. Detect field additions/removals
-            old_keys = set(old_content.keys())
-            new_keys = set(new_content.keys())
-            
-            added_fields = new_keys - old_keys
-            removed_fields = old_keys - old_keys
-            common_fields = old_keys & new_keys
-            
-            # 2. Analyze field changes
-            for field in added_fields:
-                changes.append({
-                    "type": "field_added",
-                    "field": field,
-                    "severity": "low",
-                    "confidence": 1.0,
-                    "impact_level": "minor",
-                    "description": f"New field '{field}' added",
-                    "old_value": None,
-                    "new_value": new_content[field]
-                })
+            changes = self._structural_change_records(old_content, new_content)
             
-            for field in removed_fields:
-                changes.append({
-                    "type": "field_removed",
-                    "field": field,
-                    "severity": "medium",
-                    "confidence": 1.0,
-                    "impact_level": "moderate",
-                    "description": f"Field '{field}' removed",
-                    "old_value": old_content[field],
-                    "new_value": None
-                })
-            
-            # 3. Analyze value changes in common fields
-            for field in common_fields:
-                old_val = old_content[field]
-                new_val = new_content[field]
-                
-                if old_val != new_val:
-                    change_type, severity, impact = self._analyze_value_change(
-                        field, old_val, new_val
-                    )
-                    
-                    changes.append({
-                        "type": change_type,
-                        "field": field,
-                        "severity": severity,
-                        "confidence": 0.9,
-                        "impact_level": impact,
-                        "description": f"Field '{field}' value changed",
-                        "old_value": old_val,
-                        "new_value": new_val
-                    })
-            
-            # 4. Detect nested structure changes
-            nested_changes = await self._detect_nested_changes(old_content, new_content)
-            changes.extend(nested_changes)
-            
-            # 5. Add metadata to all changes
+            # Add metadata to all changes
+            timestamp = datetime.now().isoformat()
             for change in changes:
-                change['timestamp'] = datetime.now().isoformat()
+                change['timestamp'] = timestamp
                 change['change_id'] = self._generate_change_id(change)
                 change['affected_components'] = [change.get('field', 'unknown')]
             
@@ -130,124 +75,80 @@ class DiffService:
         """
         Recursively detect changes in nested structures
         """
-        changes = []
-        
         try:
-            for key in set(old_content.keys()) | set(new_content.keys()):
-                current_path = f"{path}.{key}" if path else key
-                
-                if key not in old_content:
-                    # New nested field
-                    changes.append({
-                        "type": "nested_field_added",
-                        "field": current_path,
-                        "severity": "low",
-                        "confidence": 1.0,
-                        "impact_level": "minor",
-                        "description": f"New nested field '{current_path}' added",
-                        "old_value": None,
-                        "new_value": new_content[key]
-                    })
-                elif key not in new_content:
-                    # Removed nested field
-                    changes.append({
-                        "type": "nested_field_removed",
-                        "field": current_path,
-                        "severity": "medium",
-                        "confidence": 1.0,
-                        "impact_level": "moderate",
-                        "description": f"Nested field '{current_path}' removed",
-                        "old_value": old_content[key],
-                        "new_value": None
-                    })
-                else:
-                    # Both exist, check for changes
-                    old_val = old_content[key]
-                    new_val = new_content[key]
-                    
-                    if isinstance(old_val, dict) and isinstance(new_val, dict):
-                        # Recursively check nested dictionaries
-                        nested_changes = await self.detect_nested_changes(
-                            old_val, new_val, current_path
-                        )
-                        changes.extend(nested_changes)
-                    elif isinstance(old_val, list) and isinstance(new_val, list):
-                        # Check list changes
-                        list_changes = self._detect_list_changes(
-                            current_path, old_val, new_val
-                        )
-                        changes.extend(list_changes)
-                    elif old_val != new_val:
-                        # Enterprise value change analysis with type-aware impact
-                        change_type, severity, impact = self._analyze_value_change(
-                            current_path, old_val, new_val
-                        )
-                        
-                        changes.append({
-                            "type": change_type,
-                            "field": current_path,
-                            "severity": severity,
-                            "confidence": 0.9,
-                            "impact_level": impact,
-                            "description": f"Nested field '{current_path}' value changed",
-                            "old_value": old_val,
-                            "new_value": new_val
-                        })
-            
-            return changes
-            
+            return self._structural_change_records(old_content, new_content, path)
         except Exception as e:
             self.logger.error(f"Error detecting nested changes: {e}")
             return []
     
-    def _detect_list_changes(
+    def _structural_change_records(
         self,
-        path: str,
-        old_list: List[Any],
-        new_list: List[Any]
+        old_content: Dict[str, Any],
+        new_content: Dict[str, Any],
+        path: str = ""
     ) -> List[Dict[str, Any]]:
         """
-        Detect changes in list structures
+        One change record per added, removed, changed or moved field or list item.
+        Identical subtrees are skipped by the shared structural diff core.
         """
         changes = []
-        
-        try:
-            # Detect length changes
-            if len(old_list) != len(new_list):
+        for change in structural_diff.diff(old_content, new_content).changes:
+            field = change.location
+            if path:
+                field = f"{path}{field}" if field.startswith("[") else f"{path}.{field}"
+            nested = len(change.path) > 1 or bool(path)
+            item = "list_item" if change.path and isinstance(change.path[-1], int) else "nested_field" if nested else "field"
+            label = item.replace("_", " ").capitalize()
+            
+            if change.op == structural_diff.ADDED:
                 changes.append({
-                    "type": "list_length_changed",
-                    "field": path,
+                    "type": f"{item}_added",
+                    "field": field,
+                    "severity": "low",
+                    "confidence": 1.0,
+                    "impact_level": "minor",
+                    "description": f"{label} '{field}' added",
+                    "old_value": None,
+                    "new_value": change.new
+                })
+            elif change.op == structural_diff.REMOVED:
+                changes.append({
+                    "type": f"{item}_removed",
+                    "field": field,
                     "severity": "medium",
                     "confidence": 1.0,
                     "impact_level": "moderate",
-                    "description": f"List '{path}' length changed from {len(old_list)} to {len(new_list)}",
-                    "old_value": len(old_list),
-                    "new_value": len(old_list)
+                    "description": f"{label} '{field}' removed",
+                    "old_value": change.old,
+                    "new_value": None
                 })
-            
-            # Detect content changes (diff-based)
-            if len(old_list) > 0 or len(new_list) > 0:
-                import difflib
-                old_repr = [json.dumps(x, sort_keys=True) for x in old_list]
-                new_repr = [json.dumps(x, sort_keys=True) for x in new_list]
-                diff = list(difflib.unified_diff(old_repr, new_repr, lineterm=""))
-                if diff:
-                    changes.append({
-                        "type": "list_content_changed",
-                        "field": path,
-                        "severity": "medium",
-                        "confidence": 0.85,
-                        "impact_level": "moderate",
-                        "description": f"List '{path}' content modified",
-                        "old_value": old_list[:3],
-                        "new_value": new_list[:3]
-                    })
-            
-            return changes
-            
-        except Exception as e:
-            self.logger.error(f"Error detecting list changes: {e}")
-            return []
+            elif change.op == structural_diff.MOVED:
+                changes.append({
+                    "type": "list_item_moved",
+                    "field": field,
+                    "severity": "low",
+                    "confidence": 1.0,
+                    "impact_level": "minor",
+                    "description": f"List item '{field}' moved from position {change.old} to {change.new}",
+                    "old_value": change.old,
+                    "new_value": change.new
+                })
+            else:
+                change_type, severity, impact = self._analyze_value_change(
+                    field, change.old, change.new
+                )
+                changes.append({
+                    "type": change_type,
+                    "field": field,
+                    "severity": severity,
+                    "confidence": 0.9,
+                    "impact_level": impact,
+                    "description": f"{label} '{field}' value changed",
+                    "old_value": change.old,
+                    "new_value": change.new
+                })
+        
+        return changes
     
     def _analyze_value_change(
         self,
@@ -0,0 +1,480 @@
+"""
+Durable Job Queue
+Priority job queue with aging, SQLite durability and leased delivery.
+
+- Ready jobs live in a binary heap keyed on ``ready_at + rank * aging_seconds``:
+  each priority level is worth ``aging_seconds`` of waiting, so a low priority
+  job that has waited long enough overtakes newer high priority work instead
+  of starving. The key never changes while the job waits, so aging costs
+  nothing per dequeue.
+- Delayed jobs (``schedule_time``, retry backoff) wait in a second heap ordered
+  by ``available_at`` and are promoted when due.
+- ``get`` leases a job to the caller until ``timeout + lease_grace_seconds``; a
+  lease that expires (worker hung or died) makes the job visible again. Acks
+  carry the lease token, so a late ack from an expired lease is ignored.
+- Every state change is written to SQLite (WAL). Writes are coalesced per job
+  and group-committed once per event loop iteration, in a worker thread so
+  the commit never blocks the loop; ``put`` waits for its commit so an
+  accepted job survives a restart. A write never replaces a newer state of
+  the same job.
+- Several processes may share one database. Every job row records the store
+  (process) that owns it, and each store keeps a heartbeat row fresh while
+  its queue runs. ``recover`` only claims the non-terminal jobs of owners
+  whose heartbeat expired (or that closed their store), with running jobs
+  treated as expired leases; jobs of live processes are left alone.
+
+Consumers block on an event instead of polling; the only timed wake-ups are
+the next delayed job and the next lease expiry.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANKS = {"critical": 0, "high": 1, "normal": 2, "low": 3}
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+DEFAULT_DB_PATH = os.getenv(
+    "BACKGROUND_JOBS_DB_PATH",
+    os.path.join(tempfile.gettempdir(), "data_governance_background_jobs.sqlite3"),
+)
+DEFAULT_OWNER_TTL_SECONDS = 60.0  # Heartbeat age after which an owner's jobs may be recovered
+HEARTBEAT_INTERVAL_SECONDS = 15.0
+
+
+def priority_rank(priority: Any) -> int:
+    value = getattr(priority, "value", priority)
+    return PRIORITY_RANKS.get(str(value).lower(), PRIORITY_RANKS["normal"])
+
+
+class SQLiteJobStore:
+    """Job records persisted as JSON rows in a SQLite database shared by the processes of a host."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_DB_PATH,
+        owner: Optional[str] = None,
+        owner_ttl_seconds: float = DEFAULT_OWNER_TTL_SECONDS,
+    ):
+        self.path = path
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.owner_ttl_seconds = owner_ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS background_jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                job_type TEXT,
+                updated_at REAL NOT NULL,
+                record TEXT NOT NULL,
+                owner TEXT
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(background_jobs)")}
+        if "owner" not in columns:
+            self._conn.execute("ALTER TABLE background_jobs ADD COLUMN owner TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_background_jobs_status ON background_jobs (status)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS background_job_owners (owner TEXT PRIMARY KEY, heartbeat_at REAL NOT NULL)"
+        )
+        self.heartbeat()
+
+    def encode(self, records: List[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+        """Serialize records into rows (on the caller's thread, while they cannot change)."""
+        now = time.time()
+        return [
+            (record["job_id"], record["status"], record.get("job_type"), now,
+             json.dumps({k: v for k, v in record.items() if k != "handler"}, default=str), self.owner)
+            for record in records
+        ]
+
+    def write_rows(self, rows: List[Tuple[Any, ...]]) -> None:
+        """Commit encoded rows and refresh the heartbeat; an older state never replaces a newer one."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO background_jobs (job_id, status, job_type, updated_at, record, owner) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (job_id) DO UPDATE SET status = excluded.status, job_type = excluded.job_type, "
+                    "updated_at = excluded.updated_at, record = excluded.record, owner = excluded.owner "
+                    "WHERE excluded.updated_at >= background_jobs.updated_at",
+                    rows,
+                )
+                self._touch()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def save_many(self, records: List[Dict[str, Any]]) -> None:
+        self.write_rows(self.encode(records))
+
+    def heartbeat(self) -> None:
+        with self._lock:
+            self._touch()
+
+    def _touch(self) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO background_job_owners (owner, heartbeat_at) VALUES (?, ?)",
+            (self.owner, time.time()),
+        )
+
+    def claim_open(self) -> List[Dict[str, Any]]:
+        """Take over the non-terminal jobs of owners that are gone (heartbeat expired or store closed)."""
+        placeholders = ",".join("?" for _ in TERMINAL_STATUSES)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                alive_since = time.time() - self.owner_ttl_seconds
+                rows = self._conn.execute(
+                    f"SELECT job_id, record FROM background_jobs WHERE status NOT IN ({placeholders}) "
+                    "AND (owner IS NULL OR owner = ? OR owner NOT IN "
+                    "(SELECT owner FROM background_job_owners WHERE heartbeat_at >= ?))",
+                    (*TERMINAL_STATUSES, self.owner, alive_since),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE background_jobs SET owner = ? WHERE job_id = ?", [(self.owner, row[0]) for row in rows]
+                )
+                self._conn.execute("DELETE FROM background_job_owners WHERE heartbeat_at < ?", (alive_since,))
+                self._touch()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [json.loads(row[1]) for row in rows]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM background_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def purge_terminal(self, older_than_seconds: float) -> int:
+        placeholders = ",".join("?" for _ in TERMINAL_STATUSES)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM background_jobs WHERE status IN ({placeholders}) AND updated_at < ?",
+                (*TERMINAL_STATUSES, time.time() - older_than_seconds),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the connection; the jobs still open become recoverable by other processes at once."""
+        with self._lock:
+            self._conn.execute("DELETE FROM background_job_owners WHERE owner = ?", (self.owner,))
+            self._conn.close()
+
+
+class DurableJobQueue:
+    """Aging priority queue with delayed delivery, leases and group-committed persistence."""
+
+    def __init__(
+        self,
+        store: Optional[SQLiteJobStore] = None,
+        aging_seconds: float = 30.0,
+        lease_grace_seconds: float = 30.0,
+        latency_window: int = 2048,
+        heartbeat_seconds: float = HEARTBEAT_INTERVAL_SECONDS,
+    ):
+        self.store = store
+        self.aging_seconds = aging_seconds
+        self.lease_grace_seconds = lease_grace_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self._next_heartbeat = time.time() + heartbeat_seconds
+        self._ready: List[Tuple[float, int, str]] = []
+        self._delayed: List[Tuple[float, int, str]] = []
+        self._leases: Dict[str, Tuple[float, str]] = {}
+        self._lease_expiries: List[Tuple[float, str, str]] = []
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._pending_flush: Optional[asyncio.Future] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wait_times: Deque[float] = deque(maxlen=latency_window)
+        self._stats = {
+            "enqueued": 0, "leased": 0, "acked": 0, "retried": 0, "failed": 0,
+            "cancelled": 0, "lease_expired": 0, "stale_acks": 0, "recovered": 0, "flushes": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    async def put(self, record: Dict[str, Any], available_at: Optional[float] = None) -> None:
+        """Enqueue a job record and wait until it is durably stored."""
+        self._enqueue(record, available_at)
+        self._stats["enqueued"] += 1
+        commit = self._mark_dirty(record)
+        if commit is not None:
+            await asyncio.shield(commit)
+
+    def recover(self) -> List[Dict[str, Any]]:
+        """Claim the non-terminal jobs of processes that are gone (application startup)."""
+        if self.store is None:
+            return []
+        recovered = []
+        for record in self.store.claim_open():
+            if record["job_id"] in self._records:
+                continue
+            if record.get("status") == "running":
+                # The process died mid-run: treat as an expired lease
+                record["status"] = "pending"
+                record["started_at"] = None
+            available_at = record.get("available_at")
+            self._enqueue(record, available_at if available_at and available_at > time.time() else None)
+            recovered.append(record)
+        self._stats["recovered"] += len(recovered)
+        if recovered:
+            logger.info(f"Recovered {len(recovered)} background job(s) from {self.store.path}")
+        return recovered
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a waiting or leased job; it is skipped lazily when it reaches the heap top."""
+        record = self._records.pop(job_id, None)
+        if record is None:
+            return None
+        self._leases.pop(job_id, None)
+        record["status"] = "cancelled"
+        self._stats["cancelled"] += 1
+        self._mark_dirty(record)
+        return record
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    async def get(self) -> Tuple[Dict[str, Any], str]:
+        """Block until a job is ready, lease it and return ``(record, lease_token)``."""
+        while True:
+            now = time.time()
+            if self.store is not None and now >= self._next_heartbeat:
+                self._next_heartbeat = now + self.heartbeat_seconds
+                self._schedule_flush()  # Commits refresh the store's heartbeat
+            self._promote_due(now)
+            self._expire_leases(now)
+            leased = self._lease_next(now)
+            if leased is not None:
+                return leased
+            timeout = self._next_wakeup(now)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def ack(self, record: Dict[str, Any], lease_token: str) -> bool:
+        """Persist a terminal state (completed/failed) for a leased job."""
+        if not self._release(record["job_id"], lease_token):
+            return False
+        self._records.pop(record["job_id"], None)
+        self._stats["acked" if record.get("status") == "completed" else "failed"] += 1
+        self._mark_dirty(record)
+        return True
+
+    def retry(self, record: Dict[str, Any], lease_token: str, delay_seconds: float = 0.0) -> bool:
+        """Return a leased job to the queue, optionally after a backoff delay."""
+        if not self._release(record["job_id"], lease_token):
+            return False
+        record["status"] = "pending"
+        self._enqueue(record, time.time() + delay_seconds if delay_seconds > 0 else None)
+        self._stats["retried"] += 1
+        self._mark_dirty(record)
+        return True
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def get_metrics(self) -> Dict[str, Any]:
+        depth_by_priority: Dict[str, int] = {}
+        for _, _, job_id in self._ready:
+            record = self._records.get(job_id)
+            if record is not None and record.get("status") == "pending":
+                priority = str(record.get("priority", "normal"))
+                depth_by_priority[priority] = depth_by_priority.get(priority, 0) + 1
+        waits = sorted(self._wait_times)
+
+        def _percentile(q: float) -> float:
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))], 6) if waits else 0.0
+
+        oldest = min(
+            (r["enqueued_at"] for r in self._records.values() if r.get("status") == "pending"),
+            default=None,
+        )
+        return {
+            **self._stats,
+            "depth": sum(depth_by_priority.values()),
+            "depth_by_priority": depth_by_priority,
+            "delayed": sum(1 for _, _, job_id in self._delayed if job_id in self._records),
+            "leased": len(self._leases),
+            "oldest_pending_age_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "queue_latency_seconds": {"p50": _percentile(0.5), "p95": _percentile(0.95), "p99": _percentile(0.99)},
+            "unflushed_writes": len(self._dirty),
+        }
+
+    def get_record(self, job_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(job_id)
+        if record is None and self.store is not None:
+            record = self.store.get(job_id)
+        return record
+
+    def flush(self) -> None:
+        """Write all pending state changes in one transaction (blocking; used without a running loop)."""
+        self._write(self._take_dirty())
+
+    def close(self) -> None:
+        """Flush and close the store, releasing this process's jobs to other processes."""
+        self.flush()
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def _take_dirty(self) -> List[Tuple[Any, ...]]:
+        records = list(self._dirty.values())
+        self._dirty.clear()
+        if self.store is None or not records:
+            return []
+        return self.store.encode(records)
+
+    def _write(self, rows: List[Tuple[Any, ...]]) -> None:
+        if self.store is None:
+            return
+        try:
+            self.store.write_rows(rows)
+        except Exception as e:
+            logger.error(f"Failed to persist {len(rows)} background job update(s): {e}")
+        self._stats["flushes"] += 1
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, record: Dict[str, Any], available_at: Optional[float]) -> None:
+        job_id = record["job_id"]
+        record.setdefault("enqueued_at", time.time())
+        record["available_at"] = available_at
+        self._records[job_id] = record
+        if available_at is not None and available_at > time.time():
+            heapq.heappush(self._delayed, (available_at, next(self._seq), job_id))
+            return
+        self._push_ready(record)
+
+    def _push_ready(self, record: Dict[str, Any]) -> None:
+        if record.get("status") == "scheduled":
+            record["status"] = "pending"
+        record["ready_at"] = time.time()
+        key = record["ready_at"] + priority_rank(record.get("priority")) * self.aging_seconds
+        heapq.heappush(self._ready, (key, next(self._seq), record["job_id"]))
+        self._wakeup.set()
+
+    def _promote_due(self, now: float) -> None:
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, job_id = heapq.heappop(self._delayed)
+            record = self._records.get(job_id)
+            if record is not None and record.get("status") in ("pending", "scheduled"):
+                self._push_ready(record)
+
+    def _expire_leases(self, now: float) -> None:
+        while self._lease_expiries and self._lease_expiries[0][0] <= now:
+            _, job_id, token = heapq.heappop(self._lease_expiries)
+            lease = self._leases.get(job_id)
+            if lease is None or lease[1] != token:
+                continue
+            del self._leases[job_id]
+            record = self._records.get(job_id)
+            if record is None:
+                continue
+            logger.warning(f"Lease expired for background job {job_id}; making it visible again")
+            record["status"] = "pending"
+            record["retry_count"] = record.get("retry_count", 0) + 1
+            self._stats["lease_expired"] += 1
+            self._push_ready(record)
+            self._mark_dirty(record)
+
+    def _lease_next(self, now: float) -> Optional[Tuple[Dict[str, Any], str]]:
+        while self._ready:
+            _, _, job_id = heapq.heappop(self._ready)
+            record = self._records.get(job_id)
+            if record is None or record.get("status") != "pending" or job_id in self._leases:
+                continue
+            token = uuid.uuid4().hex
+            expires_at = now + float(record.get("timeout") or 3600) + self.lease_grace_seconds
+            self._leases[job_id] = (expires_at, token)
+            heapq.heappush(self._lease_expiries, (expires_at, job_id, token))
+            record["status"] = "running"
+            self._wait_times.append(now - record.get("ready_at", now))
+            self._stats["leased"] += 1
+            self._mark_dirty(record)
+            return record, token
+        return None
+
+    def _release(self, job_id: str, lease_token: str) -> bool:
+        lease = self._leases.get(job_id)
+        if lease is None or lease[1] != lease_token:
+            self._stats["stale_acks"] += 1
+            return False
+        del self._leases[job_id]
+        return True
+
+    def _next_wakeup(self, now: float) -> Optional[float]:
+        deadlines = []
+        if self._delayed:
+            deadlines.append(self._delayed[0][0])
+        if self._lease_expiries:
+            deadlines.append(self._lease_expiries[0][0])
+        if self.store is not None:
+            deadlines.append(self._next_heartbeat)
+        return max(0.0, min(deadlines) - now) if deadlines else None
+
+    def _mark_dirty(self, record: Dict[str, Any]) -> Optional[asyncio.Future]:
+        """Queue a write; the returned future resolves once it is committed."""
+        self._dirty[record["job_id"]] = record
+        return self._schedule_flush()
+
+    def _schedule_flush(self) -> Optional[asyncio.Future]:
+        """Join the next group commit; writes made while one is in flight go into the following one."""
+        if self._pending_flush is not None:
+            return self._pending_flush
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return None
+        self._pending_flush = loop.create_future()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_loop())
+        return self._pending_flush
+
+    async def _flush_loop(self) -> None:
+        while self._pending_flush is not None:
+            future, self._pending_flush = self._pending_flush, None
+            try:
+                rows = self._take_dirty()
+                if rows:
+                    await asyncio.to_thread(self._write, rows)
+                elif self.store is not None:
+                    await asyncio.to_thread(self.store.heartbeat)
+            except Exception as e:
+                logger.error(f"Background job flush failed: {e}")
+            finally:
+                if not future.done():
+                    future.set_result(None)
@@ -1,15 +1,22 @@
-from typing import Dict, List, Any, Optional, Union, Set
+from typing import Dict, List, Any, Optional, Union, Set, Tuple
+import copy
 import logging
 from datetime import datetime
 from sqlmodel import Session, select
 from app.models.scan_models import DataSource, Scan, ScanResult, DataSourceType
 from app.services.scan_service import ScanService
+from app.services.schema_fingerprint import (
+    CATALOG_DIGESTS_KEY, COUNT_KEYS, COUNTS_KEY, FINGERPRINT_KEY, MONGODB_LAYOUT, RELATIONAL_LAYOUT,
+    SCHEMA_DIGESTS_KEY, item_count, layout_for, named_items, same_digests, same_snapshot
+)
 import json
 import hashlib
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+RELATIONAL_SOURCE_TYPES = {DataSourceType.MYSQL, DataSourceType.POSTGRESQL}
+
 class IncrementalScanService:
     """Service for managing incremental scans."""
     
@@ -85,9 +92,9 @@ class IncrementalScanService:
             if not data_source:
                 raise ValueError(f"Data source not found: {data_source_id}")
             
-            # Get the base scan result
-            base_scan_result = IncrementalScanService._get_latest_scan_result(session, base_scan.id)
-            if not base_scan_result:
+            # Rebuild the base snapshot (with its stored fingerprints) from the base scan's results
+            base_metadata = IncrementalScanService._load_base_snapshot(session, base_scan.id, data_source.source_type)
+            if base_metadata is None:
                 raise ValueError(f"No scan result found for base scan: {base_scan.id}")
             
             # Update scan status
@@ -105,7 +112,7 @@ class IncrementalScanService:
             
             # Compare with base scan and get only the changes
             incremental_metadata = IncrementalScanService._get_incremental_changes(
-                base_metadata=base_scan_result.scan_metadata,
+                base_metadata=base_metadata,
                 current_metadata=metadata,
                 data_source_type=data_source.source_type
             )
@@ -129,6 +136,8 @@ class IncrementalScanService:
             session.add(scan)
             session.commit()
             
+            IncrementalScanService._reevaluate_compliance(session, data_source_id, incremental_metadata)
+            
             return scan
             
         except Exception as e:
@@ -140,12 +149,62 @@ class IncrementalScanService:
             session.commit()
             raise
     
+    @staticmethod
+    def _reevaluate_compliance(session: Session, data_source_id: int, incremental_metadata: Dict[str, Any]) -> None:
+        """Re-evaluate the compliance rules that depend on the changed tables."""
+        # Imported here: the compliance services import the scan services
+        from app.services.compliance_rule_service import ComplianceRuleService
+        try:
+            ComplianceRuleService.reevaluate_for_scan_delta(session, data_source_id, incremental_metadata)
+        except Exception as e:
+            # The scan itself succeeded; compliance is re-evaluated in full on the next scheduled run
+            logger.warning(f"Incremental compliance evaluation failed for data source {data_source_id}: {str(e)}")
+    
     @staticmethod
     def _get_latest_scan_result(session: Session, scan_id: int) -> Optional[ScanResult]:
         """Get the latest scan result for a scan."""
         stmt = select(ScanResult).where(ScanResult.scan_id == scan_id).order_by(ScanResult.created_at.desc()).limit(1)
         return session.execute(stmt).scalars().first()
     
+    @staticmethod
+    def _load_base_snapshot(session: Session, scan_id: int,
+                            data_source_type: Union[DataSourceType, str]) -> Optional[Dict[str, Any]]:
+        """Rebuild a scan's metadata snapshot from its stored table and column results.
+        
+        Table rows carry the table, schema and catalog digests and the row/document count
+        written by ``ScanService._store_scan_results``; column rows carry the column
+        metadata. Scans stored as a single metadata document are returned as a copy, so the
+        comparison never writes into stored results.
+        """
+        if isinstance(data_source_type, DataSourceType):
+            data_source_type = data_source_type.value
+        layout = layout_for(data_source_type)
+        top_key, child_key, leaf_key = layout
+        count_key = COUNT_KEYS[child_key]
+        
+        stmt = select(ScanResult).where(ScanResult.scan_id == scan_id, ScanResult.table_name.isnot(None))
+        rows = session.execute(stmt).scalars().all()
+        if not rows:
+            latest = IncrementalScanService._get_latest_scan_result(session, scan_id)
+            return copy.deepcopy(latest.scan_metadata or {}) if latest else None
+        
+        snapshot: Dict[str, Any] = {top_key: {}}
+        for row in rows:
+            stored = row.scan_metadata or {}
+            schema = snapshot[top_key].setdefault(row.schema_name, {child_key: {}})
+            table = schema[child_key].setdefault(row.table_name, {leaf_key: {}})
+            if row.column_name is not None:
+                table[leaf_key][row.column_name] = copy.deepcopy(stored)
+                continue
+            table[FINGERPRINT_KEY] = stored.get(FINGERPRINT_KEY)
+            if item_count(stored, child_key) is not None:
+                table[count_key] = item_count(stored, child_key)
+            if stored.get(SCHEMA_DIGESTS_KEY):
+                schema[FINGERPRINT_KEY], schema[COUNTS_KEY] = stored[SCHEMA_DIGESTS_KEY]
+            if stored.get(CATALOG_DIGESTS_KEY):
+                snapshot[FINGERPRINT_KEY], snapshot[COUNTS_KEY] = stored[CATALOG_DIGESTS_KEY]
+        return snapshot
+    
     @staticmethod
     def _get_incremental_changes(base_metadata: Dict[str, Any], current_metadata: Dict[str, Any], 
                                 data_source_type: Union[DataSourceType, str]) -> Dict[str, Any]:
@@ -162,9 +221,14 @@ class IncrementalScanService:
         if isinstance(data_source_type, str):
             data_source_type = DataSourceType(data_source_type)
         
-        if data_source_type in [DataSourceType.MYSQL, DataSourceType.POSTGRESQL, DataSourceType.ORACLE, DataSourceType.SQLSERVER]:
+        if data_source_type in RELATIONAL_SOURCE_TYPES:
+            # Fingerprints stored with the snapshots let unchanged subtrees be skipped wholesale
+            if same_snapshot(base_metadata, current_metadata, RELATIONAL_LAYOUT):
+                return {"schemas": []}
             return IncrementalScanService._get_relational_changes(base_metadata, current_metadata)
         elif data_source_type == DataSourceType.MONGODB:
+            if same_snapshot(base_metadata, current_metadata, MONGODB_LAYOUT):
+                return {"databases": []}
             return IncrementalScanService._get_mongodb_changes(base_metadata, current_metadata)
         else:
             logger.warning(f"Unsupported data source type for incremental scan: {data_source_type}")
@@ -176,44 +240,46 @@ class IncrementalScanService:
         changes = {"schemas": []}
         
         # Create lookup dictionaries for faster access
-        base_schemas = {schema["name"]: schema for schema in base_metadata.get("schemas", [])}
-        current_schemas = {schema["name"]: schema for schema in current_metadata.get("schemas", [])}
+        base_schemas = IncrementalScanService._by_name(base_metadata.get("schemas"))
+        current_schemas = IncrementalScanService._by_name(current_metadata.get("schemas"))
         
         # Find new and changed schemas
         for schema_name, schema in current_schemas.items():
             if schema_name not in base_schemas:
                 # New schema
-                changes["schemas"].append(schema)
+                changes["schemas"].append(dict(IncrementalScanService._listed(schema, RELATIONAL_LAYOUT[1:]), change_type="added"))
                 continue
             
             base_schema = base_schemas[schema_name]
+            if IncrementalScanService._same_fingerprint(base_schema, schema) and \
+                    IncrementalScanService._same_fingerprint(base_schema, schema, COUNTS_KEY):
+                continue
             schema_changes = {"name": schema_name, "tables": []}
             
             # Create lookup dictionaries for tables
-            base_tables = {table["name"]: table for table in base_schema.get("tables", [])}
-            current_tables = {table["name"]: table for table in schema.get("tables", [])}
+            base_tables = IncrementalScanService._by_name(base_schema.get("tables"))
+            current_tables = IncrementalScanService._by_name(schema.get("tables"))
             
             # Find new and changed tables
             for table_name, table in current_tables.items():
                 if table_name not in base_tables:
                     # New table
-                    schema_changes["tables"].append(table)
+                    schema_changes["tables"].append(dict(IncrementalScanService._listed(table, RELATIONAL_LAYOUT[2:]), change_type="added"))
                     continue
                 
                 base_table = base_tables[table_name]
                 table_changes = {"name": table_name, "columns": []}
                 
-                # Check if row count changed significantly
-                if "row_count" in table and "row_count" in base_table:
-                    base_count = base_table["row_count"] or 0
-                    current_count = table["row_count"] or 0
-                    if base_count != current_count:
-                        table_changes["row_count"] = current_count
-                        table_changes["previous_row_count"] = base_count
+                # Row counts are compared on their own; they are not part of the structural fingerprint
+                table_changes.update(IncrementalScanService._count_change(base_table, table, "tables"))
+                if IncrementalScanService._same_fingerprint(base_table, table):
+                    if "row_count" in table_changes:
+                        schema_changes["tables"].append(table_changes)
+                    continue
                 
                 # Create lookup dictionaries for columns
-                base_columns = {col["name"]: col for col in base_table.get("columns", [])}
-                current_columns = {col["name"]: col for col in table.get("columns", [])}
+                base_columns = IncrementalScanService._by_name(base_table.get("columns"))
+                current_columns = IncrementalScanService._by_name(table.get("columns"))
                 
                 # Find new and changed columns
                 for col_name, column in current_columns.items():
@@ -225,6 +291,8 @@ class IncrementalScanService:
                     base_column = base_columns[col_name]
                     
                     # Check if column definition changed
+                    if IncrementalScanService._same_fingerprint(base_column, column):
+                        continue
                     if IncrementalScanService._has_column_changed(base_column, column):
                         column_changes = column.copy()
                         column_changes["change_type"] = "modified"
@@ -263,44 +331,46 @@ class IncrementalScanService:
         changes = {"databases": []}
         
         # Create lookup dictionaries for faster access
-        base_dbs = {db["name"]: db for db in base_metadata.get("databases", [])}
-        current_dbs = {db["name"]: db for db in current_metadata.get("databases", [])}
+        base_dbs = IncrementalScanService._by_name(base_metadata.get("databases"))
+        current_dbs = IncrementalScanService._by_name(current_metadata.get("databases"))
         
         # Find new and changed databases
         for db_name, db in current_dbs.items():
             if db_name not in base_dbs:
                 # New database
-                changes["databases"].append(db)
+                changes["databases"].append(dict(IncrementalScanService._listed(db, MONGODB_LAYOUT[1:]), change_type="added"))
                 continue
             
             base_db = base_dbs[db_name]
+            if IncrementalScanService._same_fingerprint(base_db, db) and \
+                    IncrementalScanService._same_fingerprint(base_db, db, COUNTS_KEY):
+                continue
             db_changes = {"name": db_name, "collections": []}
             
             # Create lookup dictionaries for collections
-            base_collections = {coll["name"]: coll for coll in base_db.get("collections", [])}
-            current_collections = {coll["name"]: coll for coll in db.get("collections", [])}
+            base_collections = IncrementalScanService._by_name(base_db.get("collections"))
+            current_collections = IncrementalScanService._by_name(db.get("collections"))
             
             # Find new and changed collections
             for coll_name, collection in current_collections.items():
                 if coll_name not in base_collections:
                     # New collection
-                    db_changes["collections"].append(collection)
+                    db_changes["collections"].append(dict(IncrementalScanService._listed(collection, MONGODB_LAYOUT[2:]), change_type="added"))
                     continue
                 
                 base_collection = base_collections[coll_name]
                 coll_changes = {"name": coll_name, "fields": []}
                 
-                # Check if document count changed significantly
-                if "document_count" in collection and "document_count" in base_collection:
-                    base_count = base_collection["document_count"] or 0
-                    current_count = collection["document_count"] or 0
-                    if base_count != current_count:
-                        coll_changes["document_count"] = current_count
-                        coll_changes["previous_document_count"] = base_count
+                # Document counts are compared on their own; they are not part of the structural fingerprint
+                coll_changes.update(IncrementalScanService._count_change(base_collection, collection, "collections"))
+                if IncrementalScanService._same_fingerprint(base_collection, collection):
+                    if "document_count" in coll_changes:
+                        db_changes["collections"].append(coll_changes)
+                    continue
                 
                 # Create lookup dictionaries for fields
-                base_fields = {field["name"]: field for field in base_collection.get("fields", [])}
-                current_fields = {field["name"]: field for field in collection.get("fields", [])}
+                base_fields = IncrementalScanService._by_name(base_collection.get("fields"))
+                current_fields = IncrementalScanService._by_name(collection.get("fields"))
                 
                 # Find new and changed fields
                 for field_name, field in current_fields.items():
@@ -312,6 +382,8 @@ class IncrementalScanService:
                     base_field = base_fields[field_name]
                     
                     # Check if field definition changed
+                    if IncrementalScanService._same_fingerprint(base_field, field):
+                        continue
                     if IncrementalScanService._has_field_changed(base_field, field):
                         field_changes = field.copy()
                         field_changes["change_type"] = "modified"
@@ -344,6 +416,34 @@ class IncrementalScanService:
         
         return changes
     
+    @staticmethod
+    def _same_fingerprint(base_item: Dict[str, Any], current_item: Dict[str, Any], key: str = FINGERPRINT_KEY) -> bool:
+        """True when both snapshots carry the same content hash for this node."""
+        return same_digests(base_item, current_item, key)
+    
+    @staticmethod
+    def _count_change(base_item: Dict[str, Any], current_item: Dict[str, Any], child_key: str) -> Dict[str, Any]:
+        """``{row_count, previous_row_count}`` (or document counts) when the count changed."""
+        count_key = COUNT_KEYS[child_key]
+        base_count = item_count(base_item, child_key)
+        current_count = item_count(current_item, child_key)
+        if base_count is None or current_count is None or (base_count or 0) == (current_count or 0):
+            return {}
+        return {count_key: current_count or 0, f"previous_{count_key}": base_count or 0}
+    
+    @staticmethod
+    def _by_name(container: Any) -> Dict[str, Dict[str, Any]]:
+        """Name-keyed lookup over a list- or dict-layout container; every item carries its ``name``."""
+        return {name: dict(item, name=name) for name, item in named_items(container)}
+    
+    @staticmethod
+    def _listed(item: Dict[str, Any], child_keys: Tuple[str, ...]) -> Dict[str, Any]:
+        """Copy of ``item`` with nested containers as lists of named dicts, the change-set layout."""
+        if not child_keys or child_keys[0] not in item:
+            return item
+        children = IncrementalScanService._by_name(item[child_keys[0]]).values()
+        return dict(item, **{child_keys[0]: [IncrementalScanService._listed(child, child_keys[1:]) for child in children]})
+    
     @staticmethod
     def _has_column_changed(base_column: Dict[str, Any], current_column: Dict[str, Any]) -> bool:
         """Check if a column definition has changed."""
@@ -406,7 +506,7 @@ class IncrementalScanService:
             "deleted": {"count": 0, "items": []}
         }
         
-        if data_source_type in [DataSourceType.MYSQL, DataSourceType.POSTGRESQL, DataSourceType.ORACLE, DataSourceType.SQLSERVER]:
+        if data_source_type in RELATIONAL_SOURCE_TYPES:
             # Process relational database changes
             for schema in incremental_metadata.get("schemas", []):
                 schema_name = schema.get("name", "")
@@ -6,9 +6,9 @@ Enterprise metrics export service for exporting metrics data
 for analysis, reporting, and external system integration.
 
 This service provides:
-- Metrics data export in various formats (JSON, CSV, XML)
-- Historical metrics export
-- Real-time metrics streaming
+- Metrics data export in various formats (JSON, NDJSON, CSV, XML, Prometheus, Arrow, Parquet)
+- Historical metrics export from the metric rollups
+- Streaming exports with on-the-fly gzip/zstd compression (see metrics_export_stream)
 - Metrics aggregation and summarization
 - Custom export formats
 - Scheduled exports
@@ -16,24 +16,100 @@ This service provides:
 - Performance optimization
 """
 
+import asyncio
 import logging
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timedelta
+import itertools
 import json
-import csv
-import io
-import gzip
 import base64
 
+from app.services.columnar_transport import ARROW_STREAM_MEDIA_TYPE, DEFAULT_BATCH_SIZE, PARQUET_MEDIA_TYPE
+from app.services.metrics_export_stream import (
+    AGGREGATION_RESOLUTIONS, COMPRESSIONS, EXPORT_FORMATS, HISTORICAL, SNAPSHOT,
+    historical_row_batches, open_export, resolve_format, snapshot_row_batches
+)
+
 logger = logging.getLogger(__name__)
 
+BINARY_MEDIA_TYPES = (ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE)
+
 
 class MetricsExportService:
     """Enterprise metrics export service"""
     
     def __init__(self):
-        self.export_formats = ["json", "csv", "xml", "prometheus"]
-        self.compression_formats = ["none", "gzip", "base64"]
+        self.export_formats = list(EXPORT_FORMATS)
+        self.compression_formats = list(COMPRESSIONS) + ["base64"]
+    
+    def _export_header(self, format: str, include_metadata: bool, total_metrics: Optional[int] = None,
+                       timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+        header = {
+            "export_timestamp": (timestamp or datetime.utcnow()).isoformat(),
+            "export_format": format
+        }
+        if include_metadata:
+            header["metadata"] = {
+                "version": "1.0",
+                "source": "data_governance_system"
+            }
+            if total_metrics is not None:
+                header["metadata"]["total_metrics"] = total_metrics
+        return header
+    
+    def stream_metrics(
+        self,
+        metrics: Dict[str, Any],
+        format: str = "json",
+        compression: str = "none",
+        include_metadata: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """Stream a metrics snapshot; returns the media type, file name and a byte iterator for a StreamingResponse"""
+        # One timestamp for the whole snapshot
+        timestamp = datetime.utcnow()
+        header = self._export_header(
+            format, include_metadata,
+            len(metrics.get("counters", {})) + len(metrics.get("gauges", {})) + len(metrics.get("histograms", {})),
+            timestamp
+        )
+        return open_export(
+            snapshot_row_batches(metrics, timestamp, batch_size),
+            format, compression, header, source=SNAPSHOT
+        )
+    
+    async def stream_historical_metrics(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        format: str = "parquet",
+        aggregation: str = "hourly",
+        compression: str = "none",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        bind: Any = None
+    ) -> Dict[str, Any]:
+        """Stream rollup buckets for a time period through a server-side cursor"""
+        if aggregation not in AGGREGATION_RESOLUTIONS:
+            raise ValueError(f"Unsupported aggregation: {aggregation}")
+        if bind is None:
+            from app.db_session import engine as bind
+        
+        header = self._export_header(format, True)
+        header["metadata"].update({
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "aggregation": aggregation
+        })
+        resolve_format(format, compression, HISTORICAL)
+        
+        # Prime the generator so query errors surface before the response starts;
+        # connecting and running the query block, so off the event loop
+        row_batches = historical_row_batches(bind, start_date, end_date, aggregation, batch_size)
+        first = await asyncio.to_thread(next, row_batches, None)
+        return open_export(
+            itertools.chain([first] if first is not None else [], row_batches),
+            format, compression, header, source=HISTORICAL
+        )
     
     async def export_metrics_for_analysis(
         self,
@@ -44,36 +120,21 @@ class MetricsExportService:
     ) -> Dict[str, Any]:
         """Export metrics for analysis"""
         try:
-            # Validate format
-            if format not in self.export_formats:
-                return {"success": False, "error": f"Unsupported format: {format}"}
-            
             # Validate compression
             if compression not in self.compression_formats:
                 return {"success": False, "error": f"Unsupported compression: {compression}"}
             
-            # Export metrics
-            if format == "json":
-                export_data = await self._export_to_json(metrics, include_metadata)
-            elif format == "csv":
-                export_data = await self._export_to_csv(metrics, include_metadata)
-            elif format == "xml":
-                export_data = await self._export_to_xml(metrics, include_metadata)
-            elif format == "prometheus":
-                export_data = await self._export_to_prometheus(metrics, include_metadata)
-            else:
-                return {"success": False, "error": f"Format not implemented: {format}"}
-            
-            # Apply compression if requested
-            if compression != "none":
-                export_data = await self._apply_compression(export_data, compression)
+            export = self.stream_metrics(
+                metrics, format, "none" if compression == "base64" else compression, include_metadata
+            )
+            export_data = self._collect(export, compression)
             
             return {
                 "success": True,
                 "format": format,
                 "compression": compression,
                 "data": export_data,
-                "size_bytes": len(export_data) if isinstance(export_data, str) else len(str(export_data)),
+                "size_bytes": len(export_data),
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -88,29 +149,19 @@ class MetricsExportService:
         format: str = "json",
         aggregation: str = "hourly"
     ) -> Dict[str, Any]:
-        """Export historical metrics for a time period"""
+        """Export historical metrics for a time period (in memory; use stream_historical_metrics for large ranges)"""
         try:
-            # Fetch real historical metrics from storage
-            from .data_source_service import DataSourceService
-            ds_service = DataSourceService()
-            
-            historical_metrics = await ds_service.get_historical_metrics(
-                start_date=start_date,
-                end_date=end_date,
-                aggregation=aggregation
-            )
-            
-            if not historical_metrics.get("success"):
-                # Fallback to generated metrics if storage fails
-                historical_metrics = await self._generate_historical_metrics(start_date, end_date, aggregation)
+            export = await self.stream_historical_metrics(start_date, end_date, format=format, aggregation=aggregation)
+            export_data = self._collect(export, "none")
             
-            # Export the historical data
-            return await self.export_metrics_for_analysis(
-                metrics=historical_metrics,
-                format=format,
-                compression="none",
-                include_metadata=True
-            )
+            return {
+                "success": True,
+                "format": format,
+                "compression": "none",
+                "data": export_data,
+                "size_bytes": len(export_data),
+                "timestamp": datetime.utcnow().isoformat()
+            }
             
         except Exception as e:
             logger.error(f"Error exporting historical metrics: {e}")
@@ -136,211 +187,14 @@ class MetricsExportService:
             logger.error(f"Error exporting metrics summary: {e}")
             return {"success": False, "error": str(e)}
     
-    async def _export_to_json(
-        self,
-        metrics: Dict[str, Any],
-        include_metadata: bool = True
-    ) -> str:
-        """Export metrics to JSON format"""
-        try:
-            export_data = {
-                "metrics": metrics,
-                "export_timestamp": datetime.utcnow().isoformat(),
-                "export_format": "json"
-            }
-            
-            if include_metadata:
-                export_data["metadata"] = {
-                    "version": "1.0",
-                    "source": "data_governance_system",
-                    "total_metrics": len(metrics.get("counters", {})) + len(metrics.get("gauges", {})) + len(metrics.get("histograms", {})),
-                    "export_duration_ms": 0
-                }
-            
-            return json.dumps(export_data, indent=2, default=str)
-            
-        except Exception as e:
-            logger.error(f"Error exporting to JSON: {e}")
-            return json.dumps({"error": str(e)})
-    
-    async def _export_to_csv(
-        self,
-        metrics: Dict[str, Any],
-        include_metadata: bool = True
-    ) -> str:
-        """Export metrics to CSV format"""
-        try:
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # Write header
-            writer.writerow(["metric_name", "metric_type", "value", "timestamp"])
-            
-            # Write counters
-            for name, value in metrics.get("counters", {}).items():
-                writer.writerow([name, "counter", value, datetime.utcnow().isoformat()])
-            
-            # Write gauges
-            for name, value in metrics.get("gauges", {}).items():
-                writer.writerow([name, "gauge", value, datetime.utcnow().isoformat()])
-            
-            # Write histograms
-            for name, histogram_data in metrics.get("histograms", {}).items():
-                if isinstance(histogram_data, dict):
-                    for bucket, count in histogram_data.items():
-                        if bucket not in ["sum", "count"]:
-                            writer.writerow([f"{name}_bucket_{bucket}", "histogram_bucket", count, datetime.utcnow().isoformat()])
-                    writer.writerow([f"{name}_sum", "histogram_sum", histogram_data.get("sum", 0), datetime.utcnow().isoformat()])
-                    writer.writerow([f"{name}_count", "histogram_count", histogram_data.get("count", 0), datetime.utcnow().isoformat()])
-            
-            csv_data = output.getvalue()
-            output.close()
-            
-            return csv_data
-            
-        except Exception as e:
-            logger.error(f"Error exporting to CSV: {e}")
-            return f"error,{str(e)}"
-    
-    async def _export_to_xml(
-        self,
-        metrics: Dict[str, Any],
-        include_metadata: bool = True
-    ) -> str:
-        """Export metrics to XML format"""
-        try:
-            xml_lines = ['<?xml version="1.0" encoding="UTF-8"?>']
-            xml_lines.append('<metrics>')
-            
-            # Add metadata
-            if include_metadata:
-                xml_lines.append('  <metadata>')
-                xml_lines.append(f'    <export_timestamp>{datetime.utcnow().isoformat()}</export_timestamp>')
-                xml_lines.append('    <export_format>xml</export_format>')
-                xml_lines.append('    <version>1.0</version>')
-                xml_lines.append('  </metadata>')
-            
-            # Add counters
-            xml_lines.append('  <counters>')
-            for name, value in metrics.get("counters", {}).items():
-                xml_lines.append(f'    <counter name="{name}" value="{value}" />')
-            xml_lines.append('  </counters>')
-            
-            # Add gauges
-            xml_lines.append('  <gauges>')
-            for name, value in metrics.get("gauges", {}).items():
-                xml_lines.append(f'    <gauge name="{name}" value="{value}" />')
-            xml_lines.append('  </gauges>')
-            
-            # Add histograms
-            xml_lines.append('  <histograms>')
-            for name, histogram_data in metrics.get("histograms", {}).items():
-                xml_lines.append(f'    <histogram name="{name}">')
-                if isinstance(histogram_data, dict):
-                    for bucket, count in histogram_data.items():
-                        if bucket not in ["sum", "count"]:
-                            xml_lines.append(f'      <bucket value="{bucket}" count="{count}" />')
-                    xml_lines.append(f'      <sum>{histogram_data.get("sum", 0)}</sum>')
-                    xml_lines.append(f'      <count>{histogram_data.get("count", 0)}</count>')
-                xml_lines.append('    </histogram>')
-            xml_lines.append('  </histograms>')
-            
-            xml_lines.append('</metrics>')
-            
-            return '\n'.join(xml_lines)
-            
-        except Exception as e:
-            logger.error(f"Error exporting to XML: {e}")
-            return f'<error>{str(e)}</error>'
-    
-    async def _export_to_prometheus(
-        self,
-        metrics: Dict[str, Any],
-        include_metadata: bool = True
-    ) -> str:
-        """Export metrics to Prometheus format"""
-        try:
-            prometheus_lines = []
-            
-            # Add metadata comments
-            if include_metadata:
-                prometheus_lines.append(f'# Export timestamp: {datetime.utcnow().isoformat()}')
-                prometheus_lines.append('# Export format: prometheus')
-                prometheus_lines.append('# Source: data_governance_system')
-                prometheus_lines.append('')
-            
-            # Add counters
-            for name, value in metrics.get("counters", {}).items():
-                prometheus_lines.append(f'{name} {value}')
-            
-            # Add gauges
-            for name, value in metrics.get("gauges", {}).items():
-                prometheus_lines.append(f'{name} {value}')
-            
-            # Add histograms
-            for name, histogram_data in metrics.get("histograms", {}).items():
-                if isinstance(histogram_data, dict):
-                    for bucket, count in histogram_data.items():
-                        if bucket not in ["sum", "count"]:
-                            prometheus_lines.append(f'{name}_bucket{{le="{bucket}"}} {count}')
-                    prometheus_lines.append(f'{name}_sum {histogram_data.get("sum", 0)}')
-                    prometheus_lines.append(f'{name}_count {histogram_data.get("count", 0)}')
-            
-            return '\n'.join(prometheus_lines)
-            
-        except Exception as e:
-            logger.error(f"Error exporting to Prometheus: {e}")
-            return f'# Error: {str(e)}'
-    
-    async def _apply_compression(
-        self,
-        data: str,
-        compression: str
-    ) -> Union[str, bytes]:
-        """Apply compression to export data"""
-        try:
-            if compression == "gzip":
-                return gzip.compress(data.encode('utf-8'))
-            elif compression == "base64":
-                return base64.b64encode(data.encode('utf-8')).decode('utf-8')
-            else:
-                return data
-                
-        except Exception as e:
-            logger.error(f"Error applying compression: {e}")
-            return data
-    
-    async def _generate_historical_metrics(
-        self,
-        start_date: datetime,
-        end_date: datetime,
-        aggregation: str
-    ) -> Dict[str, Any]:
-        """Generate historical metrics from real data sources"""
-        try:
-            # Fetch real historical data from monitoring systems
-            from .monitoring_integration_service import MonitoringIntegrationService
-            monitoring_service = MonitoringIntegrationService()
-            
-            historical_metrics = await monitoring_service.get_historical_metrics(
-                start_date=start_date,
-                end_date=end_date,
-                aggregation=aggregation
-            )
-            
-            if not historical_metrics.get("success"):
-                # Fallback to basic metrics structure
-                historical_metrics = {
-                    "counters": {},
-                    "gauges": {},
-                    "histograms": {}
-                }
-            
-            return historical_metrics.get("metrics", historical_metrics)
-            
-        except Exception as e:
-            logger.error(f"Error generating historical metrics: {e}")
-            return {"counters": {}, "gauges": {}, "histograms": {}}
+    def _collect(self, export: Dict[str, Any], compression: str) -> Union[str, bytes]:
+        """Join a streamed export for callers that need it as one value"""
+        data = b"".join(export["content"])
+        if compression == "base64":
+            return base64.b64encode(data).decode("utf-8")
+        if compression == "none" and not export["media_type"].startswith(BINARY_MEDIA_TYPES):
+            return data.decode("utf-8")
+        return data
     
     async def _generate_metrics_summary(
         self,
@@ -430,20 +284,26 @@ class MetricsExportService:
                 validation_result["errors"].append("No data in export")
                 return validation_result
             
-            # Count metrics based on format
-            if export_data.get("format") == "json":
+            # Count metrics based on format (compressed and columnar exports are bytes)
+            if not isinstance(data, str):
+                pass
+            elif export_data.get("format") == "json":
                 try:
                     json_data = json.loads(data)
-                    validation_result["metrics_count"] = len(json_data.get("metrics", {}).get("counters", {})) + len(json_data.get("metrics", {}).get("gauges", {}))
+                    validation_result["metrics_count"] = len(json_data.get("metrics", []))
                 except json.JSONDecodeError:
                     validation_result["valid"] = False
                     validation_result["errors"].append("Invalid JSON format")
             elif export_data.get("format") == "csv":
                 lines = data.strip().split('\n')
                 validation_result["metrics_count"] = max(0, len(lines) - 1)  # Subtract header
+            elif export_data.get("format") == "ndjson":
+                validation_result["metrics_count"] = len([line for line in data.split('\n') if line.strip()])
+            elif export_data.get("format") == "xml":
+                validation_result["metrics_count"] = data.count('<metric ')
             elif export_data.get("format") == "prometheus":
                 lines = data.strip().split('\n')
-                validation_result["metrics_count"] = len([line for line in lines if not line.startswith('#')])
+                validation_result["metrics_count"] = len([line for line in lines if line and not line.startswith('#')])
             
             # Check size
             size = export_data.get("size_bytes", 0)
@@ -0,0 +1,350 @@
+"""
+Metrics Export Stream
+Format-pluggable, streaming encoders for metrics exports.
+
+MetricsExportService used to build every export as one string (``json.dumps``
+with indentation, a ``StringIO`` for CSV, a list of XML lines), stamp every row
+with its own ``datetime.utcnow()`` and compress the finished string afterwards.
+An export is now a generator of row batches (``columnar_transport.RowBatch``)
+fed through an encoder and a streaming compressor, so a ``StreamingResponse``
+sends each batch as soon as it is encoded and memory stays bounded by one batch:
+
+- ``snapshot_row_batches`` flattens a collector snapshot (counters, gauges,
+  histograms) into rows that share one export timestamp.
+- ``historical_row_batches`` reads ``RacineMetricRollup`` buckets through a
+  server-side cursor, so history of any length streams in constant memory.
+- Encoders are registered per format in ``EXPORT_FORMATS`` (json, ndjson, csv,
+  xml, prometheus, and arrow and parquet when pyarrow is installed);
+  ``register_format`` adds new ones.
+- ``compress_stream`` gzips or zstd-compresses the encoded chunks as they are
+  produced. Parquet compresses its column chunks itself instead.
+"""
+
+import csv
+import io
+import json
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+from app.services.columnar_transport import (
+    ARROW_STREAM_MEDIA_TYPE, DEFAULT_BATCH_SIZE, NDJSON_MEDIA_TYPE, PARQUET_MEDIA_TYPE, PYARROW_AVAILABLE,
+    RowBatch, iter_cursor_batches, iter_record_batches, json_default, stream_arrow_ipc, stream_ndjson,
+    stream_parquet
+)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT = "snapshot"
+HISTORICAL = "historical"
+
+SNAPSHOT_COLUMNS = ["metric_name", "metric_type", "bucket", "value", "timestamp"]
+HISTORICAL_COLUMNS = [
+    "bucket_start", "resolution", "metric_group", "measure",
+    "sample_count", "value_sum", "value_min", "value_max", "last_value"
+]
+
+# Export aggregation -> RacineMetricRollup resolution
+AGGREGATION_RESOLUTIONS = {
+    "minute": "minute", "minutely": "minute",
+    "hour": "hour", "hourly": "hour",
+    "day": "day", "daily": "day",
+}
+
+COMPRESSIONS = {
+    # name: (media type, file extension)
+    "none": (None, ""),
+    "gzip": ("application/gzip", ".gz"),
+    "zstd": ("application/zstd", ".zst"),
+}
+
+# (row batches, export header) -> encoded chunks
+Encoder = Callable[[Iterable[RowBatch], Dict[str, Any]], Iterator[bytes]]
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    name: str
+    media_type: str
+    extension: str
+    encoder: Encoder
+    sources: FrozenSet[str] = frozenset({SNAPSHOT, HISTORICAL})
+    requires_pyarrow: bool = False
+    compresses_itself: bool = False  # Compression is passed to the encoder instead of wrapping its output
+
+    @property
+    def available(self) -> bool:
+        return PYARROW_AVAILABLE or not self.requires_pyarrow
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {}
+
+
+def register_format(export_format: ExportFormat) -> ExportFormat:
+    EXPORT_FORMATS[export_format.name] = export_format
+    return export_format
+
+
+def _as_float(value: Any) -> Optional[float]:
+    # One numeric type per column, so a column keeps its Arrow type across batches
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _batched(rows: Iterable[Sequence[Any]], columns: List[str], batch_size: int) -> Iterator[RowBatch]:
+    batch: List[Sequence[Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield columns, batch
+            batch = []
+    if batch:
+        yield columns, batch
+
+
+# ------------------------------------------------------------------ sources
+
+def snapshot_row_batches(
+    metrics: Dict[str, Any],
+    timestamp: Optional[datetime] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[RowBatch]:
+    """Flatten a ``{"counters", "gauges", "histograms"}`` snapshot into rows sharing one timestamp."""
+    stamp = (timestamp or datetime.utcnow()).isoformat()
+
+    def rows() -> Iterator[Sequence[Any]]:
+        for name, value in metrics.get("counters", {}).items():
+            yield name, "counter", None, _as_float(value), stamp
+        for name, value in metrics.get("gauges", {}).items():
+            yield name, "gauge", None, _as_float(value), stamp
+        for name, histogram_data in metrics.get("histograms", {}).items():
+            if not isinstance(histogram_data, dict):
+                continue
+            for bucket, count in histogram_data.items():
+                if bucket not in ("sum", "count"):
+                    yield name, "histogram_bucket", str(bucket), _as_float(count), stamp
+            yield name, "histogram_sum", None, _as_float(histogram_data.get("sum", 0)), stamp
+            yield name, "histogram_count", None, _as_float(histogram_data.get("count", 0)), stamp
+
+    return _batched(rows(), SNAPSHOT_COLUMNS, batch_size)
+
+
+def historical_row_batches(
+    bind: Any,
+    start_date: datetime,
+    end_date: datetime,
+    aggregation: str = "hourly",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    table: Any = None
+) -> Iterator[RowBatch]:
+    """Stream rollup buckets in ``[start_date, end_date)`` at the aggregation's resolution."""
+    from sqlalchemy import select
+
+    resolution = AGGREGATION_RESOLUTIONS.get(aggregation)
+    if resolution is None:
+        raise ValueError(f"Unsupported aggregation: {aggregation}")
+    if table is None:
+        from app.models.racine_models.racine_dashboard_models import RacineMetricRollup
+        table = RacineMetricRollup.__table__
+
+    t = table.c
+    query = (
+        select(*(t[column] for column in HISTORICAL_COLUMNS))
+        .where(t.resolution == resolution, t.bucket_start >= start_date, t.bucket_start < end_date)
+        .order_by(t.bucket_start, t.metric_group, t.measure)
+    )
+    with bind.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(query)
+        yield from iter_cursor_batches(result, batch_size)
+
+
+# ----------------------------------------------------------------- encoders
+
+def _header_json(header: Dict[str, Any]) -> str:
+    return ", ".join(f"{json.dumps(key)}: {json.dumps(value, default=json_default)}" for key, value in header.items())
+
+
+def encode_json(row_batches: Iterable[RowBatch], header: Dict[str, Any]) -> Iterator[bytes]:
+    """One JSON document: the header fields plus ``"metrics"``, a list with one object per row."""
+    head = _header_json(header)
+    yield ("{" + head + (", " if head else "") + '"metrics": [').encode("utf-8")
+    separator = ""
+    for columns, rows in row_batches:
+        body = ", ".join(json.dumps(dict(zip(columns, row)), default=json_default) for row in rows)
+        if body:
+            yield (separator + body).encode("utf-8")
+            separator = ", "
+    yield b"]}\n"
+
+
+def encode_ndjson(row_batches: Iterable[RowBatch], header: Dict[str, Any]) -> Iterator[bytes]:
+    return stream_ndjson(row_batches)
+
+
+def encode_csv(row_batches: Iterable[RowBatch], header: Dict[str, Any]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    wrote_header = False
+    for columns, rows in row_batches:
+        if not wrote_header:
+            writer.writerow(columns)
+            wrote_header = True
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def encode_xml(row_batches: Iterable[RowBatch], header: Dict[str, Any]) -> Iterator[bytes]:
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', "<metrics>"]
+    if header:
+        lines.append("  <metadata>")
+        for key, value in header.items():
+            if isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    lines.append(f"    <{sub_key}>{escape(str(sub_value))}</{sub_key}>")
+            else:
+                lines.append(f"    <{key}>{escape(str(value))}</{key}>")
+        lines.append("  </metadata>")
+    yield ("\n".join(lines) + "\n").encode("utf-8")
+    for columns, rows in row_batches:
+        chunk = "".join(
+            "  <metric "
+            + " ".join(
+                f"{column}={quoteattr(value.isoformat() if isinstance(value, datetime) else str(value))}"
+                for column, value in zip(columns, row) if value is not None
+            )
+            + " />\n"
+            for row in rows
+        )
+        if chunk:
+            yield chunk.encode("utf-8")
+    yield b"</metrics>\n"
+
+
+def encode_prometheus(row_batches: Iterable[RowBatch], header: Dict[str, Any]) -> Iterator[bytes]:
+    """Prometheus text exposition of snapshot rows."""
+    if "metadata" in header:
+        comments = [
+            f"# Export timestamp: {header.get('export_timestamp')}",
+            "# Export format: prometheus",
+            f"# Source: {header['metadata'].get('source')}",
+        ]
+        yield ("\n".join(comments) + "\n\n").encode("utf-8")
+    for columns, rows in row_batches:
+        lines = []
+        for name, metric_type, bucket, value, _ in rows:
+            if metric_type == "histogram_bucket":
+                lines.append(f'{name}_bucket{{le="{bucket}"}} {value}')
+            elif metric_type == "histogram_sum":
+                lines.append(f"{name}_sum {value}")
+            elif metric_type == "histogram_count":
+                lines.append(f"{name}_count {value}")
+            else:
+                lines.append(f"{name} {value}")
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def encode_arrow(row_batches: Iterable[RowBatch], header: Dict[str, Any]) -> Iterator[bytes]:
+    return stream_arrow_ipc(iter_record_batches(row_batches))
+
+
+def encode_parquet(row_batches: Iterable[RowBatch], header: Dict[str, Any], compression: str = "none") -> Iterator[bytes]:
+    return stream_parquet(iter_record_batches(row_batches), compression=compression)
+
+
+register_format(ExportFormat("json", "application/json", ".json", encode_json))
+register_format(ExportFormat("ndjson", NDJSON_MEDIA_TYPE, ".ndjson", encode_ndjson))
+register_format(ExportFormat("csv", "text/csv", ".csv", encode_csv))
+register_format(ExportFormat("xml", "application/xml", ".xml", encode_xml))
+register_format(ExportFormat(
+    "prometheus", "text/plain; version=0.0.4", ".prom", encode_prometheus, sources=frozenset({SNAPSHOT})
+))
+register_format(ExportFormat("arrow", ARROW_STREAM_MEDIA_TYPE, ".arrows", encode_arrow, requires_pyarrow=True))
+register_format(ExportFormat(
+    "parquet", PARQUET_MEDIA_TYPE, ".parquet", encode_parquet, requires_pyarrow=True, compresses_itself=True
+))
+
+
+# -------------------------------------------------------------- compression
+
+def compress_stream(chunks: Iterable[bytes], compression: str) -> Iterator[bytes]:
+    """Compress encoded chunks as they are produced (a gzip member or a zstd frame)."""
+    if compression == "none":
+        yield from chunks
+        return
+    if compression == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    elif compression == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression requires the zstandard package; use gzip")
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    tail = compressor.flush()
+    if tail:
+        yield tail
+
+
+def resolve_format(format: str, compression: str = "none", source: str = SNAPSHOT) -> ExportFormat:
+    """The registered format, or ValueError if it or the compression cannot serve this export."""
+    export_format = EXPORT_FORMATS.get(format)
+    if export_format is None:
+        raise ValueError(f"Unsupported format: {format}")
+    if not export_format.available:
+        raise ValueError(f"{format} export requires pyarrow; use ndjson or csv")
+    if source not in export_format.sources:
+        raise ValueError(f"{format} export is not available for {source} metrics")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if compression == "zstd" and not ZSTD_AVAILABLE:
+        raise ValueError("zstd compression requires the zstandard package; use gzip")
+    return export_format
+
+
+def open_export(
+    row_batches: Iterable[RowBatch],
+    format: str,
+    compression: str = "none",
+    header: Optional[Dict[str, Any]] = None,
+    source: str = SNAPSHOT
+) -> Dict[str, Any]:
+    """
+    Return the media type, file name and chunk iterator of an export. Nothing
+    is read or encoded until the iterator is consumed.
+    """
+    export_format = resolve_format(format, compression, source)
+    header = header or {}
+    if export_format.compresses_itself:
+        content = export_format.encoder(row_batches, header, compression=compression)
+        return {
+            "media_type": export_format.media_type,
+            "filename": f"metrics{export_format.extension}",
+            "content": content
+        }
+
+    compressed_media_type, compressed_extension = COMPRESSIONS[compression]
+    return {
+        "media_type": compressed_media_type or export_format.media_type,
+        "filename": f"metrics{export_format.extension}{compressed_extension}",
+        "content": compress_stream(export_format.encoder(row_batches, header), compression)
+    }
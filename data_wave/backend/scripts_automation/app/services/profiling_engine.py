@@ -0,0 +1,500 @@
+"""
+Pushdown Profiling Engine
+Computes column profiles inside the source database with a single aggregate query per table.
+
+The previous profiling path pulled ``ORDER BY RANDOM()`` samples (a full scan
+plus sort on the source) and then computed statistics in pandas column by
+column. This engine instead:
+
+- pushes counts, null counts, min/max, approximate distinct counts, moments,
+  percentiles and equi-depth histograms down into one ``SELECT`` per table;
+- uses block/system sampling (``TABLESAMPLE SYSTEM``, ``SAMPLE SYSTEM``, ...)
+  where the dialect supports it, sized from catalog row estimates;
+- falls back to a single vectorized pandas/NumPy pass over a sample when the
+  dialect cannot express the aggregates or the pushdown query fails.
+"""
+
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.services.columnar_transport import (
+    PYARROW_AVAILABLE, iter_cursor_batches, iter_record_batches, record_batches_to_table, pa, table_to_pandas
+)
+
+logger = logging.getLogger(__name__)
+
+QUARTILES = (0.25, 0.5, 0.75)
+HISTOGRAM_POINTS = (0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+QUANTILE_POINTS = tuple(sorted(set(QUARTILES) | set(HISTOGRAM_POINTS)))
+
+# Sentinel: look the row estimate up (None is a valid "no estimate" answer)
+_LOOKUP = object()
+
+
+class ColumnKind(str, Enum):
+    """Coarse column families that decide which aggregates are pushed down."""
+    NUMERIC = "numeric"
+    TEXT = "text"
+    TEMPORAL = "temporal"
+    BOOLEAN = "boolean"
+    OTHER = "other"
+
+
+@dataclass
+class ColumnSpec:
+    name: str
+    data_type: str
+    kind: ColumnKind
+
+
+@dataclass
+class DialectProfile:
+    """SQL capabilities of a source dialect."""
+    name: str
+    quote_open: str = '"'
+    quote_close: str = '"'
+    length_function: str = "LENGTH"
+    stddev_function: str = "STDDEV_SAMP"
+    approx_distinct: Optional[str] = None  # e.g. "APPROX_COUNT_DISTINCT({col})"
+    percentile: Optional[str] = None  # "array" (PostgreSQL) or a per-point template
+    table_sample: Optional[str] = None  # template with {percent}
+    row_estimate_sql: Optional[str] = None
+    numeric_cast: str = "{col}"
+
+    def quote(self, identifier: str) -> str:
+        escaped = identifier.replace(self.quote_close, self.quote_close * 2)
+        return f"{self.quote_open}{escaped}{self.quote_close}"
+
+
+DIALECTS: Dict[str, DialectProfile] = {
+    "postgresql": DialectProfile(
+        name="postgresql",
+        percentile="array",
+        table_sample="TABLESAMPLE SYSTEM ({percent})",
+        row_estimate_sql=(
+            "SELECT c.reltuples::bigint FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = :table_name AND (:schema_name IS NULL OR n.nspname = :schema_name)"
+        ),
+        numeric_cast="CAST({col} AS DOUBLE PRECISION)",
+    ),
+    "mysql": DialectProfile(
+        name="mysql",
+        quote_open="`",
+        quote_close="`",
+        row_estimate_sql=(
+            "SELECT TABLE_ROWS FROM information_schema.tables "
+            "WHERE TABLE_NAME = :table_name AND TABLE_SCHEMA = COALESCE(:schema_name, DATABASE())"
+        ),
+    ),
+    "snowflake": DialectProfile(
+        name="snowflake",
+        approx_distinct="APPROX_COUNT_DISTINCT({col})",
+        percentile="APPROX_PERCENTILE({col}, {point})",
+        table_sample="SAMPLE SYSTEM ({percent})",
+        row_estimate_sql=(
+            "SELECT ROW_COUNT FROM information_schema.tables "
+            "WHERE TABLE_NAME = :table_name AND (:schema_name IS NULL OR TABLE_SCHEMA = :schema_name)"
+        ),
+    ),
+    "sqlserver": DialectProfile(
+        name="sqlserver",
+        quote_open="[",
+        quote_close="]",
+        length_function="LEN",
+        stddev_function="STDEV",
+        approx_distinct="APPROX_COUNT_DISTINCT({col})",
+        table_sample="TABLESAMPLE SYSTEM ({percent} PERCENT)",
+        numeric_cast="CAST({col} AS FLOAT)",
+    ),
+    "oracle": DialectProfile(
+        name="oracle",
+        stddev_function="STDDEV",
+        approx_distinct="APPROX_COUNT_DISTINCT({col})",
+        percentile="APPROX_PERCENTILE({point}) WITHIN GROUP (ORDER BY {col})",
+        table_sample="SAMPLE ({percent})",
+    ),
+}
+
+
+def _py(value: Any) -> Any:
+    """Convert NumPy/pandas scalars to plain JSON-friendly Python values."""
+    if value is None:
+        return None
+    if isinstance(value, (np.generic,)):
+        value = value.item()
+    if isinstance(value, float) and (np.isnan(value) or np.isinf(value)):
+        return None
+    if isinstance(value, (pd.Timestamp,)):
+        return None if pd.isna(value) else value.isoformat()
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+def classify_type(type_name: str) -> ColumnKind:
+    """Map a database/pandas type name onto a column family."""
+    lowered = type_name.lower()
+    if "bool" in lowered or lowered == "bit":
+        return ColumnKind.BOOLEAN
+    if any(token in lowered for token in ("int", "numeric", "decimal", "float", "double", "real", "number", "money")):
+        return ColumnKind.NUMERIC
+    if any(token in lowered for token in ("date", "time")):
+        return ColumnKind.TEMPORAL
+    if any(token in lowered for token in ("char", "text", "string", "clob", "uuid", "object", "enum")):
+        return ColumnKind.TEXT
+    return ColumnKind.OTHER
+
+
+class PushdownProfilingEngine:
+    """Profiles a table with one pushed-down aggregate query, falling back to a vectorized sample pass."""
+
+    def __init__(self, engine: Engine, dialect: str, target_sample_rows: int = 100_000):
+        self.engine = engine
+        self.dialect = DIALECTS.get(str(getattr(dialect, "value", dialect)).lower(), DialectProfile(name=str(dialect)))
+        self.target_sample_rows = target_sample_rows
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def profile_table(
+        self,
+        table_name: str,
+        schema_name: Optional[str] = None,
+        columns: Optional[Sequence[ColumnSpec]] = None,
+        sample_percent: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Profile every column of a table with one aggregate query."""
+        columns = list(columns) if columns is not None else self.get_columns(table_name, schema_name)
+        if not columns:
+            return {"error": f"No columns found for {schema_name + '.' if schema_name else ''}{table_name}"}
+
+        estimated_rows = self.estimate_row_count(table_name, schema_name)
+        if sample_percent is None:
+            sample_percent = self._auto_sample_percent(estimated_rows)
+
+        try:
+            profile = self._pushdown_profile(table_name, schema_name, columns, sample_percent)
+            profile["estimated_row_count"] = estimated_rows
+            return profile
+        except Exception as e:
+            logger.warning(f"Pushdown profiling failed for {table_name}, falling back to sample profiling: {e}")
+
+        sample_size = min(self.target_sample_rows, 10_000)
+        if PYARROW_AVAILABLE:
+            frame = self.sample_arrow(table_name, schema_name, sample_size, estimated_rows)
+        else:
+            frame = self.sample_rows(table_name, schema_name, sample_size, estimated_rows)
+        profile = profile_frame(frame)
+        profile["estimated_row_count"] = estimated_rows
+        profile["pushdown"] = False
+        return profile
+
+    def sample_rows(
+        self,
+        table_name: str,
+        schema_name: Optional[str] = None,
+        sample_size: int = 1000,
+        estimated_rows: Any = _LOOKUP,
+    ) -> pd.DataFrame:
+        """Fetch an approximately random sample without sorting the whole table.
+
+        ``estimated_rows`` skips the catalog lookup when the caller already has it.
+        """
+        if PYARROW_AVAILABLE:
+            return table_to_pandas(self.sample_arrow(table_name, schema_name, sample_size, estimated_rows))
+        if estimated_rows is _LOOKUP:
+            estimated_rows = self.estimate_row_count(table_name, schema_name)
+        query, params = self.build_sample_query(table_name, schema_name, sample_size, estimated_rows)
+        with self.engine.connect() as conn:
+            return pd.read_sql(text(query), conn, params=params)
+
+    def sample_arrow(
+        self,
+        table_name: str,
+        schema_name: Optional[str] = None,
+        sample_size: int = 1000,
+        estimated_rows: Any = _LOOKUP,
+    ) -> "pa.Table":
+        """Fetch a sample as an Arrow table, pivoting cursor batches column-wise (no per-row dicts)."""
+        if estimated_rows is _LOOKUP:
+            estimated_rows = self.estimate_row_count(table_name, schema_name)
+        query, params = self.build_sample_query(table_name, schema_name, sample_size, estimated_rows)
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(text(query), params)
+            return record_batches_to_table(iter_record_batches(iter_cursor_batches(result)))
+
+    def build_sample_query(
+        self,
+        table_name: str,
+        schema_name: Optional[str],
+        sample_size: int,
+        estimated_rows: Optional[int],
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Build the dialect-specific sampling query (no ORDER BY RANDOM())."""
+        table = self._qualified(table_name, schema_name)
+        sample_size = int(sample_size)
+        params: Dict[str, Any] = {}
+        needs_sampling = bool(estimated_rows) and estimated_rows > sample_size
+        # Oversample block-level samples so the LIMIT is still filled on skewed pages
+        percent = min(100.0, max(0.001, (sample_size * 2.0 / estimated_rows) * 100)) if needs_sampling else 100.0
+        name = self.dialect.name
+
+        if name == "sqlserver":
+            sample = f" TABLESAMPLE SYSTEM ({percent:.4f} PERCENT)" if needs_sampling else ""
+            return f"SELECT TOP {sample_size} * FROM {table}{sample}", params
+        if name == "snowflake":
+            return f"SELECT * FROM {table} SAMPLE ({sample_size} ROWS)", params
+        if name == "oracle":
+            sample = f" SAMPLE ({percent:.4f})" if needs_sampling else ""
+            return f"SELECT * FROM {table}{sample} FETCH FIRST {sample_size} ROWS ONLY", params
+        if name == "mysql":
+            if needs_sampling:
+                params["fraction"] = percent / 100.0
+                return f"SELECT * FROM {table} WHERE RAND() < :fraction LIMIT {sample_size}", params
+            return f"SELECT * FROM {table} LIMIT {sample_size}", params
+        if self.dialect.table_sample and needs_sampling:
+            sample = " " + self.dialect.table_sample.format(percent=f"{percent:.4f}")
+            return f"SELECT * FROM {table}{sample} LIMIT {sample_size}", params
+        return f"SELECT * FROM {table} LIMIT {sample_size}", params
+
+    def build_profile_query(
+        self,
+        table_name: str,
+        schema_name: Optional[str],
+        columns: Sequence[ColumnSpec],
+        sample_percent: Optional[float] = None,
+    ) -> str:
+        """Build one SELECT computing every column statistic of the table."""
+        d = self.dialect
+        select_items = ["COUNT(*) AS row_count"]
+        for index, column in enumerate(columns):
+            col = d.quote(column.name)
+            alias = f"c{index}"
+            select_items.append(f"COUNT({col}) AS {alias}_non_null")
+            if d.approx_distinct:
+                select_items.append(f"{d.approx_distinct.format(col=col)} AS {alias}_distinct")
+            else:
+                select_items.append(f"COUNT(DISTINCT {col}) AS {alias}_distinct")
+
+            if column.kind in (ColumnKind.NUMERIC, ColumnKind.TEMPORAL):
+                select_items.append(f"MIN({col}) AS {alias}_min")
+                select_items.append(f"MAX({col}) AS {alias}_max")
+            if column.kind == ColumnKind.NUMERIC:
+                num = d.numeric_cast.format(col=col)
+                select_items.append(f"AVG({num}) AS {alias}_mean")
+                select_items.append(f"{d.stddev_function}({num}) AS {alias}_std")
+                if d.percentile == "array":
+                    points = ",".join(str(p) for p in QUANTILE_POINTS)
+                    select_items.append(
+                        f"percentile_cont(ARRAY[{points}]) WITHIN GROUP (ORDER BY {num}) AS {alias}_pct"
+                    )
+                elif d.percentile:
+                    for p_index, point in enumerate(QUANTILE_POINTS):
+                        select_items.append(
+                            f"{d.percentile.format(col=num, point=point)} AS {alias}_p{p_index}"
+                        )
+            elif column.kind == ColumnKind.TEXT:
+                length = f"{d.length_function}({col})"
+                select_items.append(f"MIN({length}) AS {alias}_min_length")
+                select_items.append(f"MAX({length}) AS {alias}_max_length")
+                select_items.append(f"AVG({length}) AS {alias}_avg_length")
+
+        sample = ""
+        if sample_percent and sample_percent < 100 and d.table_sample:
+            sample = " " + d.table_sample.format(percent=f"{sample_percent:.4f}")
+        return f"SELECT {', '.join(select_items)} FROM {self._qualified(table_name, schema_name)}{sample}"
+
+    def get_columns(self, table_name: str, schema_name: Optional[str] = None) -> List[ColumnSpec]:
+        inspector = inspect(self.engine)
+        return [
+            ColumnSpec(name=c["name"], data_type=str(c["type"]), kind=classify_type(str(c["type"])))
+            for c in inspector.get_columns(table_name, schema=schema_name)
+        ]
+
+    def estimate_row_count(self, table_name: str, schema_name: Optional[str] = None) -> Optional[int]:
+        """Catalog row estimate (no table scan); None when the dialect has no cheap estimate."""
+        if not self.dialect.row_estimate_sql:
+            return None
+        try:
+            with self.engine.connect() as conn:
+                value = conn.execute(
+                    text(self.dialect.row_estimate_sql),
+                    {"table_name": table_name, "schema_name": schema_name},
+                ).scalar()
+            return int(value) if value is not None and int(value) >= 0 else None
+        except Exception as e:
+            logger.debug(f"Row estimate unavailable for {table_name}: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _pushdown_profile(
+        self,
+        table_name: str,
+        schema_name: Optional[str],
+        columns: Sequence[ColumnSpec],
+        sample_percent: Optional[float],
+    ) -> Dict[str, Any]:
+        query = self.build_profile_query(table_name, schema_name, columns, sample_percent)
+        with self.engine.connect() as conn:
+            row = dict(conn.execute(text(query)).mappings().first() or {})
+
+        row_count = int(row.get("row_count") or 0)
+        sampled = bool(sample_percent and sample_percent < 100 and self.dialect.table_sample)
+        profile: Dict[str, Any] = {
+            "row_count": row_count,
+            "column_count": len(columns),
+            "columns": {},
+            "pushdown": True,
+            "sampling": {
+                "method": self.dialect.table_sample.split(" (")[0] if sampled else "none",
+                "percent": sample_percent if sampled else 100.0,
+            },
+        }
+        for index, column in enumerate(columns):
+            alias = f"c{index}"
+            non_null = int(row.get(f"{alias}_non_null") or 0)
+            null_count = row_count - non_null
+            col_profile: Dict[str, Any] = {
+                "data_type": column.data_type,
+                "null_count": null_count,
+                "null_percentage": round(null_count / row_count * 100, 2) if row_count else 0.0,
+                "approx_distinct": _py(row.get(f"{alias}_distinct")),
+            }
+            if column.kind in (ColumnKind.NUMERIC, ColumnKind.TEMPORAL):
+                col_profile["min"] = _py(row.get(f"{alias}_min"))
+                col_profile["max"] = _py(row.get(f"{alias}_max"))
+            if column.kind == ColumnKind.NUMERIC:
+                col_profile["mean"] = _float_or_none(row.get(f"{alias}_mean"))
+                col_profile["std_dev"] = _float_or_none(row.get(f"{alias}_std"))
+                points = row.get(f"{alias}_pct")
+                if points is None and self.dialect.percentile and self.dialect.percentile != "array":
+                    points = [row.get(f"{alias}_p{i}") for i in range(len(QUANTILE_POINTS))]
+                if points is not None:
+                    quantiles = dict(zip(QUANTILE_POINTS, (_float_or_none(p) for p in points)))
+                    col_profile["quartiles"] = {f"{int(q * 100)}%": quantiles.get(q) for q in QUARTILES}
+                    col_profile["median"] = quantiles.get(0.5)
+                    col_profile["histogram"] = _equi_depth_histogram(
+                        [quantiles.get(q) for q in HISTOGRAM_POINTS], non_null
+                    )
+            elif column.kind == ColumnKind.TEXT:
+                col_profile["min_length"] = _py(row.get(f"{alias}_min_length"))
+                col_profile["max_length"] = _py(row.get(f"{alias}_max_length"))
+                col_profile["avg_length"] = _float_or_none(row.get(f"{alias}_avg_length"))
+                distinct = col_profile["approx_distinct"] or 0
+                col_profile["cardinality"] = distinct
+                col_profile["cardinality_ratio"] = round(distinct / non_null * 100, 2) if non_null else 0
+            profile["columns"][column.name] = col_profile
+        return profile
+
+    def _auto_sample_percent(self, estimated_rows: Optional[int]) -> Optional[float]:
+        if not estimated_rows or estimated_rows <= self.target_sample_rows or not self.dialect.table_sample:
+            return None
+        return max(0.01, min(100.0, self.target_sample_rows / estimated_rows * 100))
+
+    def _qualified(self, table_name: str, schema_name: Optional[str]) -> str:
+        table = self.dialect.quote(table_name)
+        return f"{self.dialect.quote(schema_name)}.{table}" if schema_name else table
+
+
+def _float_or_none(value: Any) -> Optional[float]:
+    value = _py(value)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _equi_depth_histogram(points: Sequence[Optional[float]], non_null: int) -> List[Dict[str, Any]]:
+    """Turn decile boundaries into equi-depth buckets (each holds ~10% of non-null rows)."""
+    if any(p is None for p in points):
+        return []
+    per_bucket = non_null / (len(points) - 1) if len(points) > 1 else non_null
+    return [
+        {"lower": points[i], "upper": points[i + 1], "count": round(per_bucket)}
+        for i in range(len(points) - 1)
+    ]
+
+
+def profile_frame(df: Union[pd.DataFrame, "pa.Table"], include_correlations: bool = True) -> Dict[str, Any]:
+    """Profile a sampled DataFrame (or Arrow table) in one vectorized pass over each column family."""
+    if PYARROW_AVAILABLE and isinstance(df, pa.Table):
+        df = table_to_pandas(df)
+    if df.empty:
+        return {"error": "No data to profile"}
+
+    row_count = len(df)
+    null_counts = df.isna().sum()
+    profile: Dict[str, Any] = {"row_count": row_count, "column_count": len(df.columns), "columns": {}}
+    for column in df.columns:
+        nulls = int(null_counts[column])
+        profile["columns"][column] = {
+            "data_type": str(df[column].dtype),
+            "null_count": nulls,
+            "null_percentage": round(nulls / row_count * 100, 2) if row_count else 0.0,
+        }
+
+    numeric = df.select_dtypes(include=[np.number], exclude=["bool"])
+    if not numeric.empty:
+        # One reduction per statistic across every numeric column at once
+        mins, maxs = numeric.min(), numeric.max()
+        means, stds = numeric.mean(), numeric.std()
+        points = numeric.quantile(list(QUANTILE_POINTS))
+        for column in numeric.columns:
+            quantiles = {q: _float_or_none(points.at[q, column]) for q in QUANTILE_POINTS}
+            non_null = row_count - int(null_counts[column])
+            profile["columns"][column].update({
+                "min": _py(mins[column]),
+                "max": _py(maxs[column]),
+                "mean": _float_or_none(means[column]),
+                "median": quantiles[0.5],
+                "std_dev": _float_or_none(stds[column]),
+                "quartiles": {f"{int(q * 100)}%": quantiles[q] for q in QUARTILES},
+                "histogram": _equi_depth_histogram([quantiles[q] for q in HISTOGRAM_POINTS], non_null),
+            })
+
+    objects = df.select_dtypes(include=["object", "string"])
+    for column in objects.columns:
+        values = objects[column].dropna()
+        col_profile = profile["columns"][column]
+        if values.empty:
+            continue
+        as_text = values.astype(str)
+        lengths = as_text.str.len()
+        counts = as_text.value_counts()
+        distinct = int(counts.size)
+        col_profile.update({
+            "min_length": _py(lengths.min()),
+            "max_length": _py(lengths.max()),
+            "avg_length": _float_or_none(lengths.mean()),
+            "top_values": [{"value": str(v), "count": int(c)} for v, c in counts.head(10).items()],
+            "cardinality": distinct,
+            "cardinality_ratio": round(distinct / row_count * 100, 2) if row_count else 0,
+        })
+
+    temporal = df.select_dtypes(include=["datetime", "datetimetz"])
+    if not temporal.empty:
+        mins, maxs = temporal.min(), temporal.max()
+        for column in temporal.columns:
+            profile["columns"][column].update({
+                "min_date": mins[column].strftime('%Y-%m-%d %H:%M:%S') if not pd.isna(mins[column]) else None,
+                "max_date": maxs[column].strftime('%Y-%m-%d %H:%M:%S') if not pd.isna(maxs[column]) else None,
+            })
+
+    if include_correlations and numeric.shape[1] > 1:
+        profile["correlations"] = numeric.corr().round(2).to_dict()
+    return profile
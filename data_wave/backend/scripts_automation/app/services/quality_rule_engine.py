@@ -0,0 +1,684 @@
+"""
+Quality Rule Engine
+Evaluates every data quality rule of an assessment over one shared sample.
+
+``CatalogQualityService.assess_asset_quality`` used to run each rule as its
+own coroutine, and every rule fetched its own sample of the asset (a new
+``DataSourceService`` and a new query per rule) before looping over the
+records in Python. The planner here sizes a single sample for all rules of an
+assessment (the largest ``sample_size`` they ask for; each rule reads its own
+prefix of it). ``QualitySample`` wraps that sample as a DataFrame and
+memoizes the per-column conversions several rules share: null masks, text
+and numeric values. The rules are then evaluated over it with pandas/NumPy
+column operations. Result dictionaries keep the shape of the per-record
+implementations.
+
+Only custom assertions and business-rule expressions, which are arbitrary
+Python, still run per record, over the same shared records.
+"""
+
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_SIZE = 1000
+MAX_ANOMALIES = 10
+MAX_EXAMPLES = 25
+
+
+def _plain(value: Any) -> Any:
+    """NumPy scalars and missing values as JSON-friendly Python values."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return _plain(value.item())
+    if value is pd.NaT:
+        return None
+    return value
+
+
+def _parses_as_date(value: str) -> bool:
+    try:
+        pd.to_datetime(value)
+        return True
+    except Exception:
+        return False
+
+
+class QualitySample:
+    """One asset sample shared by all rules, with memoized column conversions."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.reset_index(drop=True)
+        self.size = len(self.frame)
+        self._heads: Dict[int, "QualitySample"] = {}
+        self._cache: Dict[Tuple[str, str], Any] = {}
+        self._records: Optional[List[Dict[str, Any]]] = None
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "QualitySample":
+        return cls(pd.DataFrame.from_records(list(records)) if records else pd.DataFrame())
+
+    def __len__(self) -> int:
+        return self.size
+
+    def head(self, size: Optional[int]) -> "QualitySample":
+        """The first ``size`` rows (what a rule asking for a smaller sample would have read)."""
+        if size is None or size >= self.size:
+            return self
+        size = max(0, int(size))
+        if size not in self._heads:
+            self._heads[size] = QualitySample(self.frame.iloc[:size])
+        return self._heads[size]
+
+    def _memo(self, kind: str, column: str, compute: Callable[[], Any]) -> Any:
+        key = (kind, column)
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def column(self, column: str) -> pd.Series:
+        """Column values; a column missing from the sample reads as all nulls."""
+        if column in self.frame.columns:
+            return self.frame[column]
+        return pd.Series([None] * self.size, dtype=object)
+
+    def nulls(self, column: str) -> np.ndarray:
+        return self._memo("nulls", column, lambda: self.column(column).isna().to_numpy())
+
+    def blanks(self, column: str) -> np.ndarray:
+        """Null or empty-string values."""
+        def compute():
+            values = self.column(column)
+            blank = self.nulls(column).copy()
+            if values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+                blank |= (values == "").fillna(False).to_numpy(dtype=bool)
+            return blank
+        return self._memo("blanks", column, compute)
+
+    def text(self, column: str) -> pd.Series:
+        """``str(value)`` for every non-null value (nulls stay missing)."""
+        def compute():
+            values = self.column(column)
+            return values.astype(str).where(~self.nulls(column))
+        return self._memo("text", column, compute)
+
+    def numbers(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """``float(value)`` for every value, with the mask of non-null values that converted."""
+        def compute():
+            values = self.column(column)
+            if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+                converted = values.astype(float).to_numpy()
+            else:
+                converted = pd.to_numeric(values, errors="coerce").astype(float).to_numpy()
+            return converted, ~self.nulls(column) & ~np.isnan(converted)
+        return self._memo("numbers", column, compute)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Row dictionaries (nulls as None) for rules that evaluate Python per record."""
+        if self._records is None:
+            frame = self.frame.astype(object).where(self.frame.notna(), None)
+            self._records = frame.to_dict("records")
+        return self._records
+
+
+def _parameters(rule) -> Dict[str, Any]:
+    return getattr(rule, "parameters", None) or {}
+
+
+def _thresholds(rule) -> Dict[str, Any]:
+    return getattr(rule, "thresholds", None) or {}
+
+
+# ---------------------------------------------------------------------------
+# Rule evaluators: (rule, sample) -> result dictionary
+# ---------------------------------------------------------------------------
+
+def null_check(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Check for null/missing values"""
+    column = _parameters(rule).get("column")
+    total_records = len(sample)
+    if column:
+        null_count = int(sample.blanks(column).sum())
+    else:
+        blank_rows = np.zeros(total_records, dtype=bool)
+        for name in sample.frame.columns:
+            blank_rows |= sample.blanks(name)
+        null_count = int(blank_rows.sum())
+
+    null_rate = null_count / total_records if total_records > 0 else 1.0
+    threshold = _thresholds(rule).get("max_null_rate", 0.05)
+    passed = null_rate <= threshold
+    return {
+        "passed": passed,
+        "score": (1.0 - null_rate) * 100,
+        "total_records": total_records,
+        "passed_records": total_records - null_count,
+        "failed_records": null_count,
+        "details": {
+            "null_count": null_count,
+            "null_rate": null_rate,
+            "threshold": threshold,
+            "column": column
+        },
+        "recommendations": [
+            "Consider making fields required if nulls are not acceptable",
+            "Implement data validation at input points",
+            "Review data collection processes"
+        ] if not passed else []
+    }
+
+
+def range_check(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Check if values are within expected ranges"""
+    params = _parameters(rule)
+    column = params.get("column")
+    min_value = params.get("min_value")
+    max_value = params.get("max_value")
+    if not column or (min_value is None and max_value is None):
+        return {"passed": False, "error": "Invalid rule parameters"}
+
+    total_records = len(sample)
+    values, numeric = sample.numbers(column)
+    out_of_range = np.zeros(total_records, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        if min_value is not None:
+            out_of_range |= values < min_value
+        if max_value is not None:
+            out_of_range |= values > max_value
+    out_of_range &= numeric
+    # Non-null values that are not numbers count as violations too
+    violations = int(out_of_range.sum() + (~sample.nulls(column) & ~numeric).sum())
+    outliers = [
+        {"record_index": int(i), "value": float(values[i]), "expected_range": f"[{min_value}, {max_value}]"}
+        for i in np.flatnonzero(out_of_range)[:MAX_ANOMALIES]
+    ]
+
+    compliance_rate = (total_records - violations) / total_records if total_records > 0 else 0.0
+    threshold = _thresholds(rule).get("min_compliance_rate", 0.95)
+    passed = compliance_rate >= threshold
+    return {
+        "passed": passed,
+        "score": compliance_rate * 100,
+        "total_records": total_records,
+        "passed_records": total_records - violations,
+        "failed_records": violations,
+        "details": {
+            "violations": violations,
+            "compliance_rate": compliance_rate,
+            "range": {"min": min_value, "max": max_value},
+            "threshold": threshold
+        },
+        "anomalies": outliers,
+        "recommendations": [
+            "Review data entry processes for out-of-range values",
+            "Implement input validation with proper range checks",
+            "Investigate sources of outlier values"
+        ] if not passed else []
+    }
+
+
+def format_check(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Check if values match expected format patterns"""
+    params = _parameters(rule)
+    column = params.get("column")
+    pattern = params.get("pattern")
+    format_type = params.get("format_type", "regex")
+    if not column or not pattern:
+        return {"passed": False, "error": "Invalid rule parameters"}
+    if format_type == "regex":
+        try:
+            regex_pattern = re.compile(pattern)
+        except re.error as e:
+            return {"passed": False, "error": f"Invalid regex pattern: {e}"}
+
+    total_records = len(sample)
+    present = ~sample.nulls(column)
+    values = sample.text(column)[present]
+    if format_type == "regex":
+        valid = values.map(lambda value: regex_pattern.match(value) is not None)
+    elif format_type == "email":
+        domains = values.str.rsplit("@", n=1).str[-1]
+        valid = values.str.contains("@", regex=False) & domains.str.contains(".", regex=False)
+    elif format_type == "phone":
+        digits = values.str.count(r"\d")
+        valid = (digits >= 7) & (digits <= 15)
+    elif format_type == "date":
+        valid = values.map(_parses_as_date)
+    else:
+        valid = pd.Series(False, index=values.index)
+    invalid = values[~valid.to_numpy(dtype=bool)]
+    violations = len(invalid)
+    invalid_values = [
+        {"record_index": int(i), "value": value, "expected_format": pattern}
+        for i, value in invalid.iloc[:MAX_ANOMALIES].items()
+    ]
+
+    compliance_rate = (total_records - violations) / total_records if total_records > 0 else 0.0
+    threshold = _thresholds(rule).get("min_compliance_rate", 0.95)
+    passed = compliance_rate >= threshold
+    return {
+        "passed": passed,
+        "score": compliance_rate * 100,
+        "total_records": total_records,
+        "passed_records": total_records - violations,
+        "failed_records": violations,
+        "details": {
+            "violations": violations,
+            "compliance_rate": compliance_rate,
+            "pattern": pattern,
+            "format_type": format_type,
+            "threshold": threshold
+        },
+        "anomalies": invalid_values,
+        "recommendations": [
+            "Standardize data entry formats",
+            "Implement format validation at data input",
+            "Consider data cleansing for existing records"
+        ] if not passed else []
+    }
+
+
+def uniqueness_check(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Check for duplicate values"""
+    columns = _parameters(rule).get("columns", [])
+    if not columns:
+        return {"passed": False, "error": "No columns specified for uniqueness check"}
+
+    total_records = len(sample)
+    keys = None
+    for column in columns:
+        part = sample.text(column).fillna("NULL")
+        keys = part if keys is None else keys + "|" + part
+    duplicated = keys.duplicated(keep="first").to_numpy()
+    duplicate_count = int(duplicated.sum())
+    duplicates = [
+        {
+            "record_index": int(i),
+            "key": keys.iloc[i],
+            "values": {column: _plain(sample.column(column).iloc[i]) for column in columns}
+        }
+        for i in np.flatnonzero(duplicated)[:MAX_ANOMALIES]
+    ]
+
+    uniqueness_rate = (total_records - duplicate_count) / total_records if total_records > 0 else 1.0
+    threshold = _thresholds(rule).get("min_uniqueness_rate", 1.0)
+    passed = uniqueness_rate >= threshold
+    return {
+        "passed": passed,
+        "score": uniqueness_rate * 100,
+        "total_records": total_records,
+        "passed_records": total_records - duplicate_count,
+        "failed_records": duplicate_count,
+        "details": {
+            "duplicate_count": duplicate_count,
+            "uniqueness_rate": uniqueness_rate,
+            "checked_columns": columns,
+            "threshold": threshold,
+            "unique_values": int(keys.nunique())
+        },
+        "anomalies": duplicates,
+        "recommendations": [
+            "Implement unique constraints at database level",
+            "Review data integration processes for duplicates",
+            "Consider deduplication procedures"
+        ] if not passed else []
+    }
+
+
+def statistical_outlier(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Detect statistical outliers using IQR or Z-score methods"""
+    params = _parameters(rule)
+    column = params.get("column")
+    method = params.get("method", "iqr")  # iqr or zscore
+    threshold = params.get("threshold", 3.0)
+    if not column:
+        return {"passed": False, "error": "No column specified"}
+
+    converted, numeric = sample.numbers(column)
+    indices = np.flatnonzero(numeric)
+    values = converted[indices]
+    if len(values) < 3:
+        return {"passed": False, "error": "Insufficient numeric data"}
+
+    if method == "iqr":
+        q1, q3 = np.percentile(values, [25, 75])
+        iqr = q3 - q1
+        lower_bound, upper_bound = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        flagged = (values < lower_bound) | (values > upper_bound)
+        outliers = [
+            {
+                "record_index": int(indices[i]),
+                "value": float(values[i]),
+                "bounds": {"lower": float(lower_bound), "upper": float(upper_bound)},
+                "method": "iqr"
+            }
+            for i in np.flatnonzero(flagged)[:MAX_ANOMALIES]
+        ]
+    elif method == "zscore":
+        mean_val, std_val = values.mean(), values.std()
+        z_scores = np.abs((values - mean_val) / std_val) if std_val > 0 else np.zeros(len(values))
+        flagged = z_scores > threshold
+        outliers = [
+            {
+                "record_index": int(indices[i]),
+                "value": float(values[i]),
+                "z_score": float(z_scores[i]),
+                "threshold": threshold,
+                "method": "zscore"
+            }
+            for i in np.flatnonzero(flagged)[:MAX_ANOMALIES]
+        ]
+    else:
+        flagged = np.zeros(len(values), dtype=bool)
+        outliers = []
+
+    outlier_count = int(flagged.sum())
+    outlier_rate = outlier_count / len(values)
+    max_outlier_rate = _thresholds(rule).get("max_outlier_rate", 0.05)
+    passed = outlier_rate <= max_outlier_rate
+    return {
+        "passed": passed,
+        "score": (1.0 - outlier_rate) * 100,
+        "total_records": len(sample),
+        "passed_records": len(values) - outlier_count,
+        "failed_records": outlier_count,
+        "details": {
+            "outlier_count": outlier_count,
+            "outlier_rate": outlier_rate,
+            "method": method,
+            "threshold": threshold,
+            "max_outlier_rate": max_outlier_rate,
+            "statistics": {
+                "mean": float(values.mean()),
+                "std": float(values.std()),
+                "min": float(values.min()),
+                "max": float(values.max())
+            }
+        },
+        "anomalies": outliers,
+        "recommendations": [
+            "Investigate outlier values for data entry errors",
+            "Consider if outliers represent valid edge cases",
+            "Review data collection and validation processes"
+        ] if not passed else []
+    }
+
+
+def referential_integrity(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Check referential integrity of a column against ``reference_values``."""
+    params = _parameters(rule)
+    column = params.get("column")
+    allow_nulls = params.get("allow_nulls", True)
+    threshold = _thresholds(rule).get("max_missing_rate", 0.01)
+    if not column:
+        return {"passed": False, "error": "Missing 'column' parameter"}
+
+    reference_values = list(set(params.get("reference_values", [])))
+    total_records = len(sample)
+    nulls = sample.nulls(column)
+    violations = int(nulls.sum()) if not allow_nulls else 0
+    if reference_values:
+        missing = ~nulls & ~sample.column(column).isin(reference_values).to_numpy()
+        violations += int(missing.sum())
+
+    missing_rate = violations / max(1, total_records)
+    passed = missing_rate <= threshold
+    return {
+        "passed": passed,
+        "score": max(0.0, (1.0 - missing_rate) * 100.0),
+        "total_records": total_records,
+        "passed_records": total_records - violations,
+        "failed_records": violations,
+        "details": {
+            "checked": int((~nulls).sum()),
+            "nulls": int(nulls.sum()),
+            "missing_rate": missing_rate,
+            "threshold": threshold,
+            "reference_mode": "explicit_values" if reference_values else "not_provided"
+        },
+        "recommendations": [] if passed else [
+            "Populate missing foreign key values",
+            "Ensure referential set is synchronized and configured in rule.parameters.reference_values"
+        ]
+    }
+
+
+def custom_assertion(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Evaluate a custom assertion over the sampled records with a restricted evaluator."""
+    params = _parameters(rule)
+    assertion = params.get("assertion")
+    if not assertion:
+        return {"passed": False, "error": "Missing 'assertion' parameter"}
+
+    records = sample.records()
+    safe_globals = {
+        "__builtins__": {},
+        "sum": sum,
+        "min": min,
+        "max": max,
+        "len": len,
+        "all": all,
+        "any": any,
+    }
+
+    def col(name: str):
+        return [r.get(name) for r in records]
+
+    try:
+        result = bool(eval(assertion, safe_globals, {"records": records, "col": col}))
+    except Exception as eval_err:
+        return {"passed": False, "error": f"Assertion evaluation error: {eval_err}"}
+
+    return {
+        "passed": result,
+        "score": 100.0 if result else 0.0,
+        "total_records": len(records),
+        "details": {"assertion": assertion},
+        "recommendations": [] if result else [params.get("failure_message") or "Review the custom assertion and underlying data"]
+    }
+
+
+def pattern_match(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Regex validation across one or more columns."""
+    params = _parameters(rule)
+    columns = params.get("columns")
+    pattern = params.get("pattern")
+    if not columns or not pattern:
+        return {"passed": False, "error": "Missing 'columns' or 'pattern' parameter"}
+    flags = re.IGNORECASE if params.get("case_insensitive", True) else 0
+    try:
+        regex = re.compile(pattern, flags)
+    except re.error as re_err:
+        return {"passed": False, "error": f"Invalid regex: {re_err}"}
+
+    total_records = len(sample)
+    use_full = params.get("fullmatch", False)
+    test = regex.fullmatch if use_full else regex.search
+    # violations[i, j]: non-null cell of row i, column j that does not match
+    violations = np.zeros((total_records, len(columns)), dtype=bool)
+    for j, column in enumerate(columns):
+        present = ~sample.nulls(column)
+        values = sample.text(column)[present]
+        violations[present, j] = ~values.map(lambda value: test(value) is not None).to_numpy(dtype=bool)
+    violation_count = int(violations.sum())
+    invalid_values = []
+    for cell in np.flatnonzero(violations)[:MAX_EXAMPLES]:
+        i, j = divmod(int(cell), len(columns))
+        invalid_values.append({"index": i, "column": columns[j], "value": sample.text(columns[j]).iloc[i]})
+
+    evaluated = max(1, total_records * len(columns))
+    compliance_rate = (evaluated - violation_count) / evaluated
+    threshold = _thresholds(rule).get("min_compliance_rate", 0.95)
+    passed = compliance_rate >= threshold
+    return {
+        "passed": passed,
+        "score": max(0.0, compliance_rate * 100.0),
+        "total_records": total_records,
+        "passed_records": int(evaluated - violation_count),
+        "failed_records": violation_count,
+        "details": {
+            "columns": columns,
+            "pattern": pattern,
+            "compliance_rate": compliance_rate,
+            "threshold": threshold,
+            "checked_cells": evaluated,
+            "invalid_examples": invalid_values
+        },
+        "recommendations": [] if passed else [
+            "Standardize input formats and update upstream validations",
+            "Consider refining regex pattern or adjusting acceptable formats"
+        ]
+    }
+
+
+def business_rule(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Evaluate a boolean expression over each record ``r``."""
+    params = _parameters(rule)
+    expression = params.get("expression")
+    if not expression:
+        return {"passed": False, "error": "Missing 'expression' parameter"}
+
+    code = compile(expression, "<business rule>", "eval")
+    safe_globals = {"__builtins__": {}}
+    passed_count = 0
+    errors = 0
+    for r in sample.records():
+        try:
+            if bool(eval(code, safe_globals, {"r": r})):
+                passed_count += 1
+        except Exception:
+            errors += 1
+
+    total = len(sample)
+    pass_rate = passed_count / max(1, total - errors)
+    threshold = params.get("min_pass_rate", 0.99)
+    passed = pass_rate >= threshold and errors == 0
+    return {
+        "passed": passed,
+        "score": max(0.0, pass_rate * 100.0),
+        "total_records": total,
+        "passed_records": passed_count,
+        "failed_records": max(0, total - passed_count - errors),
+        "details": {
+            "pass_rate": pass_rate,
+            "threshold": threshold,
+            "evaluation_errors": errors,
+            "expression": expression
+        },
+        "recommendations": [] if passed else [
+            "Review the business rule and data anomalies",
+            "Tighten data entry validations or adjust the rule threshold appropriately"
+        ]
+    }
+
+
+def cross_reference(rule, sample: QualitySample) -> Dict[str, Any]:
+    """Cross-reference validation against a reference set and/or a source-implies-target column pair."""
+    params = _parameters(rule)
+    source_column = params.get("source_column")
+    target_column = params.get("target_column")
+    reference_set = list(set(params.get("reference_set", [])))
+    if not source_column and not target_column and not reference_set:
+        return {"passed": False, "error": "Specify 'source_column' and at least one of 'target_column' or 'reference_set'"}
+
+    total = len(sample)
+    outside = np.zeros(total, dtype=bool)
+    unmatched = np.zeros(total, dtype=bool)
+    if source_column:
+        source = sample.column(source_column)
+        present = ~sample.nulls(source_column)
+        if reference_set:
+            outside = present & ~source.isin(reference_set).to_numpy()
+        if target_column:
+            truthy = present.copy()
+            truthy[present] = source[present].map(bool).to_numpy(dtype=bool)
+            unmatched = truthy & sample.blanks(target_column)
+    violations = int(outside.sum() + unmatched.sum())
+
+    examples = []
+    for i in np.flatnonzero(outside | unmatched):
+        if len(examples) >= MAX_EXAMPLES:
+            break
+        src = _plain(sample.column(source_column).iloc[i])
+        if outside[i]:
+            examples.append({"index": int(i), "value": src})
+        if unmatched[i] and len(examples) < MAX_EXAMPLES:
+            examples.append({"index": int(i), "source": src, "target": _plain(sample.column(target_column).iloc[i])})
+
+    violation_rate = violations / max(1, total)
+    threshold = params.get("max_violation_rate", 0.01)
+    passed = violation_rate <= threshold
+    return {
+        "passed": passed,
+        "score": max(0.0, (1.0 - violation_rate) * 100.0),
+        "total_records": total,
+        "passed_records": total - violations,
+        "failed_records": violations,
+        "details": {
+            "violation_rate": violation_rate,
+            "threshold": threshold,
+            "reference_mode": "set" if reference_set else "column_implication",
+            "examples": examples
+        },
+        "recommendations": [] if passed else [
+            "Align cross-reference mappings and ensure target fields are populated",
+            "Update reference set or cleanse source values to meet governance rules"
+        ]
+    }
+
+
+# Keyed by ``QualityRuleType`` value
+RULE_EVALUATORS: Dict[str, Callable[[Any, QualitySample], Dict[str, Any]]] = {
+    "null_check": null_check,
+    "range_check": range_check,
+    "format_check": format_check,
+    "uniqueness_check": uniqueness_check,
+    "referential_integrity": referential_integrity,
+    "custom_sql": custom_assertion,
+    "pattern_match": pattern_match,
+    "statistical_outlier": statistical_outlier,
+    "business_rule": business_rule,
+    "cross_reference": cross_reference,
+}
+
+
+def plan_sample_size(rules: Sequence[Any]) -> int:
+    """One sample large enough for every rule of the assessment."""
+    return max((int(_parameters(rule).get("sample_size", DEFAULT_SAMPLE_SIZE)) for rule in rules),
+               default=DEFAULT_SAMPLE_SIZE)
+
+
+def evaluate_rules(rules: Sequence[Any], sample: QualitySample,
+                   evaluators: Optional[Dict[Any, Callable]] = None) -> List[Tuple[Any, float]]:
+    """Evaluate every rule over the shared sample.
+
+    Returns ``(result, execution_ms)`` per rule, in order; ``result`` is the
+    rule's result dictionary, or the exception raised for an unknown rule type.
+    """
+    evaluators = RULE_EVALUATORS if evaluators is None else evaluators
+    results: List[Tuple[Any, float]] = []
+    for rule in rules:
+        started = time.perf_counter()
+        rule_type = getattr(rule.rule_type, "value", rule.rule_type)
+        evaluator = evaluators.get(rule_type)
+        if evaluator is None:
+            result: Any = ValueError(f"Unknown rule type: {rule.rule_type}")
+        else:
+            rule_sample = sample.head(_parameters(rule).get("sample_size", DEFAULT_SAMPLE_SIZE))
+            if len(rule_sample) == 0:
+                result = {"passed": False, "error": "No data available"}
+            else:
+                try:
+                    result = evaluator(rule, rule_sample)
+                except Exception as e:
+                    logger.error(f"Quality rule {rule_type} failed: {e}")
+                    result = {"passed": False, "error": str(e)}
+        results.append((result, (time.perf_counter() - started) * 1000))
+    return results
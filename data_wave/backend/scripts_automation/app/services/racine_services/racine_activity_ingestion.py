@@ -0,0 +1,165 @@
+"""
+Racine Activity Ingestion
+=========================
+
+Write-behind batching for activity tracking.
+
+``RacineActivityService.track_activity`` used to enrich, insert, log, match
+streams, correlate, check alerts, update metrics and commit inline, so every
+tracked activity cost an API request several database round trips.
+
+The request path now only appends a plain record to a bounded in-memory
+buffer. A flush, triggered every ``flush_interval`` seconds on the shared loop
+scheduler or as soon as a full batch is waiting, hands batches to a writer
+running in a worker thread, which persists and post-processes a whole batch in
+one transaction.
+
+Durability trade-offs:
+
+- Accepted records that have not been flushed yet (at most one interval or one
+  batch) are lost if the process dies without a graceful shutdown.
+- When the buffer is full the oldest records are dropped (load shedding keeps
+  the request path non-blocking); drops are counted in ``get_stats()``.
+- A batch whose write fails is retried on the following flushes, up to
+  ``max_attempts`` times, and is then dropped and logged.
+- ``shutdown_ingestion_pipelines()`` (application shutdown) flushes every
+  pipeline before the event loop stops.
+- Tracked activities become visible to readers after the next flush.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..scheduler import get_loop_scheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_BUFFER = 50000
+DEFAULT_FLUSH_INTERVAL_SECONDS = 1.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+BatchWriter = Callable[[List[Dict[str, Any]]], Any]
+
+_pipelines: List["ActivityIngestionPipeline"] = []
+
+
+class ActivityIngestionPipeline:
+    """Bounded buffer in front of a batch writer, flushed on the loop scheduler."""
+
+    def __init__(
+        self,
+        writer: BatchWriter,
+        name: str = "racine_activity_ingestion",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_buffer: int = DEFAULT_MAX_BUFFER,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.writer = writer
+        self.name = name
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._retries: Deque[Tuple[int, List[Dict[str, Any]]]] = deque()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        self._stats = {
+            "accepted": 0, "written": 0, "dropped_overflow": 0, "dropped_failed": 0,
+            "batches": 0, "failed_batches": 0, "last_flush_seconds": 0.0,
+        }
+        _pipelines.append(self)
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """Accept one record; O(1) and never touches the database."""
+        if self._closed:
+            raise RuntimeError(f"Ingestion pipeline '{self.name}' is shut down")
+        if len(self._buffer) >= self.max_buffer:
+            self._buffer.popleft()
+            self._stats["dropped_overflow"] += 1
+        self._buffer.append(record)
+        self._stats["accepted"] += 1
+        scheduler = get_loop_scheduler()
+        if not scheduler.is_scheduled(self.name):
+            scheduler.call_every(self.name, self.flush_interval, self.flush)
+        if len(self._buffer) == self.batch_size:
+            scheduler.call_later(f"{self.name}:full_batch", 0, self.flush)
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of records written."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            written = 0
+            pending = len(self._retries)
+            while pending:
+                pending -= 1
+                attempts, batch = self._retries.popleft()
+                written += await self._write(batch, attempts)
+            while self._buffer:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                written += await self._write(batch, 0)
+            return written
+
+    async def _write(self, batch: List[Dict[str, Any]], attempts: int) -> int:
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self.writer, batch)
+        except Exception as e:
+            attempts += 1
+            self._stats["failed_batches"] += 1
+            if attempts < self.max_attempts:
+                logger.warning(f"Ingestion batch of {len(batch)} failed (attempt {attempts}), will retry: {e}")
+                self._retries.append((attempts, batch))
+            else:
+                logger.error(f"Dropping ingestion batch of {len(batch)} after {attempts} attempts: {e}")
+                self._stats["dropped_failed"] += len(batch)
+            return 0
+        self._stats["batches"] += 1
+        self._stats["written"] += len(batch)
+        self._stats["last_flush_seconds"] = time.perf_counter() - started
+        return len(batch)
+
+    async def shutdown(self, timeout: float = 30.0) -> None:
+        """Stop accepting records and flush what is buffered (including pending retries)."""
+        self._closed = True
+        scheduler = get_loop_scheduler()
+        scheduler.cancel(self.name)
+        scheduler.cancel(f"{self.name}:full_batch")
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+            # One more pass for batches that failed during the final flush
+            if self._retries:
+                await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out flushing ingestion pipeline '{self.name}'")
+        remaining = len(self._buffer) + sum(len(batch) for _, batch in self._retries)
+        if remaining:
+            logger.error(f"Ingestion pipeline '{self.name}' shut down with {remaining} unwritten records")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "buffered": len(self._buffer),
+            "retrying": sum(len(batch) for _, batch in self._retries),
+        }
+
+
+async def shutdown_ingestion_pipelines(timeout: float = 30.0) -> None:
+    """Flush every ingestion pipeline created in this process (application shutdown)."""
+    for pipeline in list(_pipelines):
+        if not pipeline._closed:
+            await pipeline.shutdown(timeout)
@@ -3,7 +3,8 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, insert
+import threading
 import uuid
 import json
 
@@ -35,9 +36,387 @@ from ...models.racine_models.racine_activity_models import (
     ActivitySeverity as AlertSeverity
 )
 from ...models.auth_models import User
+from ...db_session import get_sync_db_session
+from .racine_activity_ingestion import ActivityIngestionPipeline
+from .racine_activity_subscriptions import ActivitySubscriptionIndex
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PRIMARY_GROUP = "racine"
+
+# Correlation analysis over each ingested batch
+CORRELATION_WINDOW = timedelta(minutes=30)
+CORRELATION_THRESHOLD = 0.7
+CORRELATION_CANDIDATES = 20  # Correlations kept per activity
+CORRELATION_SCAN_LIMIT = 5000  # Most recent stored activities considered per batch
+
+# Full resync of the subscription index (catches deleted streams and changed alerts)
+SUBSCRIPTION_RESYNC_INTERVAL = timedelta(minutes=5)
+
+
+def _activity_name(record: Dict[str, Any]) -> str:
+    return f"{record['activity_type'].value}:{record['activity_category']}"
+
+
+def correlation_strength(first: Dict[str, Any], second: Dict[str, Any]) -> float:
+    """Correlation strength between two activity records (same weights as the service method)."""
+    strength = 0.0
+    if abs((first["created_at"] - second["created_at"]).total_seconds()) < 300:
+        strength += 0.3
+    if first["user_id"] == second["user_id"]:
+        strength += 0.3
+    if first["resource_id"] is not None and first["resource_id"] == second["resource_id"]:
+        strength += 0.4
+    if first["workspace_id"] is not None and first["workspace_id"] == second["workspace_id"]:
+        strength += 0.2
+    return min(strength, 1.0)
+
+
+class RacineActivityBatchWriter:
+    """Persists one ingested batch of activities and runs its follow-up processing in one transaction."""
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        now = datetime.utcnow()
+        user_contexts = self._load_user_contexts({record["user_id"] for record in records})
+
+        activity_rows, log_rows = [], []
+        for record in records:
+            details = self._enrich(record, user_contexts, now)
+            activity_rows.append({
+                "id": record["id"],
+                "activity_name": _activity_name(record),
+                "activity_type": record["activity_type"],
+                "activity_category": record["activity_category"],
+                "status": ActivityStatus.COMPLETED,
+                "severity": ActivitySeverity.INFO,
+                "activity_data": details,
+                "activity_metadata": {
+                    "tracking_source": "api",
+                    "session_id": details.get("session_id"),
+                    "resource_id": record["resource_id"],
+                    "resource_type": record["resource_type"],
+                    "workspace_id": record["workspace_id"],
+                    "enriched": True
+                },
+                "user_context": details["user_context"],
+                "system_context": details["system_context"],
+                "primary_group": record["group_name"] or DEFAULT_PRIMARY_GROUP,
+                "ip_address": details.get("ip_address"),
+                "user_agent": details.get("user_agent"),
+                "user_id": record["user_id"],
+                "started_at": record["created_at"],
+                "completed_at": record["created_at"],
+                "created_at": record["created_at"]
+            })
+            log_rows.append({
+                "id": str(uuid.uuid4()),
+                "log_level": "INFO",
+                "message": f"Activity {record['activity_type'].value} performed by user {record['user_id']}",
+                "log_category": "activity_tracker",
+                "log_data": details,
+                "context_data": {
+                    "activity_type": record["activity_type"].value,
+                    "activity_category": record["activity_category"],
+                    "has_resource": record["resource_id"] is not None
+                },
+                "activity_id": record["id"],
+                "sequence_number": 1,
+                "timestamp": record["created_at"]
+            })
+
+        self.db.execute(insert(RacineActivity), activity_rows)
+        self.db.execute(insert(RacineActivityLog), log_rows)
+
+        subscriptions = refresh_subscription_index(self.db, now)
+        for model, rows in (
+            (RacineActivityStreamEvent, self._stream_events(records, subscriptions)),
+            (RacineActivityCorrelation, self._correlations(records)),
+            (RacineActivityMetrics, self._metric_rows(records, now)),
+        ):
+            if rows:
+                self.db.execute(insert(model), rows)
+        self._check_alerts(records, subscriptions, now)
+
+    def _load_user_contexts(self, user_ids: set) -> Dict[str, Dict[str, Any]]:
+        users = self.db.query(User).filter(User.id.in_([user_id for user_id in user_ids if user_id is not None])).all()
+        return {
+            str(user.id): {
+                "user_id": str(user.id),
+                "username": getattr(user, 'username', None) or getattr(user, 'email', 'Unknown'),
+                "role": getattr(user, 'role', 'user')
+            }
+            for user in users
+        }
+
+    @staticmethod
+    def _enrich(record: Dict[str, Any], user_contexts: Dict[str, Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+        enriched = record["details"]
+        enriched["user_context"] = user_contexts.get(
+            str(record["user_id"]), {"user_id": record["user_id"], "username": "Unknown", "role": "user"}
+        )
+        if record["resource_id"] and record["resource_type"] and record["group_name"]:
+            enriched["resource_context"] = {
+                "resource_id": record["resource_id"],
+                "resource_type": record["resource_type"],
+                "group_name": record["group_name"],
+                "context_retrieved": now.isoformat()
+            }
+        enriched["system_context"] = {
+            "timestamp": record["created_at"].isoformat(),
+            "activity_id": record["id"],
+            "system_version": "1.0.0"
+        }
+        if record["group_name"]:
+            enriched["cross_group_context"] = {
+                "group_name": record["group_name"],
+                "activity_type": record["activity_type"].value,
+                "cross_group_services": list(record.get("cross_group_services") or ())
+            }
+        return enriched
+
+    @staticmethod
+    def _stream_events(records: List[Dict[str, Any]], subscriptions: ActivitySubscriptionIndex) -> List[Dict[str, Any]]:
+        events = []
+        for record in records:
+            for stream in subscriptions.match("stream", record):
+                events.append({
+                    "id": str(uuid.uuid4()),
+                    "event_type": record["activity_type"].value,
+                    "event_data": {
+                        "activity_type": record["activity_type"].value,
+                        "user_id": record["user_id"],
+                        "resource_id": record["resource_id"],
+                        "timestamp": record["created_at"].isoformat(),
+                        "stream_type": stream.payload.get("stream_type")
+                    },
+                    "original_activity_id": record["id"],
+                    "processing_status": "pending",
+                    "stream_id": stream.subscription_id,
+                    "event_timestamp": record["created_at"]
+                })
+        return events
+
+    def _correlations(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Temporal correlations for the batch, looking up candidates by shared user or resource."""
+        window_start = min(record["created_at"] for record in records) - CORRELATION_WINDOW
+        window_end = max(record["created_at"] for record in records) + CORRELATION_WINDOW
+        batch_ids = {record["id"] for record in records}
+        stored = self.db.query(
+            RacineActivity.id, RacineActivity.created_at, RacineActivity.user_id, RacineActivity.activity_metadata
+        ).filter(
+            and_(RacineActivity.created_at >= window_start, RacineActivity.created_at <= window_end)
+        ).order_by(RacineActivity.created_at.desc()).limit(CORRELATION_SCAN_LIMIT).all()
+
+        candidates = list(records)
+        for activity_id, created_at, user_id, metadata in stored:
+            if activity_id in batch_ids:
+                continue
+            metadata = metadata or {}
+            candidates.append({
+                "id": activity_id,
+                "created_at": created_at,
+                "user_id": user_id,
+                "resource_id": metadata.get("resource_id"),
+                "workspace_id": metadata.get("workspace_id")
+            })
+
+        # Every pair above the threshold shares the user or the resource
+        by_user: Dict[Any, List[Dict[str, Any]]] = {}
+        by_resource: Dict[Any, List[Dict[str, Any]]] = {}
+        for candidate in candidates:
+            by_user.setdefault(candidate["user_id"], []).append(candidate)
+            if candidate["resource_id"] is not None:
+                by_resource.setdefault(candidate["resource_id"], []).append(candidate)
+
+        correlations = []
+        seen = set()
+        for record in records:
+            found = 0
+            related = by_user.get(record["user_id"], []) + by_resource.get(record["resource_id"], [])
+            for candidate in related:
+                if found >= CORRELATION_CANDIDATES:
+                    break
+                pair = frozenset((record["id"], candidate["id"]))
+                if candidate["id"] == record["id"] or pair in seen:
+                    continue
+                if abs(candidate["created_at"] - record["created_at"]) > CORRELATION_WINDOW:
+                    continue
+                seen.add(pair)
+                strength = correlation_strength(record, candidate)
+                if strength <= CORRELATION_THRESHOLD:
+                    continue
+                found += 1
+                correlations.append({
+                    "id": str(uuid.uuid4()),
+                    "correlation_type": "temporal",
+                    "correlation_name": f"temporal:{record['id']}:{candidate['id']}",
+                    "confidence_score": strength,
+                    "correlation_data": {
+                        "time_diff_seconds": abs((record["created_at"] - candidate["created_at"]).total_seconds()),
+                        "same_user": record["user_id"] == candidate["user_id"],
+                        "same_resource": record["resource_id"] == candidate["resource_id"]
+                    },
+                    "primary_activity_id": record["id"],
+                    "related_activity_ids": [candidate["id"]],
+                    "time_window_start": record["created_at"] - CORRELATION_WINDOW,
+                    "time_window_end": record["created_at"] + CORRELATION_WINDOW,
+                    "discovery_method": "ingestion_batch"
+                })
+        return correlations
+
+    def _check_alerts(self, records: List[Dict[str, Any]], subscriptions: ActivitySubscriptionIndex, now: datetime) -> None:
+        candidates: Dict[str, List[Dict[str, Any]]] = {}
+        criteria_by_alert: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            for subscription in subscriptions.match("alert", record):
+                candidates.setdefault(subscription.subscription_id, []).append(record)
+                criteria_by_alert[subscription.subscription_id] = subscription.criteria
+        if not candidates:
+            return
+
+        recent_counts: Dict[int, Dict[tuple, int]] = {}
+        triggered: Dict[str, List[Dict[str, Any]]] = {}
+        for alert_id, alert_records in candidates.items():
+            criteria = criteria_by_alert[alert_id]
+            window = int(criteria.get("time_window_minutes", 60))
+            if window not in recent_counts:
+                recent_counts[window] = self._count_recent(records, now - timedelta(minutes=window))
+            counts = recent_counts[window]
+            matched = [
+                record for record in alert_records
+                if counts.get((record["activity_type"], record["user_id"]), 0) >= criteria["frequency_threshold"]
+            ]
+            if matched:
+                triggered[alert_id] = matched
+        if not triggered:
+            return
+
+        alerts = self.db.query(RacineActivityAlert).filter(RacineActivityAlert.id.in_(list(triggered))).all()
+        for alert in alerts:
+            matched = triggered[alert.id]
+            logger.warning(f"Activity alert triggered: {alert.alert_name} for {len(matched)} activities")
+            alert.occurrence_count = (alert.occurrence_count or 0) + len(matched)
+            alert.last_occurrence = now
+            alert.related_activities = ((alert.related_activities or []) + [record["id"] for record in matched])[-50:]
+
+    def _count_recent(self, records: List[Dict[str, Any]], since: datetime) -> Dict[tuple, int]:
+        """Recent activity counts per (type, user) for the batch's types and users, in one grouped query."""
+        rows = self.db.query(
+            RacineActivity.activity_type, RacineActivity.user_id, func.count(RacineActivity.id)
+        ).filter(
+            and_(
+                RacineActivity.created_at >= since,
+                RacineActivity.activity_type.in_(list({record["activity_type"] for record in records})),
+                RacineActivity.user_id.in_(list({record["user_id"] for record in records}))
+            )
+        ).group_by(RacineActivity.activity_type, RacineActivity.user_id).all()
+        return {(activity_type, user_id): count for activity_type, user_id, count in rows}
+
+    @staticmethod
+    def _metric_rows(records: List[Dict[str, Any]], now: datetime) -> List[Dict[str, Any]]:
+        """One usage counter per activity type and workspace for the batch."""
+        grouped: Dict[tuple, List[Dict[str, Any]]] = {}
+        for record in records:
+            grouped.setdefault((record["activity_type"], record["workspace_id"]), []).append(record)
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "metric_type": "usage",
+                "metric_name": f"activity_{activity_type.value}",
+                "metric_value": float(len(batch)),
+                "metric_unit": "count",
+                "activity_id": batch[-1]["id"],
+                "aggregation_level": "ingestion_batch",
+                "dimensions": {"activity_type": activity_type.value, "workspace_id": workspace_id},
+                "measurement_timestamp": now,
+                "measurement_window_start": min(record["created_at"] for record in batch),
+                "measurement_window_end": max(record["created_at"] for record in batch)
+            }
+            for (activity_type, workspace_id), batch in grouped.items()
+        ]
+
+
+_subscription_index = ActivitySubscriptionIndex()
+_subscription_lock = threading.Lock()
+_subscription_state: Dict[str, Optional[datetime]] = {"synced_at": None, "streams_watermark": None}
+
+
+def get_activity_subscription_index() -> ActivitySubscriptionIndex:
+    """Process-wide compiled index of active stream filters and alert criteria."""
+    return _subscription_index
+
+
+def index_activity_subscription(kind: str, subscription_id: Any, criteria: Optional[Dict[str, Any]],
+                                payload: Optional[Dict[str, Any]] = None, active: bool = True) -> None:
+    """Apply one created/changed stream or alert to the index without waiting for the next resync."""
+    with _subscription_lock:
+        if active and (kind != "alert" or "frequency_threshold" in (criteria or {})):
+            _subscription_index.upsert(kind, subscription_id, criteria, payload)
+        else:
+            _subscription_index.remove(kind, subscription_id)
+
+
+def refresh_subscription_index(db: Session, now: Optional[datetime] = None) -> ActivitySubscriptionIndex:
+    """
+    Bring the subscription index up to date.
+
+    Streams changed since the last refresh are applied incrementally (by ``updated_at``);
+    every ``SUBSCRIPTION_RESYNC_INTERVAL`` both kinds are reconciled against the database,
+    which also picks up deleted streams and alerts (alerts carry no ``updated_at``).
+    Unchanged filters are never recompiled.
+    """
+    now = now or datetime.utcnow()
+    with _subscription_lock:
+        synced_at = _subscription_state["synced_at"]
+        if synced_at is None or now - synced_at >= SUBSCRIPTION_RESYNC_INTERVAL:
+            streams = db.query(
+                RacineActivityStream.id, RacineActivityStream.filter_criteria, RacineActivityStream.stream_type
+            ).filter(RacineActivityStream.is_active == True).all()
+            _subscription_index.reconcile(
+                "stream", ((stream_id, criteria, {"stream_type": stream_type}) for stream_id, criteria, stream_type in streams)
+            )
+            alerts = db.query(RacineActivityAlert.id, RacineActivityAlert.trigger_condition).filter(
+                RacineActivityAlert.status == "active"
+            ).all()
+            _subscription_index.reconcile(
+                "alert", ((alert_id, criteria, None) for alert_id, criteria in alerts
+                          if "frequency_threshold" in (criteria or {}))
+            )
+            _subscription_state["synced_at"] = now
+            _subscription_state["streams_watermark"] = now
+            return _subscription_index
+
+        changed = db.query(
+            RacineActivityStream.id, RacineActivityStream.filter_criteria,
+            RacineActivityStream.stream_type, RacineActivityStream.is_active
+        ).filter(RacineActivityStream.updated_at >= _subscription_state["streams_watermark"]).all()
+        for stream_id, criteria, stream_type, is_active in changed:
+            if is_active:
+                _subscription_index.upsert("stream", stream_id, criteria, {"stream_type": stream_type})
+            else:
+                _subscription_index.remove("stream", stream_id)
+        _subscription_state["streams_watermark"] = now
+    return _subscription_index
+
+
+def _persist_activity_batch(records: List[Dict[str, Any]]) -> None:
+    with get_sync_db_session() as session:
+        RacineActivityBatchWriter(session).write(records)
+
+
+_ingestion_pipeline: Optional[ActivityIngestionPipeline] = None
+
+
+def get_activity_ingestion_pipeline() -> ActivityIngestionPipeline:
+    """Process-wide write-behind pipeline behind RacineActivityService.track_activity."""
+    global _ingestion_pipeline
+    if _ingestion_pipeline is None:
+        _ingestion_pipeline = ActivityIngestionPipeline(_persist_activity_batch)
+    return _ingestion_pipeline
+
 
 class RacineActivityService:
     """
@@ -73,6 +452,11 @@ class RacineActivityService:
             'analytics': self.analytics_service
         }
 
+        self._service_names = tuple(self.service_registry)
+
+        # Write-behind batching for track_activity
+        self.ingestion = get_activity_ingestion_pipeline()
+
         logger.info("RacineActivityService initialized with full cross-group integration")
 
     async def track_activity(
@@ -89,6 +473,11 @@ class RacineActivityService:
         """
         Track a new activity with comprehensive metadata and cross-group context.
 
+        The activity is handed to the write-behind ingestion pipeline: enrichment,
+        persistence, stream events, correlations, alerts and metrics happen in
+        batches off the request path, so the record becomes queryable after the
+        next flush (see racine_activity_ingestion for the durability trade-offs).
+
         Args:
             activity_type: Type of activity
             activity_category: Category of activity
@@ -100,63 +489,33 @@ class RacineActivityService:
             group_name: Optional group context
 
         Returns:
-            Created activity record
+            Activity record (not attached to the session; persisted by the pipeline)
         """
-        try:
-            logger.info(f"Tracking activity {activity_type.value} by user {user_id}")
-
-            # Enrich activity with contextual data
-            enriched_details = await self._enrich_activity_details(
-                activity_type, details or {}, user_id, resource_id, resource_type, group_name
-            )
-
-            # Create activity record
-            activity = RacineActivity(
-                activity_type=activity_type,
-                activity_category=activity_category,
-                user_id=user_id,
-                resource_id=resource_id,
-                resource_type=resource_type,
-                activity_data=enriched_details,
-                workspace_id=workspace_id,
-                group_name=group_name,
-                status=ActivityStatus.COMPLETED,
-                metadata={
-                    "tracking_source": "api",
-                    "session_id": enriched_details.get("session_id"),
-                    "ip_address": enriched_details.get("ip_address"),
-                    "user_agent": enriched_details.get("user_agent"),
-                    "enriched": True
-                }
-            )
-
-            self.db.add(activity)
-            self.db.flush()
-
-            # Create detailed activity log
-            await self._create_activity_log(activity, enriched_details)
-
-            # Trigger real-time stream events
-            await self._trigger_stream_events(activity)
-
-            # Analyze for correlations
-            await self._analyze_activity_correlations(activity)
-
-            # Check for alert conditions
-            await self._check_activity_alerts(activity)
-
-            # Update activity metrics
-            await self._update_activity_metrics(activity)
-
-            self.db.commit()
-            logger.info(f"Successfully tracked activity {activity.id}")
-
-            return activity
-
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error tracking activity: {str(e)}")
-            raise
+        record = {
+            "id": str(uuid.uuid4()),
+            "activity_type": activity_type,
+            "activity_category": activity_category,
+            "user_id": user_id,
+            "resource_id": resource_id,
+            "resource_type": resource_type,
+            "details": dict(details or {}),
+            "workspace_id": workspace_id,
+            "group_name": group_name,
+            "created_at": datetime.utcnow(),
+            "cross_group_services": self._service_names
+        }
+        self.ingestion.submit(record)
+
+        return RacineActivity(
+            id=record["id"],
+            activity_name=_activity_name(record),
+            activity_type=activity_type,
+            activity_category=activity_category,
+            user_id=user_id,
+            primary_group=group_name or DEFAULT_PRIMARY_GROUP,
+            status=ActivityStatus.COMPLETED,
+            created_at=record["created_at"]
+        )
 
     async def get_activity_history(
         self,
@@ -287,6 +646,9 @@ class RacineActivityService:
             await self._initialize_stream_events(stream)
 
             self.db.commit()
+            index_activity_subscription(
+                "stream", stream.id, stream.filter_criteria, {"stream_type": stream.stream_type}
+            )
             logger.info(f"Successfully created activity stream {stream.id}")
 
             return stream
@@ -510,6 +872,7 @@ class RacineActivityService:
 
             self.db.add(alert)
             self.db.commit()
+            index_activity_subscription("alert", alert.id, enhanced_criteria)
 
             logger.info(f"Successfully created activity alert {alert.id}")
             return alert
@@ -521,256 +884,6 @@ class RacineActivityService:
 
     # Private helper methods
 
-    async def _enrich_activity_details(
-        self,
-        activity_type: ActivityType,
-        details: Dict[str, Any],
-        user_id: str,
-        resource_id: Optional[str],
-        resource_type: Optional[str],
-        group_name: Optional[str]
-    ) -> Dict[str, Any]:
-        """Enrich activity details with contextual information."""
-        try:
-            enriched = details.copy()
-
-            # Add user context
-            user_context = await self._get_user_context(user_id)
-            enriched["user_context"] = user_context
-
-            # Add resource context if available
-            if resource_id and resource_type and group_name:
-                resource_context = await self._get_resource_context(resource_id, resource_type, group_name)
-                enriched["resource_context"] = resource_context
-
-            # Add system context
-            enriched["system_context"] = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "activity_id": str(uuid.uuid4()),
-                "system_version": "1.0.0"
-            }
-
-            # Add cross-group context
-            if group_name:
-                cross_group_context = await self._get_cross_group_context(group_name, activity_type)
-                enriched["cross_group_context"] = cross_group_context
-
-            return enriched
-
-        except Exception as e:
-            logger.error(f"Error enriching activity details: {str(e)}")
-            return details
-
-    async def _create_activity_log(self, activity: RacineActivity, details: Dict[str, Any]):
-        """Create detailed activity log entry."""
-        try:
-            log_entry = RacineActivityLog(
-                activity_id=activity.id,
-                log_level="INFO",
-                log_message=f"Activity {activity.activity_type.value} performed by user {activity.user_id}",
-                log_data=details,
-                source_component="activity_tracker",
-                metadata={
-                    "activity_type": activity.activity_type.value,
-                    "activity_category": activity.activity_category.value,
-                    "has_resource": activity.resource_id is not None
-                }
-            )
-
-            self.db.add(log_entry)
-
-        except Exception as e:
-            logger.error(f"Error creating activity log: {str(e)}")
-
-    async def _trigger_stream_events(self, activity: RacineActivity):
-        """Trigger real-time stream events for the activity."""
-        try:
-            # Find active streams that match this activity
-            streams = await self._find_matching_streams(activity)
-
-            for stream in streams:
-                # Create stream event
-                event = RacineActivityStreamEvent(
-                    stream_id=stream.id,
-                    activity_id=activity.id,
-                    event_data={
-                        "activity_type": activity.activity_type.value,
-                        "user_id": activity.user_id,
-                        "resource_id": activity.resource_id,
-                        "timestamp": activity.created_at.isoformat()
-                    },
-                    metadata={
-                        "stream_type": stream.stream_type.value,
-                        "real_time": True,
-                        "auto_generated": True
-                    }
-                )
-
-                self.db.add(event)
-
-        except Exception as e:
-            logger.error(f"Error triggering stream events: {str(e)}")
-
-    async def _analyze_activity_correlations(self, activity: RacineActivity):
-        """Analyze correlations for the activity."""
-        try:
-            # Look for activities within correlation window
-            correlation_window = timedelta(minutes=30)
-            time_start = activity.created_at - correlation_window
-            time_end = activity.created_at + correlation_window
-
-            # Find potentially related activities
-            related_activities = self.db.query(RacineActivity).filter(
-                and_(
-                    RacineActivity.created_at >= time_start,
-                    RacineActivity.created_at <= time_end,
-                    RacineActivity.id != activity.id
-                )
-            ).limit(20).all()
-
-            # Analyze each potential correlation
-            for related_activity in related_activities:
-                correlation_strength = await self._calculate_correlation_strength(activity, related_activity)
-                
-                if correlation_strength > 0.7:  # High correlation threshold
-                    correlation = RacineActivityCorrelation(
-                        primary_activity_id=activity.id,
-                        related_activity_id=related_activity.id,
-                        correlation_type="temporal",
-                        correlation_strength=correlation_strength,
-                        correlation_data={
-                            "time_diff_seconds": abs((activity.created_at - related_activity.created_at).total_seconds()),
-                            "same_user": activity.user_id == related_activity.user_id,
-                            "same_resource": activity.resource_id == related_activity.resource_id
-                        }
-                    )
-                    self.db.add(correlation)
-
-        except Exception as e:
-            logger.error(f"Error analyzing activity correlations: {str(e)}")
-
-    async def _check_activity_alerts(self, activity: RacineActivity):
-        """Check if activity triggers any alerts."""
-        try:
-            # Get active alerts
-            active_alerts = self.db.query(RacineActivityAlert).filter(
-                RacineActivityAlert.is_active == True
-            ).all()
-
-            for alert in active_alerts:
-                if await self._activity_matches_alert_criteria(activity, alert):
-                    # Trigger alert
-                    await self._trigger_activity_alert(alert, activity)
-
-        except Exception as e:
-            logger.error(f"Error checking activity alerts: {str(e)}")
-
-    async def _update_activity_metrics(self, activity: RacineActivity):
-        """Update activity metrics."""
-        try:
-            # Update or create metrics for this activity type
-            metrics = self.db.query(RacineActivityMetrics).filter(
-                and_(
-                    RacineActivityMetrics.metric_name == f"activity_{activity.activity_type.value}",
-                    RacineActivityMetrics.workspace_id == activity.workspace_id
-                )
-            ).first()
-
-            if metrics:
-                metrics.metric_value += 1
-                metrics.last_updated = datetime.utcnow()
-            else:
-                metrics = RacineActivityMetrics(
-                    metric_name=f"activity_{activity.activity_type.value}",
-                    metric_value=1.0,
-                    metric_unit="count",
-                    workspace_id=activity.workspace_id,
-                    metrics_data={
-                        "activity_type": activity.activity_type.value,
-                        "first_recorded": datetime.utcnow().isoformat()
-                    }
-                )
-                self.db.add(metrics)
-
-        except Exception as e:
-            logger.error(f"Error updating activity metrics: {str(e)}")
-
-    # Placeholder methods for various operations
-
-    async def _get_user_context(self, user_id: str) -> Dict[str, Any]:
-        """Get user context information."""
-        try:
-            user = self.db.query(User).filter(User.id == user_id).first()
-            return {
-                "user_id": user_id,
-                "username": getattr(user, 'username', 'Unknown') if user else 'Unknown',
-                "role": getattr(user, 'role', 'user') if user else 'user'
-            }
-        except Exception as e:
-            logger.error(f"Error getting user context: {str(e)}")
-            return {"user_id": user_id}
-
-    async def _get_resource_context(self, resource_id: str, resource_type: str, group_name: str) -> Dict[str, Any]:
-        """Get resource context information."""
-        return {
-            "resource_id": resource_id,
-            "resource_type": resource_type,
-            "group_name": group_name,
-            "context_retrieved": datetime.utcnow().isoformat()
-        }
-
-    async def _get_cross_group_context(self, group_name: str, activity_type: ActivityType) -> Dict[str, Any]:
-        """Get cross-group context for the activity."""
-        return {
-            "group_name": group_name,
-            "activity_type": activity_type.value,
-            "cross_group_services": list(self.service_registry.keys())
-        }
-
-    async def _find_matching_streams(self, activity: RacineActivity) -> List[RacineActivityStream]:
-        """Find streams that match the activity."""
-        try:
-            streams = self.db.query(RacineActivityStream).filter(
-                RacineActivityStream.is_active == True
-            ).all()
-
-            matching_streams = []
-            for stream in streams:
-                if await self._activity_matches_stream_filter(activity, stream):
-                    matching_streams.append(stream)
-
-            return matching_streams
-
-        except Exception as e:
-            logger.error(f"Error finding matching streams: {str(e)}")
-            return []
-
-    async def _activity_matches_stream_filter(self, activity: RacineActivity, stream: RacineActivityStream) -> bool:
-        """Check if activity matches stream filter criteria."""
-        try:
-            filter_criteria = stream.filter_criteria or {}
-            
-            # Check activity type filter
-            if "activity_types" in filter_criteria:
-                if activity.activity_type.value not in filter_criteria["activity_types"]:
-                    return False
-
-            # Check user filter
-            if "user_ids" in filter_criteria:
-                if activity.user_id not in filter_criteria["user_ids"]:
-                    return False
-
-            # Check workspace filter
-            if "workspace_ids" in filter_criteria:
-                if activity.workspace_id not in filter_criteria["workspace_ids"]:
-                    return False
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Error checking stream filter match: {str(e)}")
-            return False
-
     async def _calculate_correlation_strength(self, activity1: RacineActivity, activity2: RacineActivity) -> float:
         """Calculate correlation strength between two activities."""
         try:
@@ -799,66 +912,6 @@ class RacineActivityService:
             logger.error(f"Error calculating correlation strength: {str(e)}")
             return 0.0
 
-    async def _activity_matches_alert_criteria(self, activity: RacineActivity, alert: RacineActivityAlert) -> bool:
-        """Check if activity matches alert criteria."""
-        try:
-            criteria = alert.alert_criteria or {}
-
-            # Check activity type
-            if "activity_types" in criteria:
-                if activity.activity_type.value not in criteria["activity_types"]:
-                    return False
-
-            # Check frequency threshold
-            if "frequency_threshold" in criteria:
-                # Check if this activity type exceeds frequency threshold
-                threshold = criteria["frequency_threshold"]
-                time_window = criteria.get("time_window_minutes", 60)
-                
-                recent_count = await self._count_recent_activities(
-                    activity.activity_type, activity.user_id, time_window
-                )
-                
-                if recent_count >= threshold:
-                    return True
-
-            return False
-
-        except Exception as e:
-            logger.error(f"Error checking alert criteria: {str(e)}")
-            return False
-
-    async def _trigger_activity_alert(self, alert: RacineActivityAlert, activity: RacineActivity):
-        """Trigger an activity alert."""
-        try:
-            logger.warning(f"Activity alert triggered: {alert.alert_name} for activity {activity.id}")
-            
-            # Update alert trigger count
-            alert.trigger_count = (alert.trigger_count or 0) + 1
-            alert.last_triggered = datetime.utcnow()
-
-        except Exception as e:
-            logger.error(f"Error triggering activity alert: {str(e)}")
-
-    async def _count_recent_activities(self, activity_type: ActivityType, user_id: str, time_window_minutes: int) -> int:
-        """Count recent activities of a specific type for a user."""
-        try:
-            time_threshold = datetime.utcnow() - timedelta(minutes=time_window_minutes)
-            
-            count = self.db.query(RacineActivity).filter(
-                and_(
-                    RacineActivity.activity_type == activity_type,
-                    RacineActivity.user_id == user_id,
-                    RacineActivity.created_at >= time_threshold
-                )
-            ).count()
-
-            return count
-
-        except Exception as e:
-            logger.error(f"Error counting recent activities: {str(e)}")
-            return 0
-
     # Additional placeholder methods for comprehensive functionality
 
     async def _enrich_activities_with_logs(self, activities: List[RacineActivity]) -> List[Dict[str, Any]]:
@@ -0,0 +1,207 @@
+"""
+Racine Activity Subscriptions
+=============================
+
+Compiled index of activity stream filters and alert criteria.
+
+Matching used to load every active stream and alert for each ingested batch
+and test each filter dict against each activity, so every event paid
+O(subscriptions).
+
+Filters are compiled once into frozensets and indexed under the combination
+of the dimensions they constrain (``activity_types``, ``group_names``,
+``resource_types``, ``user_ids``, ``workspace_ids``): a filter on activity
+type and user is bucketed by every ``(activity_type, user_id)`` pair it
+accepts, so its bucket only holds events that satisfy both constraints. When
+the cross product of a filter's values would exceed ``MAX_INDEX_KEYS`` the
+dimensions with the most values are left out of the key and checked on
+evaluation instead. Unconstrained filters go to a wildcard list. An event
+looks up one key per combination of dimensions in use, evaluates only those
+buckets plus the wildcards, and each filter lives under exactly one
+combination, so no candidate is visited twice. Filters whose every
+constraint is part of their key match without being evaluated at all.
+
+Subscriptions are updated incrementally: ``upsert``/``remove`` for single
+changes and ``reconcile`` to resynchronise a whole kind from the database,
+recompiling only the filters whose criteria changed. All operations are
+thread-safe: ingestion batches match in worker threads while API handlers
+register new streams and alerts on the event loop.
+"""
+
+import hashlib
+import json
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Criteria key -> event attribute
+FILTER_DIMENSIONS: Tuple[Tuple[str, str], ...] = (
+    ("activity_types", "activity_type"),
+    ("group_names", "group_name"),
+    ("resource_types", "resource_type"),
+    ("user_ids", "user_id"),
+    ("workspace_ids", "workspace_id"),
+)
+
+# Most bucket keys (cross product of indexed values) a single filter is placed under
+MAX_INDEX_KEYS = 64
+
+
+def _value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def _signature(criteria: Dict[str, Any]) -> str:
+    payload = json.dumps(criteria or {}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _key_count(constraints: List[Tuple[str, FrozenSet[Any]]]) -> int:
+    count = 1
+    for _, values in constraints:
+        count *= len(values)
+    return count
+
+
+@dataclass
+class Subscription:
+    """A compiled stream filter or alert criteria."""
+    kind: str  # stream, alert
+    subscription_id: str
+    criteria: Dict[str, Any]
+    payload: Dict[str, Any] = field(default_factory=dict)
+    signature: str = ""
+    constraints: Tuple[Tuple[str, FrozenSet[Any]], ...] = ()
+    index_dimensions: Tuple[str, ...] = ()
+    index_keys: FrozenSet[Tuple[Any, ...]] = frozenset()
+    exact: bool = True  # every constraint is part of the index key
+
+    @classmethod
+    def compile(cls, kind: str, subscription_id: str, criteria: Optional[Dict[str, Any]],
+                payload: Optional[Dict[str, Any]] = None) -> "Subscription":
+        criteria = criteria or {}
+        constraints = []
+        for key, attribute in FILTER_DIMENSIONS:
+            if key in criteria:
+                values = criteria[key]
+                if not isinstance(values, (list, tuple, set, frozenset)):
+                    values = [values]
+                constraints.append((attribute, frozenset(_value(v) for v in values)))
+        subscription = cls(kind, str(subscription_id), criteria, payload or {}, _signature(criteria), tuple(constraints))
+        indexed = list(constraints)
+        while len(indexed) > 1 and _key_count(indexed) > MAX_INDEX_KEYS:
+            indexed.remove(max(indexed, key=lambda constraint: len(constraint[1])))
+        if indexed:
+            subscription.index_dimensions = tuple(attribute for attribute, _ in indexed)
+            subscription.index_keys = frozenset(itertools.product(*(values for _, values in indexed)))
+        subscription.exact = len(indexed) == len(constraints)
+        return subscription
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        for attribute, allowed in self.constraints:
+            if _value(event.get(attribute)) not in allowed:
+                return False
+        return True
+
+
+class ActivitySubscriptionIndex:
+    """Buckets subscriptions by their indexed dimensions for candidate-only matching."""
+
+    def __init__(self):
+        self._subscriptions: Dict[Tuple[str, str], Subscription] = {}
+        self._buckets: Dict[str, Dict[Tuple[str, ...], Dict[Tuple[Any, ...], Dict[Tuple[str, str], Subscription]]]] = {}
+        self._wildcards: Dict[str, Dict[Tuple[str, str], Subscription]] = {}
+        self._stats = {"compiled": 0, "removed": 0, "candidates_evaluated": 0, "matches": 0}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def upsert(self, kind: str, subscription_id: Any, criteria: Optional[Dict[str, Any]],
+               payload: Optional[Dict[str, Any]] = None) -> Subscription:
+        key = (kind, str(subscription_id))
+        with self._lock:
+            existing = self._subscriptions.get(key)
+            if existing is not None and existing.signature == _signature(criteria or {}):
+                existing.payload = payload or existing.payload
+                return existing
+            if existing is not None:
+                self._unlink(existing)
+            subscription = Subscription.compile(kind, subscription_id, criteria, payload)
+            self._link(subscription)
+            self._stats["compiled"] += 1
+            return subscription
+
+    def remove(self, kind: str, subscription_id: Any) -> bool:
+        with self._lock:
+            subscription = self._subscriptions.get((kind, str(subscription_id)))
+            if subscription is None:
+                return False
+            self._unlink(subscription)
+            self._stats["removed"] += 1
+            return True
+
+    def reconcile(self, kind: str, rows: Iterable[Tuple[Any, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> None:
+        """Make ``kind`` match ``(id, criteria, payload)`` rows exactly; unchanged filters are kept as compiled."""
+        with self._lock:
+            seen = set()
+            for subscription_id, criteria, payload in rows:
+                seen.add(str(subscription_id))
+                self.upsert(kind, subscription_id, criteria, payload)
+            stale = [key for key in self._subscriptions if key[0] == kind and key[1] not in seen]
+            for _, subscription_id in stale:
+                self.remove(kind, subscription_id)
+
+    def match(self, kind: str, event: Dict[str, Any]) -> List[Subscription]:
+        """Subscriptions of ``kind`` whose filter accepts ``event``."""
+        matched = []
+        evaluated = 0
+        with self._lock:
+            candidate_groups = [self._wildcards.get(kind, {}).values()]
+            for dimensions, keys in self._buckets.get(kind, {}).items():
+                bucket = keys.get(tuple(_value(event.get(attribute)) for attribute in dimensions))
+                if bucket:
+                    candidate_groups.append(bucket.values())
+            for candidates in candidate_groups:
+                for subscription in candidates:
+                    evaluated += 1
+                    if subscription.exact or subscription.matches(event):
+                        matched.append(subscription)
+            self._stats["candidates_evaluated"] += evaluated
+            self._stats["matches"] += len(matched)
+        return matched
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "subscriptions": len(self._subscriptions),
+            "wildcards": {kind: len(items) for kind, items in self._wildcards.items()},
+        }
+
+    def _link(self, subscription: Subscription) -> None:
+        key = (subscription.kind, subscription.subscription_id)
+        self._subscriptions[key] = subscription
+        if not subscription.index_dimensions:
+            self._wildcards.setdefault(subscription.kind, {})[key] = subscription
+            return
+        keys = self._buckets.setdefault(subscription.kind, {}).setdefault(subscription.index_dimensions, {})
+        for index_key in subscription.index_keys:
+            keys.setdefault(index_key, {})[key] = subscription
+
+    def _unlink(self, subscription: Subscription) -> None:
+        key = (subscription.kind, subscription.subscription_id)
+        self._subscriptions.pop(key, None)
+        if not subscription.index_dimensions:
+            self._wildcards.get(subscription.kind, {}).pop(key, None)
+            return
+        kind_buckets = self._buckets.get(subscription.kind, {})
+        keys = kind_buckets.get(subscription.index_dimensions, {})
+        for index_key in subscription.index_keys:
+            bucket = keys.get(index_key)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del keys[index_key]
+        if not keys:
+            kind_buckets.pop(subscription.index_dimensions, None)
@@ -18,6 +18,7 @@ Features:
 
 import asyncio
 import json
+import logging
 import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Tuple
@@ -37,7 +38,8 @@ from ...models.racine_models.racine_dashboard_models import (
     RacineDashboardAlert as RacineAlertRule,
     RacineDashboardAnalytics as RacineExecutiveReport,
     RacineDashboardAnalytics as RacinePerformanceMonitor,
-    RacineDashboardPersonalization as RacineUserDashboardPreference
+    RacineDashboardPersonalization as RacineUserDashboardPreference,
+    RacineMetricRollup
 )
 from ...models.racine_models.racine_orchestration_models import RacineOrchestrationMaster
 from ...models.auth_models import User, Role
@@ -46,6 +48,7 @@ from ...models.compliance_models import ComplianceRequirement as ComplianceRule,
 from ...models.classification_models import ClassificationRule, ClassificationResult
 from ...models.advanced_catalog_models import IntelligentDataAsset as CatalogItem, DataProfilingResult as CatalogMetadata
 from ...models.scan_models import ScanOrchestrationJob
+from ...db_session import get_sync_db_session
 
 # Import existing services for integration
 from ..comprehensive_analytics_service import ComprehensiveAnalyticsService
@@ -56,6 +59,18 @@ from ..scan_service import ScanService
 from ..compliance_rule_service import ComplianceRuleService
 from ..classification_service import ClassificationService as EnterpriseClassificationService
 from ..enterprise_catalog_service import EnterpriseIntelligentCatalogService
+from ..scheduler import get_loop_scheduler
+from .racine_metrics_rollup import (
+    COMPACTION_INTERVAL_SECONDS,
+    MetricsRollupStore,
+    RollupEventSource,
+    RollupGaugeSource,
+)
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COMPACTION_JOB = "racine_dashboard_rollup_compaction"
+TREND_POINTS = 24  # Time bins used for metric trend series
 
 class DashboardType(Enum):
     EXECUTIVE = "executive"
@@ -115,6 +130,102 @@ class RealTimeMetricsRequest:
     groups: List[str]
     time_range: int = 300  # 5 minutes default
     granularity: int = 10  # 10 seconds default
+
+
+def _status_value(status: Any) -> str:
+    return str(getattr(status, 'value', status) or '').lower()
+
+def _scan_events(session: Session, start: datetime, end: datetime):
+    rows = session.query(Scan.created_at, Scan.status, Scan.started_at, Scan.completed_at).filter(
+        and_(Scan.created_at >= start, Scan.created_at < end)
+    )
+    for created_at, status, started_at, completed_at in rows:
+        completed = _status_value(status) == 'completed'
+        yield created_at, {
+            'created': 1,
+            'completed': 1 if completed else 0,
+            'duration': (completed_at - started_at).total_seconds() if completed and started_at and completed_at else None
+        }
+
+def _compliance_events(session: Session, start: datetime, end: datetime):
+    rows = session.query(ComplianceValidation.created_at, ComplianceValidation.validation_status).filter(
+        and_(ComplianceValidation.created_at >= start, ComplianceValidation.created_at < end)
+    )
+    for created_at, status in rows:
+        status = _status_value(status)
+        yield created_at, {'validations': 1, 'passed': 1 if status == 'passed' else 0, 'failed': 1 if status == 'failed' else 0}
+
+def _classification_events(session: Session, start: datetime, end: datetime):
+    rows = session.query(ClassificationResult.created_at, ClassificationResult.confidence_score).filter(
+        and_(ClassificationResult.created_at >= start, ClassificationResult.created_at < end)
+    )
+    for created_at, confidence in rows:
+        yield created_at, {'results': 1, 'confidence': confidence}
+
+def _catalog_events(session: Session, start: datetime, end: datetime):
+    rows = session.query(CatalogItem.discovered_at).filter(
+        and_(CatalogItem.discovered_at >= start, CatalogItem.discovered_at < end)
+    )
+    for (discovered_at,) in rows:
+        yield discovered_at, {'assets': 1}
+
+def _catalog_gauges(session: Session) -> Dict[str, float]:
+    total_items = session.query(func.count(CatalogItem.id)).scalar() or 0
+    items_with_metadata = session.query(func.count(CatalogMetadata.id)).scalar() or 0
+    return {'metadata_completeness': (items_with_metadata / total_items * 100) if total_items > 0 else 0}
+
+def _data_source_gauges(session: Session) -> Dict[str, float]:
+    by_status = dict(session.query(DataSource.status, func.count(DataSource.id)).group_by(DataSource.status).all())
+    total_sources = sum(by_status.values())
+    active_sources = sum(count for status, count in by_status.items() if _status_value(status) == 'active')
+    return {
+        'active': active_sources,
+        'healthy_percentage': (active_sources / total_sources * 100) if total_sources > 0 else 0
+    }
+
+_rollup_store: Optional[MetricsRollupStore] = None
+
+def get_dashboard_rollup_store() -> MetricsRollupStore:
+    """Process-wide rollup store over the scan, compliance, classification, catalog and data source tables"""
+    global _rollup_store
+    if _rollup_store is None:
+        _rollup_store = MetricsRollupStore(
+            RacineMetricRollup.__table__,
+            event_sources=[
+                RollupEventSource('scans', ('created', 'completed', 'duration'), _scan_events),
+                RollupEventSource('compliance', ('validations', 'passed', 'failed'), _compliance_events),
+                RollupEventSource('classifications', ('results', 'confidence'), _classification_events),
+                RollupEventSource('catalog', ('assets',), _catalog_events),
+            ],
+            gauge_sources=[
+                RollupGaugeSource('catalog', ('metadata_completeness',), _catalog_gauges),
+                RollupGaugeSource('data_sources', ('active', 'healthy_percentage'), _data_source_gauges),
+            ],
+        )
+    return _rollup_store
+
+def _compact_rollups_sync() -> Dict[str, Any]:
+    with get_sync_db_session() as session:
+        return get_dashboard_rollup_store().compact(session)
+
+async def _compact_dashboard_rollups():
+    try:
+        result = await asyncio.to_thread(_compact_rollups_sync)
+        logger.debug(f"Dashboard rollups compacted: {result}")
+    except Exception as e:
+        logger.error(f"Dashboard rollup compaction failed: {e}")
+
+def ensure_rollup_compaction() -> None:
+    """Register the periodic rollup compactor on the shared loop scheduler (once per process)"""
+    try:
+        scheduler = get_loop_scheduler()
+        if not scheduler.is_scheduled(ROLLUP_COMPACTION_JOB):
+            scheduler.call_every(
+                ROLLUP_COMPACTION_JOB, COMPACTION_INTERVAL_SECONDS, _compact_dashboard_rollups, first_delay=0
+            )
+    except RuntimeError:
+        # No running event loop (scripts); the first service created inside the app registers it
+        pass
     
 class RacineDashboardService:
     """
@@ -147,9 +258,9 @@ class RacineDashboardService:
             'catalog': self.catalog_service
         }
         
-        # Cache for real-time metrics
-        self._metrics_cache = {}
-        self._cache_ttl = 60  # 1 minute TTL
+        # Pre-aggregated metric buckets kept current by the rollup compactor
+        self.rollup_store = get_dashboard_rollup_store()
+        ensure_rollup_compaction()
         
     async def create_dashboard(
         self, 
@@ -340,281 +451,45 @@ class RacineDashboardService:
             Real-time metrics data
         """
         try:
-            # Check cache first
-            cache_key = f"{':'.join(request.metrics)}:{':'.join(request.groups)}:{request.time_range}"
+            end_time = datetime.utcnow()
+            start_time = end_time - timedelta(seconds=request.time_range)
+            groups = [group for group in request.groups if group in self.service_registry]
             
-            if cache_key in self._metrics_cache:
-                cached_data, timestamp = self._metrics_cache[cache_key]
-                if datetime.utcnow().timestamp() - timestamp < self._cache_ttl:
-                    return cached_data
-            
-            # Collect metrics from all requested groups
-            metrics_data = {}
-            
-            for group in request.groups:
-                if group in self.service_registry:
-                    group_metrics = await self._collect_group_metrics(
-                        group, 
-                        request.metrics, 
-                        request.time_range,
-                        request.granularity
-                    )
-                    metrics_data[group] = group_metrics
+            # One range query over the rollup buckets serves every group and metric
+            snapshot = self.rollup_store.snapshot(self.db, start_time, end_time, groups)
+            points = max(1, min(TREND_POINTS, request.time_range // max(1, request.granularity)))
+            metrics_data = {group: snapshot.metrics(group, request.metrics) for group in groups}
+            series_data = {group: snapshot.series(group, request.metrics, points) for group in groups}
             
             # Aggregate cross-group metrics
             aggregated_metrics = self._aggregate_cross_group_metrics(metrics_data, request.metrics)
             
             # Calculate trends and predictions
-            trend_analysis = await self._calculate_metric_trends(metrics_data, request.time_range)
+            trend_analysis = await self._calculate_metric_trends(series_data, request.time_range)
             
-            result = {
-                'timestamp': datetime.utcnow().isoformat(),
+            return {
+                'timestamp': end_time.isoformat(),
                 'time_range': request.time_range,
                 'granularity': request.granularity,
                 'metrics': aggregated_metrics,
                 'group_breakdown': metrics_data,
                 'trends': trend_analysis,
-                'predictions': await self._generate_metric_predictions(metrics_data)
+                'predictions': await self._generate_metric_predictions(metrics_data),
+                'rollups_compacted_at': (
+                    self.rollup_store.last_compacted_at.isoformat()
+                    if self.rollup_store.last_compacted_at else None
+                )
             }
             
-            # Cache the result
-            self._metrics_cache[cache_key] = (result, datetime.utcnow().timestamp())
-            
-            return result
-            
         except Exception as e:
             raise Exception(f"Failed to get real-time metrics: {str(e)}")
     
-    async def _collect_group_metrics(
-        self, 
-        group: str, 
-        metrics: List[str], 
-        time_range: int,
-        granularity: int
-    ) -> Dict[str, Any]:
-        """Collect metrics from a specific group"""
-        
-        service = self.service_registry.get(group)
-        if not service:
-            return {}
+    def _rollup_metrics(self, group: str, metrics: List[str], time_range: Optional[str] = None) -> Dict[str, Any]:
+        """Metrics for a KPI window ('7d' or the last day) served from the rollup buckets"""
         
-        group_metrics = {}
         end_time = datetime.utcnow()
-        start_time = end_time - timedelta(seconds=time_range)
-        
-        try:
-            if group == 'scans':
-                # Collect scan metrics
-                scan_metrics = await self._collect_scan_metrics(metrics, start_time, end_time, granularity)
-                group_metrics.update(scan_metrics)
-                
-            elif group == 'compliance':
-                # Collect compliance metrics
-                compliance_metrics = await self._collect_compliance_metrics(metrics, start_time, end_time, granularity)
-                group_metrics.update(compliance_metrics)
-                
-            elif group == 'classifications':
-                # Collect classification metrics
-                classification_metrics = await self._collect_classification_metrics(metrics, start_time, end_time, granularity)
-                group_metrics.update(classification_metrics)
-                
-            elif group == 'catalog':
-                # Collect catalog metrics
-                catalog_metrics = await self._collect_catalog_metrics(metrics, start_time, end_time, granularity)
-                group_metrics.update(catalog_metrics)
-                
-            elif group == 'data_sources':
-                # Collect data source metrics
-                data_source_metrics = await self._collect_data_source_metrics(metrics, start_time, end_time, granularity)
-                group_metrics.update(data_source_metrics)
-                
-        except Exception as e:
-            print(f"Error collecting metrics for group {group}: {str(e)}")
-            
-        return group_metrics
-    
-    async def _collect_scan_metrics(
-        self, 
-        metrics: List[str], 
-        start_time: datetime, 
-        end_time: datetime,
-        granularity: int
-    ) -> Dict[str, Any]:
-        """Collect scan-related metrics"""
-        
-        scan_metrics = {}
-        
-        if 'scan_count' in metrics:
-            scan_count = self.db.query(func.count(Scan.id)).filter(
-                and_(
-                    Scan.created_at >= start_time,
-                    Scan.created_at <= end_time
-                )
-            ).scalar()
-            scan_metrics['scan_count'] = scan_count or 0
-            
-        if 'success_rate' in metrics:
-            total_scans = self.db.query(func.count(Scan.id)).filter(
-                and_(
-                    Scan.created_at >= start_time,
-                    Scan.created_at <= end_time
-                )
-            ).scalar()
-            
-            successful_scans = self.db.query(func.count(Scan.id)).filter(
-                and_(
-                    Scan.created_at >= start_time,
-                    Scan.created_at <= end_time,
-                    Scan.status == 'completed'
-                )
-            ).scalar()
-            
-            success_rate = (successful_scans / total_scans * 100) if total_scans > 0 else 0
-            scan_metrics['success_rate'] = round(success_rate, 2)
-            
-        if 'avg_duration' in metrics:
-            avg_duration = self.db.query(func.avg(Scan.execution_time)).filter(
-                and_(
-                    Scan.created_at >= start_time,
-                    Scan.created_at <= end_time,
-                    Scan.status == 'completed'
-                )
-            ).scalar()
-            scan_metrics['avg_duration'] = float(avg_duration) if avg_duration else 0
-            
-        return scan_metrics
-    
-    async def _collect_compliance_metrics(
-        self, 
-        metrics: List[str], 
-        start_time: datetime, 
-        end_time: datetime,
-        granularity: int
-    ) -> Dict[str, Any]:
-        """Collect compliance-related metrics"""
-        
-        compliance_metrics = {}
-        
-        if 'compliance_score' in metrics:
-            # Calculate overall compliance score
-            total_validations = self.db.query(func.count(ComplianceValidation.id)).filter(
-                and_(
-                    ComplianceValidation.created_at >= start_time,
-                    ComplianceValidation.created_at <= end_time
-                )
-            ).scalar()
-            
-            passed_validations = self.db.query(func.count(ComplianceValidation.id)).filter(
-                and_(
-                    ComplianceValidation.created_at >= start_time,
-                    ComplianceValidation.created_at <= end_time,
-                    ComplianceValidation.validation_status == 'passed'
-                )
-            ).scalar()
-            
-            compliance_score = (passed_validations / total_validations * 100) if total_validations > 0 else 100
-            compliance_metrics['compliance_score'] = round(compliance_score, 2)
-            
-        if 'violations' in metrics:
-            violations = self.db.query(func.count(ComplianceValidation.id)).filter(
-                and_(
-                    ComplianceValidation.created_at >= start_time,
-                    ComplianceValidation.created_at <= end_time,
-                    ComplianceValidation.validation_status == 'failed'
-                )
-            ).scalar()
-            compliance_metrics['violations'] = violations or 0
-            
-        return compliance_metrics
-    
-    async def _collect_classification_metrics(
-        self, 
-        metrics: List[str], 
-        start_time: datetime, 
-        end_time: datetime,
-        granularity: int
-    ) -> Dict[str, Any]:
-        """Collect classification-related metrics"""
-        
-        classification_metrics = {}
-        
-        if 'classification_count' in metrics:
-            classification_count = self.db.query(func.count(DataClassification.id)).filter(
-                and_(
-                    DataClassification.created_at >= start_time,
-                    DataClassification.created_at <= end_time
-                )
-            ).scalar()
-            classification_metrics['classification_count'] = classification_count or 0
-            
-        if 'accuracy_rate' in metrics:
-            # Calculate classification accuracy based on confidence scores
-            avg_confidence = self.db.query(func.avg(DataClassification.confidence_score)).filter(
-                and_(
-                    DataClassification.created_at >= start_time,
-                    DataClassification.created_at <= end_time
-                )
-            ).scalar()
-            classification_metrics['accuracy_rate'] = float(avg_confidence) if avg_confidence else 0
-            
-        return classification_metrics
-    
-    async def _collect_catalog_metrics(
-        self, 
-        metrics: List[str], 
-        start_time: datetime, 
-        end_time: datetime,
-        granularity: int
-    ) -> Dict[str, Any]:
-        """Collect catalog-related metrics"""
-        
-        catalog_metrics = {}
-        
-        if 'catalog_items' in metrics:
-            item_count = self.db.query(func.count(CatalogItem.id)).filter(
-                and_(
-                    CatalogItem.created_at >= start_time,
-                    CatalogItem.created_at <= end_time
-                )
-            ).scalar()
-            catalog_metrics['catalog_items'] = item_count or 0
-            
-        if 'metadata_completeness' in metrics:
-            # Calculate metadata completeness
-            total_items = self.db.query(func.count(CatalogItem.id)).scalar()
-            items_with_metadata = self.db.query(func.count(CatalogMetadata.id)).scalar()
-            completeness = (items_with_metadata / total_items * 100) if total_items > 0 else 0
-            catalog_metrics['metadata_completeness'] = round(completeness, 2)
-            
-        return catalog_metrics
-    
-    async def _collect_data_source_metrics(
-        self, 
-        metrics: List[str], 
-        start_time: datetime, 
-        end_time: datetime,
-        granularity: int
-    ) -> Dict[str, Any]:
-        """Collect data source-related metrics"""
-        
-        data_source_metrics = {}
-        
-        if 'data_source_count' in metrics:
-            source_count = self.db.query(func.count(DataSource.id)).filter(
-                DataSource.status == 'active'
-            ).scalar()
-            data_source_metrics['data_source_count'] = source_count or 0
-            
-        if 'connection_health' in metrics:
-            # Calculate connection health
-            total_sources = self.db.query(func.count(DataSource.id)).scalar()
-            healthy_sources = self.db.query(func.count(DataSource.id)).filter(
-                DataSource.connection_status == 'connected'
-            ).scalar()
-            health_percentage = (healthy_sources / total_sources * 100) if total_sources > 0 else 0
-            data_source_metrics['connection_health'] = round(health_percentage, 2)
-            
-        return data_source_metrics
+        start_time = end_time - timedelta(days=7) if time_range == '7d' else end_time - timedelta(days=1)
+        return self.rollup_store.snapshot(self.db, start_time, end_time, [group]).metrics(group, metrics)
     
     def _aggregate_cross_group_metrics(self, metrics_data: Dict[str, Any], requested_metrics: List[str]) -> Dict[str, Any]:
         """Aggregate metrics across all groups"""
@@ -1032,71 +907,24 @@ class RacineDashboardService:
     async def _get_compliance_score(self, time_range: Optional[str] = None) -> float:
         """Calculate compliance score"""
         
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(days=7) if time_range == '7d' else end_time - timedelta(days=1)
-        
-        total_validations = self.db.query(func.count(ComplianceValidation.id)).filter(
-            and_(
-                ComplianceValidation.created_at >= start_time,
-                ComplianceValidation.created_at <= end_time
-            )
-        ).scalar()
-        
-        passed_validations = self.db.query(func.count(ComplianceValidation.id)).filter(
-            and_(
-                ComplianceValidation.created_at >= start_time,
-                ComplianceValidation.created_at <= end_time,
-                ComplianceValidation.validation_status == 'passed'
-            )
-        ).scalar()
-        
-        return (passed_validations / total_validations * 100) if total_validations > 0 else 100
+        return float(self._rollup_metrics('compliance', ['compliance_score'], time_range)['compliance_score'])
     
     async def _get_classification_accuracy(self, time_range: Optional[str] = None) -> float:
         """Calculate classification accuracy"""
         
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(days=7) if time_range == '7d' else end_time - timedelta(days=1)
-        
-        avg_confidence = self.db.query(func.avg(DataClassification.confidence_score)).filter(
-            and_(
-                DataClassification.created_at >= start_time,
-                DataClassification.created_at <= end_time
-            )
-        ).scalar()
-        
+        avg_confidence = self._rollup_metrics('classifications', ['accuracy_rate'], time_range)['accuracy_rate']
         return float(avg_confidence * 100) if avg_confidence else 0
     
     async def _get_catalog_completeness(self, time_range: Optional[str] = None) -> float:
         """Calculate catalog completeness"""
         
-        total_items = self.db.query(func.count(CatalogItem.id)).scalar()
-        items_with_metadata = self.db.query(func.count(CatalogMetadata.id)).scalar()
-        
-        return (items_with_metadata / total_items * 100) if total_items > 0 else 0
+        return float(self._rollup_metrics('catalog', ['metadata_completeness'], time_range)['metadata_completeness'])
     
     async def _get_scan_health_score(self, time_range: Optional[str] = None) -> float:
         """Calculate scan health score"""
         
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(days=7) if time_range == '7d' else end_time - timedelta(days=1)
-        
-        total_scans = self.db.query(func.count(Scan.id)).filter(
-            and_(
-                Scan.created_at >= start_time,
-                Scan.created_at <= end_time
-            )
-        ).scalar()
-        
-        successful_scans = self.db.query(func.count(Scan.id)).filter(
-            and_(
-                Scan.created_at >= start_time,
-                Scan.created_at <= end_time,
-                Scan.status == 'completed'
-            )
-        ).scalar()
-        
-        return (successful_scans / total_scans * 100) if total_scans > 0 else 100
+        scan_metrics = self._rollup_metrics('scans', ['scan_count', 'success_rate'], time_range)
+        return float(scan_metrics['success_rate']) if scan_metrics['scan_count'] > 0 else 100
     
     async def _calculate_scan_success_percentage(self, time_range: Optional[str] = None) -> float:
         """Calculate scan success percentage"""
@@ -1105,18 +933,7 @@ class RacineDashboardService:
     async def _calculate_compliance_violation_count(self, time_range: Optional[str] = None) -> float:
         """Calculate compliance violation count"""
         
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(days=7) if time_range == '7d' else end_time - timedelta(days=1)
-        
-        violations = self.db.query(func.count(ComplianceValidation.id)).filter(
-            and_(
-                ComplianceValidation.created_at >= start_time,
-                ComplianceValidation.created_at <= end_time,
-                ComplianceValidation.validation_status == 'failed'
-            )
-        ).scalar()
-        
-        return float(violations or 0)
+        return float(self._rollup_metrics('compliance', ['violations'], time_range)['violations'])
     
     def _get_kpi_status(self, value: float, threshold_config: Dict[str, Any]) -> str:
         """Determine KPI status based on thresholds"""
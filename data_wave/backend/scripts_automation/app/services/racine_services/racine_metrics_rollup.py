@@ -0,0 +1,565 @@
+"""
+Racine Metrics Rollup
+=====================
+
+Pre-aggregated, time-bucketed metrics for RacineDashboardService.
+
+Dashboard refreshes used to run several ``COUNT``/``AVG`` queries over the raw
+scan, compliance, classification and catalog tables for every requested metric,
+so refresh cost grew with both the number of metrics and the amount of history.
+
+A periodic compactor now folds raw rows into mergeable buckets
+(count, sum, min, max, last) at minute, hour and day resolution:
+
+- Minute buckets are rebuilt from raw rows for a short settle window on every
+  run, which also picks up late status changes (a scan finishing after it was
+  created). Hour buckets are rebuilt from minute buckets and day buckets from
+  hour buckets, only for the buckets that window touched.
+- Gauges that describe current state (active data sources, metadata
+  completeness) are sampled into the current minute bucket.
+- Minute and hour buckets expire after their retention; day buckets are kept.
+- History is backfilled newest first, one ``backfill_step`` per run, so the
+  first run on an empty table does not scan the whole backfill window at once.
+- Buckets are unique per (resolution, group, measure, start) and written as
+  upserts; one worker compacts at a time (database advisory lock).
+
+A dashboard range is decomposed into whole days plus hour and minute edges
+(falling back to coarser buckets where finer ones expired) and served from one
+range query. Ratio metrics are derived from the merged counters, and trends
+are computed by binning the same rows.
+"""
+
+import logging
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+logger = logging.getLogger(__name__)
+
+# Coarsest to finest
+RESOLUTIONS: Tuple[Tuple[str, int], ...] = (("day", 86400), ("hour", 3600), ("minute", 60))
+RESOLUTION_SECONDS = dict(RESOLUTIONS)
+
+DEFAULT_RETENTION = {"minute": timedelta(days=2), "hour": timedelta(days=120), "day": None}
+DEFAULT_SETTLE_WINDOW = timedelta(hours=1)
+DEFAULT_BACKFILL_WINDOW = timedelta(days=400)
+DEFAULT_BACKFILL_STEP = timedelta(days=7)
+COMPACTION_INTERVAL_SECONDS = 60
+
+BUCKET_KEY_COLUMNS = ("resolution", "metric_group", "measure", "bucket_start")
+BUCKET_VALUE_COLUMNS = ("sample_count", "value_sum", "value_min", "value_max", "last_value", "updated_at")
+
+# Backfill progress is kept as a single bookkeeping row outside RESOLUTIONS
+BACKFILL_MARKER = ("backfill", "_compactor", "backfilled_from")
+COMPACTION_LOCK_NAME = "racine_metric_rollups"
+COMPACTION_LOCK_KEY = zlib.crc32(COMPACTION_LOCK_NAME.encode("utf-8"))
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def floor_time(ts: datetime, seconds: int) -> datetime:
+    return _EPOCH + timedelta(seconds=(ts - _EPOCH) // timedelta(seconds=seconds) * seconds)
+
+
+def ceil_time(ts: datetime, seconds: int) -> datetime:
+    floored = floor_time(ts, seconds)
+    return floored if floored == ts else floored + timedelta(seconds=seconds)
+
+
+def _parent(resolution: str) -> Optional[str]:
+    names = [name for name, _ in RESOLUTIONS]
+    index = names.index(resolution)
+    return names[index - 1] if index else None
+
+
+def rollup_horizon(resolution: str, now: datetime, retention: Dict[str, Optional[timedelta]]) -> Optional[datetime]:
+    """Oldest bucket start kept at ``resolution`` (aligned to the parent resolution)."""
+    keep = retention.get(resolution)
+    if keep is None:
+        return None
+    parent = _parent(resolution)
+    return floor_time(now - keep, RESOLUTION_SECONDS[parent] if parent else RESOLUTION_SECONDS[resolution])
+
+
+def plan_segments(
+    start: datetime,
+    end: datetime,
+    now: datetime,
+    retention: Optional[Dict[str, Optional[timedelta]]] = None,
+) -> List[Tuple[str, datetime, datetime]]:
+    """Cover ``[start, end)`` with as few buckets as possible.
+
+    Returns ``(resolution, bucket_start_from, bucket_start_before)`` segments:
+    whole days in the middle, hours and then minutes at the edges. Where the
+    finer buckets have already expired the edge is widened to the enclosing
+    coarser bucket instead.
+    """
+    retention = {**DEFAULT_RETENTION, **(retention or {})}
+    segments: List[Tuple[str, datetime, datetime]] = []
+
+    def _plan(seg_start: datetime, seg_end: datetime, level: int) -> None:
+        name, seconds = RESOLUTIONS[level]
+        if level == len(RESOLUTIONS) - 1:
+            segments.append((name, floor_time(seg_start, seconds), seg_end))
+            return
+        inner_start, inner_end = ceil_time(seg_start, seconds), floor_time(seg_end, seconds)
+        if inner_start < inner_end:
+            segments.append((name, inner_start, inner_end))
+            edges = [(seg_start, inner_start), (inner_end, seg_end)]
+        else:
+            edges = [(seg_start, seg_end)]
+        horizon = rollup_horizon(RESOLUTIONS[level + 1][0], now, retention)
+        for edge_start, edge_end in edges:
+            if edge_start >= edge_end:
+                continue
+            if horizon is not None and edge_start < horizon:
+                segments.append((name, floor_time(edge_start, seconds), edge_end))
+            else:
+                _plan(edge_start, edge_end, level + 1)
+
+    if start < end:
+        _plan(start, end, 0)
+    return segments
+
+
+# ----------------------------------------------------------------------
+# Aggregates
+# ----------------------------------------------------------------------
+
+@dataclass
+class RollupAggregate:
+    """Mergeable bucket value: count, sum, min, max and the latest sample."""
+    count: int = 0
+    total: float = 0.0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    last: Optional[float] = None
+    last_at: Optional[datetime] = None
+
+    def add(self, value: float, at: datetime) -> None:
+        self.merge(RollupAggregate(1, value, value, value, value, at))
+
+    def merge(self, other: "RollupAggregate") -> None:
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        if self.last_at is None or (other.last_at is not None and other.last_at >= self.last_at):
+            self.last, self.last_at = other.last, other.last_at
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class MetricTotals:
+    """Merged aggregates for one group over some time span."""
+
+    def __init__(self, aggregates: Optional[Dict[str, RollupAggregate]] = None):
+        self.aggregates = aggregates or {}
+
+    def sum(self, measure: str) -> float:
+        aggregate = self.aggregates.get(measure)
+        return aggregate.total if aggregate else 0.0
+
+    def mean(self, measure: str) -> float:
+        aggregate = self.aggregates.get(measure)
+        return aggregate.mean if aggregate else 0.0
+
+    def last(self, measure: str) -> float:
+        aggregate = self.aggregates.get(measure)
+        return float(aggregate.last) if aggregate and aggregate.last is not None else 0.0
+
+    def percentage(self, numerator: str, denominator: str, empty: float = 0.0) -> float:
+        total = self.sum(denominator)
+        return round(self.sum(numerator) / total * 100, 2) if total else empty
+
+
+# Dashboard metric name -> derivation from the group's measures
+METRIC_DEFINITIONS: Dict[str, Dict[str, Callable[[MetricTotals], float]]] = {
+    "scans": {
+        "scan_count": lambda t: int(t.sum("created")),
+        "success_rate": lambda t: t.percentage("completed", "created"),
+        "avg_duration": lambda t: t.mean("duration"),
+    },
+    "compliance": {
+        "compliance_score": lambda t: t.percentage("passed", "validations", empty=100.0),
+        "violations": lambda t: int(t.sum("failed")),
+    },
+    "classifications": {
+        "classification_count": lambda t: int(t.sum("results")),
+        "accuracy_rate": lambda t: t.mean("confidence"),
+    },
+    "catalog": {
+        "catalog_items": lambda t: int(t.sum("assets")),
+        "metadata_completeness": lambda t: round(t.last("metadata_completeness"), 2),
+    },
+    "data_sources": {
+        "data_source_count": lambda t: int(t.last("active")),
+        "connection_health": lambda t: round(t.last("healthy_percentage"), 2),
+    },
+}
+
+
+# ----------------------------------------------------------------------
+# Sources
+# ----------------------------------------------------------------------
+
+# fetch(session, start, end) -> (timestamp, {measure: value}) for raw rows in [start, end)
+EventFetcher = Callable[[Any, datetime, datetime], Iterable[Tuple[datetime, Dict[str, float]]]]
+GaugeSampler = Callable[[Any], Dict[str, float]]
+
+
+@dataclass
+class RollupEventSource:
+    """Raw rows folded into buckets by their timestamp."""
+    group: str
+    measures: Tuple[str, ...]
+    fetch: EventFetcher
+
+
+@dataclass
+class RollupGaugeSource:
+    """Current-state values sampled into the current minute bucket."""
+    group: str
+    measures: Tuple[str, ...]
+    sample: GaugeSampler
+
+
+BucketKey = Tuple[str, str, datetime]  # (group, measure, bucket_start)
+
+
+@dataclass
+class RollupSnapshot:
+    """Rollup rows covering one dashboard range."""
+    start: datetime
+    end: datetime
+    rows: List[Tuple[str, str, datetime, RollupAggregate]] = field(default_factory=list)
+
+    def totals(self, group: str) -> MetricTotals:
+        merged: Dict[str, RollupAggregate] = {}
+        for row_group, measure, _, aggregate in self.rows:
+            if row_group == group:
+                merged.setdefault(measure, RollupAggregate()).merge(aggregate)
+        return MetricTotals(merged)
+
+    def metrics(self, group: str, names: Sequence[str]) -> Dict[str, Any]:
+        definitions = METRIC_DEFINITIONS.get(group, {})
+        totals = self.totals(group)
+        return {name: definitions[name](totals) for name in names if name in definitions}
+
+    def series(self, group: str, names: Sequence[str], points: int) -> Dict[str, List[float]]:
+        """Each requested metric derived per time bin (``points`` equal bins over the range)."""
+        definitions = {name: METRIC_DEFINITIONS.get(group, {}).get(name) for name in names}
+        definitions = {name: derive for name, derive in definitions.items() if derive}
+        if not definitions or points < 1:
+            return {}
+        width = max((self.end - self.start) / points, timedelta(seconds=1))
+        bins: List[Dict[str, RollupAggregate]] = [{} for _ in range(points)]
+        for row_group, measure, bucket_start, aggregate in self.rows:
+            if row_group != group:
+                continue
+            index = min(points - 1, max(0, int((bucket_start - self.start) / width)))
+            bins[index].setdefault(measure, RollupAggregate()).merge(aggregate)
+        populated = [MetricTotals(bucket) for bucket in bins if bucket]
+        return {name: [derive(totals) for totals in populated] for name, derive in definitions.items()}
+
+
+# ----------------------------------------------------------------------
+# Store / compactor
+# ----------------------------------------------------------------------
+
+class MetricsRollupStore:
+    """Maintains and queries the rollup table through the caller's session."""
+
+    def __init__(
+        self,
+        table: Any,
+        event_sources: Sequence[RollupEventSource] = (),
+        gauge_sources: Sequence[RollupGaugeSource] = (),
+        retention: Optional[Dict[str, Optional[timedelta]]] = None,
+        settle_window: timedelta = DEFAULT_SETTLE_WINDOW,
+        backfill_window: timedelta = DEFAULT_BACKFILL_WINDOW,
+        backfill_step: timedelta = DEFAULT_BACKFILL_STEP,
+    ):
+        self.table = table
+        self.event_sources = list(event_sources)
+        self.gauge_sources = list(gauge_sources)
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.settle_window = settle_window
+        self.backfill_window = backfill_window
+        self.backfill_step = backfill_step
+        self.last_compacted_at: Optional[datetime] = None
+        self._event_measures = {(source.group, measure) for source in self.event_sources for measure in source.measures}
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def snapshot(
+        self,
+        session: Any,
+        start: datetime,
+        end: datetime,
+        groups: Optional[Sequence[str]] = None,
+        now: Optional[datetime] = None,
+    ) -> RollupSnapshot:
+        """All rollup rows covering ``[start, end)`` in a single range query."""
+        segments = plan_segments(start, end, now or datetime.utcnow(), self.retention)
+        snapshot = RollupSnapshot(start, end)
+        if not segments:
+            return snapshot
+        t = self.table.c
+        query = select(
+            t.metric_group, t.measure, t.bucket_start, t.sample_count,
+            t.value_sum, t.value_min, t.value_max, t.last_value,
+        ).where(or_(*(
+            and_(t.resolution == resolution, t.bucket_start >= seg_start, t.bucket_start < seg_end)
+            for resolution, seg_start, seg_end in segments
+        )))
+        if groups:
+            query = query.where(t.metric_group.in_(list(groups)))
+        for group, measure, bucket_start, count, total, minimum, maximum, last in session.execute(query):
+            snapshot.rows.append((
+                group, measure, bucket_start,
+                RollupAggregate(count or 0, total or 0.0, minimum, maximum, last, bucket_start),
+            ))
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+
+    def compact(self, session: Any, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Sample gauges, re-aggregate the settle window, backfill one step and expire old buckets.
+
+        Skipped (``{"skipped": True}``) while another worker holds the compaction lock.
+        """
+        now = now or datetime.utcnow()
+        hour = RESOLUTION_SECONDS["hour"]
+        with self._compaction_lock(session) as acquired:
+            if not acquired:
+                session.rollback()
+                return {"skipped": True}
+            t = self.table.c
+            latest_minute = session.execute(
+                select(func.max(t.bucket_start)).where(t.resolution == "minute")
+            ).scalar()
+            backfilled_from = self._backfilled_from(session)
+            if latest_minute is None:
+                rebuild_from = floor_time(now - self.settle_window, hour)
+                if backfilled_from is None:
+                    backfilled_from = rebuild_from
+            else:
+                rebuild_from = floor_time(min(latest_minute, now - self.settle_window), hour)
+                if backfilled_from is None:
+                    # Populated before backfill progress was tracked: history is complete
+                    backfilled_from = floor_time(now - self.backfill_window, hour)
+
+            self._sample_gauges(session, now)
+            written = self.rebuild(session, rebuild_from, now, now=now)
+
+            backfill_target = floor_time(now - self.backfill_window, hour)
+            if backfilled_from > backfill_target:
+                step_from = max(backfill_target, floor_time(backfilled_from - self.backfill_step, hour))
+                written += self.rebuild(session, step_from, backfilled_from, now=now)
+                backfilled_from = step_from
+                self._mark_backfilled(session, backfilled_from)
+
+            expired = self._expire(session, now)
+            session.commit()
+        self.last_compacted_at = now
+        return {
+            "rebuilt_from": rebuild_from.isoformat(),
+            "backfilled_from": backfilled_from.isoformat(),
+            "backfill_complete": backfilled_from <= backfill_target,
+            "rows_written": written,
+            "rows_expired": expired,
+        }
+
+    @contextmanager
+    def _compaction_lock(self, session: Any) -> Iterator[bool]:
+        """Advisory lock so only one worker compacts; a no-op on databases without one."""
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            # Transaction-scoped: released by the commit/rollback that ends the run
+            yield bool(session.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": COMPACTION_LOCK_KEY}
+            ).scalar())
+        elif dialect == "mysql":
+            acquired = session.execute(
+                text("SELECT GET_LOCK(:name, 0)"), {"name": COMPACTION_LOCK_NAME}
+            ).scalar() == 1
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    session.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": COMPACTION_LOCK_NAME})
+        else:
+            yield True
+
+    def _backfilled_from(self, session: Any) -> Optional[datetime]:
+        t = self.table.c
+        resolution, group, measure = BACKFILL_MARKER
+        return session.execute(select(func.min(t.bucket_start)).where(and_(
+            t.resolution == resolution, t.metric_group == group, t.measure == measure,
+        ))).scalar()
+
+    def _mark_backfilled(self, session: Any, backfilled_from: datetime) -> None:
+        t = self.table.c
+        resolution, group, measure = BACKFILL_MARKER
+        session.execute(delete(self.table).where(and_(
+            t.resolution == resolution, t.metric_group == group, t.measure == measure,
+        )))
+        self._insert(session, resolution, {(group, measure, backfilled_from): RollupAggregate()})
+
+    def rebuild(self, session: Any, start: datetime, end: datetime, now: Optional[datetime] = None) -> int:
+        """Recompute buckets for ``[start, end)`` from raw rows, one day per chunk."""
+        now = now or datetime.utcnow()
+        minute_horizon = rollup_horizon("minute", now, self.retention)
+        written = 0
+        chunk_start = floor_time(start, RESOLUTION_SECONDS["hour"])
+        while chunk_start < end:
+            chunk_end = min(end, floor_time(chunk_start, RESOLUTION_SECONDS["day"]) + timedelta(days=1))
+            if minute_horizon is not None and chunk_start < minute_horizon < chunk_end:
+                chunk_end = minute_horizon
+            finest = "minute" if minute_horizon is None or chunk_start >= minute_horizon else "hour"
+            written += self._rebuild_chunk(session, chunk_start, chunk_end, finest)
+            chunk_start = chunk_end
+        return written
+
+    def _rebuild_chunk(self, session: Any, start: datetime, end: datetime, finest: str) -> int:
+        seconds = RESOLUTION_SECONDS[finest]
+        buckets: Dict[BucketKey, RollupAggregate] = {}
+        for source in self.event_sources:
+            for timestamp, values in source.fetch(session, start, end):
+                if timestamp is None:
+                    continue
+                bucket_start = floor_time(timestamp, seconds)
+                for measure, value in values.items():
+                    if value is None:
+                        continue
+                    buckets.setdefault((source.group, measure, bucket_start), RollupAggregate()).add(float(value), timestamp)
+
+        # Event measures are replaced wholesale; gauge samples in the same buckets are kept
+        t = self.table.c
+        for group, measures in self._measures_by_group().items():
+            session.execute(delete(self.table).where(and_(
+                t.resolution == finest, t.bucket_start >= start, t.bucket_start < end,
+                t.metric_group == group, t.measure.in_(measures),
+            )))
+        written = self._insert(session, finest, buckets)
+
+        # Re-derive the coarser buckets the chunk touched from the level below
+        finer = finest
+        parent = _parent(finer)
+        while parent is not None:
+            parent_seconds = RESOLUTION_SECONDS[parent]
+            written += self._rollup_level(
+                session, finer, parent, floor_time(start, parent_seconds), ceil_time(end, parent_seconds)
+            )
+            finer, parent = parent, _parent(parent)
+        return written
+
+    def _rollup_level(self, session: Any, finer: str, coarser: str, start: datetime, end: datetime) -> int:
+        t = self.table.c
+        seconds = RESOLUTION_SECONDS[coarser]
+        rows = session.execute(
+            select(t.metric_group, t.measure, t.bucket_start, t.sample_count,
+                   t.value_sum, t.value_min, t.value_max, t.last_value)
+            .where(and_(t.resolution == finer, t.bucket_start >= start, t.bucket_start < end))
+        )
+        buckets: Dict[BucketKey, RollupAggregate] = {}
+        for group, measure, bucket_start, count, total, minimum, maximum, last in rows:
+            buckets.setdefault((group, measure, floor_time(bucket_start, seconds)), RollupAggregate()).merge(
+                RollupAggregate(count or 0, total or 0.0, minimum, maximum, last, bucket_start)
+            )
+        if not buckets:
+            # Nothing at the finer level (e.g. hour-only backfill history): leave existing buckets alone
+            return 0
+        session.execute(delete(self.table).where(and_(
+            t.resolution == coarser, t.bucket_start >= start, t.bucket_start < end,
+        )))
+        return self._insert(session, coarser, buckets)
+
+    def _sample_gauges(self, session: Any, now: datetime) -> None:
+        bucket_start = floor_time(now, RESOLUTION_SECONDS["minute"])
+        t = self.table.c
+        buckets: Dict[BucketKey, RollupAggregate] = {}
+        for source in self.gauge_sources:
+            try:
+                values = source.sample(session)
+            except Exception as e:
+                logger.warning(f"Failed to sample {source.group} gauges: {e}")
+                continue
+            session.execute(delete(self.table).where(and_(
+                t.resolution == "minute", t.bucket_start == bucket_start,
+                t.metric_group == source.group, t.measure.in_(list(source.measures)),
+            )))
+            for measure, value in values.items():
+                if value is not None:
+                    buckets.setdefault((source.group, measure, bucket_start), RollupAggregate()).add(float(value), now)
+        self._insert(session, "minute", buckets)
+
+    def _expire(self, session: Any, now: datetime) -> int:
+        expired = 0
+        t = self.table.c
+        for resolution, _ in RESOLUTIONS:
+            horizon = rollup_horizon(resolution, now, self.retention)
+            if horizon is None:
+                continue
+            result = session.execute(delete(self.table).where(and_(
+                t.resolution == resolution, t.bucket_start < horizon,
+            )))
+            expired += result.rowcount or 0
+        return expired
+
+    def _upsert_statement(self, session: Any) -> Any:
+        """INSERT that overwrites an existing bucket (e.g. one written by an overlapping run)."""
+        dialect = session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            statement = (postgresql if dialect == "postgresql" else sqlite).insert(self.table)
+            return statement.on_conflict_do_update(
+                index_elements=list(BUCKET_KEY_COLUMNS),
+                set_={column: statement.excluded[column] for column in BUCKET_VALUE_COLUMNS},
+            )
+        if dialect == "mysql":
+            statement = mysql.insert(self.table)
+            return statement.on_duplicate_key_update(
+                {column: statement.inserted[column] for column in BUCKET_VALUE_COLUMNS}
+            )
+        return insert(self.table)
+
+    def _insert(self, session: Any, resolution: str, buckets: Dict[BucketKey, RollupAggregate]) -> int:
+        if not buckets:
+            return 0
+        updated_at = datetime.utcnow()
+        session.execute(self._upsert_statement(session), [
+            {
+                "resolution": resolution,
+                "metric_group": group,
+                "measure": measure,
+                "bucket_start": bucket_start,
+                "sample_count": aggregate.count,
+                "value_sum": aggregate.total,
+                "value_min": aggregate.minimum,
+                "value_max": aggregate.maximum,
+                "last_value": aggregate.last,
+                "updated_at": updated_at,
+            }
+            for (group, measure, bucket_start), aggregate in buckets.items()
+        ])
+        return len(buckets)
+
+    def _measures_by_group(self) -> Dict[str, List[str]]:
+        grouped: Dict[str, List[str]] = {}
+        for group, measure in sorted(self._event_measures):
+            grouped.setdefault(group, []).append(measure)
+        return grouped
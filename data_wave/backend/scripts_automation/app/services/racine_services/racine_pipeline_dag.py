@@ -0,0 +1,329 @@
+"""
+Racine Pipeline DAG
+===================
+
+Dependency-aware stage scheduling for RacinePipelineService.
+
+Stages form a DAG instead of a strict ``stage_order`` sequence:
+
+- A stage with an explicit ``depends_on_stages`` list (stage ids or names, an
+  empty list meaning "no dependencies") waits only for those stages.
+- A stage without declared dependencies waits for every stage of the nearest
+  lower ``stage_order``, so stages sharing an order level (or legacy pipelines
+  that never declared dependencies) keep their previous ordering guarantees
+  while same-level stages run concurrently.
+
+Every stage belongs to a resource class (``resource_requirements.resource_class``
+or a default per stage type) with its own concurrency limit on top of a global
+limit. Each stage also gets an input fingerprint over every stage-defining
+column, the execution parameters, the version of the source data the run
+reads, and the fingerprints and output digests of its upstream stages. The
+service reuses the result of a stage only when that fingerprint is unchanged
+and a source data version is known.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Default resource class per stage type value
+STAGE_RESOURCE_CLASSES = {
+    "data_ingestion": "io",
+    "catalog_update": "io",
+    "notification": "io",
+    "scan_execution": "io",
+    "data_transformation": "compute",
+    "data_validation": "compute",
+    "quality_check": "compute",
+    "compliance_validation": "compute",
+    "compliance_check": "compute",
+    "classification": "ml",
+    "data_classification": "ml",
+    "ai_processing": "ml",
+}
+
+DEFAULT_RESOURCE_LIMITS = {"io": 8, "compute": 4, "ml": 2, "default": 4}
+DEFAULT_MAX_PARALLEL_STAGES = 8
+
+# Stage types whose results depend only on their inputs and may be reused
+CACHEABLE_STAGE_TYPES = {
+    "data_transformation", "data_validation", "quality_check", "compliance_validation",
+    "compliance_check", "classification", "data_classification", "ai_processing",
+}
+
+# Stage columns that define what a stage does (anything changing its result)
+STAGE_DEFINITION_ATTRIBUTES = (
+    "configuration", "stage_configuration", "input_schema", "output_schema", "transformation_logic",
+    "conditional_logic", "branching_conditions", "target_group", "target_service", "target_operation",
+    "group_specific_config", "quality_checks", "validation_rules", "compliance_checks", "error_thresholds",
+)
+
+# Execution parameters identifying the version of the source data a run reads, by precedence
+DATA_VERSION_PARAMETERS = ("source_data_version", "schema_fingerprint", "scan_id")
+
+
+def _type_value(stage: Any) -> str:
+    stage_type = getattr(stage, "stage_type", None)
+    return str(getattr(stage_type, "value", stage_type) or "")
+
+
+@dataclass
+class StageNode:
+    """A pipeline stage with its resolved dependencies and scheduling attributes."""
+    key: str
+    stage: Any
+    depends_on: Set[str] = field(default_factory=set)
+    resource_class: str = "default"
+    cacheable: bool = False
+    expected_duration: float = 0.0
+
+
+@dataclass
+class StageOutcome:
+    """Result of running one node, including its timing span."""
+    key: str
+    status: str  # completed, failed, skipped
+    result: Any = None
+    fingerprint: Optional[str] = None
+    output_digest: Optional[str] = None
+    cache_hit: bool = False
+    queued_at: float = 0.0
+    started_at: Optional[float] = None
+    completed_at: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "completed"
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.completed_at is None:
+            return 0.0
+        return self.completed_at - self.started_at
+
+    def span(self) -> Dict[str, Any]:
+        return {
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "wait_seconds": round((self.started_at or self.queued_at) - self.queued_at, 6),
+            "duration_seconds": round(self.duration, 6),
+            "cache_hit": self.cache_hit,
+            "input_fingerprint": self.fingerprint,
+        }
+
+
+class PipelineDAG:
+    """Stage dependency graph built from pipeline stage rows."""
+
+    def __init__(self, nodes: Dict[str, StageNode]):
+        self.nodes = nodes
+        self.order = self._topological_order()
+
+    @classmethod
+    def from_stages(cls, stages: List[Any]) -> "PipelineDAG":
+        by_id = {str(stage.id): stage for stage in stages}
+        by_name = {getattr(stage, "stage_name", None): str(stage.id) for stage in stages}
+        levels = sorted({stage.stage_order or 0 for stage in stages})
+
+        nodes: Dict[str, StageNode] = {}
+        for stage in stages:
+            key = str(stage.id)
+            declared = getattr(stage, "depends_on_stages", None)
+            if declared is None:
+                previous = [level for level in levels if level < (stage.stage_order or 0)]
+                depends_on = {
+                    str(other.id) for other in stages
+                    if previous and (other.stage_order or 0) == previous[-1]
+                }
+            else:
+                depends_on = set()
+                for reference in declared:
+                    resolved = str(reference) if str(reference) in by_id else by_name.get(reference)
+                    if resolved is None:
+                        logger.warning(f"Stage {stage.stage_name} depends on unknown stage {reference}; ignoring")
+                        continue
+                    depends_on.add(resolved)
+            depends_on.discard(key)
+
+            requirements = getattr(stage, "resource_requirements", None) or {}
+            hints = getattr(stage, "optimization_hints", None) or {}
+            type_value = _type_value(stage)
+            nodes[key] = StageNode(
+                key=key,
+                stage=stage,
+                depends_on=depends_on,
+                resource_class=requirements.get("resource_class") or STAGE_RESOURCE_CLASSES.get(type_value, "default"),
+                cacheable=hints.get("cache_enabled", type_value in CACHEABLE_STAGE_TYPES),
+                expected_duration=float(getattr(stage, "expected_duration", None) or 0),
+            )
+        return cls(nodes)
+
+    def _topological_order(self) -> List[str]:
+        indegree = {key: len(node.depends_on) for key, node in self.nodes.items()}
+        dependents: Dict[str, List[str]] = {key: [] for key in self.nodes}
+        for key, node in self.nodes.items():
+            for dependency in node.depends_on:
+                dependents[dependency].append(key)
+        ready = sorted(
+            (key for key, degree in indegree.items() if degree == 0),
+            key=lambda k: self.nodes[k].stage.stage_order or 0,
+        )
+        order: List[str] = []
+        while ready:
+            key = ready.pop(0)
+            order.append(key)
+            for dependent in dependents[key]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.nodes):
+            cyclic = [self.nodes[key].stage.stage_name for key, degree in indegree.items() if degree > 0]
+            raise ValueError(f"Pipeline stages contain a dependency cycle: {cyclic}")
+        return order
+
+    def critical_path(self, durations: Dict[str, float]) -> Dict[str, Any]:
+        """Longest dependency chain by measured (or expected) stage duration."""
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for key in self.order:
+            node = self.nodes[key]
+            start, via = 0.0, None
+            for dependency in node.depends_on:
+                if finish[dependency] > start:
+                    start, via = finish[dependency], dependency
+            finish[key] = start + durations.get(key, node.expected_duration)
+            previous[key] = via
+        if not finish:
+            return {"seconds": 0.0, "stages": []}
+        tail = max(finish, key=finish.get)
+        path = []
+        while tail is not None:
+            path.append(self.nodes[tail].stage.stage_name)
+            tail = previous[tail]
+        return {"seconds": round(max(finish.values()), 6), "stages": list(reversed(path))}
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def source_data_version(parameters: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Version of the source data an execution reads (None if the parameters do not identify one)."""
+    for name in DATA_VERSION_PARAMETERS:
+        value = (parameters or {}).get(name)
+        if value not in (None, ""):
+            return f"{name}:{value}"
+    return None
+
+
+def digest_output(output: Any) -> str:
+    """Stable digest of a stage output, chained into the fingerprints of downstream stages."""
+    return _digest(output)
+
+
+def fingerprint_stage_input(
+    stage: Any,
+    upstream: List[str],
+    parameters: Optional[Dict[str, Any]],
+    data_version: Optional[str] = None,
+) -> str:
+    """Stable hash of everything a stage's result depends on.
+
+    ``upstream`` holds one entry per upstream stage (its fingerprint and output
+    digest), so a stage is invalidated when an upstream result changed even if
+    that upstream stage's own inputs did not.
+    """
+    return _digest({
+        "type": _type_value(stage),
+        "definition": {attr: getattr(stage, attr, None) for attr in STAGE_DEFINITION_ATTRIBUTES},
+        "upstream": sorted(upstream),
+        "parameters": parameters or {},
+        "data_version": data_version,
+    })
+
+
+StageRunner = Callable[[StageNode, str, Dict[str, "StageOutcome"]], Awaitable["StageOutcome"]]
+
+
+class PipelineDAGExecutor:
+    """Runs a PipelineDAG with bounded parallelism per resource class."""
+
+    def __init__(
+        self,
+        resource_limits: Optional[Dict[str, int]] = None,
+        max_parallel_stages: int = DEFAULT_MAX_PARALLEL_STAGES,
+    ):
+        self.resource_limits = {**DEFAULT_RESOURCE_LIMITS, **(resource_limits or {})}
+        self.max_parallel_stages = max_parallel_stages
+
+    async def run(
+        self,
+        dag: PipelineDAG,
+        run_stage: StageRunner,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, StageOutcome]:
+        """Execute every node once its dependencies completed.
+
+        ``run_stage(node, fingerprint, upstream_outcomes)`` must return a StageOutcome.
+        A failed stage whose ``on_failure_action`` is not ``continue``/``skip``
+        stops new stages from starting; stages already running are awaited and
+        everything not started is reported as ``skipped``.
+        """
+        global_slots = asyncio.Semaphore(self.max_parallel_stages)
+        class_slots = {
+            resource_class: asyncio.Semaphore(max(1, limit))
+            for resource_class, limit in self.resource_limits.items()
+        }
+        aborted = asyncio.Event()
+        data_version = source_data_version(parameters)
+        futures: Dict[str, asyncio.Future] = {
+            key: asyncio.get_running_loop().create_future() for key in dag.order
+        }
+
+        async def _run_node(node: StageNode) -> StageOutcome:
+            upstream = {key: await futures[key] for key in node.depends_on}
+            queued_at = time.time()
+            if aborted.is_set() or any(outcome.status == "skipped" for outcome in upstream.values()) or any(
+                not outcome.ok and not self._tolerates_failure(dag.nodes[key].stage)
+                for key, outcome in upstream.items()
+            ):
+                return StageOutcome(node.key, "skipped", queued_at=queued_at)
+            fingerprint = fingerprint_stage_input(
+                node.stage,
+                [f"{outcome.fingerprint or ''}:{outcome.output_digest or ''}" for outcome in upstream.values()],
+                parameters,
+                data_version,
+            )
+            slots = class_slots.get(node.resource_class) or class_slots["default"]
+            async with global_slots, slots:
+                if aborted.is_set():
+                    return StageOutcome(node.key, "skipped", fingerprint=fingerprint, queued_at=queued_at)
+                outcome = await run_stage(node, fingerprint, upstream)
+            outcome.queued_at = queued_at
+            if not outcome.ok and not self._tolerates_failure(node.stage):
+                aborted.set()
+            return outcome
+
+        async def _settle(node: StageNode) -> None:
+            try:
+                outcome = await _run_node(node)
+            except Exception as e:
+                logger.error(f"Stage {node.stage.stage_name} raised outside its runner: {e}")
+                outcome = StageOutcome(node.key, "failed", result={"error": str(e)})
+                if not self._tolerates_failure(node.stage):
+                    aborted.set()
+            futures[node.key].set_result(outcome)
+
+        await asyncio.gather(*(_settle(dag.nodes[key]) for key in dag.order))
+        return {key: futures[key].result() for key in dag.order}
+
+    @staticmethod
+    def _tolerates_failure(stage: Any) -> bool:
+        return (getattr(stage, "on_failure_action", None) or "fail") in ("continue", "skip")
@@ -26,6 +26,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 import uuid
 import json
+import time
 
 # Import existing services for integration
 from ..data_source_service import DataSourceService
@@ -55,6 +56,15 @@ from ...models.racine_models.racine_pipeline_models import (
     OptimizationType
 )
 from ...models.auth_models import User
+from .racine_pipeline_dag import (
+    DEFAULT_MAX_PARALLEL_STAGES,
+    PipelineDAG,
+    PipelineDAGExecutor,
+    StageNode,
+    StageOutcome,
+    digest_output,
+    source_data_version
+)
 
 logger = logging.getLogger(__name__)
 
@@ -704,45 +714,108 @@ class RacinePipelineService:
         execution: RacinePipelineExecution, 
         optimizations: List[Dict[str, Any]]
     ):
-        """Execute all stages in a pipeline with applied optimizations."""
+        """Execute pipeline stages as a dependency DAG with bounded parallelism and result reuse."""
         try:
-            # Get pipeline stages in order
             stages = self.db.query(RacinePipelineStage).filter(
                 RacinePipelineStage.pipeline_id == execution.pipeline_id
             ).order_by(RacinePipelineStage.stage_order).all()
 
+            parameters = execution.execution_parameters or {}
             execution_context = {
                 "execution_id": execution.id,
                 "pipeline_id": execution.pipeline_id,
-                "parameters": execution.execution_parameters,
+                "parameters": parameters,
                 "optimizations": optimizations,
                 "service_registry": self.service_registry
             }
 
-            # Track data lineage throughout execution
+            dag = PipelineDAG.from_stages(stages)
+            executor = PipelineDAGExecutor(
+                resource_limits=parameters.get("resource_limits"),
+                max_parallel_stages=parameters.get("max_parallel_stages", DEFAULT_MAX_PARALLEL_STAGES)
+            )
+            # Results are only reused when the run identifies the source data version it reads
+            use_cache = parameters.get("use_stage_cache", True) and source_data_version(parameters) is not None
+
+            async def _run_stage(node: StageNode, fingerprint: str, upstream: Dict[str, StageOutcome]) -> StageOutcome:
+                started_at = time.time()
+                cached_output = None
+                if use_cache and node.cacheable:
+                    cached_output = self._find_cached_stage_output(node.stage, fingerprint)
+                stage_context = {
+                    **execution_context,
+                    "upstream_outputs": {
+                        dag.nodes[key].stage.stage_name: outcome.result.stage_output
+                        for key, outcome in upstream.items() if outcome.result is not None
+                    }
+                }
+                stage_execution = await self._execute_pipeline_stage(
+                    node.stage, stage_context, cached_output=cached_output
+                )
+                return StageOutcome(
+                    key=node.key,
+                    status="completed" if stage_execution.status == ExecutionStatus.COMPLETED else "failed",
+                    result=stage_execution,
+                    fingerprint=fingerprint,
+                    output_digest=digest_output(stage_execution.stage_output),
+                    cache_hit=cached_output is not None,
+                    started_at=started_at,
+                    completed_at=time.time()
+                )
+
+            started = time.time()
+            outcomes = await executor.run(dag, _run_stage, parameters)
+            wall_seconds = time.time() - started
+
+            # Track data lineage and per-stage timing spans
             data_lineage = {
                 "execution_id": execution.id,
                 "data_sources": [],
                 "transformations": [],
                 "outputs": []
             }
-
-            for stage in stages:
-                stage_execution = await self._execute_pipeline_stage(stage, execution_context)
-                
-                # Update data lineage
+            failed = [outcome for outcome in outcomes.values() if outcome.status == "failed"]
+            for key in dag.order:
+                outcome = outcomes[key]
+                stage_execution = outcome.result
+                if stage_execution is None:
+                    continue
+                stage_execution.performance_metrics = {
+                    **(stage_execution.performance_metrics or {}),
+                    "input_fingerprint": outcome.fingerprint,
+                    "span": {**outcome.span(), "resource_class": dag.nodes[key].resource_class}
+                }
+                stage_execution.duration_seconds = int(round(outcome.duration))
                 if stage_execution.data_lineage:
                     data_lineage["transformations"].append(stage_execution.data_lineage)
 
-                if stage_execution.status == ExecutionStatus.FAILED:
-                    execution.status = ExecutionStatus.FAILED
-                    execution.completed_at = datetime.utcnow()
-                    execution.error_message = stage_execution.error_message
-                    break
+            critical_path = dag.critical_path({key: outcome.duration for key, outcome in outcomes.items()})
+            execution.total_stages = len(outcomes)
+            execution.completed_stages = sum(1 for outcome in outcomes.values() if outcome.ok)
+            execution.failed_stages = len(failed)
+            execution.skipped_stages = sum(1 for outcome in outcomes.values() if outcome.status == "skipped")
+            execution.actual_duration = int(round(wall_seconds))
+            execution.performance_metrics = {
+                **(execution.performance_metrics or {}),
+                "dag": {
+                    "wall_seconds": round(wall_seconds, 6),
+                    "critical_path_seconds": critical_path["seconds"],
+                    "critical_path": critical_path["stages"],
+                    "serial_seconds": round(sum(outcome.duration for outcome in outcomes.values()), 6),
+                    "cache_hits": sum(1 for outcome in outcomes.values() if outcome.cache_hit)
+                }
+            }
 
-            if execution.status == ExecutionStatus.RUNNING:
-                execution.status = ExecutionStatus.COMPLETED
-                execution.completed_at = datetime.utcnow()
+            blocking = [
+                outcome for outcome in failed
+                if not PipelineDAGExecutor._tolerates_failure(dag.nodes[outcome.key].stage)
+            ]
+            if blocking:
+                execution.status = ExecutionStatus.FAILED
+                execution.error_message = blocking[0].result.error_message if blocking[0].result is not None else None
+            elif execution.status == ExecutionStatus.RUNNING:
+                execution.status = ExecutionStatus.COMPLETED_WITH_WARNINGS if failed else ExecutionStatus.COMPLETED
+            execution.completed_at = datetime.utcnow()
 
             # Update final data lineage
             execution.data_lineage = data_lineage
@@ -753,16 +826,31 @@ class RacinePipelineService:
             execution.error_message = str(e)
             logger.error(f"Error executing pipeline stages: {str(e)}")
 
+    def _find_cached_stage_output(self, stage: RacinePipelineStage, input_fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Output of a recent successful run of this stage with identical inputs, if any."""
+        try:
+            recent = self.db.query(RacineStageExecution).filter(
+                RacineStageExecution.pipeline_stage_id == stage.id,
+                RacineStageExecution.status == ExecutionStatus.COMPLETED
+            ).order_by(RacineStageExecution.started_at.desc()).limit(5).all()
+            for prior in recent:
+                if (prior.performance_metrics or {}).get("input_fingerprint") == input_fingerprint:
+                    return prior.stage_output
+        except Exception as e:
+            logger.warning(f"Stage cache lookup failed for {stage.id}: {str(e)}")
+        return None
+
     async def _execute_pipeline_stage(
         self, 
         stage: RacinePipelineStage, 
-        execution_context: Dict[str, Any]
+        execution_context: Dict[str, Any],
+        cached_output: Optional[Dict[str, Any]] = None
     ) -> RacineStageExecution:
-        """Execute a single pipeline stage with AI optimizations."""
+        """Execute a single pipeline stage with AI optimizations (or reuse a cached output)."""
         try:
             stage_execution = RacineStageExecution(
-                execution_id=execution_context["execution_id"],
-                stage_id=stage.id,
+                pipeline_execution_id=execution_context["execution_id"],
+                pipeline_stage_id=stage.id,
                 status=ExecutionStatus.RUNNING,
                 stage_input=execution_context.get("parameters", {}),
                 optimization_applied=execution_context.get("optimizations", []),
@@ -772,8 +860,11 @@ class RacinePipelineService:
             self.db.add(stage_execution)
             self.db.flush()
 
+            if cached_output is not None:
+                # Inputs unchanged since a previous successful run: reuse its output
+                result = cached_output
             # Execute stage based on type with cross-group integration
-            if stage.stage_type == StageType.DATA_INGESTION:
+            elif stage.stage_type == StageType.DATA_INGESTION:
                 result = await self._execute_data_ingestion_stage(stage, execution_context)
             elif stage.stage_type == StageType.DATA_TRANSFORMATION:
                 result = await self._execute_data_transformation_stage(stage, execution_context)
@@ -791,7 +882,7 @@ class RacinePipelineService:
             stage_execution.status = ExecutionStatus.COMPLETED
             stage_execution.stage_output = result
             stage_execution.data_lineage = result.get("lineage", {})
-            stage_execution.performance_metrics = result.get("metrics", {})
+            stage_execution.performance_metrics = {**result.get("metrics", {}), "cache_hit": cached_output is not None}
             stage_execution.completed_at = datetime.utcnow()
 
             return stage_execution
@@ -7,6 +7,7 @@ from app.models.scan_models import (
     DiscoveryHistory, DiscoveryStatus
 )
 from app.services.scan_rule_set_service import ScanRuleSetService
+from app.services.schema_fingerprint import MONGODB_LAYOUT, RELATIONAL_LAYOUT, annotate_fingerprints, layout_for, stored_digests
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 from datetime import datetime
@@ -325,6 +326,9 @@ class ScanService:
             
         scan_results = []
         
+        # Content hashes (stored with every table row) let later incremental scans skip unchanged schemas/tables
+        annotate_fingerprints(metadata, layout_for(source_type))
+        
         if source_type in ["mysql", "postgresql"]:
             # Process SQL database metadata
             for schema_name, schema_data in metadata.get("schemas", {}).items():
@@ -334,7 +338,7 @@ class ScanService:
                         scan_id=scan_id,
                         schema_name=schema_name,
                         table_name=table_name,
-                        scan_metadata=table_data.get("metadata", {})
+                        scan_metadata={**table_data.get("metadata", {}), **stored_digests(metadata, schema_data, table_data, RELATIONAL_LAYOUT)}
                     )
                     scan_results.append(table_result)
                     
@@ -360,7 +364,7 @@ class ScanService:
                         scan_id=scan_id,
                         schema_name=db_name,  # Use database name as schema name
                         table_name=collection_name,  # Use collection name as table name
-                        scan_metadata=collection_data.get("metadata", {})
+                        scan_metadata={**collection_data.get("metadata", {}), **stored_digests(metadata, db_data, collection_data, MONGODB_LAYOUT)}
                     )
                     scan_results.append(collection_result)
                     
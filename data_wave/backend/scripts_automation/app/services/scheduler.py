@@ -1,44 +1,328 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from typing import Callable, Any, Tuple
+"""
+Loop Scheduler
+Process-wide timer scheduler that runs on the asyncio event loop.
+
+Background loops used to re-arm themselves through ``SchedulerService()``, and
+every instantiation started a fresh APScheduler ``BackgroundScheduler`` thread
+whose jobs then hopped back into the loop with ``call_soon_threadsafe``. Threads
+accumulated with every tick.
+
+``LoopScheduler`` keeps all timers in one binary heap and arms a single
+``loop.call_at`` handle for the earliest deadline, so any number of pending
+timers costs no threads and a tick only touches the timers that are due.
+
+- Jobs are named; scheduling a name again replaces the pending job.
+- Cancellation is O(1) (lazy deletion, the heap is compacted when it fills up
+  with cancelled entries).
+- Periodic jobs are drift-free: deadlines advance on a fixed grid from the first
+  run, missed intervals are skipped rather than replayed, and a coroutine job
+  never overlaps a still-running previous invocation.
+"""
+
 import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class _Timer:
+    deadline: float
+    seq: int
+    name: str = field(compare=False)
+    callback: Callable[..., Any] = field(compare=False)
+    args: Tuple[Any, ...] = field(compare=False, default=())
+    kwargs: Dict[str, Any] = field(compare=False, default_factory=dict)
+    interval: Optional[float] = field(compare=False, default=None)
+    cancelled: bool = field(compare=False, default=False)
+    running: Optional[asyncio.Task] = field(compare=False, default=None)
+
+
+class LoopScheduler:
+    """Named one-shot and periodic timers multiplexed onto one event loop handle."""
+
+    # Rebuild the heap once cancelled entries outnumber live ones past this size
+    COMPACT_MIN_SIZE = 1024
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self._loop = loop
+        self._heap: List[_Timer] = []
+        self._jobs: Dict[str, _Timer] = {}
+        self._seq = itertools.count()
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._armed_deadline: Optional[float] = None
+        self._cancelled_in_heap = 0
+        self._tasks: set = set()
+        self._stats = {"fired": 0, "failed": 0, "cancelled": 0, "replaced": 0, "skipped_overlaps": 0, "ticks": 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def call_later(self, name: str, delay: float, callback: Callable[..., Any],
+                   args: Tuple[Any, ...] = (), kwargs: Optional[Dict[str, Any]] = None) -> str:
+        """Run ``callback(*args, **kwargs)`` once after ``delay`` seconds."""
+        return self._add(name, max(0.0, float(delay)), callback, tuple(args), kwargs or {}, None)
+
+    def call_every(self, name: str, interval: float, callback: Callable[..., Any],
+                   args: Tuple[Any, ...] = (), kwargs: Optional[Dict[str, Any]] = None,
+                   first_delay: Optional[float] = None) -> str:
+        """Run ``callback`` every ``interval`` seconds (first run after ``first_delay``, default one interval)."""
+        interval = float(interval)
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        delay = interval if first_delay is None else max(0.0, float(first_delay))
+        return self._add(name, delay, callback, tuple(args), kwargs or {}, interval)
+
+    def cancel(self, name: str) -> bool:
+        timer = self._jobs.pop(name, None)
+        if timer is None:
+            return False
+        self._discard(timer)
+        self._stats["cancelled"] += 1
+        self._maybe_compact()
+        return True
+
+    def cancel_all(self) -> None:
+        for name in list(self._jobs):
+            self.cancel(name)
+
+    def is_scheduled(self, name: str) -> bool:
+        return name in self._jobs
+
+    def next_run_in(self, name: str) -> Optional[float]:
+        timer = self._jobs.get(name)
+        if timer is None or self._loop is None:
+            return None
+        return max(0.0, timer.deadline - self._loop.time())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "pending": len(self._jobs),
+            "periodic": sum(1 for timer in self._jobs.values() if timer.interval is not None),
+            "heap_size": len(self._heap),
+            "running_tasks": len(self._tasks),
+        }
+
+    def shutdown(self) -> None:
+        """Cancel all timers and in-flight job tasks."""
+        self.cancel_all()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            self._armed_deadline = None
+        for task in list(self._tasks):
+            task.cancel()
+        self._heap.clear()
+        self._cancelled_in_heap = 0
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        running = asyncio.get_running_loop()
+        if self._loop is not running:
+            if self._loop is not None and not self._loop.is_closed() and self._loop.is_running():
+                raise RuntimeError("LoopScheduler is bound to a different running event loop")
+            # First use, or the previous loop is gone (e.g. between test runs): start clean
+            self._jobs.clear()
+            self._heap.clear()
+            self._tasks.clear()
+            self._cancelled_in_heap = 0
+            self._handle = None
+            self._armed_deadline = None
+            self._loop = running
+        return running
+
+    def _add(self, name: str, delay: float, callback: Callable[..., Any], args: Tuple[Any, ...],
+             kwargs: Dict[str, Any], interval: Optional[float]) -> str:
+        loop = self._bind_loop()
+        previous = self._jobs.pop(name, None)
+        if previous is not None:
+            self._discard(previous)
+            self._stats["replaced"] += 1
+        timer = _Timer(loop.time() + delay, next(self._seq), name, callback, args, kwargs, interval)
+        self._jobs[name] = timer
+        self._push(timer)
+        return name
+
+    def _push(self, timer: _Timer) -> None:
+        heapq.heappush(self._heap, timer)
+        if self._armed_deadline is None or timer.deadline < self._armed_deadline:
+            self._arm(timer.deadline)
+
+    def _discard(self, timer: _Timer) -> None:
+        timer.cancelled = True
+        self._cancelled_in_heap += 1
+
+    def _arm(self, deadline: float) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = self._loop.call_at(deadline, self._tick)
+        self._armed_deadline = deadline
+
+    def _tick(self) -> None:
+        self._handle = None
+        self._armed_deadline = None
+        self._stats["ticks"] += 1
+        now = self._loop.time()
+        heap = self._heap
+        while heap and heap[0].deadline <= now:
+            timer = heapq.heappop(heap)
+            if timer.cancelled:
+                self._cancelled_in_heap -= 1
+                continue
+            if timer.interval is None:
+                del self._jobs[timer.name]
+                self._fire(timer)
+                continue
+            self._fire(timer)
+            # Stay on the original grid; skip (not replay) intervals missed while the loop was busy
+            missed = math.floor((now - timer.deadline) / timer.interval) + 1
+            timer.deadline += missed * timer.interval
+            timer.seq = next(self._seq)
+            heapq.heappush(heap, timer)
+        self._maybe_compact()
+        while heap and heap[0].cancelled:
+            heapq.heappop(heap)
+            self._cancelled_in_heap -= 1
+        if heap:
+            self._arm(heap[0].deadline)
+
+    def _fire(self, timer: _Timer) -> None:
+        if timer.running is not None and not timer.running.done():
+            self._stats["skipped_overlaps"] += 1
+            return
+        try:
+            result = timer.callback(*timer.args, **timer.kwargs)
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.error(f"Scheduled job '{timer.name}' failed: {e}")
+            return
+        self._stats["fired"] += 1
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result, loop=self._loop)
+            timer.running = task
+            self._tasks.add(task)
+            task.add_done_callback(lambda t, name=timer.name: self._task_done(name, t))
+
+    def _task_done(self, name: str, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self._stats["failed"] += 1
+            logger.error(f"Scheduled job '{name}' failed: {error}")
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) >= self.COMPACT_MIN_SIZE and self._cancelled_in_heap * 2 > len(self._heap):
+            # In place: _tick holds a reference to the heap list while jobs run
+            self._heap[:] = [timer for timer in self._heap if not timer.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled_in_heap = 0
+
+
+_loop_scheduler = LoopScheduler()
+
+
+def get_loop_scheduler() -> LoopScheduler:
+    """Get the process-wide loop scheduler."""
+    return _loop_scheduler
+
+
+def _default_task_name(func: Callable[..., Any]) -> str:
+    owner = getattr(func, "__self__", None)
+    name = getattr(func, "__qualname__", repr(func))
+    return f"{name}@{id(owner):x}" if owner is not None else name
+
+
+def _task_owner(func: Callable[..., Any]) -> str:
+    """Class (bound methods) or module (functions) a task belongs to."""
+    owner = getattr(func, "__self__", None)
+    if owner is not None:
+        cls = owner if isinstance(owner, type) else type(owner)
+        return f"{cls.__module__}.{cls.__qualname__}"
+    return getattr(func, "__module__", None) or "tasks"
 
 
 class SchedulerService:
-    """Lightweight wrapper around APScheduler to schedule async tasks."""
+    """Thin facade over the shared loop scheduler, kept for existing callers.
+
+    Job names are namespaced by owner (``owner.name``) so that services using
+    the same short name ("health_check", "progress_monitor") do not replace
+    each other's jobs. The owner is the one given here, or else the class or
+    module of the task function.
+    """
+
+    def __init__(self, owner: Optional[str] = None) -> None:
+        self._scheduler = get_loop_scheduler()
+        self.owner = owner
 
-    def __init__(self) -> None:
-        self._scheduler = BackgroundScheduler()
-        if not self._scheduler.running:
-            self._scheduler.start()
+    def _job_name(self, task_name: str, task_func: Optional[Callable[..., Any]] = None) -> str:
+        owner = self.owner or (_task_owner(task_func) if task_func is not None else None)
+        return f"{owner}.{task_name}" if owner else task_name
 
     async def schedule_task(
         self,
-        task_name: str,
-        delay_seconds: int,
-        task_func: Callable[..., Any],
-        args: Tuple[Any, ...] | None = None,
-        kwargs: dict | None = None,
-    ) -> None:
-        args = args or tuple()
-        kwargs = kwargs or {}
+        task_name: Any = None,
+        *call_args: Any,
+        delay_seconds: float = 0,
+        task_func: Optional[Callable[..., Any]] = None,
+        args: Optional[Tuple[Any, ...]] = None,
+        kwargs: Optional[dict] = None,
+    ) -> str:
+        """Run ``task_func`` once after ``delay_seconds``.
 
-        loop = asyncio.get_running_loop()
+        Also accepts the short form ``schedule_task(func, *args, delay_seconds=...)``;
+        unnamed tasks are keyed on the function so re-arming replaces the pending run.
+        """
+        if callable(task_name) and task_func is None:
+            task_func, task_name = task_name, None
+        if task_func is None:
+            raise ValueError("task_func is required")
+        return self._scheduler.call_later(
+            self._job_name(task_name, task_func) if task_name
+            else f"{getattr(task_func, '__module__', None) or 'tasks'}.{_default_task_name(task_func)}",
+            delay_seconds,
+            task_func,
+            args=tuple(args or ()) + call_args,
+            kwargs=kwargs,
+        )
 
-        def _runner():
-            try:
-                loop.call_soon_threadsafe(asyncio.create_task, task_func(*args, **kwargs))
-            except RuntimeError:
-                # In case no running loop, create a new one (best-effort fallback)
-                asyncio.run(task_func(*args, **kwargs))
+    async def schedule_periodic(
+        self,
+        task_name: str,
+        interval_seconds: float,
+        task_func: Callable[..., Any],
+        args: Optional[Tuple[Any, ...]] = None,
+        kwargs: Optional[dict] = None,
+        first_delay: Optional[float] = None,
+    ) -> str:
+        return self._scheduler.call_every(
+            self._job_name(task_name, task_func), interval_seconds, task_func, args=tuple(args or ()), kwargs=kwargs, first_delay=first_delay
+        )
 
-        from datetime import datetime, timedelta
-        run_date = datetime.now() + timedelta(seconds=delay_seconds)
-        self._scheduler.add_job(_runner, 'date', run_date=run_date, id=task_name, replace_existing=True)
+    def cancel_task(self, task_name: str) -> bool:
+        """Cancel a job by the name ``schedule_*`` returned (or its short name with an explicit owner)."""
+        if self.owner and not task_name.startswith(f"{self.owner}."):
+            task_name = f"{self.owner}.{task_name}"
+        return self._scheduler.cancel(task_name)
 
 
 # Backward-compatible function
 def schedule_tasks():
-    # No-op default; retained for backward compatibility with existing callers
-    if not hasattr(schedule_tasks, "_scheduler"):
-        schedule_tasks._scheduler = BackgroundScheduler()
-        schedule_tasks._scheduler.start()
+    """Bind the shared scheduler to the running event loop (application startup)."""
+    try:
+        get_loop_scheduler()._bind_loop()
+    except RuntimeError:
+        # Not called from the event loop; the scheduler binds on first use instead
+        pass
@@ -0,0 +1,147 @@
+"""
+Schema Fingerprints
+Stable content hashes for scanned catalog metadata with a Merkle-style rollup.
+
+Every column (or MongoDB field) gets a digest of the attributes that define it,
+every table/collection a digest over its sorted column digests, and every
+schema/database a digest over its table digests. Row and document counts are
+kept out of those structural digests (a table with new rows but the same
+columns is not descended into) and rolled up separately under
+``counts_fingerprint`` per schema and for the catalog, so row churn is still
+found without walking unchanged schemas.
+
+The digests are written into the metadata itself when a scan is stored, and
+the schema and catalog digests are persisted with every stored table row
+(``stored_digests``), so an incremental scan can compare a snapshot rebuilt
+from stored rows with the current one top-down and only descend into the
+schemas and tables whose digests differ.
+
+Both metadata layouts used by the scanners are accepted: containers given as a
+list of ``{"name": ...}`` dicts, or as a dict keyed by name.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+FINGERPRINT_KEY = "fingerprint"
+COUNTS_KEY = "counts_fingerprint"
+SCHEMA_DIGESTS_KEY = "schema_digests"
+CATALOG_DIGESTS_KEY = "catalog_digests"
+
+# Attributes that define a column/field; anything else (statistics, samples,
+# classification results) is deliberately left out of the digest.
+COLUMN_ATTRIBUTES = (
+    "data_type", "is_nullable", "is_primary_key", "is_foreign_key",
+    "character_maximum_length", "numeric_precision", "numeric_scale",
+)
+FIELD_ATTRIBUTES = ("data_type", "is_array", "is_nested")
+
+# (container key, child key, leaf key) per nesting level
+RELATIONAL_LAYOUT = ("schemas", "tables", "columns")
+MONGODB_LAYOUT = ("databases", "collections", "fields")
+
+# Volume attribute of a table/collection, by child key
+COUNT_KEYS = {"tables": "row_count", "collections": "document_count"}
+
+
+def _digest(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def named_items(container: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Iterate ``(name, item)`` pairs from a list of named dicts or a name-keyed dict."""
+    if isinstance(container, dict):
+        for name, item in container.items():
+            yield str(name), item if isinstance(item, dict) else {}
+    elif isinstance(container, list):
+        for item in container:
+            if isinstance(item, dict):
+                yield str(item.get("name", "")), item
+
+
+def _rollup(kind: str, children: Any) -> str:
+    """Merkle node: digest of the sorted child digests (child order is irrelevant)."""
+    leaves = sorted((name, child.get(FINGERPRINT_KEY)) for name, child in named_items(children))
+    return _digest(kind, leaves)
+
+
+def item_count(item: Dict[str, Any], child_key: str) -> Any:
+    """Row/document count of a table or collection (top level or under ``metadata``)."""
+    count_key = COUNT_KEYS[child_key]
+    if count_key in item:
+        return item[count_key]
+    return (item.get("metadata") or {}).get(count_key)
+
+
+def column_fingerprint(column: Dict[str, Any]) -> str:
+    return _digest("column", [(attr, column.get(attr)) for attr in COLUMN_ATTRIBUTES if attr in column])
+
+
+def field_fingerprint(field: Dict[str, Any]) -> str:
+    nested = field.get("nested_fields") or []
+    for _, child in named_items(nested):
+        child[FINGERPRINT_KEY] = field_fingerprint(child)
+    return _digest(
+        "field",
+        [(attr, field.get(attr)) for attr in FIELD_ATTRIBUTES if attr in field],
+        _rollup("nested", nested) if nested else None,
+    )
+
+
+def annotate_fingerprints(metadata: Dict[str, Any], layout: Tuple[str, str, str] = RELATIONAL_LAYOUT) -> str:
+    """Write fingerprints into ``metadata`` in place and return the catalog root digest."""
+    top_key, child_key, leaf_key = layout
+    leaf_hasher = field_fingerprint if layout is MONGODB_LAYOUT else column_fingerprint
+    schema_counts = []
+    for schema_name, schema in named_items(metadata.get(top_key)):
+        table_counts = []
+        for table_name, table in named_items(schema.get(child_key)):
+            for _, leaf in named_items(table.get(leaf_key)):
+                leaf[FINGERPRINT_KEY] = leaf_hasher(leaf)
+            table[FINGERPRINT_KEY] = _rollup(child_key, table.get(leaf_key))
+            table_counts.append((table_name, item_count(table, child_key)))
+        schema[FINGERPRINT_KEY] = _rollup(top_key, schema.get(child_key))
+        schema[COUNTS_KEY] = _digest("counts", sorted(table_counts, key=repr))
+        schema_counts.append((schema_name, schema[COUNTS_KEY]))
+    metadata[FINGERPRINT_KEY] = _rollup("catalog", metadata.get(top_key))
+    metadata[COUNTS_KEY] = _digest("counts", sorted(schema_counts))
+    return metadata[FINGERPRINT_KEY]
+
+
+def ensure_fingerprints(metadata: Dict[str, Any], layout: Tuple[str, str, str] = RELATIONAL_LAYOUT) -> str:
+    """Return the root digest, computing fingerprints only for snapshots built without them."""
+    fingerprint = metadata.get(FINGERPRINT_KEY)
+    if fingerprint and metadata.get(COUNTS_KEY):
+        return fingerprint
+    return annotate_fingerprints(metadata, layout)
+
+
+def same_digests(base_item: Dict[str, Any], current_item: Dict[str, Any], key: str = FINGERPRINT_KEY) -> bool:
+    """True when both snapshots carry the same digest under ``key`` for this node."""
+    base_digest = base_item.get(key)
+    return base_digest is not None and base_digest == current_item.get(key)
+
+
+def same_snapshot(base: Dict[str, Any], current: Dict[str, Any], layout: Tuple[str, str, str] = RELATIONAL_LAYOUT) -> bool:
+    """Neither the structure nor any row/document count changed between two snapshots."""
+    ensure_fingerprints(base, layout)
+    ensure_fingerprints(current, layout)
+    return same_digests(base, current) and same_digests(base, current, COUNTS_KEY)
+
+
+def stored_digests(metadata: Dict[str, Any], schema: Dict[str, Any], table: Dict[str, Any],
+                   layout: Tuple[str, str, str] = RELATIONAL_LAYOUT) -> Dict[str, Any]:
+    """Digests (and count) persisted with a stored table row of an annotated snapshot."""
+    count_key = COUNT_KEYS[layout[1]]
+    return {
+        FINGERPRINT_KEY: table.get(FINGERPRINT_KEY),
+        count_key: item_count(table, layout[1]),
+        SCHEMA_DIGESTS_KEY: [schema.get(FINGERPRINT_KEY), schema.get(COUNTS_KEY)],
+        CATALOG_DIGESTS_KEY: [metadata.get(FINGERPRINT_KEY), metadata.get(COUNTS_KEY)],
+    }
+
+
+def layout_for(source_type: str) -> Tuple[str, str, str]:
+    return MONGODB_LAYOUT if str(source_type).lower() == "mongodb" else RELATIONAL_LAYOUT
@@ -0,0 +1,300 @@
+"""
+Structural Diff
+One diff core for nested JSON-like documents (configurations, schema
+snapshots, rule content), shared by DiffService, VersionService and rule
+version control.
+
+``diff`` walks two documents top-down and skips every pair of subtrees that
+compare equal. The equality test on dicts and lists runs in C and stops at
+the first difference, so an unchanged subtree of a large document costs no
+Python-level walk (an equal pair is confirmed on canonical JSON, which keeps
+``1``, ``1.0`` and ``True`` apart). Lists are aligned rather than compared position by
+position:
+
+- lists of dicts sharing a unique identity key (``id``, ``name``, ...) are
+  matched by that key, so inserting or reordering an element does not report
+  every later element as changed;
+- other lists are aligned on element fingerprints (canonical JSON) with
+  difflib's longest-matching-block diff, after trimming the common prefix
+  and suffix. Elements of the same container type in a replaced range are
+  diffed recursively.
+
+The result carries both the changes (operation, path, old and new value) and
+a compact patch that turns the old document into the new one. A patch is
+plain JSON and can be stored instead of a full snapshot; ``apply_patch``
+replays it:
+
+- ``["set", path, value]`` adds or replaces a dict key (or the whole
+  document when the path is empty);
+- ``["del", path]`` removes a dict key;
+- ``["splice", path, [[start, end, items], ...]]`` replaces ranges of a list,
+  in old-list positions.
+
+List positions in patch paths always refer to the old document. Edits inside
+a list's elements come before that list's splice.
+"""
+
+import copy
+import difflib
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# Identity keys tried, in order, to match list elements that are dicts
+LIST_IDENTITY_KEYS = ("id", "_id", "name", "key", "column_name", "table_name", "field", "path")
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+MOVED = "moved"  # Keyed list element moved: path at its new position, old and new are the positions
+
+Path = Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Change:
+    op: str  # ADDED, REMOVED, CHANGED or MOVED
+    path: Path
+    old: Any = None
+    new: Any = None
+
+    @property
+    def location(self) -> str:
+        return format_path(self.path)
+
+
+@dataclass
+class StructuralDiff:
+    changes: List[Change] = field(default_factory=list)
+    patch: List[list] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def summary(self) -> Dict[str, int]:
+        counts = {ADDED: 0, REMOVED: 0, CHANGED: 0, MOVED: 0}
+        for change in self.changes:
+            counts[change.op] += 1
+        return counts
+
+    def changed_roots(self) -> List[Any]:
+        """Top-level keys (or indices) under which something changed, in first-change order."""
+        return list(dict.fromkeys(change.path[0] for change in self.changes if change.path))
+
+
+def format_path(path: Sequence[Any]) -> str:
+    """``("tables", 3, "name")`` → ``tables[3].name``."""
+    text = ""
+    for part in path:
+        if isinstance(part, int) and not isinstance(part, bool):
+            text += f"[{part}]"
+        else:
+            text += f".{part}" if text else str(part)
+    return text
+
+
+def document_digest(document: Any) -> str:
+    """Stable digest of a whole document, e.g. to check a patch is applied to the right base."""
+    return hashlib.blake2b(_canonical(document).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def leaf_count(value: Any) -> int:
+    """Number of scalar leaves in a document (empty containers have none)."""
+    count = 0
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+        else:
+            count += 1
+    return count
+
+
+def _canonical(value: Any) -> str:
+    try:
+        return json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+    except TypeError:  # Keys of mixed types cannot be sorted
+        return repr(value)
+
+
+def _fingerprint(value: Any) -> Hashable:
+    if isinstance(value, (dict, list)):
+        return _canonical(value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return type(value).__name__, value
+
+
+def _same(old: Any, new: Any) -> bool:
+    if old is new:
+        return True
+    if type(old) is not type(new) or old != new:
+        return False
+    # Container == treats 1, 1.0 and True as equal at any depth; canonical JSON does not
+    return not isinstance(old, (dict, list)) or _canonical(old) == _canonical(new)
+
+
+def _containers(old: Any, new: Any) -> bool:
+    return (isinstance(old, dict) and isinstance(new, dict)) or (isinstance(old, list) and isinstance(new, list))
+
+
+def _identity_key(old: List[Any], new: List[Any], keys: Sequence[str]) -> Optional[str]:
+    items = old + new
+    if not items or not all(isinstance(item, dict) for item in items):
+        return None
+    for key in keys:
+        if not all(key in item for item in items):
+            continue
+        if len({_fingerprint(item[key]) for item in old}) == len(old) \
+                and len({_fingerprint(item[key]) for item in new}) == len(new):
+            return key
+    return None
+
+
+class _Walker:
+    def __init__(self, identity_keys: Sequence[str]):
+        self.identity_keys = identity_keys
+        self.result = StructuralDiff()
+
+    def node(self, old: Any, new: Any, path: Path, ops: Optional[list]) -> None:
+        if _same(old, new):
+            return
+        if isinstance(old, dict) and isinstance(new, dict):
+            self.dict(old, new, path, ops)
+        elif isinstance(old, list) and isinstance(new, list):
+            self.list(old, new, path, ops)
+        else:
+            self.result.changes.append(Change(CHANGED, path, old, new))
+            if ops is not None:
+                ops.append(["set", list(path), new])
+
+    def dict(self, old: Dict[Any, Any], new: Dict[Any, Any], path: Path, ops: Optional[list]) -> None:
+        changes = self.result.changes
+        for key, value in old.items():
+            if key not in new:
+                changes.append(Change(REMOVED, path + (key,), value, None))
+                if ops is not None:
+                    ops.append(["del", list(path) + [key]])
+            elif not _same(value, new[key]):
+                self.node(value, new[key], path + (key,), ops)
+        for key, value in new.items():
+            if key not in old:
+                changes.append(Change(ADDED, path + (key,), None, value))
+                if ops is not None:
+                    ops.append(["set", list(path) + [key], value])
+
+    def list(self, old: List[Any], new: List[Any], path: Path, ops: Optional[list]) -> None:
+        # Common prefix and suffix are compared in C and never aligned
+        start, old_end, new_end = 0, len(old), len(new)
+        while start < old_end and start < new_end and _same(old[start], new[start]):
+            start += 1
+        while old_end > start and new_end > start and _same(old[old_end - 1], new[new_end - 1]):
+            old_end -= 1
+            new_end -= 1
+        old_middle, new_middle = old[start:old_end], new[start:new_end]
+
+        splices: List[list] = []
+        key = _identity_key(old_middle, new_middle, self.identity_keys)
+        if key is not None:
+            self._keyed(old_middle, new_middle, key, start, path, ops, splices)
+        else:
+            self._aligned(old_middle, new_middle, start, path, ops, splices)
+        if ops is not None and splices:
+            ops.append(["splice", list(path), splices])
+
+    def _keyed(self, old: List[Any], new: List[Any], key: str, offset: int, path: Path,
+               ops: Optional[list], splices: List[list]) -> None:
+        old_ids = [_fingerprint(item[key]) for item in old]
+        new_ids = [_fingerprint(item[key]) for item in new]
+        old_positions = {identity: i for i, identity in enumerate(old_ids)}
+        new_ids_set = set(new_ids)
+        in_place = set()
+        matcher = difflib.SequenceMatcher(None, old_ids, new_ids, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                for k in range(i2 - i1):
+                    in_place.add(i1 + k)
+                    self.node(old[i1 + k], new[j1 + k], path + (offset + i1 + k,), ops)
+            else:
+                _splice(splices, offset + i1, offset + i2, new[j1:j2])
+        for i, identity in enumerate(old_ids):
+            if identity not in new_ids_set:
+                self.result.changes.append(Change(REMOVED, path + (offset + i,), old[i], None))
+        for j, identity in enumerate(new_ids):
+            i = old_positions.get(identity)
+            if i is None:
+                self.result.changes.append(Change(ADDED, path + (offset + j,), None, new[j]))
+            elif i not in in_place:
+                # The splice carries the new element, so its changes are reported without ops
+                self.result.changes.append(Change(MOVED, path + (offset + j,), offset + i, offset + j))
+                self.node(old[i], new[j], path + (offset + i,), None)
+
+    def _aligned(self, old: List[Any], new: List[Any], offset: int, path: Path,
+                 ops: Optional[list], splices: List[list]) -> None:
+        changes = self.result.changes
+        matcher = difflib.SequenceMatcher(
+            None, [_fingerprint(item) for item in old], [_fingerprint(item) for item in new], autojunk=False
+        )
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+            for k in range(paired):
+                position = offset + i1 + k
+                if _containers(old[i1 + k], new[j1 + k]):
+                    self.node(old[i1 + k], new[j1 + k], path + (position,), ops)
+                else:
+                    changes.append(Change(CHANGED, path + (position,), old[i1 + k], new[j1 + k]))
+                    _splice(splices, position, position + 1, [new[j1 + k]])
+            for i in range(i1 + paired, i2):
+                changes.append(Change(REMOVED, path + (offset + i,), old[i], None))
+            for j in range(j1 + paired, j2):
+                changes.append(Change(ADDED, path + (offset + j,), None, new[j]))
+            if i2 - i1 > paired or j2 - j1 > paired:
+                _splice(splices, offset + i1 + paired, offset + i2, new[j1 + paired:j2])
+
+
+def _splice(splices: List[list], start: int, end: int, items: List[Any]) -> None:
+    if splices and splices[-1][1] == start:
+        splices[-1][1] = end
+        splices[-1][2].extend(items)
+    else:
+        splices.append([start, end, list(items)])
+
+
+def diff(old: Any, new: Any, identity_keys: Sequence[str] = LIST_IDENTITY_KEYS) -> StructuralDiff:
+    """Changes and patch from ``old`` to ``new``."""
+    walker = _Walker(identity_keys)
+    walker.node(old, new, (), walker.result.patch)
+    return walker.result
+
+
+def apply_patch(document: Any, patch: List[list], in_place: bool = False) -> Any:
+    """Replay a patch from ``diff`` and return the patched document."""
+    if not in_place:
+        document = copy.deepcopy(document)
+    for op in patch:
+        kind, path = op[0], op[1]
+        if kind == "set" and not path:
+            document = copy.deepcopy(op[2])
+            continue
+        container = document
+        for part in path[:-1]:
+            container = container[part]
+        if kind == "set":
+            container[path[-1]] = copy.deepcopy(op[2])
+        elif kind == "del":
+            del container[path[-1]]
+        elif kind == "splice":
+            target = container[path[-1]] if path else document
+            for start, end, items in reversed(op[2]):
+                target[start:end] = copy.deepcopy(items)
+        else:
+            raise ValueError(f"Unknown patch operation: {kind}")
+    return document
@@ -0,0 +1,239 @@
+"""
+Vectorized Pattern Detector
+Single-pass semantic pattern detection over pandas columns.
+
+All value patterns (email, phone, SSN, credit card, dates, IPv4/IPv6) are
+compiled into one anchored alternation with named groups. Each column is
+de-duplicated first and its distinct values are scanned exactly once with
+``Series.str.extract``; the group that matched identifies the pattern and the
+value counts weight the result. Wide frames are processed column-parallel on
+a thread pool.
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Order matters: more specific shapes come before the looser phone/date forms
+VALUE_PATTERNS: Dict[str, str] = {
+    "email": r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}",
+    "ssn": r"\d{3}-\d{2}-\d{4}",
+    "credit_card": r"(?:\d{4}[- ]?){3}\d{4}|3[47]\d{2}[- ]?\d{6}[- ]?\d{5}",
+    "ipv4": r"(?:(?:25[0-5]|2[0-4]\d|1?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|1?\d?\d)",
+    "ipv6": r"(?:[0-9A-Fa-f]{1,4}:){7}[0-9A-Fa-f]{1,4}",
+    "date": (
+        r"\d{4}[-/.]\d{1,2}[-/.]\d{1,2}(?:[T ]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?Z?)?"
+        r"|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}"
+    ),
+    "phone": r"\+?\d{0,3}[-. ]?\(?\d{3}\)?[-. ]?\d{3}[-. ]?\d{4}",
+}
+
+COMBINED_PATTERN = re.compile(
+    "^(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in VALUE_PATTERNS.items()) + ")$"
+)
+
+PATTERN_DESCRIPTIONS = {
+    "email": "Column contains email addresses",
+    "ssn": "Column contains US social security numbers",
+    "credit_card": "Column contains payment card numbers",
+    "ipv4": "Column contains IPv4 addresses",
+    "ipv6": "Column contains IPv6 addresses",
+    "date": "Column may contain date values",
+    "phone": "Column contains phone numbers",
+}
+
+# Backwards compatible pattern type names reported by detect_data_patterns
+PATTERN_TYPES = {"date": "potential_date"}
+
+
+class VectorizedPatternDetector:
+    """Detects structural and semantic column patterns with one regex scan per column."""
+
+    def __init__(self, match_threshold: float = 0.7, max_workers: Optional[int] = None,
+                 parallel_min_columns: int = 8):
+        self.match_threshold = match_threshold
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 4))
+        self.parallel_min_columns = parallel_min_columns
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def match_ratios(self, series: pd.Series) -> Dict[str, float]:
+        """Share of non-null values matching each value pattern (single scan over distinct values)."""
+        values = series.dropna()
+        if values.empty:
+            return {}
+        if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+            return {}
+        counts = values.astype(str).str.strip().value_counts(sort=False)
+        distinct = pd.Series(counts.index, dtype=object)
+        groups = distinct.str.extract(COMBINED_PATTERN)
+        matched = groups.notna().to_numpy()
+        weights = counts.to_numpy()
+        totals = weights @ matched
+        total = float(weights.sum())
+        return {
+            name: float(totals[i]) / total
+            for i, name in enumerate(groups.columns)
+            if totals[i]
+        }
+
+    def detect_column(self, series: pd.Series, row_count: int, null_ratio: float, nunique: int) -> Dict[str, Any]:
+        """Structural + semantic patterns for one column given precomputed frame statistics."""
+        column_patterns: List[Dict[str, Any]] = []
+        result = {"column": series.name, "patterns": column_patterns}
+
+        if null_ratio > 0.5:
+            column_patterns.append({
+                "type": "high_null_ratio",
+                "description": f"Column has {round(null_ratio * 100, 2)}% null values"
+            })
+            return result
+
+        is_numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        is_text = pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+        if nunique == row_count and row_count > 10:
+            column_patterns.append({
+                "type": "potential_primary_key",
+                "description": "Column has unique values for all rows"
+            })
+        if (is_numeric or is_text) and 10 < nunique < row_count * 0.9:
+            column_patterns.append({
+                "type": "potential_foreign_key",
+                "description": f"Column has {nunique} distinct values out of {row_count} rows"
+            })
+        if nunique <= 2 and row_count > 10:
+            column_patterns.append({
+                "type": "potential_boolean",
+                "description": f"Column has only {nunique} distinct values"
+            })
+        if is_text and nunique < 20 and row_count > 20:
+            column_patterns.append({
+                "type": "potential_categorical",
+                "description": f"Column has {nunique} distinct string values"
+            })
+        if is_numeric:
+            skewness = series.skew()
+            if pd.notna(skewness) and abs(skewness) > 1.5:
+                column_patterns.append({
+                    "type": "skewed_distribution",
+                    "description": f"Column has a skewed distribution (skewness: {round(float(skewness), 2)})"
+                })
+        if is_text:
+            for name, ratio in self.match_ratios(series).items():
+                if ratio >= self.match_threshold:
+                    column_patterns.append({
+                        "type": PATTERN_TYPES.get(name, name),
+                        "match_ratio": round(ratio, 4),
+                        "description": PATTERN_DESCRIPTIONS[name]
+                    })
+        return result
+
+    def detect(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Detect patterns for every column; frame-level statistics are computed once."""
+        if df.empty:
+            return {"error": "No data to analyze"}
+
+        row_count = len(df)
+        null_ratios = df.isna().mean()
+        nuniques = self._nunique(df)
+
+        def _detect(column: Any) -> Dict[str, Any]:
+            return self.detect_column(df[column], row_count, float(null_ratios[column]), int(nuniques[column]))
+
+        return {"columns": self._map_columns(_detect, list(df.columns))}
+
+    def quality_issues(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Column quality metrics with outlier bounds computed once across all numeric columns."""
+        null_ratios = df.isna().mean()
+        numeric = df.select_dtypes(include=[np.number], exclude=["bool"])
+        outlier_ratios = pd.Series(dtype=float)
+        if not numeric.empty:
+            quartiles = numeric.quantile([0.25, 0.75])
+            q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+            iqr = q3 - q1
+            outside = numeric.lt(q1 - 1.5 * iqr) | numeric.gt(q3 + 1.5 * iqr)
+            outlier_ratios = outside.sum() / len(numeric)
+
+        def _assess(column: Any) -> Dict[str, Any]:
+            null_ratio = float(null_ratios[column])
+            issues: List[Dict[str, Any]] = []
+            if null_ratio > 0.1:
+                issues.append({
+                    "type": "missing_values",
+                    "severity": "high" if null_ratio > 0.5 else "medium",
+                    "description": f"{round(null_ratio * 100, 2)}% of values are missing"
+                })
+            if column in outlier_ratios.index:
+                outlier_pct = float(outlier_ratios[column])
+                if outlier_pct > 0.05:
+                    issues.append({
+                        "type": "outliers",
+                        "severity": "high" if outlier_pct > 0.1 else "medium",
+                        "description": f"{round(outlier_pct * 100, 2)}% of values are outliers"
+                    })
+            elif df[column].dtype == 'object' or pd.api.types.is_string_dtype(df[column]):
+                issues.extend(self._text_consistency_issues(df[column]))
+            return {"column": column, "completeness": round((1 - null_ratio) * 100, 2), "issues": issues}
+
+        return {
+            item["column"]: {"completeness": item["completeness"], "issues": item["issues"]}
+            for item in self._map_columns(_assess, list(df.columns))
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _text_consistency_issues(series: pd.Series) -> List[Dict[str, Any]]:
+        issues: List[Dict[str, Any]] = []
+        values = series.dropna()
+        if values.empty:
+            return issues
+        # Evaluate string predicates on distinct values only, weighted by their counts
+        counts = values.astype(str).value_counts(sort=False)
+        distinct = pd.Series(counts.index, dtype=object)
+        weights = counts.to_numpy()
+        total = float(weights.sum())
+        lowercase = float(weights @ distinct.str.islower().to_numpy()) / total
+        uppercase = float(weights @ distinct.str.isupper().to_numpy()) / total
+        if 0.3 < lowercase < 0.7 or 0.3 < uppercase < 0.7:
+            issues.append({
+                "type": "inconsistent_case",
+                "severity": "low",
+                "description": "Column has inconsistent case formatting"
+            })
+        value_lengths = pd.Series(weights, index=distinct.str.len().to_numpy()).groupby(level=0).sum()
+        if 1 < len(value_lengths) <= 5:
+            length_distribution = value_lengths / value_lengths.sum()
+            if not any(length_distribution > 0.9):
+                issues.append({
+                    "type": "inconsistent_formats",
+                    "severity": "medium",
+                    "description": f"Column has {len(value_lengths)} different value lengths"
+                })
+        return issues
+
+    @staticmethod
+    def _nunique(df: pd.DataFrame) -> pd.Series:
+        try:
+            return df.nunique(dropna=True)
+        except TypeError:
+            # Unhashable cells (e.g. nested MongoDB documents): compare by string form
+            return pd.Series({c: df[c].dropna().astype(str).nunique() for c in df.columns})
+
+    def _map_columns(self, func, columns: List[Any]) -> List[Dict[str, Any]]:
+        if len(columns) < self.parallel_min_columns or self.max_workers <= 1:
+            return [func(column) for column in columns]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(columns))) as executor:
+            return list(executor.map(func, columns))
@@ -7,6 +7,7 @@ from app.models.version_models import (
     VersionStats, VersionStatus, ChangeType
 )
 from app.models.scan_models import DataSource
+from app.services import structural_diff
 import logging
 import numpy as np
 
@@ -506,39 +507,9 @@ class VersionService:
                 select(VersionChange).where(VersionChange.version_id == version2_id)
             ).scalars().all()
             
-            # Compare configurations
-            config1 = version1.configuration or {}
-            config2 = version2.configuration or {}
-            
-            config_diff = {}
-            all_keys = set(config1.keys()) | set(config2.keys())
-            
-            for key in all_keys:
-                val1 = config1.get(key)
-                val2 = config2.get(key)
-                if val1 != val2:
-                    config_diff[key] = {
-                        "version1": val1,
-                        "version2": val2,
-                        "changed": True
-                    }
-            
-            # Compare schema snapshots
-            schema1 = version1.schema_snapshot or {}
-            schema2 = version2.schema_snapshot or {}
-            
-            schema_diff = {}
-            all_schema_keys = set(schema1.keys()) | set(schema2.keys())
-            
-            for key in all_schema_keys:
-                val1 = schema1.get(key)
-                val2 = schema2.get(key)
-                if val1 != val2:
-                    schema_diff[key] = {
-                        "version1": val1,
-                        "version2": val2,
-                        "changed": True
-                    }
+            # Compare configurations and schema snapshots
+            config_diff = VersionService._top_level_diff(version1.configuration, version2.configuration)
+            schema_diff = VersionService._top_level_diff(version1.schema_snapshot, version2.schema_snapshot)
             
             return {
                 "version1": {
@@ -571,6 +542,20 @@ class VersionService:
             logger.error(f"Error comparing versions: {str(e)}")
             return None
 
+    @staticmethod
+    def _top_level_diff(content1: Optional[Dict[str, Any]], content2: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Changed top-level keys, with the nested paths that changed under each."""
+        content1 = content1 or {}
+        content2 = content2 or {}
+        result = structural_diff.diff(content1, content2)
+        diff = {
+            key: {"version1": content1.get(key), "version2": content2.get(key), "changed": True, "changes": []}
+            for key in result.changed_roots()
+        }
+        for change in result.changes:
+            diff[change.path[0]]["changes"].append({"op": change.op, "path": change.location})
+        return diff
+
     @staticmethod
     def get_version_changes(session: Session, version_id: int) -> List[VersionChangeResponse]:
         """Get changes for a specific version"""
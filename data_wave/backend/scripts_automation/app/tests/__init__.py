@@ -7,16 +7,54 @@ This package contains test modules for the enterprise data governance platform.
 
 # Import test modules
 from . import (
+    test_backup_engine,
+    test_columnar_transport,
+    test_compliance_batch_evaluator,
+    test_compliance_dependency_index,
+    test_connector_engine_registry,
+    test_durable_job_queue,
+    test_expression_compiler,
     test_extraction,
+    test_loop_scheduler,
+    test_metrics_export_stream,
+    test_profiling_engine,
+    test_quality_rule_engine,
+    test_racine_activity_ingestion,
+    test_racine_activity_subscriptions,
+    test_racine_metrics_rollup,
+    test_racine_pipeline_dag,
     test_rbac_service,
     test_regex_classifier,
-    test_scan_system
+    test_rule_version_store,
+    test_scan_system,
+    test_schema_fingerprint,
+    test_structural_diff,
+    test_vectorized_pattern_detector
 )
 
 __all__ = [
+    "test_backup_engine",
+    "test_columnar_transport",
+    "test_compliance_batch_evaluator",
+    "test_compliance_dependency_index",
+    "test_connector_engine_registry",
+    "test_durable_job_queue",
+    "test_expression_compiler",
     "test_extraction",
+    "test_loop_scheduler",
+    "test_metrics_export_stream",
+    "test_profiling_engine",
+    "test_quality_rule_engine",
+    "test_racine_activity_ingestion",
+    "test_racine_activity_subscriptions",
+    "test_racine_metrics_rollup",
+    "test_racine_pipeline_dag",
     "test_rbac_service",
     "test_regex_classifier", 
-    "test_scan_system"
+    "test_rule_version_store",
+    "test_scan_system",
+    "test_schema_fingerprint",
+    "test_structural_diff",
+    "test_vectorized_pattern_detector"
 ]
 
@@ -0,0 +1,28 @@
+# scripts_automation/app/tests/conftest.py
+import os
+
+import pytest
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: long-running benchmark, only run with RUN_BENCHMARKS=1")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv("RUN_BENCHMARKS"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; set RUN_BENCHMARKS=1")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def benchmark_report(request):
+    """Print one ``test: key=value ...`` line of measurements (shown with ``pytest -s``)."""
+    def report(**measurements):
+        values = " ".join(
+            f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}" for key, value in measurements.items()
+        )
+        print(f"{request.node.name}: {values}")
+    return report
@@ -0,0 +1,212 @@
+# scripts_automation/app/tests/test_backup_engine.py
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.pool import StaticPool
+
+from app.models.backup_models import (
+    BackupOperation, BackupSchedule, BackupStatus, BackupType, RestoreOperation, RestoreStatus
+)
+from app.models.scan_models import DataSource, DataSourceLocation, DataSourceType
+from app.services.backup_engine import (
+    ChunkStore, SqlRestoreTarget, SqlTableSource, StreamingBackupEngine, collect_garbage, decode_value,
+    default_checkpoint_path, encode_value, load_manifest, restore_backup
+)
+from app.services.backup_service import BackupService
+
+DDL = [
+    "CREATE TABLE orders (id INTEGER PRIMARY KEY, customer TEXT, amount REAL, note TEXT)",
+    "CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT)",
+    "CREATE TABLE empty_table (id INTEGER PRIMARY KEY)",
+]
+
+
+def _database(path, orders=0):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        for statement in DDL:
+            conn.execute(text(statement))
+        if orders:
+            conn.execute(text("INSERT INTO orders VALUES (:id, :customer, :amount, :note)"), [
+                {"id": i, "customer": f"c{i % 50}", "amount": i * 1.5, "note": None if i % 7 else "gift"}
+                for i in range(orders)
+            ])
+            conn.execute(text("INSERT INTO customers VALUES (:id, :name)"), [
+                {"id": i, "name": f"customer {i}"} for i in range(50)
+            ])
+    return engine
+
+
+def _rows(engine, table):
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT * FROM {table} ORDER BY id")).all()
+
+
+class DigestingSource(SqlTableSource):
+    def table_digest(self, schema, name):
+        return str(hash(tuple(_rows(self.engine, name))))  # Stands in for a server-side table digest
+
+
+def _backup(source, root, name, source_class=SqlTableSource, **options):
+    return StreamingBackupEngine(
+        source_class(source), str(root / name), ChunkStore(str(root / "chunks"), "gzip"), **options
+    ).run()
+
+
+def test_backup_and_resumable_restore(tmp_path):
+    source = _database(tmp_path / "source.db", orders=2500)
+    manifest = _backup(source, tmp_path, "full", workers=2, batch_size=400, chunk_rows=256)
+    location = str(tmp_path / "full")
+
+    tables = {t["directory"]: t for t in manifest["tables"]}
+    assert set(tables) == {"main.orders", "main.customers", "main.empty_table"}
+    orders = tables["main.orders"]["chunks"]
+    assert sum(c["rows"] for c in orders) == 2500 and all(c["rows"] <= 1024 for c in orders) and len(orders) > 2
+    assert tables["main.empty_table"]["chunks"] == [] and manifest["rows"] == 2550
+    assert manifest["changed_chunks"] == manifest["written_chunks"] == manifest["chunk_count"]
+    assert 0 < manifest["compression_ratio"] < 1 and load_manifest(location) == manifest
+
+    # First chunk already loaded by an interrupted restore
+    target = _database(tmp_path / "target.db")
+    store = ChunkStore(str(tmp_path / "chunks"), "gzip")
+    SqlRestoreTarget(target).load("main", "orders", store.get(orders[0]["file"]).splitlines())
+    with open(default_checkpoint_path(location, SqlRestoreTarget(target)), "w") as f:
+        f.write("main.orders/00000\n")
+
+    result = restore_backup(location, SqlRestoreTarget(target))
+    assert (result["loaded_chunks"], result["skipped_chunks"]) == (len(orders), 1)
+    assert result["rows"] == 2550 - orders[0]["rows"]
+    assert _rows(target, "orders") == _rows(source, "orders")
+    assert _rows(target, "customers") == _rows(source, "customers")
+    assert restore_backup(location, SqlRestoreTarget(target))["loaded_chunks"] == 0
+
+    # Another target has its own checkpoint
+    other = _database(tmp_path / "other.db")
+    assert restore_backup(location, SqlRestoreTarget(other))["skipped_chunks"] == 0
+    assert _rows(other, "orders") == _rows(source, "orders")
+
+
+def test_decimals_and_binary_values_survive_a_backup(tmp_path):
+    row = {"amount": Decimal("12345678901234567890.0100"), "payload": b"\x00\xff\n", "note": "x"}
+    assert json.loads(json.dumps(row, default=encode_value), object_hook=decode_value) == row
+
+    source = _database(tmp_path / "source.db")
+    with source.begin() as conn:
+        conn.execute(text("CREATE TABLE files (id INTEGER PRIMARY KEY, payload BLOB)"))
+        conn.execute(text("INSERT INTO files VALUES (1, :payload)"), {"payload": b"\x00\x01\xfe\n"})
+    _backup(source, tmp_path, "full")
+    target = _database(tmp_path / "target.db")
+    with target.begin() as conn:
+        conn.execute(text("CREATE TABLE files (id INTEGER PRIMARY KEY, payload BLOB)"))
+    restore_backup(str(tmp_path / "full"), SqlRestoreTarget(target), tables=["main.files"])
+    assert _rows(target, "files") == [(1, b"\x00\x01\xfe\n")]
+
+
+def test_incremental_backup_writes_only_changed_chunks(tmp_path):
+    source = _database(tmp_path / "source.db", orders=20000)
+    full = _backup(source, tmp_path, "full", DigestingSource, chunk_rows=256, metadata={"backup_id": 1})
+    with source.begin() as conn:
+        conn.execute(text("UPDATE orders SET note = 'edited' WHERE id IN (10, 11000)"))
+        conn.execute(text("DELETE FROM orders WHERE id = 15000"))
+        conn.execute(text("INSERT INTO orders VALUES (20000, 'c0', 1.0, NULL)"))
+    incremental = _backup(source, tmp_path, "incremental", DigestingSource, chunk_rows=256,
+                          backup_type="incremental", base_manifest=full)
+
+    assert incremental["base_backup"] == 1 and incremental["rows"] == 20050
+    assert incremental["reused_tables"] == 2  # customers and empty_table were not read again
+    assert 0 < incremental["written_chunks"] <= 8 and full["chunk_count"] > 40
+    assert incremental["written_bytes"] * 10 < full["written_bytes"]
+    assert incremental["changed_chunks"] == incremental["written_chunks"]
+
+    # Expire the full backup: its superseded chunks go, the incremental still restores on its own
+    store = ChunkStore(str(tmp_path / "chunks"), "gzip")
+    collected = collect_garbage(store, [incremental])
+    assert collected["removed_chunks"] == full["chunk_count"] + incremental["written_chunks"] - incremental["chunk_count"]
+    target = _database(tmp_path / "target.db")
+    restore_backup(str(tmp_path / "incremental"), SqlRestoreTarget(target))
+    assert _rows(target, "orders") == _rows(source, "orders")
+
+
+def test_restore_rejects_corrupted_chunk(tmp_path):
+    source = _database(tmp_path / "source.db", orders=10)
+    manifest = _backup(source, tmp_path, "full")
+    chunk = next(t for t in manifest["tables"] if t["name"] == "orders")["chunks"][0]
+    store = ChunkStore(str(tmp_path / "chunks"), "gzip")
+    os.remove(os.path.join(store.root, chunk["file"]))
+    store.put(chunk["sha256"], b'{"id": 1, "customer": "forged", "amount": 0, "note": null}\n')
+
+    target = _database(tmp_path / "target.db")
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        restore_backup(str(tmp_path / "full"), SqlRestoreTarget(target), tables=["main.orders"])
+    assert _rows(target, "orders") == []
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(element, compiler, **kw):
+    return "JSON"
+
+
+def test_retention_expires_backups_and_collects_their_chunks(tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[
+        DataSource.__table__, BackupOperation.__table__, BackupSchedule.__table__, RestoreOperation.__table__
+    ])
+    source = _database(tmp_path / "source.db", orders=3000)
+    with Session(engine) as session:
+        session.add(DataSource(
+            id=1, name="source", source_type=DataSourceType.POSTGRESQL, location=DataSourceLocation.ON_PREM,
+            host="db", port=5432, username="u", password_secret="s", database_name="d"
+        ))
+        session.add(BackupSchedule(data_source_id=1, schedule_name="nightly", backup_type=BackupType.INCREMENTAL,
+                                   cron_expression="0 2 * * *", retention_days=30, max_backups=2))
+        for day in range(3):
+            with source.begin() as conn:
+                conn.execute(text("UPDATE orders SET amount = amount + 1 WHERE id = :id"), {"id": day * 1000})
+            _backup(source, tmp_path, f"day{day}")
+            session.add(BackupOperation(
+                data_source_id=1, backup_type=BackupType.INCREMENTAL, backup_name=f"day{day}",
+                status=BackupStatus.COMPLETED, backup_location=str(tmp_path / f"day{day}"),
+                completed_at=datetime.now() - timedelta(days=3 - day)
+            ))
+        session.commit()
+        restore = RestoreOperation(data_source_id=1, backup_id=1, restore_name="day0", status=RestoreStatus.RUNNING)
+        session.add(restore)
+        session.commit()
+
+        assert BackupService.apply_retention(session, 1)["expired_backups"] == 0  # still being restored
+        assert os.path.exists(tmp_path / "day0")
+        restore.status = RestoreStatus.COMPLETED
+        session.commit()
+        result = BackupService.apply_retention(session, 1)
+        assert result["expired_backups"] == 1
+        assert session.execute(select(RestoreOperation)).scalars().all() == [] and result["removed_chunks"] >= 1
+        assert [b.backup_name for b in session.execute(select(BackupOperation)).scalars()] == ["day1", "day2"]
+        assert not os.path.exists(tmp_path / "day0")
+        referenced = {c["file"] for name in ("day1", "day2") for t in load_manifest(str(tmp_path / name))["tables"]
+                      for c in t["chunks"]}
+        assert set(ChunkStore(str(tmp_path / "chunks")).files()) == referenced
+
+
+@pytest.mark.benchmark
+def test_nightly_incremental_of_static_metadata_500k_rows(tmp_path, benchmark_report):
+    source = _database(tmp_path / "source.db", orders=500_000)
+    started = time.perf_counter()
+    full = _backup(source, tmp_path, "full", workers=4, metadata={"backup_id": 1})
+    full_seconds = time.perf_counter() - started
+    with source.begin() as conn:
+        conn.execute(text("UPDATE orders SET note = 'nightly' WHERE id % 100000 = 0"))
+    started = time.perf_counter()
+    nightly = _backup(source, tmp_path, "nightly", workers=4, backup_type="incremental", base_manifest=full)
+    nightly_seconds = time.perf_counter() - started
+    benchmark_report(full_s=full_seconds, full_bytes=full["written_bytes"], incremental_s=nightly_seconds,
+                     incremental_bytes=nightly["written_bytes"], chunks_written=nightly["written_chunks"],
+                     chunks=nightly["chunk_count"])
+    assert nightly["written_bytes"] * 10 < full["written_bytes"]
@@ -0,0 +1,63 @@
+# scripts_automation/app/tests/test_columnar_transport.py
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.services.columnar_transport import (
+    PYARROW_AVAILABLE, iter_cursor_batches, iter_record_batches, record_batches_to_table, stream_arrow_ipc,
+    stream_ndjson, table_to_pandas
+)
+
+pytestmark = pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+
+
+def test_later_batches_are_promoted_into_the_first_batch_schema():
+    import pyarrow as pa
+
+    batches = [
+        (["id", "amount", "ratio", "note"], [(1, Decimal("1.50"), 0.5, None), (2, Decimal("2.25"), 1.5, None)]),
+        (["id", "amount", "ratio", "note"], [(3.0, Decimal("123456789.5"), 2, 7), (4, 3, Decimal("4.25"), "x")]),
+    ]
+    record_batches = list(iter_record_batches(batches))
+    schema = record_batches[0].schema
+    assert [b.schema for b in record_batches] == [schema, schema]
+    assert schema.field("amount").type == pa.decimal128(38, 2)
+    assert pa.types.is_string(schema.field("note").type)
+
+    table = record_batches_to_table(record_batches)
+    assert table.column("id").to_pylist() == [1, 2, 3, 4]
+    assert table.column("amount").to_pylist()[2:] == [Decimal("123456789.50"), Decimal("3.00")]
+    assert table.column("ratio").to_pylist() == [0.5, 1.5, 2.0, 4.25]
+    assert table.column("note").to_pylist() == [None, None, "7", "x"]
+
+    with pytest.raises(ValueError, match="'id'"):
+        list(iter_record_batches([(["id"], [(1,)]), (["id"], [(1.5,)])]))
+
+
+def test_pandas_conversion_keeps_decimals_numeric():
+    table = record_batches_to_table(iter_record_batches([(["amount"], [(Decimal("1.25"),), (None,)])]))
+    frame = table_to_pandas(table)
+    assert str(frame["amount"].dtype) == "float64" and frame["amount"].tolist()[0] == 1.25
+
+
+def test_cursor_batches_stream_as_arrow_ipc_and_ndjson():
+    import pyarrow as pa
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER, name TEXT)"))
+        conn.execute(text("INSERT INTO t VALUES (:id, :name)"), [{"id": i, "name": f"n{i}"} for i in range(25)])
+
+    with engine.connect() as conn:
+        batches = list(iter_cursor_batches(conn.execute(text("SELECT * FROM t ORDER BY id")), batch_size=10))
+    assert [len(rows) for _, rows in batches] == [10, 10, 5]
+
+    data = b"".join(stream_arrow_ipc(iter_record_batches(batches)))
+    table = pa.ipc.open_stream(io.BytesIO(data)).read_all()
+    assert table.num_rows == 25 and table.column("name").to_pylist()[-1] == "n24"
+
+    lines = b"".join(stream_ndjson(batches)).decode("utf-8").splitlines()
+    assert json.loads(lines[3]) == {"id": 3, "name": "n3"} and len(lines) == 25
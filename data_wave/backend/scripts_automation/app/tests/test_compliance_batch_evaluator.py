@@ -0,0 +1,138 @@
+# scripts_automation/app/tests/test_compliance_batch_evaluator.py
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app.models.compliance_rule_models import (
+    ComplianceRule, ComplianceRuleEvaluation, ComplianceRuleSeverity, ComplianceRuleStatus, ComplianceRuleType,
+    compliance_rule_data_source_link
+)
+from app.models.scan_models import DataClassification, DataSource, DataSourceLocation, DataSourceType
+from app.services.compliance_batch_evaluator import SourceMatrix, evaluate_rules_in_bulk
+from app.services.compliance_rule_service import ComplianceRuleService
+
+
+def _random_sources(rng, count):
+    return [
+        SimpleNamespace(
+            id=i + 1, name=f"source_{i}", entity_count=rng.choice([None, 0, 1, 7, 100, 12345]),
+            encryption_enabled=rng.random() < 0.5, monitoring_enabled=rng.random() < 0.5,
+            backup_enabled=rng.random() < 0.5, uptime_percentage=rng.choice([100.0, 99.5, 87.25, 0.0]),
+            data_classification=rng.choice(list(DataClassification) + [None]),
+            health_score=rng.randint(0, 100), compliance_score=None,
+            avg_response_time=None, error_rate=0.0, queries_per_second=0
+        )
+        for i in range(count)
+    ]
+
+
+def test_source_matrix_matches_single_source_evaluation():
+    sources = _random_sources(random.Random(7), 300)
+    matrix = SourceMatrix(sources)
+    for rule_type in ComplianceRuleType:
+        rule = SimpleNamespace(rule_type=rule_type)
+        compliant = matrix.compliant_counts(rule_type)
+        details = matrix.source_details(matrix.positions(), rule_type)
+        for i, source in enumerate(sources):
+            expected = ComplianceRuleService._evaluate_source_compliance_comprehensive(
+                rule, source, None,
+                {"uptime_percentage": source.uptime_percentage},
+                {"encryption_enabled": source.encryption_enabled, "monitoring_enabled": source.monitoring_enabled}
+            )
+            assert compliant[i] == expected["compliant_count"], (rule_type, source)
+            assert details[i]["entity_count"] == expected["entity_count"]
+            assert details[i]["compliance_percentage"] == expected["compliance_percentage"]
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(element, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[
+        DataSource.__table__, ComplianceRule.__table__, ComplianceRuleEvaluation.__table__,
+        compliance_rule_data_source_link
+    ])
+    with Session(engine) as session:
+        yield session
+
+
+def _populate(session, rule_count, source_count, seed=1):
+    rng = random.Random(seed)
+    for source in _random_sources(rng, source_count):
+        session.add(DataSource(
+            id=source.id, name=source.name, source_type=DataSourceType.POSTGRESQL, location=DataSourceLocation.ON_PREM, host="db", port=5432,
+            username="u", password_secret="s", database_name="d", entity_count=source.entity_count,
+            encryption_enabled=source.encryption_enabled, monitoring_enabled=source.monitoring_enabled,
+            backup_enabled=source.backup_enabled, uptime_percentage=source.uptime_percentage,
+            data_classification=source.data_classification
+        ))
+    links = []
+    for i in range(rule_count):
+        applies_to_all = i % 3 == 0
+        session.add(ComplianceRule(
+            id=i + 1, name=f"rule_{i}", description="", condition="true",
+            rule_type=rng.choice(list(ComplianceRuleType)), severity=ComplianceRuleSeverity.HIGH,
+            status=ComplianceRuleStatus.ACTIVE if i % 10 else ComplianceRuleStatus.DRAFT,
+            applies_to_all_sources=applies_to_all
+        ))
+        if not applies_to_all:
+            linked = rng.sample(range(1, source_count + 1), min(5, source_count))
+            links += [{"compliance_rule_id": i + 1, "data_source_id": source_id} for source_id in linked]
+    session.commit()
+    if links:
+        session.execute(compliance_rule_data_source_link.insert(), links)
+        session.commit()
+
+
+def test_bulk_evaluation_matches_per_rule_evaluation(session):
+    _populate(session, 25, 12)
+    progress = list(evaluate_rules_in_bulk(session, chunk_size=10))
+    assert [p["evaluated_rules"] for p in progress] == [10, 20, 22]  # drafts are skipped
+    assert progress[-1]["done"] and progress[-1]["data_sources"] == 12
+
+    evaluations = {e.rule_id: e for e in session.execute(select(ComplianceRuleEvaluation)).scalars()}
+    rules = session.execute(select(ComplianceRule)).scalars().all()
+    for rule in rules:
+        if rule.status != ComplianceRuleStatus.ACTIVE:
+            assert rule.id not in evaluations and rule.last_evaluated_at is None
+            continue
+        sources = session.execute(select(DataSource)).scalars().all() if rule.applies_to_all_sources \
+            else rule.data_sources
+        expected = [
+            ComplianceRuleService._evaluate_source_compliance_comprehensive(
+                rule, source, None, {"uptime_percentage": source.uptime_percentage}, {}
+            )
+            for source in sources
+        ]
+        total = sum(r["entity_count"] for r in expected)
+        compliant = sum(r["compliant_count"] for r in expected)
+        evaluation = evaluations[rule.id]
+        assert evaluation.entity_count["total"] == total and evaluation.entity_count["compliant"] == compliant
+        assert rule.pass_rate == pytest.approx(compliant / total * 100 if total else 0)
+        assert rule.total_entities == total and rule.last_evaluated_at is not None
+        assert len(evaluation.evaluation_context["evaluation_details"]) == len(expected)
+
+    summary = ComplianceRuleService.evaluate_all_rules(session, rule_ids=[1, 2], data_source_ids=[3, 99])
+    assert summary["total_rules"] == 2 and summary["done"]
+
+
+@pytest.mark.benchmark
+def test_bulk_evaluation_2000_rules_500_sources(session, benchmark_report):
+    _populate(session, 2000, 500)
+    started = time.perf_counter()
+    progress = list(evaluate_rules_in_bulk(session))
+    elapsed = time.perf_counter() - started
+    count = session.execute(select(ComplianceRuleEvaluation.id)).all()
+    benchmark_report(elapsed_s=elapsed, progress_records=len(progress))
+    assert progress[-1]["done"] and len(count) == progress[-1]["total_rules"]
+    assert elapsed < 60
@@ -0,0 +1,130 @@
+# scripts_automation/app/tests/test_compliance_dependency_index.py
+import pytest
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app.models.compliance_rule_models import (
+    ComplianceRule, ComplianceRuleEvaluation, ComplianceRuleSeverity, ComplianceRuleStatus, ComplianceRuleType,
+    compliance_rule_data_source_link
+)
+from app.models.scan_models import DataSource, DataSourceLocation, DataSourceType
+from app.services.compliance_batch_evaluator import evaluate_rules_in_bulk
+from app.services.compliance_dependency_index import (
+    COLUMN_CHANGE, ROW_CHANGE, TABLE_CHANGE, ComplianceDependencyIndex, ScanDelta, reevaluate_for_delta
+)
+from app.services.incremental_scan_service import IncrementalScanService
+
+
+def _table(name, columns=(), row_count=None):
+    table = {"name": name, "columns": [{"name": c, "data_type": "text"} for c in columns]}
+    if row_count is not None:
+        table["row_count"] = row_count
+    return table
+
+
+def test_scan_delta_from_incremental_changes():
+    base = {"schemas": [
+        {"name": "sales", "tables": [_table("orders", ["id"], 10), _table("refunds", ["id"]), _table("stock", ["id"])]},
+        {"name": "legacy", "tables": [_table("old", ["id"])]},
+    ]}
+    current = {"schemas": [
+        {"name": "sales", "tables": [_table("orders", ["id"], 12), _table("stock", ["id", "sku"]), _table("leads", ["id"])]},
+        {"name": "hr", "tables": [_table("people", ["ssn"])]},
+    ]}
+    changes = IncrementalScanService._get_relational_changes(base, current)
+    delta = ScanDelta.from_incremental_metadata(1, changes)
+    assert delta.tables == {
+        "sales.orders": {ROW_CHANGE}, "sales.stock": {COLUMN_CHANGE}, "sales.leads": {TABLE_CHANGE},
+        "sales.refunds": {TABLE_CHANGE}, "hr.people": {TABLE_CHANGE}, "legacy.*": {TABLE_CHANGE},
+    }
+    assert changes["schemas"][1] == dict(current["schemas"][1], change_type="added")
+    assert not ScanDelta.from_incremental_metadata(1, {"schemas": []})
+
+
+def _rule(rule_id, rule_type, tables=None, applies_to_all_sources=False):
+    return ComplianceRule(
+        id=rule_id, name=f"rule_{rule_id}", description="", condition="true", rule_type=rule_type,
+        severity=ComplianceRuleSeverity.HIGH, status=ComplianceRuleStatus.ACTIVE,
+        applies_to_all_sources=applies_to_all_sources, parameters={"tables": tables} if tables else {}
+    )
+
+
+def test_affected_rules_follow_sources_tables_and_change_kinds():
+    index = ComplianceDependencyIndex()
+    index.load_rules([
+        _rule(1, ComplianceRuleType.ENCRYPTION, applies_to_all_sources=True),
+        _rule(2, ComplianceRuleType.PRIVACY, tables=["hr.*"]),
+        _rule(3, ComplianceRuleType.QUALITY, tables=["sales.orders"]),
+        _rule(4, ComplianceRuleType.SECURITY),
+    ], {2: [1], 3: [1, 2], 4: [2]})
+
+    def affected(source_id, **tables):
+        return index.affected_rules(ScanDelta(source_id, {t.replace("__", "."): k for t, k in tables.items()}))
+
+    assert affected(1, hr__people={COLUMN_CHANGE}) == [2]
+    assert affected(1, sales__orders={ROW_CHANGE}) == [3]
+    assert affected(1, sales__orders={COLUMN_CHANGE}, sales__stock={COLUMN_CHANGE}) == [3]
+    assert affected(1, sales__leads={TABLE_CHANGE}) == [1]
+    assert affected(2, sales__leads={TABLE_CHANGE}) == [1, 4]
+    assert affected(1, hr__={TABLE_CHANGE}) == [1, 2]  # "hr.*": dropped schema
+    assert affected(3, hr__people={COLUMN_CHANGE}) == []
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(element, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[
+        DataSource.__table__, ComplianceRule.__table__, ComplianceRuleEvaluation.__table__,
+        compliance_rule_data_source_link
+    ])
+    with Session(engine) as session:
+        yield session
+
+
+def test_incremental_reevaluation_matches_full_evaluation(session):
+    for source_id in (1, 2, 3):
+        session.add(DataSource(
+            id=source_id, name=f"source_{source_id}", source_type=DataSourceType.POSTGRESQL,
+            location=DataSourceLocation.ON_PREM, host="db", port=5432, username="u", password_secret="s",
+            database_name="d", entity_count=100 * source_id, encryption_enabled=source_id != 2
+        ))
+    session.add_all([
+        _rule(1, ComplianceRuleType.ENCRYPTION, applies_to_all_sources=True),
+        _rule(2, ComplianceRuleType.PRIVACY, tables=["hr.*"]),
+        _rule(3, ComplianceRuleType.SECURITY, tables=["sales.*"]),
+    ])
+    session.commit()
+    session.execute(compliance_rule_data_source_link.insert(), [
+        {"compliance_rule_id": 2, "data_source_id": 2}, {"compliance_rule_id": 3, "data_source_id": 2},
+        {"compliance_rule_id": 3, "data_source_id": 3},
+    ])
+    session.commit()
+    list(evaluate_rules_in_bulk(session))
+
+    source = session.get(DataSource, 2)
+    source.entity_count, source.encryption_enabled = 50, True
+    session.commit()
+    index = ComplianceDependencyIndex()
+    result = reevaluate_for_delta(session, ScanDelta(2, {"sales.leads": {TABLE_CHANGE}}), index)
+    # Entity count and encryption changed: every rule of source 2 is stale, not only those matching sales.leads
+    assert (result["affected_rules"], result["reevaluated_rules"], result["fully_evaluated_rules"]) == (3, 3, 0)
+
+    incremental = {r.id: (r.pass_rate, r.total_entities) for r in session.execute(select(ComplianceRule)).scalars()}
+    latest = session.execute(select(ComplianceRuleEvaluation).order_by(ComplianceRuleEvaluation.id.desc())).scalars().first()
+    assert latest.evaluation_metadata["incremental"] is True
+    list(evaluate_rules_in_bulk(session))
+    session.expire_all()
+    full = {r.id: (r.pass_rate, r.total_entities) for r in session.execute(select(ComplianceRule)).scalars()}
+    assert incremental == full
+
+    # Source attributes unchanged since: only rules matching the changed tables are re-evaluated
+    result = reevaluate_for_delta(session, ScanDelta(2, {"sales.leads": {TABLE_CHANGE}}), index)
+    assert (result["affected_rules"], result["reevaluated_rules"]) == (2, 2)
+    assert reevaluate_for_delta(session, ScanDelta(2, {}), index)["affected_rules"] == 0
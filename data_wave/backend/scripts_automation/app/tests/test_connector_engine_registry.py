@@ -0,0 +1,54 @@
+# scripts_automation/app/tests/test_connector_engine_registry.py
+from types import SimpleNamespace
+
+from app.services.connector_engine_registry import ConnectorEngineRegistry
+
+
+def _data_source(data_source_id=1):
+    return SimpleNamespace(id=data_source_id, pool_size=2, max_overflow=1, pool_timeout=5)
+
+
+def test_engine_is_reused_per_data_source():
+    registry = ConnectorEngineRegistry()
+    ds = _data_source()
+
+    first = registry.get_engine(ds, "sqlite://")
+    second = registry.get_engine(ds, "sqlite://")
+
+    assert first is second
+    metrics = registry.get_metrics()
+    assert metrics["hits"] == 1
+    assert metrics["created"] == 1
+
+
+def test_rotated_connection_string_replaces_engine():
+    registry = ConnectorEngineRegistry()
+    ds = _data_source()
+
+    old = registry.get_engine(ds, "sqlite:///old_password.db")
+    new = registry.get_engine(ds, "sqlite:///new_password.db")
+
+    assert old is not new
+    assert registry.get_metrics()["rotated"] == 1
+    assert registry.get_metrics()["cached_entries"] == 1
+
+
+def test_invalidate_and_idle_eviction():
+    registry = ConnectorEngineRegistry(idle_timeout_seconds=60)
+    registry.get_engine(_data_source(1), "sqlite://")
+    registry.get_engine(_data_source(2), "sqlite://")
+
+    assert registry.invalidate(1) == 1
+    assert registry.get_metrics(2)["entries"]
+
+    assert registry.evict_idle(now=10 ** 9) == 1
+    assert registry.get_metrics()["cached_entries"] == 0
+
+
+def test_capacity_bound_evicts_least_recently_used():
+    registry = ConnectorEngineRegistry(max_entries=2)
+    for data_source_id in range(3):
+        registry.get_engine(_data_source(data_source_id), "sqlite://")
+
+    ids = {entry["data_source_id"] for entry in registry.get_metrics()["entries"]}
+    assert ids == {1, 2}
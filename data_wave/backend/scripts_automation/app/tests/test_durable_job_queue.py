@@ -0,0 +1,151 @@
+# scripts_automation/app/tests/test_durable_job_queue.py
+import asyncio
+import time
+
+import pytest
+
+from app.services import background_processing_service
+from app.services.background_processing_service import BackgroundProcessingService, register_background_handler
+from app.services.durable_job_queue import DurableJobQueue, SQLiteJobStore
+
+
+def _job(job_id, priority="normal", timeout=3600):
+    return {"job_id": job_id, "job_type": "test", "priority": priority, "status": "pending", "timeout": timeout}
+
+
+@register_background_handler
+def _double(job_data):
+    return {"value": job_data["value"] * 2}
+
+
+def test_priority_order_with_aging():
+    async def scenario():
+        # Each priority level is worth 0.1s of waiting
+        queue = DurableJobQueue(aging_seconds=0.1)
+        await queue.put(_job("low-old", "low"))
+        await asyncio.sleep(0.35)
+        await queue.put(_job("normal", "normal"))
+        await queue.put(_job("critical", "critical"))
+        await queue.put(_job("high", "high"))
+        return [(await queue.get())[0]["job_id"] for _ in range(4)]
+
+    assert asyncio.run(scenario()) == ["low-old", "critical", "high", "normal"]
+
+
+def test_expired_lease_redelivers_and_ignores_stale_ack():
+    async def scenario():
+        queue = DurableJobQueue(lease_grace_seconds=0.0)
+        await queue.put(_job("slow", timeout=0.05))
+        record, first_token = await queue.get()
+        redelivered, second_token = await asyncio.wait_for(queue.get(), 1)
+        record["status"] = "completed"
+        return queue.ack(record, first_token), queue.ack(redelivered, second_token), queue.get_metrics()
+
+    stale, fresh, metrics = asyncio.run(scenario())
+    assert (stale, fresh) == (False, True)
+    assert metrics["lease_expired"] == 1 and metrics["stale_acks"] == 1
+
+
+def test_jobs_survive_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+
+    async def submit():
+        queue = DurableJobQueue(SQLiteJobStore(path))
+        await queue.put(_job("queued"))
+        await queue.put(_job("leased"))
+        await queue.put(dict(_job("later"), status="scheduled"), available_at=time.time() + 0.1)
+        await queue.get()
+        queue.close()
+
+    async def restart():
+        queue = DurableJobQueue(SQLiteJobStore(path))
+        recovered = {record["job_id"] for record in queue.recover()}
+        delivered = {(await asyncio.wait_for(queue.get(), 1))[0]["job_id"] for _ in range(3)}
+        return recovered, delivered
+
+    asyncio.run(submit())
+    recovered, delivered = asyncio.run(restart())
+    assert recovered == delivered == {"queued", "leased", "later"}
+
+
+def test_recover_leaves_jobs_of_live_processes_alone(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+
+    async def scenario():
+        live = DurableJobQueue(SQLiteJobStore(path, owner="live"))
+        await live.put(_job("queued"))
+        await live.put(_job("running"))
+        await live.get()
+
+        other = DurableJobQueue(SQLiteJobStore(path, owner="other"))
+        while_alive = other.recover()
+        # The live process stops heartbeating (crash): its jobs become recoverable
+        late = DurableJobQueue(SQLiteJobStore(path, owner="late", owner_ttl_seconds=0.05))
+        await asyncio.sleep(0.1)
+        claimed = {record["job_id"] for record in late.recover()}
+        return while_alive, claimed, other.recover()
+
+    while_alive, claimed, claimed_twice = asyncio.run(scenario())
+    assert while_alive == [] and claimed == {"queued", "running"} and claimed_twice == []
+
+
+def test_recovered_jobs_resolve_their_registered_handler(tmp_path, monkeypatch):
+    path = str(tmp_path / "jobs.sqlite3")
+
+    async def submit():
+        monkeypatch.setattr(background_processing_service, "_job_queue", DurableJobQueue(SQLiteJobStore(path)))
+        service = BackgroundProcessingService()
+        assert BackgroundProcessingService().job_queue is service.job_queue
+        rejected = await service.submit_job("custom", {"value": 1}, handler=lambda job_data: job_data)
+        accepted = await service.submit_job("custom", {"value": 21}, handler=_double)
+        background_processing_service.close_background_job_queue()
+        return rejected, accepted
+
+    async def restart():
+        monkeypatch.setattr(background_processing_service, "_job_queue", DurableJobQueue(SQLiteJobStore(path)))
+        service = BackgroundProcessingService()
+        await service.start_background_processor()
+        while not service.job_history:
+            await asyncio.sleep(0.01)
+        await service.stop_background_processor()
+        return service.job_history[0]
+
+    rejected, accepted = asyncio.run(submit())
+    assert rejected["success"] is False and "not registered" in rejected["error"]
+    job = asyncio.run(restart())
+    assert job["job_id"] == accepted["job_id"] and job["status"] == "completed"
+    assert job["result"] == {"value": 42}
+
+
+@pytest.mark.benchmark
+def test_throughput_small_jobs(tmp_path, benchmark_report):
+    jobs = 20_000
+
+    async def scenario():
+        queue = DurableJobQueue(SQLiteJobStore(str(tmp_path / "bench.sqlite3")))
+        finished = asyncio.Event()
+        acked = 0
+
+        async def worker():
+            nonlocal acked
+            while True:
+                record, token = await queue.get()
+                record["status"] = "completed"
+                queue.ack(record, token)
+                acked += 1
+                if acked == jobs:
+                    finished.set()
+
+        workers = [asyncio.create_task(worker()) for _ in range(8)]
+        started = time.perf_counter()
+        await asyncio.gather(*(queue.put(_job(str(i), ("low", "normal", "high")[i % 3])) for i in range(jobs)))
+        await finished.wait()
+        elapsed = time.perf_counter() - started
+        for task in workers:
+            task.cancel()
+        queue.flush()
+        return jobs / elapsed
+
+    rate = asyncio.run(scenario())
+    benchmark_report(jobs_per_s=rate)
+    assert rate >= 5000
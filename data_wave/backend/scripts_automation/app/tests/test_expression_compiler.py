@@ -0,0 +1,201 @@
+# scripts_automation/app/tests/test_expression_compiler.py
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.custom_scan_rule_service import CustomScanRuleService, ExpressionParser, _ColumnarFrame
+
+FIELDS = ["name", "schema", "table", "data_type", "row_count", "is_nullable", "missing"]
+LITERALS = ['"users"', "'pii_'", '"VARCHAR"', "10", "0", "2.5", '"^cust"', '"[bad"', "abc"]
+OPERATORS = ["==", "!=", ">", "<", ">=", "<=", "CONTAINS", "STARTSWITH", "ENDSWITH", "MATCHES", "+", "-", "/"]
+FUNCTIONS = ["FUNCTION_LENGTH", "FUNCTION_TO_LOWER", "FUNCTION_IS_NULL", "FUNCTION_CONTAINS", "FUNCTION_UNKNOWN"]
+
+
+def _random_operand(rng, depth):
+    roll = rng.random()
+    if depth < 2 and roll < 0.15:
+        return f"( {_random_expression(rng, depth + 1)} )"
+    if roll < 0.25:
+        return f"{rng.choice(FUNCTIONS)}({rng.choice(FIELDS + LITERALS)})"
+    return rng.choice(FIELDS + LITERALS)
+
+
+def _random_expression(rng, depth=0):
+    parts = []
+    if rng.random() < 0.1:
+        parts.append("NOT")
+    parts += [_random_operand(rng, depth), rng.choice(OPERATORS), _random_operand(rng, depth)]
+    if depth < 2 and rng.random() < 0.4:
+        parts += [rng.choice(["AND", "OR"]), _random_expression(rng, depth + 1)]
+    return " ".join(parts)
+
+
+def _random_context(rng):
+    return {
+        "name": rng.choice(["users", "pii_email", "Customer", "", None]),
+        "schema": rng.choice(["public", "sales"]),
+        "table": rng.choice(["users", "orders"]),
+        "data_type": rng.choice(["VARCHAR", "int", "5"]),
+        "row_count": rng.choice([0, 7, 10, 1e6, "12", None]),
+        "is_nullable": rng.choice([True, False]),
+    }
+
+
+def test_compiled_expressions_match_the_interpreter():
+    rng = random.Random(3)
+    handwritten = [
+        'name == "USERS"',
+        "row_count > 5 AND data_type != 'int'",
+        "NOT name STARTSWITH 'pii_'",
+        "( name CONTAINS 'pii' ) OR schema == sales",
+        "FUNCTION_LENGTH(name) > 3",
+        'name MATCHES "^pii_" OR name MATCHES "[bad"',
+        "row_count >= abc",
+        "name ==",
+        "name LIKE 'x'",
+        '"a" == "A" AND 10 > 2',
+    ]
+    expressions = handwritten + [_random_expression(rng) for _ in range(400)]
+    contexts = [_random_context(rng) for _ in range(40)]
+    for expression in expressions:
+        compiled = ExpressionParser.parse(expression)
+        interpreted = ExpressionParser.interpret(expression)
+        for context in contexts:
+            assert compiled(context) == interpreted(context), (expression, context)
+
+
+def test_constant_subtrees_are_folded_and_compilations_cached():
+    assert ExpressionParser.parse('"a" == "A" AND 10 > 2')({}) is True
+    assert ExpressionParser.parse("10 < 2 AND name == x").__name__ == "<lambda>"
+    ExpressionParser.compile.cache_clear()
+    for _ in range(5):
+        ExpressionParser.parse("row_count > 100")
+    assert ExpressionParser.compile.cache_info().hits == 4
+
+
+def _metadata(schemas, tables, columns):
+    return {"schemas": [
+        {"name": f"schema_{s}", "tables": [
+            {"name": f"table_{s}_{t}", "row_count": t * 100, "columns": [
+                {"name": f"col_{c}", "data_type": "VARCHAR" if c % 3 else "INT", "is_nullable": c % 2 == 0}
+                for c in range(columns)
+            ]}
+            for t in range(tables)
+        ]}
+        for s in range(schemas)
+    ]}
+
+
+RULE_SET = SimpleNamespace(custom_properties={
+    "schema_inclusion_expressions": ["name STARTSWITH 'schema_'", "name == public"],
+    "schema_exclusion_expressions": ["name == 'schema_3'", "name CONTAINS tmp"],
+    "table_inclusion_expressions": ["row_count >= 0", "name STARTSWITH 'table_'"],
+    "table_exclusion_expressions": ["row_count > 100000", "name ENDSWITH '_bak'"],
+    "column_inclusion_expressions": [
+        "data_type == 'varchar' AND is_nullable == True",
+        "FUNCTION_LENGTH(name) > 4",
+        "name MATCHES '^col_1'",
+        "data_type == 'int' OR name CONTAINS 'id'",
+        "schema == 'schema_1' AND table == 'table_1_1'",
+    ],
+    "column_exclusion_expressions": [
+        "name == 'col_13'",
+        "name ENDSWITH '_tmp'",
+        "NOT schema STARTSWITH 'schema_'",
+        "name CONTAINS 'password' OR name CONTAINS 'secret'",
+        "data_type == 'blob'",
+        "is_primary_key == True AND is_foreign_key == True",
+        "table == audit_log",
+    ],
+})
+
+
+@pytest.fixture
+def interpreted(monkeypatch):
+    """Switch the filters back to the token-walking interpreter."""
+    def switch():
+        monkeypatch.setattr(ExpressionParser, "parse", ExpressionParser.interpret)
+        ExpressionParser.compile_rules.cache_clear()
+    yield switch
+    ExpressionParser.compile_rules.cache_clear()
+
+
+def test_filtering_matches_the_interpreter(interpreted):
+    metadata = _metadata(4, 5, 20)
+    compiled = CustomScanRuleService.apply_custom_rule_filters(RULE_SET, metadata)
+    interpreted()
+    assert compiled == CustomScanRuleService.apply_custom_rule_filters(RULE_SET, metadata)
+    assert compiled["schemas"] and all(s["name"] != "schema_3" for s in compiled["schemas"])
+
+
+@pytest.mark.benchmark
+def test_filter_100k_columns_with_compiled_expressions(interpreted, benchmark_report):
+    metadata = _metadata(10, 100, 100)
+    assert sum(len(t["columns"]) for s in metadata["schemas"] for t in s["tables"]) == 100_000
+
+    def timed():
+        started = time.perf_counter()
+        result = CustomScanRuleService.apply_custom_rule_filters(RULE_SET, metadata, columnar=False)
+        return time.perf_counter() - started, result
+
+    compiled_time, compiled = timed()
+    interpreted()
+    interpreted_time, reference = timed()
+    benchmark_report(interpreted_s=interpreted_time, compiled_s=compiled_time,
+                     speedup=interpreted_time / compiled_time)
+    assert compiled == reference
+    assert compiled_time * 10 < interpreted_time
+
+
+def test_columnar_masks_match_row_evaluation():
+    rng = random.Random(5)
+    rows = [_random_context(rng) for _ in range(60)]
+    frame = _ColumnarFrame(len(rows), {key: (lambda key=key: [row[key] for row in rows]) for key in rows[0]})
+    keys = tuple(rows[0])
+    expressions = [_random_expression(rng) for _ in range(400)] + ["FUNCTION_LENGTH(name)", "row_count + 1", ""]
+    for expression in expressions:
+        expected = [bool(ExpressionParser.parse(expression)(row)) for row in rows]
+        assert ExpressionParser.compile_mask(expression, keys)(frame).tolist() == expected, expression
+
+
+MONGO_RULE_SET = SimpleNamespace(custom_properties={
+    "database_exclusion_expressions": ["name == 'db_2'"],
+    "collection_inclusion_expressions": ["document_count > 0", "name ENDSWITH '_0'"],
+    "field_inclusion_expressions": ["is_array == False", "data_type == 'string' AND name MATCHES 'f_[0-4]'"],
+    "field_exclusion_expressions": ["FUNCTION_IS_NULL(name)", "field CONTAINS '9'"],
+})
+
+
+def test_columnar_filtering_matches_row_filtering():
+    relational = _metadata(5, 6, 30)
+    assert (CustomScanRuleService.apply_custom_rule_filters(RULE_SET, relational, columnar=True)
+            == CustomScanRuleService.apply_custom_rule_filters(RULE_SET, relational, columnar=False))
+
+    mongodb = {"databases": [
+        {"name": f"db_{d}", "collections": [
+            {"name": f"coll_{d}_{c}", "document_count": c * 10, "fields": [
+                {"name": f"f_{f}", "data_type": "string" if f % 2 else "int", "is_array": f % 3 == 0}
+                for f in range(12)
+            ]}
+            for c in range(4)
+        ]}
+        for d in range(4)
+    ]}
+    columnar = CustomScanRuleService.apply_custom_rule_filters(MONGO_RULE_SET, mongodb, "mongodb", columnar=True)
+    assert columnar == CustomScanRuleService.apply_custom_rule_filters(MONGO_RULE_SET, mongodb, "mongodb", columnar=False)
+    assert [db["name"] for db in columnar["databases"]] == ["db_0", "db_1", "db_3"]
+
+
+@pytest.mark.benchmark
+def test_columnar_filter_100k_columns(benchmark_report):
+    metadata = _metadata(10, 100, 100)
+    timings = {}
+    for columnar in (False, True):
+        started = time.perf_counter()
+        result = CustomScanRuleService.apply_custom_rule_filters(RULE_SET, metadata, columnar=columnar)
+        timings[columnar] = time.perf_counter() - started, result
+    benchmark_report(row_wise_s=timings[False][0], columnar_s=timings[True][0])
+    assert timings[True][1] == timings[False][1]
+    assert timings[True][0] < timings[False][0]
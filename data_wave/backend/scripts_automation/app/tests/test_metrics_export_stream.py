@@ -0,0 +1,170 @@
+# scripts_automation/app/tests/test_metrics_export_stream.py
+import asyncio
+import csv
+import gzip
+import io
+import json
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, UniqueConstraint, create_engine
+from sqlalchemy.pool import StaticPool
+
+from app.services.columnar_transport import PYARROW_AVAILABLE
+from app.services.metrics_export_service import MetricsExportService
+from app.services.metrics_export_stream import HISTORICAL, historical_row_batches, open_export
+
+START = datetime(2024, 6, 1)
+
+METRICS = {
+    "counters": {f"scans_{i}": i for i in range(40)},
+    "gauges": {"queue_depth": 7.5, "active_sources": 3},
+    "histograms": {"scan_seconds": {"count": 4, "min": 1.0, "max": 9.0, "avg": 4.0, "p95": 8.5, "sum": 16.0}},
+}
+
+
+def _rollup_table():
+    # Mirrors RacineMetricRollup
+    return Table(
+        "racine_metric_rollups", MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("resolution", String(16), nullable=False),
+        Column("metric_group", String, nullable=False),
+        Column("measure", String, nullable=False),
+        Column("bucket_start", DateTime, nullable=False),
+        Column("sample_count", Integer, nullable=False),
+        Column("value_sum", Float, nullable=False),
+        Column("value_min", Float),
+        Column("value_max", Float),
+        Column("last_value", Float),
+        Column("updated_at", DateTime),
+        UniqueConstraint("resolution", "metric_group", "measure", "bucket_start"),
+    )
+
+
+def _rollups(hours):
+    # One shared connection: the historical export queries from a worker thread
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    table = _rollup_table()
+    table.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(table.insert(), [
+            {"resolution": resolution, "metric_group": "scans", "measure": measure,
+             "bucket_start": START + timedelta(hours=h), "sample_count": 2, "value_sum": float(h),
+             "value_min": 0.0, "value_max": float(h), "last_value": float(h)}
+            for h in range(hours) for measure in ("total", "failed") for resolution in ("hour", "minute")
+        ])
+    return engine, table
+
+
+def test_snapshot_formats_share_one_timestamp():
+    service = MetricsExportService()
+    stream = service.stream_metrics(METRICS, "json", batch_size=8)
+    chunks = list(stream["content"])
+    assert len(chunks) > 3 and stream["filename"] == "metrics.json"
+    document = json.loads(b"".join(chunks))
+    rows = document["metrics"]
+    assert len(rows) == 40 + 2 + 6 and document["metadata"]["total_metrics"] == 43
+    assert {row["timestamp"] for row in rows} == {document["export_timestamp"]}
+    assert rows[0] == {"metric_name": "scans_0", "metric_type": "counter", "bucket": None,
+                       "value": 0.0, "timestamp": document["export_timestamp"]}
+
+    csv_rows = list(csv.reader(io.StringIO(b"".join(service.stream_metrics(METRICS, "csv")["content"]).decode())))
+    assert csv_rows[0] == ["metric_name", "metric_type", "bucket", "value", "timestamp"] and len(csv_rows) == 49
+
+    xml = ET.fromstring(b"".join(service.stream_metrics(METRICS, "xml")["content"]))
+    assert len(xml.findall("metric")) == 48 and xml.find("metadata/export_format").text == "xml"
+
+    prometheus = b"".join(service.stream_metrics(METRICS, "prometheus")["content"]).decode()
+    assert 'scan_seconds_bucket{le="p95"} 8.5' in prometheus and "scan_seconds_count 4.0" in prometheus
+
+
+def test_streamed_compression_matches_uncompressed_export():
+    service = MetricsExportService()
+    def rows(data):
+        return [{k: v for k, v in json.loads(line).items() if k != "timestamp"} for line in data.splitlines()]
+
+    plain = b"".join(service.stream_metrics(METRICS, "ndjson")["content"])
+    stream = service.stream_metrics(METRICS, "ndjson", "gzip", batch_size=5)
+    chunks = list(stream["content"])
+    assert stream["media_type"] == "application/gzip" and stream["filename"] == "metrics.ndjson.gz"
+    assert rows(gzip.decompress(b"".join(chunks))) == rows(plain) and len(rows(plain)) == 48
+
+    with pytest.raises(ValueError):
+        service.stream_metrics(METRICS, "yaml")
+    with pytest.raises(ValueError):
+        service.stream_metrics(METRICS, "csv", "lz4")
+
+
+def test_in_memory_export_and_validation():
+    service = MetricsExportService()
+    export = asyncio.run(service.export_metrics_for_analysis(METRICS, "csv"))
+    assert export["success"] and isinstance(export["data"], str)
+    assert asyncio.run(service.validate_export_data(export))["metrics_count"] == 48
+
+    export = asyncio.run(service.export_metrics_for_analysis(METRICS, "json", compression="gzip"))
+    assert export["success"] and json.loads(gzip.decompress(export["data"]))["export_format"] == "json"
+    assert not asyncio.run(service.export_metrics_for_analysis(METRICS, "yaml"))["success"]
+
+
+def test_historical_rows_stream_from_rollups():
+    engine, table = _rollups(48)
+    batches = list(historical_row_batches(engine, START + timedelta(hours=6), START + timedelta(hours=30),
+                                          "hourly", batch_size=10, table=table))
+    rows = [row for _, rows in batches for row in rows]
+    assert len(rows) == 48 and max(len(rows) for _, rows in batches) == 10
+    assert batches[0][0][:4] == ["bucket_start", "resolution", "metric_group", "measure"]
+    assert {row[1] for row in rows} == {"hour"} and rows[0][3] == "failed" and rows[0][5] == 6.0
+
+    with pytest.raises(ValueError):
+        open_export(iter(batches), "prometheus", source=HISTORICAL)
+    with pytest.raises(ValueError):
+        list(historical_row_batches(engine, START, START, "weekly", table=table))
+
+
+def test_prometheus_comments_follow_metadata_and_historical_stream_is_awaited():
+    service = MetricsExportService()
+    bare = b"".join(service.stream_metrics(METRICS, "prometheus", include_metadata=False)["content"]).decode()
+    assert "#" not in bare and bare.startswith("scans_0 ")
+    commented = b"".join(service.stream_metrics(METRICS, "prometheus")["content"]).decode()
+    assert commented.startswith("# Export timestamp:") and "# Source: data_governance_system" in commented
+
+    engine, _ = _rollups(24)
+    export = asyncio.run(service.stream_historical_metrics(
+        START, START + timedelta(hours=24), format="ndjson", aggregation="hourly", bind=engine
+    ))
+    assert len(b"".join(export["content"]).splitlines()) == 48
+
+
+@pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+def test_historical_parquet_export_round_trips():
+    import pyarrow.parquet as pq
+
+    engine, table = _rollups(200)
+    export = open_export(
+        historical_row_batches(engine, START, START + timedelta(days=30), "hourly", batch_size=64, table=table),
+        "parquet", "zstd", source=HISTORICAL
+    )
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(export["content"])))
+    assert parquet.metadata.num_rows == 400 and parquet.metadata.num_row_groups == 7
+    assert parquet.read().column("measure").to_pylist()[:2] == ["failed", "total"]
+
+
+@pytest.mark.benchmark
+def test_large_export_streams_in_constant_memory(benchmark_report):
+    service = MetricsExportService()
+    metrics = {"counters": {f"counter_{i}": i for i in range(500000)}, "gauges": {}, "histograms": {}}
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = 0
+    for chunk in service.stream_metrics(metrics, "csv", "gzip")["content"]:
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    benchmark_report(compressed_bytes=size, elapsed_s=elapsed, peak_mb=peak / 1e6)
+    assert peak < 20e6
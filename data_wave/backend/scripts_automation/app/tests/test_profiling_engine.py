@@ -0,0 +1,65 @@
+# scripts_automation/app/tests/test_profiling_engine.py
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.services.profiling_engine import QUANTILE_POINTS, ColumnKind, ColumnSpec, PushdownProfilingEngine
+
+COLUMNS = [
+    ColumnSpec("amount", "NUMERIC(12,2)", ColumnKind.NUMERIC),
+    ColumnSpec('odd"name', "VARCHAR(40)", ColumnKind.TEXT),
+    ColumnSpec("created_at", "TIMESTAMP", ColumnKind.TEMPORAL),
+]
+
+
+def _engine(rows=50):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE orders (amount REAL, label TEXT)"))
+        conn.execute(
+            text("INSERT INTO orders VALUES (:amount, :label)"),
+            [{"amount": None if i % 10 == 0 else float(i), "label": f"l{i % 5}"} for i in range(rows)],
+        )
+    return engine
+
+
+def test_profile_query_is_one_aggregate_select_per_dialect():
+    engine = create_engine("sqlite://")
+
+    postgres = PushdownProfilingEngine(engine, "postgresql").build_profile_query("orders", "sales", COLUMNS, 1.5)
+    assert postgres.count("SELECT") == 1 and postgres.startswith("SELECT COUNT(*) AS row_count")
+    assert postgres.endswith('FROM "sales"."orders" TABLESAMPLE SYSTEM (1.5000)')
+    assert 'COUNT(DISTINCT "odd""name") AS c1_distinct' in postgres
+    assert 'MAX(LENGTH("odd""name")) AS c1_max_length' in postgres
+    assert 'STDDEV_SAMP(CAST("amount" AS DOUBLE PRECISION)) AS c0_std' in postgres
+    assert "percentile_cont(ARRAY[" in postgres and "c2_mean" not in postgres and 'MIN("created_at") AS c2_min' in postgres
+
+    snowflake = PushdownProfilingEngine(engine, "snowflake").build_profile_query("orders", None, COLUMNS)
+    assert 'APPROX_COUNT_DISTINCT("amount") AS c0_distinct' in snowflake
+    assert snowflake.count("APPROX_PERCENTILE(") == len(QUANTILE_POINTS) and "SAMPLE" not in snowflake
+
+    mysql = PushdownProfilingEngine(engine, "mysql").build_profile_query("orders", None, COLUMNS, 1.5)
+    assert mysql.endswith("FROM `orders`") and "COUNT(DISTINCT `amount`)" in mysql and "percentile" not in mysql
+
+
+def test_pushdown_profile_reads_back_the_aggregate_row():
+    profiler = PushdownProfilingEngine(_engine(), "sqlite")
+    profile = profiler.profile_table("orders", columns=[ColumnSpec("label", "TEXT", ColumnKind.TEXT)])
+    assert profile["pushdown"] is True and profile["row_count"] == 50
+    assert profile["columns"]["label"]["approx_distinct"] == 5
+    assert profile["columns"]["label"]["max_length"] == 2
+
+
+def test_failed_pushdown_falls_back_to_one_sample_pass_with_a_single_row_estimate():
+    # SQLite has no STDDEV_SAMP / percentile_cont, so the pushdown query fails
+    profiler = PushdownProfilingEngine(_engine(), "postgresql")
+    calls = []
+    profiler.estimate_row_count = lambda table_name, schema_name=None: calls.append(table_name) or 50
+
+    profile = profiler.profile_table("orders", columns=[
+        ColumnSpec("amount", "REAL", ColumnKind.NUMERIC), ColumnSpec("label", "TEXT", ColumnKind.TEXT),
+    ])
+    assert calls == ["orders"]
+    assert profile["pushdown"] is False and profile["estimated_row_count"] == 50
+    assert profile["row_count"] == 50 and profile["columns"]["amount"]["null_count"] == 5
+    assert profile["columns"]["amount"]["max"] == pytest.approx(49.0)
+    assert profile["columns"]["label"]["cardinality"] == 5
@@ -0,0 +1,104 @@
+# scripts_automation/app/tests/test_quality_rule_engine.py
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.quality_rule_engine import QualitySample, evaluate_rules, plan_sample_size
+
+
+def _rule(rule_type, thresholds=None, **parameters):
+    return SimpleNamespace(rule_type=rule_type, parameters=parameters, thresholds=thresholds or {})
+
+
+SAMPLE = QualitySample.from_records([
+    {"id": 1, "email": "a@x.com", "age": 30, "country": "FR", "vat": "FR1"},
+    {"id": 2, "email": "bad", "age": 250, "country": "US", "vat": None},
+    {"id": 2, "email": None, "age": "n/a", "country": "ZZ", "vat": ""},
+    {"id": 3, "email": "c@y.org", "age": 41, "country": None, "vat": "DE9"},
+    {"id": 4, "email": "", "age": 35, "country": "FR", "vat": "FR2"},
+])
+
+
+def _evaluate(rule, sample=SAMPLE):
+    [(result, _)] = evaluate_rules([rule], sample)
+    return result
+
+
+def test_rules_count_violations_over_the_shared_sample():
+    nulls = _evaluate(_rule("null_check", column="email"))
+    assert (nulls["failed_records"], nulls["passed"]) == (2, False)
+    assert _evaluate(_rule("null_check"))["failed_records"] == 4  # any blank field in the row
+
+    ranges = _evaluate(_rule("range_check", column="age", min_value=0, max_value=120))
+    assert ranges["failed_records"] == 2  # 250 and "n/a"
+    assert [a["record_index"] for a in ranges["anomalies"]] == [1]
+
+    emails = _evaluate(_rule("format_check", column="email", pattern="email", format_type="email"))
+    assert emails["failed_records"] == 2  # "bad" and ""
+    assert _evaluate(_rule("format_check", column="id", pattern=r"\d$"))["failed_records"] == 0
+
+    unique = _evaluate(_rule("uniqueness_check", columns=["id"]))
+    assert unique["failed_records"] == 1 and unique["anomalies"][0]["values"] == {"id": 2}
+    assert _evaluate(_rule("uniqueness_check", columns=["id", "country"]))["failed_records"] == 0
+
+    countries = _evaluate(_rule("referential_integrity", column="country", reference_values=["FR", "US", "DE"]))
+    assert countries["failed_records"] == 1
+    assert _evaluate(_rule("referential_integrity", column="country", allow_nulls=False))["failed_records"] == 1
+
+    patterns = _evaluate(_rule("pattern_match", columns=["country", "vat"], pattern="^[A-Z]{2}"))
+    assert patterns["failed_records"] == 1
+    assert patterns["details"]["invalid_examples"] == [{"index": 2, "column": "vat", "value": ""}]
+
+    implied = _evaluate(_rule("cross_reference", source_column="country", target_column="vat",
+                              reference_set=["FR", "US", "DE"]))
+    assert implied["failed_records"] == 3  # US and ZZ lack a VAT id, ZZ is unknown
+
+    business = _evaluate(_rule("business_rule", expression="r['id'] < 4"))
+    assert (business["passed_records"], business["details"]["evaluation_errors"]) == (4, 0)
+    assert _evaluate(_rule("custom_sql", assertion="max(col('id')) == 4"))["passed"] is True
+
+
+def test_outliers_unknown_rules_and_planner():
+    values = QualitySample.from_records([{"v": float(v)} for v in list(range(1, 20)) + [500]])
+    outliers = _evaluate(_rule("statistical_outlier", column="v"), values)
+    assert outliers["failed_records"] == 1 and outliers["anomalies"][0]["value"] == 500.0
+    assert _evaluate(_rule("statistical_outlier", column="v", method="zscore", threshold=3.0), values)["failed_records"] == 1
+
+    rules = [_rule("null_check", column="v", sample_size=5), _rule("null_check", column="v", sample_size=50)]
+    assert plan_sample_size(rules) == 50 and plan_sample_size([]) == 1000
+    (head, _), (full, _) = evaluate_rules(rules, values)
+    assert (head["total_records"], full["total_records"]) == (5, 20)
+
+    [(unknown, _)] = evaluate_rules([_rule("not_a_rule")], values)
+    assert isinstance(unknown, ValueError)
+    assert _evaluate(_rule("null_check"), QualitySample.from_records([])) == {"passed": False, "error": "No data available"}
+
+
+@pytest.mark.benchmark
+def test_all_rules_over_100k_rows(benchmark_report):
+    rng = np.random.RandomState(0)
+    size = 100_000
+    sample = QualitySample.from_records([
+        {"id": int(i), "email": f"user{i}@corp.com" if i % 50 else "broken", "age": int(a),
+         "country": c, "score": float(s)}
+        for i, a, c, s in zip(rng.randint(0, size, size), rng.randint(-5, 130, size),
+                              rng.choice(["FR", "US", "DE", None], size), rng.normal(0, 1, size))
+    ])
+    rules = [
+        _rule("null_check", column="country", sample_size=size),
+        _rule("range_check", column="age", min_value=0, max_value=120, sample_size=size),
+        _rule("format_check", column="email", pattern="email", format_type="email", sample_size=size),
+        _rule("uniqueness_check", columns=["id"], sample_size=size),
+        _rule("statistical_outlier", column="score", sample_size=size),
+        _rule("referential_integrity", column="country", reference_values=["FR", "US"], sample_size=size),
+        _rule("pattern_match", columns=["country"], pattern="^[A-Z]{2}$", sample_size=size),
+        _rule("cross_reference", source_column="country", reference_set=["FR", "DE"], sample_size=size),
+    ]
+    started = time.perf_counter()
+    results = evaluate_rules(rules, sample)
+    elapsed = time.perf_counter() - started
+    benchmark_report(rules=len(rules), rows=size, elapsed_s=elapsed)
+    assert all(result["total_records"] == size for result, _ in results)
+    assert elapsed < 5
@@ -0,0 +1,85 @@
+# scripts_automation/app/tests/test_racine_activity_ingestion.py
+import asyncio
+import time
+
+import pytest
+
+from app.services.racine_services.racine_activity_ingestion import (
+    ActivityIngestionPipeline,
+    shutdown_ingestion_pipelines,
+)
+
+
+def test_full_batches_flush_without_waiting_for_the_interval():
+    batches = []
+
+    async def scenario():
+        pipeline = ActivityIngestionPipeline(batches.append, name="test_full_batch", batch_size=100, flush_interval=60)
+        for i in range(250):
+            pipeline.submit({"id": i})
+        await asyncio.sleep(0.1)
+        flushed_early = sum(len(batch) for batch in batches)
+        await pipeline.shutdown()
+        return flushed_early, pipeline.get_stats()
+
+    flushed_early, stats = asyncio.run(scenario())
+    assert flushed_early == 250  # the full-batch flush drains everything buffered at that point
+    assert [record["id"] for batch in batches for record in batch] == list(range(250))
+    assert max(len(batch) for batch in batches) == 100
+    assert stats["written"] == 250 and stats["buffered"] == 0
+
+
+def test_overflow_drops_oldest_and_failed_batches_are_retried():
+    attempts = []
+
+    def flaky_writer(batch):
+        attempts.append(len(batch))
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+
+    async def scenario():
+        pipeline = ActivityIngestionPipeline(
+            flaky_writer, name="test_flaky", batch_size=1000, max_buffer=10, flush_interval=60
+        )
+        for i in range(15):
+            pipeline.submit({"id": i})
+        first = await pipeline.flush()
+        second = await pipeline.flush()
+        return first, second, pipeline.get_stats()
+
+    first, second, stats = asyncio.run(scenario())
+    assert (first, second) == (0, 10)
+    assert attempts == [10, 10]
+    assert stats["dropped_overflow"] == 5 and stats["failed_batches"] == 1 and stats["written"] == 10
+
+
+def test_shutdown_flushes_everything_and_rejects_new_records():
+    written = []
+
+    async def scenario():
+        pipeline = ActivityIngestionPipeline(written.extend, name="test_shutdown", flush_interval=60)
+        for i in range(42):
+            pipeline.submit({"id": i})
+        await shutdown_ingestion_pipelines()
+        with pytest.raises(RuntimeError):
+            pipeline.submit({"id": 42})
+
+    asyncio.run(scenario())
+    assert len(written) == 42
+
+
+@pytest.mark.benchmark
+def test_submit_cost_is_microseconds(benchmark_report):
+    async def scenario():
+        pipeline = ActivityIngestionPipeline(lambda batch: None, name="test_submit_cost", max_buffer=10 ** 6)
+        count = 200000
+        started = time.perf_counter()
+        for i in range(count):
+            pipeline.submit({"id": i})
+        elapsed = time.perf_counter() - started
+        await pipeline.shutdown()
+        return elapsed / count
+
+    per_submit = asyncio.run(scenario())
+    benchmark_report(submit_us=per_submit * 1e6)
+    assert per_submit < 20e-6
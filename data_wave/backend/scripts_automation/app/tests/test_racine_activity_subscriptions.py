@@ -0,0 +1,112 @@
+# scripts_automation/app/tests/test_racine_activity_subscriptions.py
+import random
+import time
+
+import pytest
+
+from app.services.racine_services.racine_activity_subscriptions import ActivitySubscriptionIndex
+
+ACTIVITY_TYPES = [f"type_{i}" for i in range(40)]
+GROUPS = ["data_sources", "scan_rule_sets", "classifications", "compliance_rules", "advanced_catalog", "scan_logic"]
+RESOURCE_TYPES = ["table", "view", "schema", "rule", "policy"]
+USERS = [f"user_{i}" for i in range(200)]
+
+
+def _random_criteria(rng):
+    criteria = {}
+    if rng.random() < 0.7:
+        criteria["activity_types"] = rng.sample(ACTIVITY_TYPES, rng.randint(1, 3))
+    if rng.random() < 0.3:
+        criteria["group_names"] = rng.sample(GROUPS, rng.randint(1, 2))
+    if rng.random() < 0.2:
+        criteria["resource_types"] = [rng.choice(RESOURCE_TYPES)]
+    if rng.random() < 0.3:
+        criteria["user_ids"] = rng.sample(USERS, 5)
+    if not criteria and rng.random() < 0.9:
+        criteria["workspace_ids"] = [f"ws_{rng.randint(0, 20)}"]
+    return criteria
+
+
+def _random_event(rng):
+    return {
+        "activity_type": rng.choice(ACTIVITY_TYPES),
+        "group_name": rng.choice(GROUPS),
+        "resource_type": rng.choice(RESOURCE_TYPES),
+        "user_id": rng.choice(USERS),
+        "workspace_id": f"ws_{rng.randint(0, 20)}",
+    }
+
+
+def _linear_match(subscriptions, event):
+    keys = {"activity_types": "activity_type", "group_names": "group_name", "resource_types": "resource_type",
+            "user_ids": "user_id", "workspace_ids": "workspace_id"}
+    return {
+        subscription_id for subscription_id, criteria in subscriptions.items()
+        if all(event[attribute] in criteria[key] for key, attribute in keys.items() if key in criteria)
+    }
+
+
+def _build(count, seed=3):
+    rng = random.Random(seed)
+    subscriptions = {f"s{i}": _random_criteria(rng) for i in range(count)}
+    index = ActivitySubscriptionIndex()
+    index.reconcile("stream", ((sid, criteria, None) for sid, criteria in subscriptions.items()))
+    return rng, subscriptions, index
+
+
+def test_index_matches_linear_evaluation_and_updates_incrementally():
+    rng, subscriptions, index = _build(2000)
+    for _ in range(300):
+        event = _random_event(rng)
+        assert {s.subscription_id for s in index.match("stream", event)} == _linear_match(subscriptions, event)
+    assert index.match("alert", _random_event(rng)) == []
+
+    event = _random_event(rng)
+    index.upsert("stream", "s0", {"activity_types": [event["activity_type"]]}, {"stream_type": "real_time"})
+    index.remove("stream", "s1")
+    matched = {s.subscription_id: s for s in index.match("stream", event)}
+    assert "s0" in matched and matched["s0"].payload == {"stream_type": "real_time"}
+    assert "s1" not in matched
+
+    # Reconcile drops missing subscriptions and only recompiles changed criteria
+    compiled = index.get_stats()["compiled"]
+    subscriptions.pop("s2")
+    subscriptions["s3"] = {"group_names": [event["group_name"]]}
+    index.reconcile("stream", ((sid, criteria, None) for sid, criteria in subscriptions.items()))
+    assert index.get_stats()["compiled"] == compiled + 3  # s0 and s1 back to their original criteria, s3 changed
+    assert len(index) == len(subscriptions)
+    assert {s.subscription_id for s in index.match("stream", event)} == _linear_match(subscriptions, event)
+
+
+def test_wide_filters_keep_the_most_selective_dimensions_in_the_key():
+    index = ActivitySubscriptionIndex()
+    wide = index.upsert("alert", "wide", {"activity_types": ACTIVITY_TYPES, "user_ids": USERS[:20], "group_names": GROUPS[:1]})
+    assert wide.index_dimensions == ("group_name", "user_id") and not wide.exact
+    narrow = index.upsert("alert", "narrow", {"activity_types": ACTIVITY_TYPES[:2], "user_ids": USERS[:3]})
+    assert len(narrow.index_keys) == 6 and narrow.exact
+
+    event = {"activity_type": "type_1", "group_name": GROUPS[0], "user_id": "user_2"}
+    assert {s.subscription_id for s in index.match("alert", event)} == {"wide", "narrow"}
+    assert [s.subscription_id for s in index.match("alert", dict(event, group_name=GROUPS[1]))] == ["narrow"]
+    assert index.match("alert", dict(event, user_id="user_50")) == []
+
+
+@pytest.mark.benchmark
+def test_matching_at_50k_subscriptions(benchmark_report):
+    rng, subscriptions, index = _build(50000)
+    events = [_random_event(rng) for _ in range(2000)]
+
+    started = time.perf_counter()
+    for event in events:
+        index.match("stream", event)
+    indexed = (time.perf_counter() - started) / len(events)
+
+    started = time.perf_counter()
+    for event in events[:50]:
+        _linear_match(subscriptions, event)
+    linear = (time.perf_counter() - started) / 50
+
+    stats = index.get_stats()
+    benchmark_report(indexed_us=indexed * 1e6, linear_us=linear * 1e6,
+                     candidates_per_event=stats["candidates_evaluated"] / len(events))
+    assert indexed * 10 < linear
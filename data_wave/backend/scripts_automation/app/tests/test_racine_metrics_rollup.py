@@ -0,0 +1,168 @@
+# scripts_automation/app/tests/test_racine_metrics_rollup.py
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import (
+    Column, DateTime, Float, Integer, MetaData, String, Table, UniqueConstraint, create_engine, func, select
+)
+from sqlalchemy.orm import Session
+
+from app.services.racine_services.racine_metrics_rollup import (
+    MetricsRollupStore,
+    RollupAggregate,
+    RollupEventSource,
+    RollupGaugeSource,
+    floor_time,
+    plan_segments,
+)
+
+NOW = datetime(2024, 6, 15, 12, 34, 56)
+
+
+def _rollup_table():
+    # Mirrors RacineMetricRollup
+    return Table(
+        "racine_metric_rollups", MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("resolution", String(16), nullable=False),
+        Column("metric_group", String, nullable=False),
+        Column("measure", String, nullable=False),
+        Column("bucket_start", DateTime, nullable=False),
+        Column("sample_count", Integer, nullable=False),
+        Column("value_sum", Float, nullable=False),
+        Column("value_min", Float),
+        Column("value_max", Float),
+        Column("last_value", Float),
+        Column("updated_at", DateTime),
+        UniqueConstraint("resolution", "metric_group", "measure", "bucket_start"),
+    )
+
+
+def _store(scans, active_sources=3):
+    def fetch(session, start, end):
+        for created_at, status, duration in scans:
+            if start <= created_at < end:
+                completed = status == "completed"
+                yield created_at, {"created": 1, "completed": int(completed), "duration": duration if completed else None}
+
+    table = _rollup_table()
+    engine = create_engine("sqlite://")
+    table.metadata.create_all(engine)
+    store = MetricsRollupStore(
+        table,
+        event_sources=[RollupEventSource("scans", ("created", "completed", "duration"), fetch)],
+        gauge_sources=[RollupGaugeSource("data_sources", ("active",), lambda session: {"active": active_sources})],
+        backfill_window=timedelta(days=30),
+    )
+    return store, Session(engine)
+
+
+def test_plan_uses_days_in_the_middle_and_finer_buckets_at_the_edges():
+    segments = plan_segments(NOW - timedelta(days=3), NOW, NOW)
+    resolutions = [resolution for resolution, _, _ in segments]
+    assert resolutions.count("day") == 1
+    assert {"hour", "minute"} <= set(resolutions)
+    day = next(segment for segment in segments if segment[0] == "day")
+    assert day[1] == datetime(2024, 6, 13) and day[2] == datetime(2024, 6, 15)
+
+    # Minute buckets of last month are gone: that edge widens to the enclosing hour
+    old = plan_segments(NOW - timedelta(days=30, minutes=20), NOW - timedelta(days=29), NOW)
+    assert all(resolution != "minute" for resolution, _, _ in old)
+
+
+def test_snapshot_matches_raw_aggregates_and_picks_up_late_status_changes():
+    rng = random.Random(7)
+    scans = []
+    for _ in range(2000):
+        created_at = NOW - timedelta(seconds=rng.randint(0, 20 * 86400))
+        status = "completed" if rng.random() < 0.8 else "failed"
+        scans.append([created_at, status, rng.uniform(1, 100)])
+    store, session = _store(scans)
+    while not store.compact(session, now=NOW)["backfill_complete"]:
+        pass
+
+    for days in (0.01, 0.5, 3, 19):
+        start = NOW - timedelta(days=days)
+        window = [scan for scan in scans if start <= scan[0] < NOW]
+        completed = [scan for scan in window if scan[1] == "completed"]
+        metrics = store.snapshot(session, start, NOW, ["scans"], now=NOW).metrics(
+            "scans", ["scan_count", "success_rate", "avg_duration"]
+        )
+        # An edge older than the minute retention widens to its enclosing hour bucket
+        widened = [scan for scan in scans if floor_time(start, 3600) <= scan[0] < NOW]
+        assert len(window) <= metrics["scan_count"] <= len(widened)
+        if len(window) > 50:
+            assert metrics["success_rate"] == pytest.approx(len(completed) / len(window) * 100, abs=1.5)
+            assert metrics["avg_duration"] == pytest.approx(sum(s[2] for s in completed) / len(completed), rel=0.05)
+
+    # A scan inside the settle window finishes after it was first compacted
+    scans.append([NOW - timedelta(minutes=5), "running", 10.0])
+    later = NOW + timedelta(minutes=1)
+    store.compact(session, now=later)
+    before = store.snapshot(session, NOW - timedelta(hours=1), later, ["scans"], now=later).metrics("scans", ["success_rate"])
+    scans[-1][1] = "completed"
+    store.compact(session, now=later + timedelta(minutes=1))
+    after = store.snapshot(session, NOW - timedelta(hours=1), later, ["scans"], now=later).metrics("scans", ["success_rate"])
+    assert after["success_rate"] > before["success_rate"]
+
+    gauges = store.snapshot(session, NOW - timedelta(hours=1), later, ["data_sources"], now=later)
+    assert gauges.metrics("data_sources", ["data_source_count"]) == {"data_source_count": 3}
+    series = store.snapshot(session, NOW - timedelta(days=7), NOW, ["scans"], now=NOW).series("scans", ["scan_count"], 7)
+    assert len(series["scan_count"]) == 7 and sum(series["scan_count"]) > 0
+
+
+def test_first_compaction_backfills_history_one_step_per_run():
+    scans = [(NOW - timedelta(days=day, hours=1), "completed", 1.0) for day in range(30)]
+    store, session = _store(scans)
+
+    def history_count():
+        return store.snapshot(session, NOW - timedelta(days=31), NOW, ["scans"], now=NOW).metrics(
+            "scans", ["scan_count"]
+        )["scan_count"]
+
+    results = [store.compact(session, now=NOW)]
+    assert not results[0]["backfill_complete"] and history_count() == 8
+    while not results[-1]["backfill_complete"]:
+        results.append(store.compact(session, now=NOW))
+    assert len(results) == 5 and history_count() == 30
+
+    # Once complete, later runs only rebuild the settle window
+    later = store.compact(session, now=NOW + timedelta(minutes=1))
+    assert later["backfill_complete"] and later["backfilled_from"] == results[-1]["backfilled_from"]
+    assert history_count() == 30
+
+
+def test_bucket_writes_upsert_on_the_bucket_key():
+    store, session = _store([])
+    key = ("scans", "created", floor_time(NOW, 60))
+    store._insert(session, "minute", {key: RollupAggregate(1, 1.0, 1.0, 1.0, 1.0, NOW)})
+    store._insert(session, "minute", {key: RollupAggregate(2, 5.0, 2.0, 3.0, 3.0, NOW)})
+    t = store.table.c
+    rows = session.execute(select(t.sample_count, t.value_sum).where(t.resolution == "minute")).all()
+    assert [tuple(row) for row in rows] == [(2, 5.0)]
+    assert session.execute(select(func.count()).select_from(store.table)).scalar() == 1
+
+
+@pytest.mark.benchmark
+def test_year_range_refresh_is_fast(benchmark_report):
+    rng = random.Random(1)
+    scans = [
+        (NOW - timedelta(seconds=rng.randint(0, 365 * 86400)), "completed" if rng.random() < 0.9 else "failed", 5.0)
+        for _ in range(50000)
+    ]
+    store, session = _store(scans)
+    store.backfill_window = store.backfill_step = timedelta(days=366)
+    store.compact(session, now=NOW)
+
+    timings = []
+    for _ in range(20):
+        started = time.perf_counter()
+        snapshot = store.snapshot(session, NOW - timedelta(days=365), NOW, ["scans", "data_sources"], now=NOW)
+        snapshot.metrics("scans", ["scan_count", "success_rate", "avg_duration"])
+        snapshot.series("scans", ["scan_count", "success_rate"], 24)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    benchmark_report(p50_ms=timings[10] * 1000, max_ms=timings[-1] * 1000, rows=len(snapshot.rows))
+    assert timings[10] < 0.05
@@ -0,0 +1,91 @@
+# scripts_automation/app/tests/test_racine_pipeline_dag.py
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.racine_services.racine_pipeline_dag import (
+    PipelineDAG, PipelineDAGExecutor, StageOutcome, digest_output, fingerprint_stage_input, source_data_version
+)
+
+
+def _stage(stage_id, order, depends_on=None, stage_type="data_validation", duration=0.1):
+    return SimpleNamespace(
+        id=stage_id, stage_name=stage_id, stage_order=order, depends_on_stages=depends_on,
+        stage_type=SimpleNamespace(value=stage_type), configuration={"id": stage_id},
+        on_failure_action=None, duration=duration,
+    )
+
+
+async def _sleep_runner(node, fingerprint, upstream):
+    started = time.time()
+    await asyncio.sleep(node.stage.duration)
+    return StageOutcome(node.key, "completed", fingerprint=fingerprint, started_at=started, completed_at=time.time())
+
+
+def test_independent_stages_run_concurrently_up_to_the_critical_path():
+    dag = PipelineDAG.from_stages([
+        _stage("ingest", 1, stage_type="data_ingestion"),
+        _stage("classify_a", 2, stage_type="classification", duration=0.3),
+        _stage("classify_b", 2, stage_type="classification", duration=0.3),
+        _stage("compliance", 2, duration=0.2),
+        _stage("catalog", 3, ["classify_a", "classify_b", "compliance"], stage_type="catalog_update"),
+    ])
+    assert dag.nodes["compliance"].depends_on == {"ingest"}
+
+    started = time.time()
+    outcomes = asyncio.run(PipelineDAGExecutor().run(dag, _sleep_runner))
+    wall = time.time() - started
+
+    critical = dag.critical_path({key: outcome.duration for key, outcome in outcomes.items()})
+    assert critical["stages"][0] == "ingest" and critical["stages"][-1] == "catalog"
+    assert wall < critical["seconds"] + 0.15
+    assert all(outcome.ok for outcome in outcomes.values())
+
+
+def test_fingerprints_are_stable_and_failures_skip_dependents():
+    dag = PipelineDAG.from_stages([_stage("a", 1), _stage("b", 2), _stage("c", 2, [])])
+    first = asyncio.run(PipelineDAGExecutor().run(dag, _sleep_runner))
+    second = asyncio.run(PipelineDAGExecutor().run(dag, _sleep_runner))
+    assert {k: o.fingerprint for k, o in first.items()} == {k: o.fingerprint for k, o in second.items()}
+
+    async def fail_a(node, fingerprint, upstream):
+        if node.key == "a":
+            return StageOutcome(node.key, "failed", fingerprint=fingerprint)
+        return await _sleep_runner(node, fingerprint, upstream)
+
+    outcomes = asyncio.run(PipelineDAGExecutor().run(dag, fail_a))
+    assert outcomes["a"].status == "failed" and outcomes["b"].status == "skipped"
+
+
+def test_fingerprints_follow_upstream_outputs_stage_definition_and_data_version():
+    dag = PipelineDAG.from_stages([_stage("a", 1), _stage("b", 2)])
+
+    def runner_with_output(output):
+        async def run(node, fingerprint, upstream):
+            outcome = await _sleep_runner(node, fingerprint, upstream)
+            outcome.output_digest = digest_output(output if node.key == "a" else None)
+            return outcome
+        return run
+
+    def fingerprints(output, parameters=None):
+        outcomes = asyncio.run(PipelineDAGExecutor().run(dag, runner_with_output(output), parameters))
+        return {key: outcome.fingerprint for key, outcome in outcomes.items()}
+
+    base = fingerprints({"rows": 1}, {"scan_id": 7})
+    assert fingerprints({"rows": 1}, {"scan_id": 7}) == base
+    changed_output = fingerprints({"rows": 2}, {"scan_id": 7})
+    assert changed_output["a"] == base["a"] and changed_output["b"] != base["b"]
+    assert fingerprints({"rows": 1}, {"scan_id": 8})["a"] != base["a"]
+
+    stage = _stage("a", 1)
+    before = fingerprint_stage_input(stage, [], {}, "scan_id:7")
+    stage.quality_checks = [{"rule": "not_null"}]
+    assert fingerprint_stage_input(stage, [], {}, "scan_id:7") != before
+    assert source_data_version({"use_stage_cache": True}) is None
+
+
+def test_dependency_cycles_are_rejected():
+    with pytest.raises(ValueError):
+        PipelineDAG.from_stages([_stage("x", 1, ["y"]), _stage("y", 1, ["x"])])
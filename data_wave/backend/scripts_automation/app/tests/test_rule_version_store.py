@@ -0,0 +1,143 @@
+# scripts_automation/app/tests/test_rule_version_store.py
+import copy
+import json
+import random
+import time
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app.models.Scan_Rule_Sets_completed_models.rule_version_control_models import RuleVersionDelta
+from app.services.Scan_Rule_Sets_completed_services.rule_version_store import RuleVersionStore
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine, tables=[RuleVersionDelta.__table__])
+    with Session(engine) as session:
+        yield session
+
+
+def _rule(conditions=20):
+    return {
+        "name": "pii_scan",
+        "pattern": r"\b\d{3}-\d{2}-\d{4}\b",
+        "parameters": {"threshold": 0.8, "sample_size": 1000, "columns": ["ssn", "tax_id"]},
+        "conditions": [{"id": i, "field": f"column_{i}", "operator": "matches", "weight": 1.0}
+                       for i in range(conditions)],
+    }
+
+
+def _edit(content, rng, step):
+    content = copy.deepcopy(content)
+    edit = rng.random()
+    if edit < 0.4:
+        rng.choice(content["conditions"])["weight"] = round(rng.random(), 3)
+    elif edit < 0.6:
+        content["conditions"].insert(rng.randint(0, len(content["conditions"])),
+                                     {"id": 1000 + step, "field": f"new_{step}", "operator": "equals"})
+    elif edit < 0.7 and len(content["conditions"]) > 5:
+        content["conditions"].pop(rng.randrange(len(content["conditions"])))
+    else:
+        content["parameters"]["threshold"] = round(rng.random(), 3)
+        content["parameters"][f"option_{step % 7}"] = step
+    return content
+
+
+def _history(session, store, count, seed=3):
+    rng = random.Random(seed)
+    contents = {}
+    content, parent = _rule(), None
+    for step in range(count):
+        version_id = f"v{step}"
+        store.put(session, version_id, "rule_1", content, parent)
+        contents[version_id] = content
+        content, parent = _edit(content, rng, step), version_id
+    session.commit()
+    return contents
+
+
+def test_checkout_replays_bounded_delta_chains(session):
+    store = RuleVersionStore(snapshot_interval=8, cache_size=16)
+    contents = _history(session, store, 100)
+    store.clear_cache()
+
+    records = session.query(RuleVersionDelta).all()
+    assert max(r.chain_length for r in records) == 7
+    assert sum(r.is_snapshot for r in records) == 13  # v0, v8, v16, ...
+    assert sum(r.stored_bytes for r in records) * 3 < sum(len(json.dumps(c)) for c in contents.values())
+
+    for version_id in ("v99", "v50", "v8", "v0", "v57"):
+        assert store.checkout(session, version_id) == contents[version_id]
+    assert store.metrics["patches_replayed"] <= 4 * 7
+
+    replayed = store.metrics["patches_replayed"]
+    checkout = store.checkout(session, "v99")
+    checkout["name"] = "mutated"  # Callers get copies, the cache is never shared
+    assert store.checkout(session, "v99") == contents["v99"]
+    assert store.metrics["patches_replayed"] == replayed and store.metrics["cache_hits"] == 2
+    assert store.checkout(session, "missing") is None
+
+
+def test_three_way_merge_on_stored_deltas(session):
+    store = RuleVersionStore(snapshot_interval=4)
+    base = _rule(5)
+    store.put(session, "base", "rule_1", base)
+
+    source = copy.deepcopy(base)
+    source["parameters"]["threshold"] = 0.9
+    store.put(session, "s1", "rule_1", source, "base")
+    source = copy.deepcopy(source)
+    source["conditions"][1]["operator"] = "contains"
+    source["tags"] = ["gdpr"]
+    store.put(session, "s2", "rule_1", source, "s1")
+
+    target = copy.deepcopy(base)
+    target["parameters"]["sample_size"] = 50
+    target["conditions"][3]["weight"] = 0.5
+    target["tags"] = ["gdpr"]
+    store.put(session, "t1", "rule_1", target, "base")
+    session.commit()
+
+    merge = store.merge(session, "base", "s2", "t1")
+    assert merge["conflicts"] == [] and merge["source_operations"] == 3
+    expected = copy.deepcopy(target)
+    expected["parameters"]["threshold"] = 0.9
+    expected["conditions"][1]["operator"] = "contains"
+    assert merge["content"] == expected
+
+    conflicting = copy.deepcopy(target)
+    conflicting["parameters"]["threshold"] = 0.1
+    conflicting["conditions"].append({"id": 9, "field": "email", "operator": "matches", "weight": 1.0})
+    store.put(session, "t2", "rule_1", conflicting, "t1")
+    session.commit()
+    merge = store.merge(session, "base", "s2", "t2")
+    assert [(c["path"], c["branch1_value"], c["branch2_value"]) for c in merge["conflicts"]] == [
+        ("parameters.threshold", 0.9, 0.1),
+        ("conditions", source["conditions"], conflicting["conditions"]),
+    ]
+    assert merge["content"]["parameters"]["threshold"] == 0.1 and merge["content"]["tags"] == ["gdpr"]
+
+
+@pytest.mark.benchmark
+def test_storage_and_checkout_stay_flat_over_5000_versions(session, benchmark_report):
+    store = RuleVersionStore(cache_size=64)
+    started = time.perf_counter()
+    contents = _history(session, store, 5000)
+    elapsed = time.perf_counter() - started
+    store.clear_cache()
+
+    def checkout_ms(version_ids):
+        started = time.perf_counter()
+        for version_id in version_ids:
+            assert store.checkout(session, version_id) == contents[version_id]
+        return (time.perf_counter() - started) * 1000 / len(version_ids)
+
+    early, late = checkout_ms([f"v{i}" for i in range(10, 110)]), checkout_ms([f"v{i}" for i in range(4890, 4990)])
+    records = session.query(RuleVersionDelta).all()
+    stored, full = sum(r.stored_bytes for r in records), sum(len(json.dumps(c)) for c in contents.values())
+    benchmark_report(elapsed_s=elapsed, stored_bytes=stored, full_bytes=full, checkout_early_ms=early,
+                     checkout_late_ms=late)
+    assert stored * 5 < full and late < early * 3
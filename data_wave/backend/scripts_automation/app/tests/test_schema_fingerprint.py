@@ -0,0 +1,130 @@
+# scripts_automation/app/tests/test_schema_fingerprint.py
+import asyncio
+import copy
+
+from sqlalchemy import ARRAY
+from sqlalchemy.ext.compiler import compiles
+from sqlmodel import Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app.models.scan_models import DataSourceType, ScanResult
+from app.services.compliance_dependency_index import ROW_CHANGE, ScanDelta
+from app.services.incremental_scan_service import IncrementalScanService
+from app.services.scan_service import ScanService
+from app.services.schema_fingerprint import COUNTS_KEY, FINGERPRINT_KEY, annotate_fingerprints
+
+
+def _catalog():
+    return {
+        "schemas": [
+            {"name": "sales", "tables": [
+                {"name": "orders", "row_count": 10, "columns": [
+                    {"name": "id", "data_type": "integer", "is_primary_key": True},
+                    {"name": "total", "data_type": "numeric", "numeric_scale": 2},
+                ]},
+                {"name": "customers", "row_count": 5, "columns": [
+                    {"name": "email", "data_type": "text"},
+                ]},
+            ]},
+            {"name": "hr", "tables": [
+                {"name": "staff", "row_count": 3, "columns": [{"name": "id", "data_type": "integer"}]},
+            ]},
+        ]
+    }
+
+
+def test_fingerprints_are_stable_and_order_independent():
+    base = _catalog()
+    reordered = _catalog()
+    reordered["schemas"].reverse()
+    reordered["schemas"][1]["tables"][0]["columns"].reverse()
+    reordered["schemas"][1]["tables"][0]["columns"][0]["sample_values"] = [1, 2]
+    assert annotate_fingerprints(base) == annotate_fingerprints(reordered)
+
+
+def test_incremental_changes_only_descend_into_changed_tables():
+    base = _catalog()
+    current = copy.deepcopy(base)
+    current["schemas"][0]["tables"][0]["columns"][1]["numeric_scale"] = 4
+    annotate_fingerprints(base)
+    annotate_fingerprints(current)
+
+    changes = IncrementalScanService._get_incremental_changes(base, current, "postgresql")
+
+    assert [schema["name"] for schema in changes["schemas"]] == ["sales"]
+    tables = changes["schemas"][0]["tables"]
+    assert [table["name"] for table in tables] == ["orders"]
+    assert [(col["name"], col["change_type"]) for col in tables[0]["columns"]] == [("total", "modified")]
+    assert IncrementalScanService._get_incremental_changes(base, copy.deepcopy(base), "postgresql") == {"schemas": []}
+
+
+def test_row_churn_alone_is_reported_without_descending():
+    base = _catalog()
+    current = copy.deepcopy(base)
+    current["schemas"][0]["tables"][0]["row_count"] = 10000
+    assert annotate_fingerprints(base) == annotate_fingerprints(current)
+    assert base[COUNTS_KEY] != current[COUNTS_KEY]
+
+    changes = IncrementalScanService._get_incremental_changes(base, current, DataSourceType.POSTGRESQL)
+    assert changes == {"schemas": [{"name": "sales", "tables": [
+        {"name": "orders", "columns": [], "row_count": 10000, "previous_row_count": 10},
+    ]}]}
+
+
+@compiles(ARRAY, "sqlite")
+def _array_as_json(element, compiler, **kw):
+    return "JSON"
+
+
+def _extracted():
+    # Name-keyed layout, as returned by the extraction service
+    return {"schemas": {
+        "sales": {"tables": {
+            "orders": {"metadata": {"row_count": 10}, "columns": {
+                "id": {"data_type": "integer", "is_primary_key": True},
+                "total": {"data_type": "numeric", "numeric_scale": 2},
+            }},
+            "customers": {"metadata": {"row_count": 5}, "columns": {"email": {"data_type": "text"}}},
+        }},
+        "hr": {"tables": {"staff": {"metadata": {"row_count": 3}, "columns": {"id": {"data_type": "integer"}}}}},
+    }}
+
+
+def test_incremental_changes_against_stored_scan_results():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    ScanResult.__table__.create(engine)
+    with Session(engine) as session:
+        asyncio.run(ScanService._store_scan_results(session, 1, _extracted(), "postgresql"))
+        stored = {row.id: copy.deepcopy(row.scan_metadata) for row in session.execute(select(ScanResult)).scalars()}
+
+        base = IncrementalScanService._load_base_snapshot(session, 1, DataSourceType.POSTGRESQL)
+        expected = _extracted()
+        annotate_fingerprints(expected)
+        assert (base[FINGERPRINT_KEY], base[COUNTS_KEY]) == (expected[FINGERPRINT_KEY], expected[COUNTS_KEY])
+        assert base["schemas"]["sales"][COUNTS_KEY] == expected["schemas"]["sales"][COUNTS_KEY]
+        assert IncrementalScanService._get_incremental_changes(base, _extracted(), "postgresql") == {"schemas": []}
+
+        grown = _extracted()
+        grown["schemas"]["sales"]["tables"]["orders"]["metadata"]["row_count"] = 12
+        changes = IncrementalScanService._get_incremental_changes(
+            IncrementalScanService._load_base_snapshot(session, 1, "postgresql"), grown, "postgresql"
+        )
+        assert changes == {"schemas": [{"name": "sales", "tables": [
+            {"name": "orders", "columns": [], "row_count": 12, "previous_row_count": 10},
+        ]}]}
+        assert ScanDelta.from_incremental_metadata(1, changes).tables == {"sales.orders": {ROW_CHANGE}}
+
+        altered = _extracted()
+        altered["schemas"]["sales"]["tables"]["orders"]["columns"]["total"]["numeric_scale"] = 4
+        changes = IncrementalScanService._get_incremental_changes(
+            IncrementalScanService._load_base_snapshot(session, 1, "postgresql"), altered, "postgresql"
+        )
+        tables = changes["schemas"][0]["tables"]
+        assert [(table["name"], [(col["name"], col["change_type"]) for col in table["columns"]]) for table in tables] == [
+            ("orders", [("total", "modified")])
+        ]
+
+        # The comparison works on a rebuilt copy and never writes into the stored results
+        assert not session.dirty
+        session.expire_all()
+        assert {row.id: row.scan_metadata for row in session.execute(select(ScanResult)).scalars()} == stored
@@ -0,0 +1,129 @@
+# scripts_automation/app/tests/test_structural_diff.py
+import asyncio
+import copy
+import json
+import random
+import time
+
+import pytest
+
+from app.services.diff_service import DiffService
+from app.services.structural_diff import ADDED, CHANGED, MOVED, REMOVED, apply_patch, diff
+from app.services.version_service import VersionService
+
+
+def _metadata(schemas, tables, columns):
+    return {
+        "source": {"host": "db", "port": 5432},
+        "schemas": [
+            {"name": f"schema_{s}", "tables": [
+                {"name": f"table_{t}", "row_count": s * t, "columns": [
+                    {"name": f"column_{c}", "data_type": "varchar", "is_nullable": c % 2 == 0,
+                     "description": f"Column {c} of table {t} in schema {s}"}
+                    for c in range(columns)
+                ]}
+                for t in range(tables)
+            ]}
+            for s in range(schemas)
+        ],
+        "tags": ["pii", "finance", "gold"],
+    }
+
+
+def test_diff_reports_keyed_changes_and_patch_replays_them():
+    old = _metadata(2, 3, 3)
+    new = copy.deepcopy(old)
+    tables = new["schemas"][1]["tables"]
+    tables[0]["columns"][2]["data_type"] = "text"
+    tables.insert(0, {"name": "table_new", "row_count": 0, "columns": []})
+    tables[1], tables[2] = tables[2], tables[1]
+    del new["source"]["port"]
+    new["tags"] = ["pii", "silver", "gold", "hr"]
+
+    result = diff(old, new)
+    changes = {(c.op, c.location) for c in result.changes}
+    assert changes == {
+        (REMOVED, "source.port"),
+        (CHANGED, "schemas[1].tables[0].columns[2].data_type"),  # positions in the old document
+        (ADDED, "schemas[1].tables[0]"),
+        (MOVED, "schemas[1].tables[1]"),  # table_1, now at position 1
+        (CHANGED, "tags[1]"),
+        (ADDED, "tags[3]"),
+    }
+    assert result.summary() == {ADDED: 2, REMOVED: 1, CHANGED: 2, MOVED: 1}
+    stored = json.loads(json.dumps(result.patch))
+    assert apply_patch(old, stored) == new and old == _metadata(2, 3, 3)
+    assert not diff(old, copy.deepcopy(old)) and diff(old, copy.deepcopy(old)).patch == []
+
+
+def test_patch_round_trip_on_random_edits():
+    rng = random.Random(5)
+    for _ in range(200):
+        old = _metadata(2, 4, 3)
+        new = copy.deepcopy(old)
+        for _ in range(rng.randint(1, 5)):
+            tables = rng.choice(new["schemas"])["tables"]
+            edit = rng.random()
+            if edit < 0.3 and tables:
+                tables.pop(rng.randrange(len(tables)))
+            elif edit < 0.5:
+                tables.insert(rng.randint(0, len(tables)), {"name": f"t{rng.random()}", "columns": []})
+            elif tables:
+                columns = rng.choice(tables)["columns"]
+                rng.shuffle(columns)
+                if columns:
+                    columns[0]["description"] = None
+        assert apply_patch(old, diff(old, new).patch) == new
+
+
+def test_nested_numbers_and_booleans_of_another_type_are_changes():
+    old = {"rule": {"threshold": 1, "enabled": True, "weights": [1, 0]}}
+    new = {"rule": {"threshold": 1.0, "enabled": 1, "weights": [True, 0.0]}}
+    assert old == new
+
+    result = diff(old, new)
+    assert {change.location for change in result.changes} >= {"rule.threshold", "rule.enabled"}
+    replayed = apply_patch(old, result.patch)
+    assert json.dumps(replayed, sort_keys=True) == json.dumps(new, sort_keys=True)
+    assert not diff(new, copy.deepcopy(new))
+
+
+def test_services_share_the_diff_core():
+    old = {"owner": "alice", "settings": {"retention": 30, "mode": "strict"}, "tags": ["a", "b"]}
+    new = {"settings": {"retention": 90, "mode": "strict", "region": "eu"}, "tags": ["a", "b", "c"]}
+    changes = {c["field"]: c["type"] for c in asyncio.run(DiffService().detect_structural_changes(old, new))}
+    assert changes == {
+        "owner": "field_removed",  # removals were never reported before
+        "settings.retention": "numeric_value_changed",
+        "settings.region": "nested_field_added",
+        "tags[2]": "list_item_added",
+    }
+
+    schema_diff = VersionService._top_level_diff(old, new)
+    assert set(schema_diff) == {"owner", "settings", "tags"}
+    assert schema_diff["settings"]["changes"] == [
+        {"op": CHANGED, "path": "settings.retention"}, {"op": ADDED, "path": "settings.region"}
+    ]
+
+
+@pytest.mark.benchmark
+def test_diff_10mb_metadata_documents(benchmark_report):
+    old = _metadata(20, 300, 14)
+    new = copy.deepcopy(old)
+    rng = random.Random(1)
+    for _ in range(50):
+        table = rng.choice(rng.choice(new["schemas"])["tables"])
+        table["row_count"] += 1
+        rng.choice(table["columns"])["data_type"] = "text"
+    new["schemas"][3]["tables"].insert(7, {"name": "table_new", "row_count": 0, "columns": []})
+    size = len(json.dumps(old))
+
+    started = time.perf_counter()
+    result = diff(old, new)
+    elapsed = time.perf_counter() - started
+    patch_size = len(json.dumps(result.patch))
+    benchmark_report(document_mb=size / 1e6, diff_ms=elapsed * 1000, changes=len(result.changes),
+                     patch_bytes=patch_size)
+    assert size > 10_000_000 and patch_size * 1000 < size
+    assert apply_patch(old, result.patch) == new
+    assert elapsed < 5
@@ -0,0 +1,62 @@
+# scripts_automation/app/tests/test_vectorized_pattern_detector.py
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.vectorized_pattern_detector import VectorizedPatternDetector
+
+
+def _synthetic_frame(rows: int, columns: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    ids = rng.integers(0, 10_000, rows)
+    generators = [
+        lambda: pd.Series(ids).map(lambda i: f"user{i}@example.com"),
+        lambda: pd.Series(ids).map(lambda i: f"555-{i % 1000:03d}-{i:04d}"),
+        lambda: pd.Series(ids).map(lambda i: f"{i % 900 + 100}-{i % 90 + 10}-{i:04d}"),
+        lambda: pd.Series(ids).map(lambda i: f"10.0.{i % 256}.{i % 200}"),
+        lambda: pd.Series(ids).map(lambda i: f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}"),
+        lambda: pd.Series(rng.normal(size=rows)),
+        lambda: pd.Series(ids).map(lambda i: f"name_{i}"),
+    ]
+    return pd.DataFrame({f"col_{c}": generators[c % len(generators)]() for c in range(columns)})
+
+
+def test_detects_semantic_patterns_in_one_pass():
+    detector = VectorizedPatternDetector()
+    df = _synthetic_frame(2_000, 7)
+
+    result = {item["column"]: {p["type"] for p in item["patterns"]} for item in detector.detect(df)["columns"]}
+
+    assert "email" in result["col_0"]
+    assert "phone" in result["col_1"]
+    assert "ssn" in result["col_2"]
+    assert "ipv4" in result["col_3"]
+    assert "potential_date" in result["col_4"]
+    assert not {"email", "phone", "ssn"} & result["col_6"]
+
+
+def test_match_ratio_is_weighted_by_value_counts():
+    detector = VectorizedPatternDetector()
+    series = pd.Series(["a@b.io"] * 9 + ["not an email"])
+
+    assert detector.match_ratios(series)["email"] == pytest.approx(0.9)
+
+
+@pytest.mark.benchmark
+def test_benchmark_1m_rows_50_columns(benchmark_report):
+    df = _synthetic_frame(1_000_000, 50)
+    detector = VectorizedPatternDetector()
+
+    start = time.perf_counter()
+    result = detector.detect(df)
+    detect_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    detector.quality_issues(df)
+    quality_seconds = time.perf_counter() - start
+
+    benchmark_report(detect_s=detect_seconds, quality_s=quality_seconds)
+    assert len(result["columns"]) == 50
+    assert detect_seconds < 15 and quality_seconds < 10